@@ -0,0 +1,141 @@
+"""
+Hang cache modul
+Feladata: A már legenerált hangfájlokat tartalom alapján (hang, modell, beállítások,
+szöveg) tárolni, hogy ugyanazt a szöveget ugyanazzal a hanggal ne kelljen
+(és ne kelljen kifizetni) újra legenerálni.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def synthesis_key(text: str, voice_id: str, model: str, voice_settings: Dict,
+                  output_format: Optional[str] = None) -> str:
+    """
+    Egy szintézis kérés tartalom alapú kulcsa.
+    Minden olyan paraméter benne van, ami a hangot befolyásolja.
+
+    Args:
+        output_format: Nem alapértelmezett kimeneti formátum (None = az API alapértelmezése,
+                       így a korábban tárolt MP3-ak kulcsa nem változik)
+
+    Returns:
+        str: SHA-256 hex kulcs
+    """
+    fields = {
+        'text': text,
+        'voice_id': voice_id,
+        'model_id': model,
+        'voice_settings': voice_settings
+    }
+    if output_format:
+        fields['output_format'] = output_format
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """
+    Tartalom címzett hang cache egy mappában (kulcs[:2]/kulcs.mp3).
+    Több folyamat / gép is használhatja közösen: az írás atomikus (ideiglenes fájl + csere).
+    """
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: A cache mappa
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def path_for(self, key: str) -> Path:
+        """A kulcshoz tartozó fájl helye."""
+        return self.root / key[:2] / f"{key}.mp3"
+
+    def contains(self, key: str) -> bool:
+        """Van-e a kulcshoz tárolt hang (statisztika nélkül, a tervezőnek)."""
+        return self.path_for(key).is_file()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        A tárolt hang elérési útja.
+
+        Returns:
+            Optional[str]: Elérési út, vagy None, ha nincs a cache-ben
+        """
+        path = self.path_for(key)
+        hit = path.is_file()
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return str(path) if hit else None
+
+    def copy_to(self, key: str, target: str) -> bool:
+        """A tárolt hang másolása a célhelyre. Hamis, ha nincs a cache-ben."""
+        source = self.get(key)
+        if source is None:
+            return False
+        shutil.copyfile(source, target)
+        return True
+
+    def words_path_for(self, key: str) -> Path:
+        """A kulcshoz tartozó szó időzítés (kulcs.words.json) helye."""
+        return self.root / key[:2] / f"{key}.words.json"
+
+    def get_words(self, key: str) -> Optional[List[List]]:
+        """A hanggal együtt tárolt szó időzítés, vagy None, ha nincs (statisztika nélkül)."""
+        try:
+            with open(self.words_path_for(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, audio: bytes, words: Optional[List[List]] = None) -> str:
+        """
+        Hang tárolása (atomikus írással).
+
+        Args:
+            key: A kérés kulcsa
+            audio: A hang byte-jai
+            words: Opcionális szó időzítés, a hang mellé külön fájlba
+
+        Returns:
+            str: A tárolt fájl elérési útja
+        """
+        path = self.path_for(key)
+        path.parent.mkdir(exist_ok=True)
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        if words is not None:
+            words_path = self.words_path_for(key)
+            tmp_path = words_path.with_name(f"{words_path.name}.{suffix}")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(words, f, ensure_ascii=False)
+            os.replace(tmp_path, words_path)
+        tmp_path = path.with_name(f"{path.name}.{suffix}")
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stores += 1
+        return str(path)
+
+    def summary(self) -> Dict:
+        """Cache statisztika (találatok, hiányok, tárolások)."""
+        with self._lock:
+            return {
+                'directory': str(self.root),
+                'hits': self.hits,
+                'misses': self.misses,
+                'stores': self.stores
+            }
@@ -0,0 +1,210 @@
+"""
+Összefűzött hang export modul
+Feladata: Egy forgatókönyv legenerált sorait slide-onként és a teljes forgatókönyvre
+egy-egy MP3 fájlba fűzni frame szinten (újrakódolás és ffmpeg nélkül), állítható
+csend szünetekkel, és egy időzítési indexet írni (soronkénti kezdő / záró pozíció).
+
+A fűzés streamelve történik: egyszerre csak egy sor hangja van a memóriában,
+így a memóriahasználat nem nő a sáv hosszával.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+from audio_pack import read_audio
+from mp3_utils import MP3_BITRATE, MP3_SAMPLE_RATE, MP3_SAMPLES_PER_FRAME, iter_frames, silent_frames
+from results_log import iter_results, write_json_with_results
+
+
+COMBINED_DIR_NAME = "combined"
+
+
+class _Track:
+    """Egy kimeneti MP3 sáv (fájl + az eddig beleírt hossz)."""
+
+    __slots__ = ('path', 'file', 'duration')
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file: BinaryIO = open(path, 'wb')
+        self.duration = 0.0
+
+    def write_frames(self, data, frames) -> float:
+        """Frame-ek írása a forrás byte-okból. Visszaadja a beírt hosszt."""
+        view = memoryview(data)
+        duration = 0.0
+        for offset, header in frames:
+            self.file.write(view[offset:offset + header.size])
+            duration += header.duration
+        self.duration += duration
+        return duration
+
+    def write_silence(self, silence: bytes, duration: float):
+        self.file.write(silence)
+        self.duration += duration
+
+    def close(self):
+        self.file.close()
+
+
+class AudioExporter:
+    """
+    Slide-onkénti és teljes forgatókönyv MP3 sávok készítése a generált sorokból.
+    """
+
+    def __init__(self, line_gap: float = 0.3, slide_gap: float = 1.0,
+                 reader: Callable[[str], bytes] = read_audio):
+        """
+        Args:
+            line_gap: Csend két sor között (s)
+            slide_gap: Csend két slide között a teljes sávban (s)
+            reader: A naplózott elérési útból a hang byte-jait adja (fájl vagy csomag)
+        """
+        self.line_gap = max(0.0, line_gap)
+        self.slide_gap = max(0.0, slide_gap)
+        self.reader = reader
+        # Előre kódolt csend formátumonként: (sample_rate, bitrate) -> {hossz: (byte-ok, valós hossz)}
+        self._silence: Dict[tuple, Dict[float, tuple]] = {}
+
+    def _silence_for(self, gap: float, sample_rate: int, bitrate: int):
+        """A csend frame-ek (a sáv formátumában), gyorsítótárazva."""
+        if gap <= 0:
+            return b"", 0.0
+        cache = self._silence.setdefault((sample_rate, bitrate), {})
+        if gap not in cache:
+            try:
+                frames = silent_frames(gap, sample_rate, bitrate)
+            except ValueError:
+                # Nem MPEG-1 formátum: az alapértelmezett csend
+                sample_rate, bitrate = MP3_SAMPLE_RATE, MP3_BITRATE
+                frames = silent_frames(gap, sample_rate, bitrate)
+            frame_count = len(list(iter_frames(frames)))
+            cache[gap] = (frames, frame_count * MP3_SAMPLES_PER_FRAME / sample_rate)
+        return cache[gap]
+
+    def export(self, results: Iterator[Dict], output_dir: str, script_name: str) -> Dict:
+        """
+        Összefűzi a sikeres sorokat (forgatókönyv sorrendben).
+
+        Kimenet az output_dir/combined mappában:
+            slide_NN.mp3, <script_name>.mp3 és timing.json
+
+        Args:
+            results: A soronkénti eredmények (dialogues.jsonl rekordjai), forgatókönyv sorrendben
+            output_dir: A forgatókönyv output mappája
+            script_name: A teljes sáv fájlneve (kiterjesztés nélkül)
+
+        Returns:
+            Dict: Sávok, hosszak, kihagyott sorok és az index elérési útja
+        """
+        combined_dir = Path(output_dir) / COMBINED_DIR_NAME
+        combined_dir.mkdir(parents=True, exist_ok=True)
+        index_path = combined_dir / "timing.json"
+
+        summary = {
+            'directory': str(combined_dir),
+            'script_file': str(combined_dir / f"{script_name}.mp3"),
+            'index_file': str(index_path),
+            'duration': 0.0,
+            'lines': 0,
+            'skipped': [],
+            'slides': []
+        }
+
+        script_track = _Track(combined_dir / f"{script_name}.mp3")
+        try:
+            head = {'script': script_name, 'line_gap': self.line_gap, 'slide_gap': self.slide_gap}
+            write_json_with_results(head, self._stream(results, combined_dir, script_track, summary),
+                                    str(index_path), key='lines')
+        finally:
+            script_track.close()
+
+        summary['duration'] = round(script_track.duration, 3)
+        return summary
+
+    def _stream(self, results: Iterator[Dict], combined_dir: Path,
+                script_track: _Track, summary: Dict) -> Iterator[Dict]:
+        """Sorról sorra írja a sávokat, és közben előállítja az index rekordokat."""
+        slide_track: Optional[_Track] = None
+        slide_number = None
+        slides: List[Dict] = summary['slides']
+
+        try:
+            for record in results:
+                path = record.get('file_path')
+                if not record.get('success') or not path:
+                    summary['skipped'].append(record.get('file_name') or record.get('line_number'))
+                    continue
+
+                data = self.reader(path)
+                frames = list(iter_frames(data))
+                if not frames:
+                    summary['skipped'].append(record.get('file_name'))
+                    continue
+
+                first = frames[0][1]
+                fmt = (first.sample_rate, first.bitrate)
+
+                # Új slide: előző lezárása, szünet a teljes sávban
+                if record.get('slide_number') != slide_number:
+                    if slide_track is not None:
+                        slide_track.close()
+                        slides[-1]['duration'] = round(slide_track.duration, 3)
+                        script_track.write_silence(*self._silence_for(self.slide_gap, *fmt))
+                    slide_number = record.get('slide_number')
+                    slide_track = _Track(combined_dir / f"slide_{slide_number:02d}.mp3")
+                    slides.append({'slide_number': slide_number, 'file': str(slide_track.path),
+                                   'script_start': round(script_track.duration, 3), 'lines': 0})
+                elif slide_track.duration > 0:
+                    # Szünet a slide-on belüli sorok között (mindkét sávban)
+                    silence, duration = self._silence_for(self.line_gap, *fmt)
+                    slide_track.write_silence(silence, duration)
+                    script_track.write_silence(silence, duration)
+
+                slide_start = slide_track.duration
+                script_start = script_track.duration
+                duration = slide_track.write_frames(data, frames)
+                script_track.write_frames(data, frames)
+                slides[-1]['lines'] += 1
+                summary['lines'] += 1
+
+                yield {
+                    'line_number': record.get('line_number'),
+                    'slide_number': slide_number,
+                    'character': record.get('character'),
+                    'file_name': record.get('file_name'),
+                    'duration': round(duration, 3),
+                    'slide_file': slide_track.path.name,
+                    'slide_start': round(slide_start, 3),
+                    'slide_end': round(slide_start + duration, 3),
+                    'script_start': round(script_start, 3),
+                    'script_end': round(script_start + duration, 3)
+                }
+        finally:
+            if slide_track is not None:
+                slide_track.close()
+                slides[-1]['duration'] = round(slide_track.duration, 3)
+
+
+def export_combined_audio(log_path: str,
+                          output_dir: str,
+                          script_name: str,
+                          line_gap: float = 0.3,
+                          slide_gap: float = 1.0,
+                          reader: Callable[[str], bytes] = read_audio) -> Dict:
+    """
+    A forgatókönyv soronkénti naplójából (dialogues.jsonl) elkészíti az összefűzött sávokat.
+
+    Args:
+        log_path: A dialogues.jsonl elérési útja
+        output_dir: A forgatókönyv output mappája
+        script_name: A teljes sáv fájlneve (kiterjesztés nélkül)
+        line_gap: Csend két sor között (s)
+        slide_gap: Csend két slide között (s)
+        reader: A hangok beolvasása (alapért.: fájl vagy csomag a naplózott út szerint)
+
+    Returns:
+        Dict: AudioExporter.export() eredménye
+    """
+    exporter = AudioExporter(line_gap, slide_gap, reader)
+    return exporter.export(iter_results(log_path), output_dir, script_name)
@@ -0,0 +1,388 @@
+"""
+Hang csomag modul
+Feladata: Egy forgatókönyv (vagy a teljes batch) összes hangját egyetlen, indexelt
+csomag fájlba fűzni a sok ezer apró MP3 helyett (gyorsabb másolás, szinkron és
+listázás hálózati tárhelyen), memory-mapped olvasóval (másolás nélküli nézetek
+soronként) és kicsomagolóval a megszokott fájl elrendezéshez.
+
+Formátum:
+    fejléc:   b"ASPK" + verzió (1 byte) + 3 byte tartalék
+    rekordok: b"E" + név hossz (<H) + méret (<Q) + név (UTF-8) + hang byte-ok
+              b"A" + név hossz (<H) + cél név hossz (<H) + név + cél név   (alias: azonos hang)
+    index:    JSON {"entries": {név: [offset, méret]}}
+    lezárás:  index offset (<Q) + index hossz (<Q) + b"ASPKIDX1"
+
+Minden rekord önleíró, így egy megszakadt írás után (index nélkül) is
+visszaolvasható a csomag a rekordok végigolvasásával.
+
+Használat:
+    python audio_pack.py list batch_output/01_At_the_Market/audio.pack
+    python audio_pack.py extract batch_output/01_At_the_Market/audio.pack kicsomagolt/
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+PACK_MAGIC = b"ASPK"
+PACK_VERSION = 1
+TRAILER_MAGIC = b"ASPKIDX1"
+PACK_SUFFIX = ".pack"
+
+_HEADER = PACK_MAGIC + bytes((PACK_VERSION, 0, 0, 0))
+_ENTRY = struct.Struct('<cHQ')      # típus, név hossz, méret
+_ALIAS = struct.Struct('<cHH')      # típus, név hossz, cél név hossz
+_TRAILER = struct.Struct('<QQ8s')   # index offset, index hossz, magic
+
+
+def pack_location(pack_path: str, name: str) -> str:
+    """Egy csomagbeli hang "elérési útja" a naplókban: <csomag>#<név>."""
+    return f"{pack_path}#{name}"
+
+
+def split_location(location: str) -> Tuple[str, Optional[str]]:
+    """
+    Elérési út szétválasztása.
+
+    Returns:
+        Tuple[str, Optional[str]]: (csomag, név) csomagbeli hangnál, egyébként (út, None)
+    """
+    pack_path, sep, name = location.rpartition('#')
+    if sep and pack_path.endswith(PACK_SUFFIX):
+        return pack_path, name
+    return location, None
+
+
+class AudioPackWriter:
+    """
+    Hozzáfűzéses csomag író (több szálból is hívható).
+    A hang byte-ok azonnal a fájlba kerülnek, az index a close()-nál.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        """
+        Args:
+            path: A csomag fájl (pl. output/audio.pack)
+            append: Létező csomag folytatása (pl. javításkor); False = felülírás
+        """
+        self.path = str(path)
+        self.entries: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._read_file = None
+
+        if append and os.path.isfile(self.path) and os.path.getsize(self.path):
+            with AudioPackReader(self.path) as reader:
+                self.entries = dict(reader.entries)
+                self._offset = reader.data_end
+            # A régi index és lezárás helyére írunk tovább
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(self._offset)
+            self._file.seek(self._offset)
+        else:
+            self._file = open(self.path, 'wb')
+            self._file.write(_HEADER)
+            self._offset = len(_HEADER)
+
+    def add(self, name: str, data: bytes) -> str:
+        """
+        Hang hozzáfűzése.
+
+        Args:
+            name: A hang neve a csomagban (pl. "01_Lisa_001.mp3"; batch csomagnál "mappa/fájl.mp3")
+            data: A hang byte-jai
+
+        Returns:
+            str: A hang helye (pack_location)
+        """
+        encoded = name.encode('utf-8')
+        with self._lock:
+            self._file.write(_ENTRY.pack(b"E", len(encoded), len(data)) + encoded)
+            data_offset = self._offset + _ENTRY.size + len(encoded)
+            self._file.write(data)
+            self._file.flush()
+            self._offset = data_offset + len(data)
+            self.entries[name] = (data_offset, len(data))
+        return pack_location(self.path, name)
+
+    def alias(self, name: str, target: str) -> str:
+        """
+        Azonos hang új néven (a byte-ok nem íródnak újra - duplikátumokhoz).
+
+        Returns:
+            str: A hang helye (pack_location)
+        """
+        encoded, encoded_target = name.encode('utf-8'), target.encode('utf-8')
+        with self._lock:
+            self._file.write(_ALIAS.pack(b"A", len(encoded), len(encoded_target)) + encoded + encoded_target)
+            self._file.flush()
+            self._offset += _ALIAS.size + len(encoded) + len(encoded_target)
+            self.entries[name] = self.entries[target]
+        return pack_location(self.path, name)
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self.entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    @property
+    def size(self) -> int:
+        """Az eddig írt byte-ok száma."""
+        with self._lock:
+            return self._offset
+
+    def read(self, name: str) -> bytes:
+        """
+        Egy már hozzáfűzött hang visszaolvasása írás közben (pl. az összefűzött exporthoz).
+
+        Raises:
+            KeyError: Ha nincs ilyen nevű hang
+        """
+        with self._lock:
+            offset, size = self.entries[name]
+            if self._read_file is None:
+                self._read_file = open(self.path, 'rb')
+            self._read_file.seek(offset)
+            return self._read_file.read(size)
+
+    def read_location(self, location: str) -> bytes:
+        """read_audio(), de a saját (még nyitott) csomag hangjai közvetlenül innen."""
+        pack_path, name = split_location(location)
+        if name is not None and pack_path == self.path:
+            return self.read(name)
+        return read_audio(location)
+
+    def close(self):
+        """Index és lezárás kiírása (többszöri hívás biztonságos)."""
+        with self._lock:
+            if self._read_file is not None:
+                self._read_file.close()
+                self._read_file = None
+            if self._file.closed:
+                return
+            index = json.dumps({'entries': self.entries}, ensure_ascii=False,
+                               separators=(',', ':')).encode('utf-8')
+            self._file.write(index + _TRAILER.pack(self._offset, len(index), TRAILER_MAGIC))
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AudioPackReader:
+    """
+    Memory-mapped csomag olvasó.
+    A get() másolás nélküli memoryview-t ad; ha a close() idején még él ilyen nézet,
+    a leképezés csak az utolsó nézet elengedésekor szűnik meg (a nézetek olvashatók maradnak).
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: A csomag fájl
+
+        Raises:
+            ValueError: Ha a fájl nem csomag
+        """
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Üres csomag fájl: {self.path}")
+        if self._mmap[:4] != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Nem hang csomag: {self.path}")
+        self._view = memoryview(self._mmap)
+        self.data_end = len(_HEADER)    # Az utolsó ép rekord vége (innen folytatható az írás)
+        self.entries = self._read_index()
+        # Index nélküli (megszakadt) csomag: a rekordok végigolvasása
+        self.recovered = self.entries is None
+        if self.recovered:
+            self.entries = self._scan()
+
+    def _read_index(self) -> Optional[Dict[str, Tuple[int, int]]]:
+        """A lezárásban tárolt index (None, ha a csomag nincs lezárva)."""
+        if len(self._mmap) < len(_HEADER) + _TRAILER.size:
+            return None
+        index_offset, index_length, magic = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        if magic != TRAILER_MAGIC:
+            return None
+        raw = self._mmap[index_offset:index_offset + index_length]
+        self.data_end = index_offset
+        return {name: tuple(entry) for name, entry in json.loads(raw.decode('utf-8'))['entries'].items()}
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Index újraépítése a rekordokból (a csonka utolsó rekord kimarad)."""
+        entries: Dict[str, Tuple[int, int]] = {}
+        offset = len(_HEADER)
+        end = len(self._mmap)
+        while offset + _ALIAS.size <= end:
+            kind = self._mmap[offset:offset + 1]
+            if kind == b"E" and offset + _ENTRY.size <= end:
+                _, name_length, size = _ENTRY.unpack_from(self._mmap, offset)
+                name_start = offset + _ENTRY.size
+                data_offset = name_start + name_length
+                if data_offset + size > end:
+                    break
+                entries[self._mmap[name_start:data_offset].decode('utf-8')] = (data_offset, size)
+                offset = data_offset + size
+            elif kind == b"A":
+                _, name_length, target_length = _ALIAS.unpack_from(self._mmap, offset)
+                name_start = offset + _ALIAS.size
+                target_start = name_start + name_length
+                if target_start + target_length > end:
+                    break
+                target = self._mmap[target_start:target_start + target_length].decode('utf-8')
+                if target in entries:
+                    entries[self._mmap[name_start:target_start].decode('utf-8')] = entries[target]
+                offset = target_start + target_length
+            else:
+                break
+            self.data_end = offset
+        return entries
+
+    def names(self) -> List[str]:
+        """A csomag hangjainak nevei (írási sorrendben)."""
+        return sorted(self.entries, key=lambda name: self.entries[name][0])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> memoryview:
+        """
+        Egy hang másolás nélküli nézete.
+
+        Raises:
+            KeyError: Ha nincs ilyen nevű hang
+        """
+        offset, size = self.entries[name]
+        return self._view[offset:offset + size]
+
+    def read(self, name: str) -> bytes:
+        """Egy hang byte-jai (másolat)."""
+        return bytes(self.get(name))
+
+    def iter_entries(self) -> Iterator[Tuple[str, memoryview]]:
+        """(név, nézet) párok írási sorrendben."""
+        for name in self.names():
+            yield name, self.get(name)
+
+    def extract(self, target_dir: str, names: Optional[List[str]] = None) -> int:
+        """
+        Kicsomagolás a megszokott fájl elrendezésbe (target_dir/név).
+
+        Returns:
+            int: Kiírt fájlok száma
+
+        Raises:
+            ValueError: Ha egy név a target_dir-en kívülre mutat (abszolút út vagy '..');
+                        ilyenkor egyetlen fájl sem íródik ki
+        """
+        root = Path(target_dir).resolve()
+        paths = []
+        for name in names or self.names():
+            path = (root / name).resolve()
+            try:
+                path.relative_to(root)
+            except ValueError:
+                raise ValueError(f"A csomagbeli név a célmappán kívülre mutat: {name!r}")
+            if path == root:
+                raise ValueError(f"Érvénytelen csomagbeli név: {name!r}")
+            paths.append((name, path))
+
+        count = 0
+        for name, path in paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(self.get(name))
+            count += 1
+        return count
+
+    def close(self):
+        """
+        Az mmap és a fájl lezárása.
+        Ha a get() nézetei közül még él valamelyik, az mmap lezárása elmarad: a leképezés
+        az utolsó nézet elengedésekor szabadul fel (az olvasó ettől kezdve nem használható).
+        """
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None and not self._mmap.closed:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Élő nézetek: a referencia elengedése, a nézetek tartják életben a leképezést
+                self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_audio(location: str) -> bytes:
+    """
+    Egy naplózott hang byte-jai, akár önálló fájl, akár csomagbeli (<csomag>#<név>).
+
+    Raises:
+        FileNotFoundError / KeyError: Ha a fájl vagy a csomagbeli hang nem létezik
+    """
+    pack_path, name = split_location(location)
+    if name is None:
+        with open(location, 'rb') as f:
+            return f.read()
+    with AudioPackReader(pack_path) as reader:
+        return reader.read(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoSound - hang csomag listázása / kicsomagolása")
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_parser = sub.add_parser('list', help="A csomag tartalma")
+    list_parser.add_argument('pack')
+    extract_parser = sub.add_parser('extract', help="Kicsomagolás fájlokba")
+    extract_parser.add_argument('pack')
+    extract_parser.add_argument('target_dir')
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.pack):
+        print(f"❌ Hiba: A csomag nem található: {args.pack}")
+        sys.exit(2)
+
+    with AudioPackReader(args.pack) as reader:
+        if reader.recovered:
+            print("⚠️  A csomag nincs lezárva (megszakadt írás) - az index a rekordokból épült újra")
+        if args.command == 'list':
+            for name in reader.names():
+                print(f"{reader.entries[name][1]:>10}  {name}")
+            print(f"\n📦 {len(reader)} hang, {os.path.getsize(args.pack)} byte")
+        else:
+            try:
+                count = reader.extract(args.target_dir)
+            except ValueError as e:
+                print(f"❌ Hiba: {e}")
+                sys.exit(2)
+            print(f"📂 {count} fájl kicsomagolva: {args.target_dir}")
+
+
+if __name__ == "__main__":
+    main()
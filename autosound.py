@@ -0,0 +1,303 @@
+"""
+Beágyazható könyvtár API
+Feladata: Forgatókönyvek (fájl vagy nyers szöveg) hanggá alakítása programból,
+alfolyamat és kimenetre írás nélkül. A soronkénti eredmények generátorként
+(vagy async generátorként) jönnek, amint elkészülnek, így a hívó nem vár
+a teljes forgatókönyv / batch végére.
+
+Példa:
+    from autosound import Synthesizer
+
+    with Synthesizer(api_key, "lessons/out", max_workers=8) as synth:
+        for result in synth.iter_text(script_text, name="lesson_12"):
+            print(result.script, result.line.file_path, result.success)
+
+    async with Synthesizer(api_key, cache=shared_cache, session=shared_session) as synth:
+        async for result in synth.aiter_file("scripts/01_At_the_Market.docx", ordered=False):
+            ...
+
+A cache (AudioCache), a rate limiter (RateLimiter), a kulcs pool (KeyPool) és a HTTP
+kliens (requests.Session / httpx.Client, vagy create_transport() példány) kívülről
+is átadható, így több Synthesizer és több szolgáltatás kérés osztozhat rajtuk.
+"""
+
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Union
+
+from audio_cache import AudioCache
+from batch_processor import BatchProcessor
+from dialogue_line import DialogueLine
+from docx_parser import DocxParser
+from http_transport import create_transport, transport_for_session
+from key_pool import KeyPool
+from rate_limiter import RateLimiter
+from script_parser import ScriptParser
+from telemetry import TelemetryCollector
+from tts_generator import TTSGenerator
+from voice_manager import VoiceManager
+
+
+ScriptSource = Union[str, os.PathLike]
+
+# Az async generátor sorának vége jelzés
+_DONE = object()
+
+
+class LineResult:
+    """Egy elkészült sor: a forgatókönyv neve és a kitöltött DialogueLine."""
+
+    __slots__ = ('script', 'line')
+
+    def __init__(self, script: str, line: DialogueLine):
+        self.script = script
+        self.line = line
+
+    @property
+    def success(self) -> bool:
+        return self.line.success
+
+    def to_dict(self) -> Dict:
+        """A sor exportált (dialogues.jsonl) alakja a forgatókönyv nevével kiegészítve."""
+        data = self.line.to_dict()
+        data['script'] = self.script
+        return data
+
+    def __repr__(self) -> str:
+        return f"LineResult(script={self.script!r}, line={self.line!r}, success={self.success})"
+
+
+class Synthesizer:
+    """
+    Forgatókönyvek generálása könyvtárként: nem ír a kimenetre, nem kérdez,
+    és minden sor eredményét azonnal visszaadja.
+
+    Egy példány több forgatókönyvön át újrahasználható; a HTTP kapcsolatok
+    (és az átadott cache / limiter / kulcs pool) a forgatókönyvek között megmaradnak.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 output_dir: str = "output",
+                 voice_mappings: Optional[Dict[str, str]] = None,
+                 max_workers: int = 1,
+                 delay: float = 0.0,
+                 cache: Optional[AudioCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 key_pool: Optional[KeyPool] = None,
+                 session=None,
+                 transport=None,
+                 telemetry: Optional[TelemetryCollector] = None,
+                 base_url: Optional[str] = None,
+                 speed: float = 0.7,
+                 output_format: Optional[str] = None,
+                 chunk_chars: Optional[int] = None,
+                 coalesce_chars: Optional[int] = None,
+                 word_timing: bool = False,
+                 verbose: bool = False):
+        """
+        Args:
+            api_key: ElevenLabs API kulcs (alapért.: ELEVENLABS_API_KEY; key_pool mellett nem kell)
+            output_dir: Alap kimeneti mappa; forgatókönyvenként egy almappa készül benne
+            voice_mappings: Egyedi szereplő -> hangprofil párosítások
+            max_workers: Egyidejű szintézis kérések száma forgatókönyvenként
+            delay: Minimális időköz a kérések indítása között (s), ha nincs rate_limiter
+            cache: Közös tartalom alapú hang cache
+            rate_limiter: Közös RateLimiter (több példány / szál között is)
+            key_pool: Több kulcsos pool (kulcsonkénti rate limittel)
+            session: A hívó HTTP kliense (requests.Session vagy httpx.Client); nem zárjuk le
+            transport: 'http1' / 'http2' vagy egy create_transport() példány (session helyett)
+            telemetry: Közös TelemetryCollector a kérések mérési adataihoz
+            base_url: API alap URL (pl. a helyi fake szerver)
+            speed: Beszéd sebessége
+            output_format: Kimeneti profil vagy ElevenLabs output_format
+            chunk_chars: Hosszú sorok darabolása ennél a hossznál
+            coalesce_chars: Rövid sorok összevonása ennél a hossznál
+            word_timing: Szó szintű időzítés (DialogueLine.words) a feliratokhoz
+            verbose: A generátor soronkénti kiírásai (alapért.: csendes)
+
+        Raises:
+            ValueError: Ha sem API kulcs, sem kulcs pool nincs megadva
+        """
+        self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
+        if not self.api_key and key_pool is None:
+            raise ValueError("API kulcs (api_key / ELEVENLABS_API_KEY) vagy key_pool szükséges")
+
+        self.output_dir = output_dir
+        self.voice_mappings = voice_mappings
+        self.max_workers = max(1, max_workers)
+        self.delay = delay
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.key_pool = key_pool
+        self.telemetry = telemetry
+        self.base_url = base_url
+        self.speed = speed
+        self.output_format = output_format
+        self.chunk_chars = chunk_chars
+        self.coalesce_chars = coalesce_chars
+        self.word_timing = word_timing
+        self.verbose = verbose
+
+        # A csak általunk létrehozott transportot zárjuk le
+        self._owns_transport = session is None and (transport is None or isinstance(transport, str))
+        if session is not None:
+            transport = transport_for_session(session)
+        elif transport is None or isinstance(transport, str):
+            transport = create_transport(transport, self.max_workers, verbose)
+        self.transport = transport
+
+    def iter_file(self, path: ScriptSource, ordered: bool = True) -> Iterator[LineResult]:
+        """
+        Egy forgatókönyv fájl (.txt / .md / .docx) sorai, amint elkészülnek.
+
+        Args:
+            path: A forgatókönyv elérési útja
+            ordered: True = forgatókönyv sorrend, False = elkészülési sorrend
+
+        Yields:
+            LineResult: Soronként (sikertelen sor is, success=False)
+        """
+        path = Path(path)
+        parser = DocxParser(str(path)) if path.suffix.lower() == '.docx' else ScriptParser(str(path))
+        parser_data = parser.parse()
+        yield from self._iter_parsed(parser, parser_data, path.stem, ordered)
+
+    def iter_text(self, text: str, name: str = "script", ordered: bool = True) -> Iterator[LineResult]:
+        """
+        Nyers forgatókönyv szöveg sorai (fájl nélkül), amint elkészülnek.
+
+        Args:
+            text: A forgatókönyv szövege (ugyanaz a formátum, mint a .txt fájloké)
+            name: A forgatókönyv neve (a kimeneti almappa és a LineResult.script)
+            ordered: True = forgatókönyv sorrend, False = elkészülési sorrend
+        """
+        parser = ScriptParser(name)
+        parser_data = parser.parse_text(text)
+        yield from self._iter_parsed(parser, parser_data, name, ordered)
+
+    def iter_scripts(self, sources: Iterable[ScriptSource], ordered: bool = True) -> Iterator[LineResult]:
+        """
+        Több forgatókönyv egymás után. Path vagy létező fájl útvonala -> fájl,
+        egyéb szöveg -> nyers forgatókönyv (neve: script_001, script_002, ...).
+        """
+        for number, source in enumerate(sources, start=1):
+            if isinstance(source, os.PathLike) or os.path.isfile(source):
+                yield from self.iter_file(source, ordered)
+            else:
+                yield from self.iter_text(source, f"script_{number:03d}", ordered)
+
+    async def aiter_file(self, path: ScriptSource, ordered: bool = True) -> AsyncIterator[LineResult]:
+        """iter_file() async generátorként (a generálás háttérszálon fut, az event loop nem blokkol)."""
+        async for result in self._aiterate(lambda: self.iter_file(path, ordered)):
+            yield result
+
+    async def aiter_text(self, text: str, name: str = "script", ordered: bool = True) -> AsyncIterator[LineResult]:
+        """iter_text() async generátorként."""
+        async for result in self._aiterate(lambda: self.iter_text(text, name, ordered)):
+            yield result
+
+    async def aiter_scripts(self, sources: Iterable[ScriptSource], ordered: bool = True) -> AsyncIterator[LineResult]:
+        """iter_scripts() async generátorként."""
+        async for result in self._aiterate(lambda: self.iter_scripts(sources, ordered)):
+            yield result
+
+    def _iter_parsed(self, parser, parser_data: Dict, name: str, ordered: bool) -> Iterator[LineResult]:
+        """Hangok hozzárendelése és a sorok generálása egy feldolgozott forgatókönyvhöz."""
+        dialogues = parser.get_all_dialogues()
+        if not dialogues:
+            return
+
+        voice_manager = VoiceManager()
+        BatchProcessor.assign_voices(parser, parser_data, voice_manager, self.voice_mappings)
+
+        generator = TTSGenerator(self.api_key, os.path.join(self.output_dir, BatchProcessor._safe_dir_name(name)),
+                                 speed=self.speed,
+                                 telemetry=self.telemetry,
+                                 telemetry_label=name,
+                                 base_url=self.base_url,
+                                 max_workers=self.max_workers,
+                                 key_pool=self.key_pool,
+                                 cache=self.cache,
+                                 chunk_chars=self.chunk_chars,
+                                 coalesce_chars=self.coalesce_chars,
+                                 output_format=self.output_format,
+                                 transport=self.transport,
+                                 word_timing=self.word_timing,
+                                 rate_limiter=self.rate_limiter,
+                                 verbose=self.verbose)
+        for line in generator.iter_generate(dialogues, voice_manager, self.delay, ordered):
+            yield LineResult(name, line)
+
+    async def _aiterate(self, start: Callable[[], Iterator[LineResult]]) -> AsyncIterator[LineResult]:
+        """
+        Egy szinkron eredmény generátor async generátorként: a generátor saját
+        háttérszálon fut, az eredmények az event loop sorába kerülnek. Ha a hívó
+        idő előtt kilép, a háttérszál a folyamatban lévő kérések után leáll.
+        """
+        loop = asyncio.get_running_loop()
+        results: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def post(item):
+            try:
+                loop.call_soon_threadsafe(results.put_nowait, item)
+            except RuntimeError:
+                # Az event loop már leállt
+                stop.set()
+
+        def produce():
+            iterator = start()
+            try:
+                for result in iterator:
+                    if stop.is_set():
+                        break
+                    post(result)
+            except BaseException as e:
+                post(e)
+            finally:
+                iterator.close()
+                post(_DONE)
+
+        threading.Thread(target=produce, name="autosound-stream", daemon=True).start()
+        try:
+            while True:
+                item = await results.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def close(self):
+        """A saját HTTP kapcsolatok lezárása (az átadott session / transport a hívóé marad)."""
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self) -> 'Synthesizer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self) -> 'Synthesizer':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def synthesize(source: ScriptSource, **options) -> Iterator[LineResult]:
+    """
+    Egyszeri használat: egy forgatókönyv (fájl útvonal vagy nyers szöveg) sorai.
+
+    Args:
+        source: Path / létező fájl útvonala, vagy a forgatókönyv szövege
+        **options: Synthesizer paraméterek (api_key, output_dir, max_workers, ...)
+    """
+    with Synthesizer(**options) as synthesizer:
+        yield from synthesizer.iter_scripts([source])
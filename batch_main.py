@@ -4,8 +4,16 @@ Több forgatókönyv fájl automatikus feldolgozása
 """
 
 import os
+import json
+import argparse
+from typing import Callable, Iterable
 from dotenv import load_dotenv
-from batch_processor import BatchProcessor
+from batch_processor import BatchProcessor, parse_shard_spec, merge_shard_summaries, SHARD_MODES, PACK_MODES
+from scheduling import SCHEDULES
+from key_pool import load_api_keys, parse_key_spec
+from planner import plan_batch, check_quota
+from output_formats import OUTPUT_PROFILES, resolve_output_format
+from http_transport import TRANSPORTS
 
 
 def print_banner():
@@ -16,8 +24,108 @@ def print_banner():
     print("="*60 + "\n")
 
 
-def print_summary(batch_result: dict):
-    """Kiírja a batch feldolgozás összefoglalóját."""
+def output_format_arg(value: str) -> str:
+    """--output-format ellenőrzése (profil név vagy ElevenLabs formátum)."""
+    try:
+        return resolve_output_format(value).name
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parancssori argumentumok (mind opcionális - hiányukban interaktív mód)."""
+    parser = argparse.ArgumentParser(description="AutoSound - Batch Mode")
+    parser.add_argument('input_dir', nargs='?', help="Input mappa (.docx/.txt fájlok)")
+    parser.add_argument('-o', '--output', help="Output alap mappa (alapért: batch_output)")
+    parser.add_argument('--shard', metavar='i/N',
+                        help="Csak az N részre osztott munka i-edik részét dolgozza fel (pl. 2/4)")
+    parser.add_argument('--shard-by', choices=SHARD_MODES, default='file',
+                        help="Felosztás alapja: fájlonként vagy soronként (nagy forgatókönyvekhez)")
+    parser.add_argument('--merge-shards', action='store_true',
+                        help="A shard összesítők egyesítése batch_summary.json-né (nincs generálás)")
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help="Feldolgozandó fájlok mintája, többször is megadható (alapért.: *.txt, *.docx)")
+    parser.add_argument('--exclude', action='append', metavar='GLOB',
+                        help="Kihagyandó fájlok/mappák mintája, többször is megadható (pl. archive)")
+    parser.add_argument('--max-depth', type=int, metavar='N',
+                        help="Almappák bejárási mélysége (0 = csak az input mappa, alapért.: korlátlan)")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="Prometheus text formátumú metrikák mentése (pl. metrics.prom)")
+    parser.add_argument('--profile', nargs='?', const='timing', choices=('timing', 'cprofile'),
+                        help="Szakaszonkénti időmérés; 'cprofile' esetén .pstats fájlok is (output/profile/), "
+                             "a worker szálak profiljai szakaszonként egyesítve")
+    parser.add_argument('--base-url', metavar='URL',
+                        help="ElevenLabs API alap URL (pl. http://127.0.0.1:8765/v1 a fake_elevenlabs.py-hoz)")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="Egyidejű szintézis kérések száma (alapért.: 1 = sorban)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Adaptív (AIMD) párhuzamosság: --min-workers és --workers között hangolódik")
+    parser.add_argument('--min-workers', type=int, default=1, metavar='N',
+                        help="Adaptív módban az egyidejű kérések alsó határa (alapért.: 1)")
+    parser.add_argument('--hedge', nargs='?', type=float, const=95.0, metavar='PCT',
+                        help="Hedging: a késleltetés PCT-edik percentilisénél lassabb kérés mellé "
+                             "másodpéldány indul (alapért. PCT: 95)")
+    parser.add_argument('--hedge-budget', type=float, default=0.1, metavar='RATIO',
+                        help="A hedge kérések megengedett aránya (alapért.: 0.1 = 10%%)")
+    parser.add_argument('--schedule', choices=SCHEDULES, default='ljf',
+                        help="Párhuzamos módban a kérések sorrendje a nyitott fájlok közös sorában: ljf = a "
+                             "leghosszabb sor először, bármelyik fájlból (alapért.), fifo = fájl és forgatókönyv sorrend")
+    parser.add_argument('--lookahead', type=int, default=4, metavar='N',
+                        help="Párhuzamos módban ennyi fájl kérései ütemeződnek együtt (alapért.: 4)")
+    parser.add_argument('--per-key-workers', type=int, metavar='N',
+                        help="Több API kulcsnál kulcsonként egyidejű kérések felső határa")
+    parser.add_argument('--delay', type=float, default=0.5, metavar='SEC',
+                        help="Minimális időköz az API kérések között (alapért.: 0.5)")
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help="Hang cache mappa: azonos szöveg + hang + beállítás nem generálódik újra")
+    parser.add_argument('--chunk-chars', type=int, metavar='N',
+                        help="N karakternél hosszabb sorok mondathatáron darabolva, párhuzamosan "
+                             "generálódnak, majd MP3 frame szinten összefűződnek")
+    parser.add_argument('--chunk-workers', type=int, default=4, metavar='N',
+                        help="Egy hosszú sor darabjaiból egyszerre futó kérések (alapért.: 4)")
+    parser.add_argument('--coalesce-chars', type=int, metavar='N',
+                        help="Egy hang egymást követő, legfeljebb N karakteres sorai egy kérésbe vonva "
+                             "(with-timestamps), a hang a karakter időzítés szerint soronként visszavágva")
+    parser.add_argument('--coalesce-max-chars', type=int, default=400, metavar='N',
+                        help="Egy összevont kérés legnagyobb szöveghossza (alapért.: 400)")
+    parser.add_argument('--coalesce-max-lines', type=int, default=8, metavar='N',
+                        help="Egy összevont kérés legtöbb sora (alapért.: 8)")
+    parser.add_argument('--export-audio', action='store_true',
+                        help="Slide-onként és a teljes forgatókönyvre egy-egy összefűzött MP3 "
+                             "(újrakódolás nélkül) + timing.json időzítési index")
+    parser.add_argument('--line-gap', type=float, default=0.3, metavar='SEC',
+                        help="Csend két sor között az összefűzött sávokban (alapért.: 0.3)")
+    parser.add_argument('--slide-gap', type=float, default=1.0, metavar='SEC',
+                        help="Csend két slide között a teljes sávban (alapért.: 1.0)")
+    parser.add_argument('--subtitles', action='store_true',
+                        help="Szó szintű időzítés a generálással együtt (with-timestamps), és "
+                             "forgatókönyvenként SRT / WebVTT felirat (combined/ almappa)")
+    parser.add_argument('--pack', choices=PACK_MODES,
+                        help="A hangok egyetlen indexelt csomag fájlba kerülnek külön MP3-ak helyett: "
+                             "script = forgatókönyvenként, batch = egy közös audio.pack")
+    parser.add_argument('--output-format', type=output_format_arg, metavar='PROFIL',
+                        help=f"Kimeneti formátum: {', '.join(OUTPUT_PROFILES)} vagy ElevenLabs "
+                             "formátum (pl. mp3_44100_96); alapért.: ELEVENLABS_OUTPUT_FORMAT vagy standard")
+    parser.add_argument('--transport', choices=TRANSPORTS,
+                        help="HTTP transport: http1 (keep-alive pool) vagy http2 (sok egyidejű kérés "
+                             "néhány kapcsolaton, httpx[http2] kell); alapért.: ELEVENLABS_TRANSPORT vagy http1")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Csak terv: kérések, karakterek hangonként, becsült idő (nincs generálás)")
+    parser.add_argument('--check-quota', action='store_true',
+                        help="Indítás előtt a fiók(ok) hátralévő karakter keretének ellenőrzése")
+    parser.add_argument('-y', '--yes', action='store_true', help="Megerősítés kérése nélkül indul")
+    return parser.parse_args(argv)
+
+
+def print_summary(batch_result: dict, results: Callable[[], Iterable[dict]]):
+    """
+    Kiírja a batch feldolgozás összefoglalóját.
+    
+    Args:
+        batch_result: A process_all() eredménye
+        results: A fájlonkénti eredmények friss iterátora (pl. processor.iter_results);
+                 a batch naplóból streamelve, nem a memóriából
+    """
     if not batch_result.get('success'):
         return
     
@@ -30,47 +138,159 @@ def print_summary(batch_result: dict):
     
     if batch_result['failed'] > 0:
         print(f"\n⚠️  Sikertelen fájlok:")
-        for result in batch_result['results']:
+        for result in results():
             if not result['success']:
                 print(f"   • {result['name']}: {result['error']}")
     
-    print(f"\n📊 Összesítő jelentés: batch_output/batch_summary.json")
+    print(f"\n📊 Összesítő jelentés: {batch_result['summary_path']}")
     print("="*60 + "\n")
     
-    # Részletes statisztikák
-    total_dialogues = sum(r['dialogues_count'] for r in batch_result['results'])
-    total_generated = sum(r['generated_count'] for r in batch_result['results'])
+    # Részletes statisztikák (egy menetben a batch naplóból)
+    total_dialogues = total_generated = total_audio = 0
+    subtitled_scripts = subtitle_cues = reused_duplicates = coalesced_lines = coalesced_requests = 0
+    for r in results():
+        total_dialogues += r['dialogues_count']
+        total_generated += r['generated_count']
+        total_audio += (r.get('audio') or {}).get('duration', 0.0)
+        if r.get('subtitles'):
+            subtitled_scripts += 1
+            subtitle_cues += r['subtitles']['cues']
+        reused_duplicates += (r.get('reused') or {}).get('duplicates', 0)
+        coalesced_lines += (r.get('coalesced') or {}).get('lines', 0)
+        coalesced_requests += (r.get('coalesced') or {}).get('requests', 0)
     
     print("📈 Statisztikák:")
     print(f"   💬 Összes párbeszéd: {total_dialogues}")
     print(f"   🎵 Generált hangfájlok: {total_generated}")
+    if total_audio:
+        print(f"   🕒 Hanganyag hossza: {total_audio / 60:.1f} perc ({total_audio:.1f}s)")
+    
+    telemetry = batch_result.get('telemetry')
+    if telemetry and telemetry['requests']:
+        latency = telemetry['latency_seconds']
+        print(f"   ⏱️  Késleltetés: p50 {latency['p50']:.2f}s, p95 {latency['p95']:.2f}s, max {latency['max']:.2f}s")
+        print(f"   🔁 Újrapróbálkozások: {telemetry['retries']}")
+        makespan = telemetry.get('makespan')
+        if makespan and makespan['seconds']:
+            print(f"   🧮 Futásidő: {makespan['seconds']:.2f}s (kérések összideje: "
+                  f"{makespan['request_seconds_sum']:.2f}s, átfedés: {makespan['overlap']:.1f}x)")
+        if telemetry.get('hedges'):
+            print(f"   🪞 Hedge kérések: {telemetry['hedges']} ({telemetry['hedge_wins']} nyert)")
+    
+    transport = batch_result.get('transport')
+    if transport and transport['transport'] != 'http1':
+        protocols = ", ".join(f"{name}: {count}" for name, count in transport['protocols'].items())
+        print(f"   🔌 Transport: {transport['transport']} ({protocols or 'nincs kérés'})")
+    
+    concurrency = batch_result.get('concurrency')
+    if concurrency:
+        print(f"   🎚️  Párhuzamosság: {concurrency['initial']} → {concurrency['final']} "
+              f"(csúcs {concurrency['peak']}, {concurrency['decreases']} csökkentés)")
+    
+    if subtitled_scripts:
+        print(f"   💬 Feliratok: {subtitled_scripts} forgatókönyv, {subtitle_cues} felirat")
+    
+    cache = batch_result.get('cache')
+    if coalesced_lines:
+        print(f"   🧩 Összevonva: {coalesced_lines} rövid sor {coalesced_requests} kérésben")
+    
+    if cache or reused_duplicates:
+        cache_hits = cache['hits'] if cache else 0
+        print(f"   ♻️  Újrahasznosítva: {cache_hits} cache találat, {reused_duplicates} duplikátum")
+    
+    keys = batch_result.get('keys')
+    if keys:
+        print(f"   🔑 API kulcsok:")
+        for key in keys:
+            state = "aktív" if key['active'] else f"kivonva: {key['drain_reason']}"
+            quota = f"/{key['quota']}" if key['quota'] else ""
+            print(f"      • {key['key']}: {key['requests']} kérés, {key['characters']}{quota} karakter ({state})")
+    
+    profile = batch_result.get('profile')
+    if profile:
+        print(f"   🔬 Szakaszok ({profile['total_seconds']:.2f}s):")
+        for name, stage in profile['stages'].items():
+            print(f"      • {name:<17} {stage['seconds']:8.3f}s  ({stage['share'] * 100:5.1f}%)")
     print(f"   📁 Output mappák:")
     
-    for result in batch_result['results']:
+    for result in results():
         if result['success']:
             print(f"      • {result['name']}/  ({result['generated_count']} fájl)")
     
     print()
 
 
+def print_plan(plan: dict):
+    """Kiírja az előzetes tervet (dry-run)."""
+    print("\n" + "="*60)
+    print("📋 ELŐZETES TERV (nincs generálás)")
+    print("="*60)
+    print(f"📄 Fájlok: {plan['files']}" + (f" ({plan['failed_files']} hibás)" if plan['failed_files'] else ""))
+    print(f"💬 Párbeszéd sorok: {plan['lines']}")
+    print(f"🎤 API kérések: {plan['requests']}  (duplikátum: {plan['duplicates']}, cache: {plan['cached']})")
+    if plan['coalesced_lines']:
+        print(f"🧩 Összevont rövid sorok: {plan['coalesced_lines']}")
+    print(f"🔤 Számlázott karakterek: {plan['characters']}")
+    
+    assumptions = plan['assumptions']
+    minutes, seconds = divmod(int(plan['estimated_seconds']), 60)
+    print(f"⏱️  Becsült idő: {minutes} perc {seconds} mp "
+          f"({assumptions['workers']} worker, {assumptions['min_interval_seconds']}s időköz, "
+          f"{assumptions['keys']} kulcs)")
+    
+    if plan['by_voice']:
+        print("\n🎭 Hangonként:")
+        for voice in plan['by_voice'].values():
+            print(f"   • {voice['voice']:<28} {voice['requests']:5d} kérés {voice['characters']:8d} karakter "
+                  f"({', '.join(voice['characters_in_script'])})")
+    
+    for entry in plan['file_plans']:
+        if entry['error']:
+            print(f"   ⚠️  {entry['file']}: {entry['error']}")
+    
+    quota = plan.get('quota')
+    if quota:
+        print(f"\n💳 Karakter keret: szükséges {quota['required']}, hátralévő {quota['remaining']} "
+              f"{'✅' if quota['sufficient'] else '❌'}")
+        for key in quota['keys']:
+            detail = f"hiba: {key['error']}" if key['error'] else f"{key['remaining']} hátralévő"
+            print(f"   • {key['key']}: {detail}")
+    print("="*60 + "\n")
+
+
 def main():
     """Fő program futási logika."""
     
+    args = parse_args()
+    
     print_banner()
     
+    # Shard összesítők egyesítése (minden gép végzett)
+    if args.merge_shards:
+        merge_shard_summaries(args.output or "batch_output")
+        return
+    
+    shard_index, shard_count = parse_shard_spec(args.shard) if args.shard else (0, 1)
+    
     # 1. API kulcs betöltése
     load_dotenv()
-    api_key = os.getenv('ELEVENLABS_API_KEY')
+    api_keys = load_api_keys()
     
-    if not api_key:
-        print("❌ Hiba: ELEVENLABS_API_KEY nincs beállítva!")
+    if not api_keys:
+        print("❌ Hiba: ELEVENLABS_API_KEY (vagy ELEVENLABS_API_KEYS) nincs beállítva!")
         print("   Ellenőrizd a .env fájlt.")
         return
     
+    api_key = parse_key_spec(api_keys[0])[0]
+    if len(api_keys) > 1:
+        print(f"🔑 {len(api_keys)} API kulcs a poolban")
+    
+    output_format = args.output_format or os.getenv('ELEVENLABS_OUTPUT_FORMAT')
+    
     # 2. Input mappa bekérése
     print("📂 BATCH FELDOLGOZÁS BEÁLLÍTÁSOK\n")
     
-    input_dir = input("Input mappa elérési útja (ahol a .docx/.txt fájlok vannak): ").strip()
+    input_dir = args.input_dir or input("Input mappa elérési útja (ahol a .docx/.txt fájlok vannak): ").strip()
     
     if not input_dir:
         print("❌ Hiba: Input mappa megadása kötelező!")
@@ -81,7 +301,9 @@ def main():
         return
     
     # 3. Output mappa bekérése (opcionális)
-    output_dir = input("Output alap mappa (Enter = 'batch_output'): ").strip()
+    output_dir = args.output
+    if output_dir is None and not args.input_dir:
+        output_dir = input("Output alap mappa (Enter = 'batch_output'): ").strip()
     if not output_dir:
         output_dir = "batch_output"
     
@@ -100,15 +322,65 @@ def main():
     processor = BatchProcessor(
         input_dir=input_dir,
         output_base_dir=output_dir,
-        api_key=api_key
+        api_key=api_key,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        shard_by=args.shard_by,
+        include=args.include,
+        exclude=args.exclude,
+        max_depth=args.max_depth,
+        metrics_path=args.metrics_file,
+        profile=args.profile,
+        base_url=args.base_url,
+        max_workers=args.workers,
+        delay=args.delay,
+        adaptive=args.adaptive,
+        min_workers=args.min_workers,
+        hedge_percentile=args.hedge,
+        hedge_budget=args.hedge_budget,
+        schedule=args.schedule,
+        lookahead=args.lookahead,
+        api_keys=api_keys,
+        per_key_workers=args.per_key_workers,
+        cache_dir=args.cache_dir,
+        chunk_chars=args.chunk_chars,
+        chunk_workers=args.chunk_workers,
+        coalesce_chars=args.coalesce_chars,
+        coalesce_max_chars=args.coalesce_max_chars,
+        coalesce_max_lines=args.coalesce_max_lines,
+        export_audio=args.export_audio,
+        line_gap=args.line_gap,
+        slide_gap=args.slide_gap,
+        subtitles=args.subtitles,
+        output_format=output_format,
+        pack=args.pack,
+        transport=args.transport or os.getenv('ELEVENLABS_TRANSPORT')
     )
     
+    # Előzetes terv (generálás nélkül) és keret ellenőrzés
+    if args.dry_run or args.check_quota:
+        plan = plan_batch(processor, custom_mappings)
+        if args.check_quota:
+            plan['quota'] = check_quota(plan, api_keys, args.base_url)
+        
+        print_plan(plan)
+        plan_path = os.path.join(output_dir, "batch_plan.json")
+        with open(plan_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False)
+        print(f"📋 Terv mentve: {plan_path}\n")
+        
+        if args.dry_run:
+            return
+        if not plan['quota']['sufficient']:
+            print("❌ A hátralévő karakter keret nem elég a futáshoz - nem indul generálás.\n")
+            return
+    
     # Összes fájl feldolgozása
-    batch_result = processor.process_all(custom_mappings)
+    batch_result = processor.process_all(custom_mappings, confirm=not args.yes)
     
     # 6. Összefoglaló kiírása
     if batch_result.get('success'):
-        print_summary(batch_result)
+        print_summary(batch_result, processor.iter_results)
     elif batch_result.get('cancelled'):
         print("\n⚠️  Feldolgozás megszakítva a felhasználó által.\n")
     else:
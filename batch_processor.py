@@ -4,16 +4,110 @@ Feladata: Több forgatókönyv fájl automatikus feldolgozása.
 """
 
 import os
+import re
 import json
 import csv
+import time
+import heapq
+import hashlib
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Sequence, Tuple
 from datetime import datetime
 
 from script_parser import ScriptParser
 from docx_parser import DocxParser
 from voice_manager import VoiceManager
 from tts_generator import TTSGenerator
+from script_discovery import iter_script_files
+from concurrency import AIMDController
+from rate_limiter import RateLimiter
+from hedging import HedgePolicy
+from scheduling import CostModel, SCHEDULES
+from key_pool import build_key_pool
+from audio_cache import AudioCache
+from audio_export import export_combined_audio
+from audio_pack import AudioPackWriter, read_audio
+from subtitles import write_subtitles
+from http_transport import create_transport
+from output_formats import resolve_output_format
+from telemetry import TelemetryCollector, merge_summaries as merge_telemetry_summaries
+from profiler import StageProfiler, merge_summaries as merge_profile_summaries
+from results_log import (ResultsLog, iter_results, export_json, export_csv,
+                         write_json_with_results, CSV_FIELDNAMES)
+
+
+SHARD_MODES = ('file', 'line')
+PACK_MODES = ('script', 'batch')
+SHARD_SUMMARY_PATTERN = re.compile(r'^batch_summary\.shard-(\d+)-of-(\d+)\.json$')
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """
+    Feldolgoz egy "i/N" formátumú shard megadást.
+    
+    Args:
+        spec: Shard megadás, 1-től számozva (pl. "2/4")
+        
+    Returns:
+        Tuple[int, int]: (0-tól számozott shard index, shardok száma)
+    """
+    match = re.match(r'^\s*(\d+)\s*/\s*(\d+)\s*$', spec or '')
+    if not match:
+        raise ValueError(f"Érvénytelen shard megadás: {spec!r} (várt formátum: i/N)")
+    
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Érvénytelen shard: {spec!r} (1 <= i <= N kell)")
+    
+    return index - 1, count
+
+
+def stable_shard(key: str, shard_count: int) -> int:
+    """
+    Stabil (gépfüggetlen) hash alapján shardhoz rendel egy kulcsot.
+    
+    A Python beépített hash()-e futásonként változik, ezért SHA-1-et használunk.
+    """
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+class _ScriptRun:
+    """Egy megnyitott forgatókönyv a generálás alatt (a lezárásig)."""
+    
+    __slots__ = ('file_path', 'label', 'voice_manager', 'result', 'output_dir', 'dialogues', 'log_path',
+                 'results_log', 'pack', 'script_pack', 'generator', 'slide_totals', 'units_left',
+                 'done', 'next_index', 'started_at')
+    
+    def __init__(self, file_path: Path, label: str, voice_manager: VoiceManager):
+        self.file_path = file_path
+        self.label = label
+        self.voice_manager = voice_manager
+        self.result = {
+            'file': str(file_path),
+            'name': file_path.stem,
+            'success': False,
+            'error': None,
+            'dialogues_count': 0,
+            'generated_count': 0,
+            'output_dir': None
+        }
+        self.output_dir: Optional[Path] = None
+        self.dialogues = []
+        self.log_path: Optional[Path] = None
+        self.results_log: Optional[ResultsLog] = None
+        self.pack: Optional[AudioPackWriter] = None
+        self.script_pack: Optional[AudioPackWriter] = None
+        self.generator: Optional[TTSGenerator] = None
+        # Slide-onkénti hossz összesítés (a frame fejlécekből)
+        self.slide_totals: Dict[int, Dict] = {}
+        # Közös ütemezőben: hátralevő egységek, kész de még nem naplózott sorok, naplózási kurzor
+        self.units_left = 0
+        self.done = set()
+        self.next_index = 0
+        self.started_at: Optional[float] = None
 
 
 class BatchProcessor:
@@ -25,7 +119,40 @@ class BatchProcessor:
     def __init__(self, 
                  input_dir: str, 
                  output_base_dir: str = "batch_output",
-                 api_key: str = None):
+                 api_key: str = None,
+                 shard_index: int = 0,
+                 shard_count: int = 1,
+                 shard_by: str = 'file',
+                 include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None,
+                 max_depth: Optional[int] = None,
+                 metrics_path: Optional[str] = None,
+                 profile: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 max_workers: int = 1,
+                 delay: float = 0.5,
+                 adaptive: bool = False,
+                 min_workers: int = 1,
+                 hedge_percentile: Optional[float] = None,
+                 hedge_budget: float = 0.1,
+                 schedule: str = 'ljf',
+                 lookahead: int = 4,
+                 api_keys: Optional[Sequence[str]] = None,
+                 per_key_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None,
+                 speed: float = 0.7,
+                 chunk_chars: Optional[int] = None,
+                 chunk_workers: int = 4,
+                 coalesce_chars: Optional[int] = None,
+                 coalesce_max_chars: int = 400,
+                 coalesce_max_lines: int = 8,
+                 export_audio: bool = False,
+                 line_gap: float = 0.3,
+                 slide_gap: float = 1.0,
+                 subtitles: bool = False,
+                 output_format: Optional[str] = None,
+                 pack: Optional[str] = None,
+                 transport: Optional[str] = None):
         """
         Inicializálja a batch processort.
         
@@ -33,19 +160,155 @@ class BatchProcessor:
             input_dir: Input mappa, ahol a forgatókönyv fájlok vannak
             output_base_dir: Alap output mappa
             api_key: ElevenLabs API kulcs
+            shard_index: Ennek a gépnek a shard indexe (0-tól számozva)
+            shard_count: Shardok (gépek) száma
+            shard_by: 'file' = fájlonkénti, 'line' = soronkénti felosztás
+            include: Glob minták a feldolgozandó fájlokra (alapért.: *.txt, *.docx)
+            exclude: Glob minták a kihagyandó fájlokra/mappákra
+            max_depth: Almappák bejárási mélysége (0 = csak az input mappa, None = korlátlan)
+            metrics_path: Opcionális Prometheus text formátumú metrika fájl
+            profile: Szakasz profilozás: None, 'timing' vagy 'cprofile' (.pstats fájlokkal)
+            base_url: ElevenLabs API alap URL (pl. helyi fake szerver)
+            max_workers: Egyidejű szintézis kérések száma fájlonként
+            delay: Minimális időköz az API kérések között (másodperc)
+            adaptive: AIMD szabályozás: az egyidejű kérések száma min_workers és
+                      max_workers között a 429-ek és a késleltetés alapján hangolódik
+            min_workers: Adaptív módban az egyidejű kérések alsó határa
+            hedge_percentile: Ha meg van adva, az ennél a késleltetés percentilisnél lassabb
+                              kérések mellé másodpéldány indul (pl. 95)
+            hedge_budget: A hedge kérések megengedett aránya (0-1)
+            schedule: Párhuzamos módban a kérések indítási sorrendje a nyitott forgatókönyvek
+                      közös sorában: 'ljf' (leghosszabb becsült munka először, bármelyik fájlból)
+                      vagy 'fifo' (fájl, majd forgatókönyv sorrend)
+            lookahead: Párhuzamos módban ennyi forgatókönyv kérései ütemeződnek együtt
+                       (egy fájl vége alatt már a következők sorai futnak)
+            api_keys: Több API kulcs ("KULCS" vagy "KULCS:KARAKTER_KERET"); megadásukkor a
+                      kérések kulcsonkénti rate limittel oszlanak el (az api_key ilyenkor nem kell)
+            per_key_workers: Kulcsonként egyidejű kérések felső határa
+            cache_dir: Opcionális hang cache mappa (azonos szöveg + hang + beállítás
+                       esetén nincs újabb API hívás, több futás / gép között is)
+            speed: Beszéd sebessége (a cache kulcsnak is része)
+            chunk_chars: Ennél hosszabb sorok darabolva, párhuzamosan generálódnak
+            chunk_workers: Egy sor darabjaiból egyszerre futó kérések száma
+            coalesce_chars: Ha meg van adva, egy hang egymást követő, legfeljebb ennyi karakteres
+                            sorai egy with-timestamps kérésbe vonódnak (soronként visszavágva)
+            coalesce_max_chars: Egy összevont kérés legnagyobb szöveghossza
+            coalesce_max_lines: Egy összevont kérés legtöbb sora
+            export_audio: Slide-onkénti és teljes forgatókönyv MP3 sáv készítése
+                          (frame szintű fűzés, combined/ almappa + timing.json)
+            line_gap: Csend két sor között az összefűzött sávokban (s)
+            slide_gap: Csend két slide között a teljes sávban (s)
+            subtitles: Szó szintű időzítés a szintézissel együtt (with-timestamps), és
+                       forgatókönyvenként SRT / WebVTT felirat a combined/ almappában
+            output_format: Kimeneti profil ("preview", "standard", "final", "pcm") vagy
+                           ElevenLabs output_format (None = az API alapértelmezése)
+            pack: Hang csomag mód: None = külön MP3 fájlok, 'script' = forgatókönyvenként
+                  egy audio.pack, 'batch' = egy közös audio.pack az output mappában
+            transport: HTTP transport: 'http1' (keep-alive pool, alapért.) vagy 'http2'
+                       (multiplexelt kérések néhány kapcsolaton; httpx[http2] kell)
         """
+        if shard_by not in SHARD_MODES:
+            raise ValueError(f"Ismeretlen shard mód: {shard_by} ({', '.join(SHARD_MODES)})")
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Érvénytelen shard: {shard_index + 1}/{shard_count}")
+        # Ismeretlen formátumnál már indításkor hiba (ValueError)
+        self.output_format = resolve_output_format(output_format)
+        if pack is not None and pack not in PACK_MODES:
+            raise ValueError(f"Ismeretlen csomag mód: {pack} ({', '.join(PACK_MODES)})")
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Ismeretlen ütemezés: {schedule} ({', '.join(SCHEDULES)})")
+        
         self.input_dir = Path(input_dir)
         self.output_base_dir = Path(output_base_dir)
         self.api_key = api_key
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.shard_by = shard_by
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.metrics_path = metrics_path
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.delay = delay
+        # A szabályozó az egész futásra közös, így a megtanult limit fájlról fájlra megmarad
+        self.concurrency = AIMDController(min_limit=min_workers, max_limit=max_workers) if adaptive else None
+        self.hedge = HedgePolicy(hedge_percentile, hedge_budget) if hedge_percentile else None
+        self.schedule = schedule
+        self.lookahead = max(1, lookahead)
+        # A hangonkénti sebesség becslés fájlról fájlra pontosodik
+        self.cost_model = CostModel()
+        self.key_pool = build_key_pool(api_keys, delay, per_key_workers) if api_keys else None
+        self.cache = AudioCache(cache_dir) if cache_dir else None
+        # A kapcsolat pool az egész futásra közös (ismeretlen névnél ValueError)
+        self.transport = create_transport(transport, max_workers * (chunk_workers if chunk_chars else 1))
+        self.speed = speed
+        self.chunk_chars = chunk_chars
+        self.chunk_workers = chunk_workers
+        self.coalesce_chars = coalesce_chars
+        self.coalesce_max_chars = coalesce_max_chars
+        self.coalesce_max_lines = coalesce_max_lines
+        self.export_audio = export_audio
+        self.line_gap = line_gap
+        self.slide_gap = slide_gap
+        self.subtitles = subtitles
+        self.pack = pack
+        # 'batch' módban a process_all() alatt nyitott közös csomag
+        self._batch_pack: Optional[AudioPackWriter] = None
+        self.telemetry = TelemetryCollector()
+        self.profiler = StageProfiler(enabled=profile is not None, use_cprofile=profile == 'cprofile')
         
         # Output mappa létrehozása
         self.output_base_dir.mkdir(exist_ok=True)
         
-        self.results = []
+        self.results_log_path = self.output_base_dir / self._shard_file_name("batch_results", "jsonl")
         self.total_files = 0
         self.processed_files = 0
         self.failed_files = []
     
+    @property
+    def is_sharded(self) -> bool:
+        """Igaz, ha a futás több gép között van felosztva."""
+        return self.shard_count > 1
+    
+    @property
+    def shard_suffix(self) -> str:
+        """Shard azonosító a fájlnevekhez (pl. "shard-02-of-04")."""
+        return f"shard-{self.shard_index + 1:02d}-of-{self.shard_count:02d}"
+    
+    def _shard_key(self, file_path: Path) -> str:
+        """Gépfüggetlen kulcs: az input mappához relatív, '/' elválasztós út."""
+        try:
+            return file_path.relative_to(self.input_dir).as_posix()
+        except ValueError:
+            return file_path.name
+    
+    def owns_file(self, file_path: Path) -> bool:
+        """Igaz, ha a fájl ehhez a shardhoz tartozik ('file' módban)."""
+        if not self.is_sharded or self.shard_by != 'file':
+            return True
+        return stable_shard(self._shard_key(file_path), self.shard_count) == self.shard_index
+    
+    def owns_line(self, file_path: Path, line_number: int) -> bool:
+        """Igaz, ha a párbeszéd sor ehhez a shardhoz tartozik ('line' módban)."""
+        if not self.is_sharded or self.shard_by != 'line':
+            return True
+        key = f"{self._shard_key(file_path)}#{line_number}"
+        return stable_shard(key, self.shard_count) == self.shard_index
+    
+    def iter_script_files(self) -> Iterator[Path]:
+        """
+        Lustán bejárja az input mappafát, és sorban visszaadja a támogatott
+        forgatókönyv fájlokat, ahogy megtalálja őket.
+        Shardolt futásnál csak az ehhez a shardhoz tartozó fájlokat adja vissza.
+        
+        Yields:
+            Path: Forgatókönyv fájl
+        """
+        for file_path in iter_script_files(self.input_dir, self.include, self.exclude, self.max_depth):
+            if self.owns_file(file_path):
+                yield file_path
+    
     def find_script_files(self) -> List[Path]:
         """
         Megkeresi az összes támogatott forgatókönyv fájlt az input mappában.
@@ -53,42 +316,74 @@ class BatchProcessor:
         Returns:
             List[Path]: Fájlok listája
         """
-        supported_extensions = ['.txt', '.docx']
-        files = []
-        
-        for ext in supported_extensions:
-            files.extend(self.input_dir.glob(f'*{ext}'))
-        
-        # Név szerint rendezés
-        files.sort()
-        
-        return files
+        return list(self.iter_script_files())
+    
+    @staticmethod
+    def _safe_dir_name(name: str) -> str:
+        """Biztonságos mappanév (speciális karakterek eltávolítása)."""
+        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
+        return safe_name.replace(' ', '_')
     
-    def create_output_directory(self, script_name: str) -> Path:
+    def create_output_directory(self, script_name: str, subdir: str = "") -> Path:
         """
         Létrehoz egy output mappát egy forgatókönyvhöz.
         
         Args:
             script_name: Forgatókönyv neve (fájlnév kiterjesztés nélkül)
+            subdir: Az input mappán belüli almappa (a mappaszerkezet tükrözéséhez)
             
         Returns:
             Path: Output mappa elérési útja
         """
-        # Biztonságos mappanév (speciális karakterek eltávolítása)
-        safe_name = "".join(c for c in script_name if c.isalnum() or c in (' ', '-', '_')).strip()
-        safe_name = safe_name.replace(' ', '_')
+        output_dir = self.output_base_dir
+        for part in Path(subdir).parts:
+            output_dir = output_dir / self._safe_dir_name(part)
         
-        output_dir = self.output_base_dir / safe_name
-        output_dir.mkdir(exist_ok=True)
+        output_dir = output_dir / self._safe_dir_name(script_name)
+        output_dir.mkdir(parents=True, exist_ok=True)
         
         return output_dir
     
+    def open_parser(self, file_path: Path):
+        """Parser választás a fájltípus alapján."""
+        if file_path.suffix.lower() == '.docx':
+            return DocxParser(str(file_path))
+        return ScriptParser(str(file_path))
+    
+    @staticmethod
+    def assign_voices(parser, parser_data: Dict, voice_manager: VoiceManager,
+                      custom_mappings: Optional[Dict] = None):
+        """
+        Hangprofilok hozzárendelése egy feldolgozott forgatókönyv szereplőihez.
+        
+        Args:
+            parser: A forgatókönyv parsere (a párbeszédekhez)
+            parser_data: A parse() eredménye
+            voice_manager: VoiceManager instance
+            custom_mappings: Egyedi hang párosítások (opcionális)
+        """
+        if custom_mappings:
+            for char, profile in custom_mappings.items():
+                if char in parser_data['characters']:
+                    voice_manager.custom_mappings[char] = profile
+        
+        # Ha VAN Characters szekció, használjuk
+        if parser_data['characters']:
+            for character, description in parser_data['characters'].items():
+                voice_manager.assign_voice_by_description(character, description)
+        # Ha NINCS Characters szekció, a párbeszédekből gyűjtjük össze a neveket
+        else:
+            unique_characters = set(d.character for d in parser.get_all_dialogues())
+            for character in unique_characters:
+                # Üres leírással hívjuk meg -> név alapú felismerés
+                voice_manager.assign_voice_by_description(character, "")
+    
     def process_single_file(self, 
                            file_path: Path, 
                            voice_manager: VoiceManager,
                            custom_mappings: Optional[Dict] = None) -> Dict:
         """
-        Feldolgoz egy forgatókönyv fájlt.
+        Feldolgoz egy forgatókönyv fájlt (a sorai a fájl saját ütemezésével generálódnak).
         
         Args:
             file_path: Forgatókönyv fájl elérési útja
@@ -98,15 +393,28 @@ class BatchProcessor:
         Returns:
             Dict: Feldolgozás eredménye
         """
-        result = {
-            'file': str(file_path),
-            'name': file_path.stem,
-            'success': False,
-            'error': None,
-            'dialogues_count': 0,
-            'generated_count': 0,
-            'output_dir': None
-        }
+        run = self._open_script(file_path, voice_manager, custom_mappings)
+        if run.generator is not None:
+            try:
+                with self.profiler.stage('synthesis', run.label):
+                    for line_result in run.generator.iter_generate(run.dialogues, voice_manager, delay=self.delay):
+                        self._record_line(run, line_result)
+            except Exception as e:
+                self._fail_script(run, e)
+        return self._close_script(run)
+    
+    def _open_script(self,
+                     file_path: Path,
+                     voice_manager: VoiceManager,
+                     custom_mappings: Optional[Dict] = None) -> '_ScriptRun':
+        """
+        Egy forgatókönyv megnyitása: feldolgozás, hangválasztás, output mappa, napló és generátor.
+        Hiba esetén, vagy ha a shardnak nincs sora a fájlban, a generator None (nincs mit generálni).
+        """
+        run = _ScriptRun(file_path, self._shard_key(file_path), voice_manager)
+        result = run.result
+        profiler = self.profiler
+        label = run.label
         
         try:
             print(f"\n{'='*60}")
@@ -114,13 +422,10 @@ class BatchProcessor:
             print(f"{'='*60}\n")
             
             # Parser választás a fájltípus alapján
-            if file_path.suffix.lower() == '.docx':
-                parser = DocxParser(str(file_path))
-            else:
-                parser = ScriptParser(str(file_path))
+            parser = self.open_parser(file_path)
             
-            # Forgatókönyv feldolgozása
-            parser_data = parser.parse()
+            # Forgatókönyv feldolgozása ('load' és 'parse' szakasz)
+            parser_data = parser.parse(profiler, label)
             
             # Metaadatok kiírása
             print(f"📌 Forgatókönyv: {parser_data['metadata'].get('title', file_path.stem)}")
@@ -128,62 +433,171 @@ class BatchProcessor:
             print(f"🎬 Jelenetek: {len(parser_data['scenes'])}")
             
             # Hangprofilok hozzárendelése
-            if custom_mappings:
-                for char, profile in custom_mappings.items():
-                    if char in parser_data['characters']:
-                        voice_manager.custom_mappings[char] = profile
-            
-            # Ha VAN Characters szekció, használjuk
-            if parser_data['characters']:
-                for character, description in parser_data['characters'].items():
-                    voice_manager.assign_voice_by_description(character, description)
-            # Ha NINCS Characters szekció, a párbeszédekből gyűjtjük össze a neveket
-            else:
-                print("   ⚠️  Nincs Characters szekció - nevek alapján történik a hangválasztás")
-                dialogues = parser.get_all_dialogues()
-                unique_characters = set(d['character'] for d in dialogues)
-                for character in unique_characters:
-                    # Üres leírással hívjuk meg -> név alapú felismerés
-                    voice_manager.assign_voice_by_description(character, "")
+            with profiler.stage('voice_assignment', label):
+                if not parser_data['characters']:
+                    print("   ⚠️  Nincs Characters szekció - nevek alapján történik a hangválasztás")
+                self.assign_voices(parser, parser_data, voice_manager, custom_mappings)
             
             # Output mappa létrehozása
-            output_dir = self.create_output_directory(file_path.stem)
+            output_dir = self.create_output_directory(file_path.stem, str(Path(label).parent))
             result['output_dir'] = str(output_dir)
+            run.output_dir = output_dir
             
             print(f"📁 Output mappa: {output_dir}")
             
             # Párbeszédek előkészítése
             dialogues = parser.get_all_dialogues()
-            result['dialogues_count'] = len(dialogues)
             
             if not dialogues:
                 raise Exception("Nincs párbeszéd a forgatókönyvben!")
             
+            # Soronkénti shardolásnál csak a saját sorainkat generáljuk
+            dialogues = [d for d in dialogues if self.owns_line(file_path, d.line_number)]
+            result['dialogues_count'] = len(dialogues)
+            run.dialogues = dialogues
+            
             print(f"💬 Párbeszédek: {len(dialogues)}\n")
             
-            # TTS generálás
-            tts_generator = TTSGenerator(self.api_key, str(output_dir))
-            generated_results = tts_generator.generate_batch(
-                dialogues, 
-                voice_manager, 
-                delay=0.5
-            )
+            if not dialogues:
+                print(f"   ℹ️  Ennek a shardnak ({self.shard_suffix}) nincs sora ebben a fájlban")
+                result['success'] = True
+                return run
+            
+            # Soronkénti napló (soronkénti shardolásnál shardonként külön fájl)
+            run.log_path = output_dir / self._dialogues_file_name('jsonl')
+            
+            # Hang csomag: a batch közös csomagja (mappa előtaggal), vagy forgatókönyvenként egy
+            pack = self._batch_pack
+            pack_prefix = ""
+            if pack is not None:
+                pack_prefix = output_dir.relative_to(self.output_base_dir).as_posix() + "/"
+            elif self.pack == 'script':
+                pack = run.script_pack = AudioPackWriter(str(output_dir / self._pack_file_name()))
+                result['pack'] = pack.path
+            run.pack = pack
+            
+            # TTS generálás - minden eredmény azonnal a naplóba kerül
+            run.generator = TTSGenerator(self.api_key, str(output_dir),
+                                         speed=self.speed,
+                                         telemetry=self.telemetry,
+                                         telemetry_label=label,
+                                         base_url=self.base_url,
+                                         max_workers=self.max_workers,
+                                         concurrency=self.concurrency,
+                                         hedge=self.hedge,
+                                         schedule=self.schedule,
+                                         cost_model=self.cost_model,
+                                         key_pool=self.key_pool,
+                                         cache=self.cache,
+                                         chunk_chars=self.chunk_chars,
+                                         chunk_workers=self.chunk_workers,
+                                         coalesce_chars=self.coalesce_chars,
+                                         coalesce_max_chars=self.coalesce_max_chars,
+                                         coalesce_max_lines=self.coalesce_max_lines,
+                                         word_timing=self.subtitles,
+                                         output_format=self.output_format.name,
+                                         pack=pack,
+                                         pack_prefix=pack_prefix,
+                                         transport=self.transport,
+                                         profiler=self.profiler)
+            run.results_log = ResultsLog(str(run.log_path))
+            print(f"🎬 Összesen {len(dialogues)} párbeszéd generálása indítása...\n")
+            
+        except Exception as e:
+            self._fail_script(run, e)
+        
+        return run
+    
+    @staticmethod
+    def _record_line(run: '_ScriptRun', line_result):
+        """Egy kész sor a naplóba és a slide-onkénti hossz összesítésbe (nincs dekódolás)."""
+        run.results_log.append(line_result.to_dict())
+        if line_result.success:
+            run.result['generated_count'] += 1
+            slide = run.slide_totals.setdefault(line_result.slide_number, {
+                'slide_number': line_result.slide_number, 'lines': 0, 'duration': 0.0})
+            slide['lines'] += 1
+            slide['duration'] += line_result.duration or 0.0
+    
+    def _fail_script(self, run: '_ScriptRun', error: Exception):
+        """A forgatókönyv hibával zárul (a még nem generált sorai kimaradnak)."""
+        print(f"\n❌ Hiba: {error}")
+        run.result['error'] = str(error)
+        run.generator = None
+        self.failed_files.append(str(run.file_path))
+    
+    def _close_script(self, run: '_ScriptRun') -> Dict:
+        """
+        A forgatókönyv lezárása az utolsó sora után: napló, összesítés, JSON / CSV,
+        hang megfeleltetések és a kért sávok / feliratok.
+        
+        Returns:
+            Dict: Feldolgozás eredménye
+        """
+        result = run.result
+        profiler = self.profiler
+        label = run.label
+        file_path = run.file_path
+        output_dir = run.output_dir
+        log_path = run.log_path
+        pack = run.pack
+        tts_generator = run.generator
+        
+        try:
+            if run.results_log is not None:
+                run.results_log.close()
+            if tts_generator is None:
+                # Hiba, vagy a shardnak nincs sora ebben a fájlban
+                return result
             
-            # Sikeres generálások száma
-            result['generated_count'] = sum(1 for r in generated_results if r['success'])
+            slide_totals = run.slide_totals
+            for slide in slide_totals.values():
+                slide['duration'] = round(slide['duration'], 3)
+            result['audio'] = {
+                'duration': round(sum(s['duration'] for s in slide_totals.values()), 3),
+                'slides': [slide_totals[n] for n in sorted(slide_totals)]
+            }
             
-            # JSON és CSV mentés
-            json_path = output_dir / "dialogues.json"
-            csv_path = output_dir / "dialogues.csv"
-            mappings_path = output_dir / "voice_mappings.json"
+            print(f"\n✅ Sikeres ({file_path.name}): {result['generated_count']}/{len(run.dialogues)} "
+                  f"(hanganyag: {result['audio']['duration']:.1f}s)")
             
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(generated_results, f, ensure_ascii=False, indent=2)
+            result['reused'] = {'cache': tts_generator.cache_hits, 'duplicates': tts_generator.dedup_hits}
+            if self.coalesce_chars:
+                result['coalesced'] = {'requests': tts_generator.coalesced_requests,
+                                       'lines': tts_generator.coalesced_lines}
             
-            self._save_csv(generated_results, csv_path)
+            # Kérésenkénti mérések összesítése (késleltetés, újrapróbálkozás, áteresztőképesség)
+            result['telemetry'] = self.telemetry.summary(label)
             
-            with open(mappings_path, 'w', encoding='utf-8') as f:
-                json.dump(voice_manager.get_all_mappings(), f, ensure_ascii=False, indent=2)
+            # JSON és CSV a naplóból
+            with profiler.stage('export', label):
+                export_json(str(log_path), str(output_dir / self._dialogues_file_name('json')))
+                export_csv(str(log_path), str(output_dir / self._dialogues_file_name('csv')))
+                
+                with open(output_dir / "voice_mappings.json", 'w', encoding='utf-8') as f:
+                    json.dump(run.voice_manager.get_all_mappings(), f, ensure_ascii=False, indent=2)
+                tts_generator.save_settings()
+                
+                # Összefűzött sávok (csak MP3; soronkénti shardolásnál a shard csak a sorok egy részét látja)
+                if (self.export_audio and self.output_format.codec == 'mp3'
+                        and not (self.is_sharded and self.shard_by == 'line')):
+                    combined = export_combined_audio(str(log_path), str(output_dir), file_path.stem,
+                                                     self.line_gap, self.slide_gap,
+                                                     reader=pack.read_location if pack else read_audio)
+                    result['combined'] = {key: combined[key] for key in
+                                          ('script_file', 'index_file', 'duration', 'lines', 'skipped')}
+                    result['combined']['slides'] = len(combined['slides'])
+                    print(f"🎞️  Összefűzött sáv: {len(combined['slides'])} slide, "
+                          f"{combined['duration']:.1f}s -> {combined['script_file']}")
+                
+                # Feliratok (az összefűzött sáv indexe szerint, ha elkészült)
+                if self.subtitles and not (self.is_sharded and self.shard_by == 'line'):
+                    index_path = result['combined']['index_file'] if 'combined' in result else None
+                    subtitles = write_subtitles(str(log_path), str(output_dir), file_path.stem,
+                                                self.line_gap, self.slide_gap, index_path)
+                    result['subtitles'] = subtitles
+                    print(f"💬 Feliratok: {subtitles['cues']} felirat -> "
+                          f"{', '.join(subtitles['files'].values())}")
             
             print(f"\n✅ Sikeres feldolgozás!")
             print(f"   Generált hangok: {result['generated_count']}/{result['dialogues_count']}")
@@ -191,26 +605,164 @@ class BatchProcessor:
             result['success'] = True
             
         except Exception as e:
-            print(f"\n❌ Hiba: {e}")
-            result['error'] = str(e)
-            self.failed_files.append(str(file_path))
+            self._fail_script(run, e)
+        finally:
+            if run.script_pack is not None:
+                run.script_pack.close()
+            if profiler.enabled:
+                result['profile'] = profiler.label_summary(label)
         
         return result
     
-    def process_all(self, custom_mappings: Optional[Dict] = None) -> Dict:
+    def _process_shared(self, files: Iterator[Path], custom_mappings: Optional[Dict], batch_log: ResultsLog):
+        """
+        Párhuzamos feldolgozás fájlokon át: a következő `lookahead` forgatókönyv kérés egységei
+        egy közös, prioritás szerint rendezett sorból indulnak ('ljf': a leghosszabb becsült
+        munka először, bármelyik fájlból; 'fifo': fájl, majd forgatókönyv sorrend). Így egy fájl
+        végén futó hosszú sor mellett már a következő fájlok sorai generálódnak, és a futás
+        nem áll meg minden fájl végén. Egy forgatókönyv az utolsó egysége után azonnal lezárul
+        (napló a forgatókönyv sorrendjében, exportok, batch napló), a fájlnevek nem változnak.
+        
+        Args:
+            files: A feldolgozandó fájlok (lustán bejárva)
+            custom_mappings: Egyedi hang párosítások
+            batch_log: A fájlonkénti eredmények naplója
+        """
+        # A kérések indításának közös időköze (kulcs poolnál a kulcsonkénti limiter végzi)
+        limiter = RateLimiter(self.delay) if self.key_pool is None else None
+        ready: List[Tuple] = []
+        pending: Dict = {}
+        sequence = itertools.count()
+        open_scripts = 0
+        exhausted = False
+        
+        def finish(run: _ScriptRun):
+            if run.started_at is not None:
+                self.profiler.record('synthesis', time.perf_counter() - run.started_at, run.label)
+            result = self._close_script(run)
+            batch_log.append(result)
+            if result['success']:
+                self.processed_files += 1
+        
+        def open_next():
+            nonlocal open_scripts, exhausted
+            file_path = next(files, None)
+            if file_path is None:
+                exhausted = True
+                return
+            self.total_files += 1
+            print(f"\n[{self.total_files}] ", end="")
+            
+            # Fájlonként saját hang megfeleltetés (egyszerre több forgatókönyv is nyitva van)
+            run = self._open_script(file_path, VoiceManager(custom_mappings), custom_mappings)
+            if run.generator is None:
+                finish(run)
+                return
+            
+            run.started_at = time.perf_counter()
+            units = run.generator.plan_units(run.dialogues, run.voice_manager)
+            run.units_left = len(units)
+            costs = run.generator.unit_costs(run.dialogues, run.voice_manager, units)
+            order = next(sequence)
+            for position, (unit, cost) in enumerate(zip(units, costs)):
+                priority = -cost if self.schedule == 'ljf' else 0.0
+                heapq.heappush(ready, (priority, order, position, run, unit))
+            open_scripts += 1
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            try:
+                while True:
+                    # Új fájl, amíg az előretekintés enged, vagy ha különben worker maradna üresen
+                    while not exhausted and (open_scripts < self.lookahead
+                                             or (not ready and len(pending) < self.max_workers)):
+                        open_next()
+                    
+                    # Csak szabad workernek indul egység, így a később nyitott fájlok hosszú sorai
+                    # is a sor elejére kerülhetnek
+                    while ready and len(pending) < self.max_workers:
+                        _, _, _, run, unit = heapq.heappop(ready)
+                        generate_unit = self.profiler.profiled('synthesis', run.generator.generate_unit)
+                        future = executor.submit(generate_unit, [run.dialogues[i] for i in unit],
+                                                 run.voice_manager, time.monotonic(), limiter)
+                        pending[future] = (run, unit)
+                    
+                    if not pending:
+                        break
+                    
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        run, unit = pending.pop(future)
+                        try:
+                            future.result()
+                        except Exception as e:
+                            # A sorok sikertelenként kerülnek a naplóba, a fájl többi sora fut tovább
+                            print(f"\n❌ Hiba ({run.file_path.name}): {e}")
+                        
+                        # A napló a forgatókönyv sorrendjében bővül
+                        run.done.update(unit)
+                        while run.next_index in run.done:
+                            run.done.discard(run.next_index)
+                            self._record_line(run, run.dialogues[run.next_index])
+                            run.next_index += 1
+                        
+                        run.units_left -= 1
+                        if run.units_left == 0:
+                            open_scripts -= 1
+                            finish(run)
+            finally:
+                # Megszakításnál a még el nem indult egységek kimaradnak
+                for future in pending:
+                    future.cancel()
+    
+    def _dialogues_file_name(self, extension: str) -> str:
+        """A párbeszéd export fájlneve (soronkénti shardolásnál shard utótaggal)."""
+        if self.is_sharded and self.shard_by == 'line':
+            return f"dialogues.{self.shard_suffix}.{extension}"
+        return f"dialogues.{extension}"
+    
+    def _pack_file_name(self) -> str:
+        """A hang csomag fájlneve (több gép által írt csomagnál shard utótaggal)."""
+        if self.is_sharded and (self.pack == 'batch' or self.shard_by == 'line'):
+            return f"audio.{self.shard_suffix}.pack"
+        return "audio.pack"
+    
+    def _shard_file_name(self, stem: str, extension: str) -> str:
+        """Batch szintű fájlnév (shardolt futásnál shard utótaggal)."""
+        if self.is_sharded:
+            return f"{stem}.{self.shard_suffix}.{extension}"
+        return f"{stem}.{extension}"
+    
+    def iter_results(self):
+        """Visszaolvassa a fájlonkénti eredményeket a batch naplóból."""
+        if not self.results_log_path.exists():
+            return iter(())
+        return iter_results(str(self.results_log_path))
+    
+    def process_all(self, custom_mappings: Optional[Dict] = None, confirm: bool = True) -> Dict:
         """
         Feldolgozza az összes forgatókönyv fájlt az input mappában.
         
         Args:
             custom_mappings: Egyedi hang párosítások (opcionális)
+            confirm: Kérjen-e megerősítést indítás előtt
             
         Returns:
-            Dict: Batch feldolgozás összesített eredménye
+            Dict: Batch feldolgozás összesített eredménye (a fájlonkénti eredmények nélkül:
+            azok az iter_results()-szal, vagy a summary_path fájlból streamelhetők)
         """
-        files = self.find_script_files()
-        self.total_files = len(files)
+        # Lusta keresés: csak az első fájlt várjuk meg, a többit feldolgozás közben találjuk meg
+        files = self.iter_script_files()
+        first_file = next(files, None)
+        
+        if first_file is None and self.is_sharded:
+            # Üres shard: az összesítő akkor is kell, hogy az egyesítés teljes legyen
+            print(f"ℹ️  A(z) {self.shard_suffix} shardhoz nem tartozik fájl")
+            ResultsLog(str(self.results_log_path)).close()
+            summary_path = self._save_summary()
+            return {'success': True, 'summary_path': str(summary_path), 'total_files': 0,
+                    'processed': 0, 'failed': 0}
         
-        if self.total_files == 0:
+        if first_file is None:
             print(f"❌ Nincs forgatókönyv fájl a mappában: {self.input_dir}")
             print("   Támogatott formátumok: .txt, .docx")
             return {'success': False, 'error': 'No files found'}
@@ -219,49 +771,88 @@ class BatchProcessor:
         print(f"{'='*60}")
         print(f"📂 Input mappa: {self.input_dir}")
         print(f"📁 Output mappa: {self.output_base_dir}")
-        print(f"📄 Talált fájlok: {self.total_files}")
+        print(f"📄 Első talált fájl: {first_file.relative_to(self.input_dir)}")
+        if self.is_sharded:
+            print(f"🧩 Shard: {self.shard_index + 1}/{self.shard_count} ({self.shard_by} alapú felosztás)")
         print(f"{'='*60}\n")
         
         # Megerősítés kérése
-        confirmation = input(f"⚠️  {self.total_files} fájl feldolgozása kezdődik. Folytatod? (i/n): ").strip().lower()
-        
-        if confirmation != 'i':
-            print("❌ Megszakítva.")
-            return {'success': False, 'cancelled': True}
+        if confirm:
+            confirmation = input(f"⚠️  A mappa forgatókönyveinek feldolgozása kezdődik. Folytatod? (i/n): ").strip().lower()
+            
+            if confirmation != 'i':
+                print("❌ Megszakítva.")
+                return {'success': False, 'cancelled': True}
         
         # Voice manager létrehozása
         voice_manager = VoiceManager(custom_mappings)
         
-        # Fájlok feldolgozása
-        for i, file_path in enumerate(files, 1):
-            print(f"\n[{i}/{self.total_files}] ", end="")
-            
-            result = self.process_single_file(file_path, voice_manager, custom_mappings)
-            self.results.append(result)
-            
-            if result['success']:
-                self.processed_files += 1
-            
-            # Voice manager tisztítása a következő fájlhoz
-            voice_manager.character_voice_map.clear()
+        if self.pack == 'batch':
+            self._batch_pack = AudioPackWriter(str(self.output_base_dir / self._pack_file_name()))
+        
+        # Fájlok feldolgozása - az eredmények azonnal a batch naplóba kerülnek
+        try:
+            with ResultsLog(str(self.results_log_path), fsync_every=1) as batch_log:
+                if self.max_workers > 1:
+                    # Párhuzamos mód: több fájl kérései egy közös, költség szerint rendezett sorban
+                    self._process_shared(itertools.chain([first_file], files), custom_mappings, batch_log)
+                else:
+                    for i, file_path in enumerate(itertools.chain([first_file], files), 1):
+                        self.total_files = i
+                        print(f"\n[{i}] ", end="")
+                        
+                        result = self.process_single_file(file_path, voice_manager, custom_mappings)
+                        batch_log.append(result)
+                        
+                        if result['success']:
+                            self.processed_files += 1
+                        
+                        # Voice manager tisztítása a következő fájlhoz
+                        voice_manager.character_voice_map.clear()
+        finally:
+            if self._batch_pack is not None:
+                self._batch_pack.close()
+                print(f"\n📦 Hang csomag: {self._batch_pack.path} "
+                      f"({len(self._batch_pack)} hang, {self._batch_pack.size / 1e6:.1f} MB)")
+                self._batch_pack = None
         
         # Összesítő jelentés mentése
-        self._save_summary()
+        summary_path = self._save_summary()
+        
+        if self.metrics_path:
+            self.telemetry.write_prometheus(self.metrics_path)
+            print(f"📈 Prometheus metrikák mentve: {self.metrics_path}")
+        
+        if self.profiler.use_cprofile:
+            suffix = self.shard_suffix if self.is_sharded else ""
+            for path in self.profiler.dump_stats(str(self.output_base_dir / "profile"), suffix):
+                print(f"🔬 cProfile mentve: {path}")
         
         return {
             'success': True,
+            'summary_path': str(summary_path),
             'total_files': self.total_files,
             'processed': self.processed_files,
             'failed': len(self.failed_files),
-            'results': self.results
+            'output_format': self.output_format.name,
+            'pack': self.pack,
+            'subtitles': self.subtitles,
+            'transport': self.transport.summary(),
+            'telemetry': self.telemetry.summary(),
+            'profile': self.profiler.summary() if self.profiler.enabled else None,
+            'concurrency': self.concurrency.summary() if self.concurrency is not None else None,
+            'hedging': self.hedge.summary() if self.hedge is not None else None,
+            'keys': self.key_pool.summary() if self.key_pool is not None else None,
+            'cache': self.cache.summary() if self.cache is not None else None
         }
     
-    def _save_csv(self, data: list, output_path: Path):
+    @staticmethod
+    def _save_csv(data: list, output_path: Path):
         """Menti a párbeszédeket CSV formátumban."""
         if not data:
             return
         
-        fieldnames = ['scene', 'slide_number', 'character', 'text', 'voice_id', 'file_name', 'success']
+        fieldnames = CSV_FIELDNAMES
         
         with open(output_path, 'w', encoding='utf-8', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -271,9 +862,12 @@ class BatchProcessor:
                 csv_row = {key: row.get(key, '') for key in fieldnames}
                 writer.writerow(csv_row)
     
-    def _save_summary(self):
-        """Mentse az összesített jelentést."""
-        summary_path = self.output_base_dir / "batch_summary.json"
+    def _save_summary(self) -> Path:
+        """
+        Mentse az összesített jelentést (shardolt futásnál shardonként).
+        A fájlonkénti eredmények a batch naplóból streamelődnek.
+        """
+        summary_path = self.output_base_dir / self._shard_file_name("batch_summary", "json")
         
         summary = {
             'timestamp': datetime.now().isoformat(),
@@ -282,10 +876,232 @@ class BatchProcessor:
             'total_files': self.total_files,
             'processed_files': self.processed_files,
             'failed_files': self.failed_files,
-            'results': self.results
+            'output_format': self.output_format.name,
+            'pack': self.pack,
+            'subtitles': self.subtitles,
+            'export_audio': self.export_audio,
+            'line_gap': self.line_gap,
+            'slide_gap': self.slide_gap,
+            'transport': self.transport.summary(),
+            'telemetry': self.telemetry.summary()
         }
         
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        if self.profiler.enabled:
+            summary['profile'] = self.profiler.summary()
+        
+        if self.concurrency is not None:
+            summary['concurrency'] = self.concurrency.summary()
+        
+        if self.hedge is not None:
+            summary['hedging'] = self.hedge.summary()
+        
+        if self.key_pool is not None:
+            summary['keys'] = self.key_pool.summary()
+        
+        if self.cache is not None:
+            summary['cache'] = self.cache.summary()
+        
+        if self.is_sharded:
+            summary['shard'] = {
+                'index': self.shard_index + 1,
+                'count': self.shard_count,
+                'by': self.shard_by
+            }
+        
+        write_json_with_results(summary, self.iter_results(), str(summary_path))
         
         print(f"\n📊 Összesítő jelentés mentve: {summary_path}")
+        return summary_path
+
+
+def merge_shard_summaries(output_base_dir: str) -> Dict:
+    """
+    Összefésüli a shardonkénti összesítőket egyetlen batch_summary.json-né.
+    
+    Soronkénti shardolásnál a forgatókönyvenkénti dialogues.shard-*.json
+    fájlokat is egyesíti dialogues.json és dialogues.csv fájlokká.
+    
+    Args:
+        output_base_dir: A shardok közös output mappája
+        
+    Returns:
+        Dict: Az összefésült összesítő
+    """
+    base_dir = Path(output_base_dir)
+    shard_files = {}
+    shard_counts = set()
+    
+    for path in sorted(base_dir.glob('batch_summary.shard-*-of-*.json')):
+        match = SHARD_SUMMARY_PATTERN.match(path.name)
+        if match:
+            shard_files[int(match.group(1))] = path
+            shard_counts.add(int(match.group(2)))
+    
+    if not shard_files:
+        raise FileNotFoundError(f"Nincs shard összesítő a mappában: {base_dir}")
+    if len(shard_counts) > 1:
+        raise ValueError(f"Eltérő shard számú összesítők: {sorted(shard_counts)}")
+    
+    shard_count = shard_counts.pop()
+    missing = [i for i in range(1, shard_count + 1) if i not in shard_files]
+    
+    summaries = []
+    for index in sorted(shard_files):
+        with open(shard_files[index], 'r', encoding='utf-8') as f:
+            summaries.append(json.load(f))
+    
+    shard_by = summaries[0].get('shard', {}).get('by', 'file')
+    
+    # Fájlonkénti eredmények egyesítése (soronkénti módban egy fájl több shardban is szerepel)
+    file_parts: Dict[str, List[Dict]] = {}
+    for summary in summaries:
+        for result in summary['results']:
+            file_parts.setdefault(result['file'], []).append(result)
+    
+    results = [_merge_file_results(file_parts[key]) for key in sorted(file_parts)]
+    failed_files = sorted({f for summary in summaries for f in summary['failed_files']})
+    
+    if shard_by == 'line':
+        for result in results:
+            if result['output_dir']:
+                merge_shard_dialogues(Path(result['output_dir']))
+    
+    merged_summary = {
+        'timestamp': datetime.now().isoformat(),
+        'input_directory': summaries[0]['input_directory'],
+        'output_directory': str(base_dir),
+        'total_files': len(results),
+        'processed_files': sum(1 for r in results if r['success']),
+        'failed_files': failed_files,
+        'telemetry': merge_telemetry_summaries([s.get('telemetry') for s in summaries]),
+        'results': results,
+        'shards': {
+            'count': shard_count,
+            'by': shard_by,
+            'merged': sorted(shard_files),
+            'missing': missing
+        }
+    }
+    
+    # Futás szintű blokkok (a beállítások minden shardban azonosak, a számlálók összeadódnak)
+    for key in ('output_format', 'pack', 'subtitles', 'export_audio', 'line_gap', 'slide_gap'):
+        if key in summaries[0]:
+            merged_summary[key] = summaries[0][key]
+    transports = [s['transport'] for s in summaries if s.get('transport')]
+    if transports:
+        merged_summary['transport'] = {'transport': transports[0]['transport'],
+                                       'protocols': _sum_fields([t['protocols'] for t in transports])}
+    caches = [s['cache'] for s in summaries if s.get('cache')]
+    if caches:
+        merged_summary['cache'] = _sum_fields(caches, ('hits', 'misses', 'stores'))
+    hedges = [s['hedging'] for s in summaries if s.get('hedging')]
+    if hedges:
+        merged_summary['hedging'] = _sum_fields(hedges, ('requests', 'hedges', 'hedge_wins', 'budget_denied'))
+        thresholds = [h['threshold_seconds'] for h in hedges if h.get('threshold_seconds') is not None]
+        merged_summary['hedging']['threshold_seconds'] = max(thresholds) if thresholds else None
+    # Shardonként külön AIMD szabályozó fut - a pályájuk nem vonható össze
+    if any('concurrency' in s for s in summaries):
+        merged_summary['concurrency'] = {'shards': [s.get('concurrency') for s in summaries]}
+    if any('keys' in s for s in summaries):
+        merged_summary['keys'] = _merge_key_summaries([s.get('keys') or [] for s in summaries])
+    
+    if any('profile' in summary for summary in summaries):
+        merged_summary['profile'] = merge_profile_summaries([s.get('profile') for s in summaries])
+    
+    summary_path = base_dir / "batch_summary.json"
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(merged_summary, f, ensure_ascii=False, indent=2)
+    
+    print(f"📊 {len(shard_files)}/{shard_count} shard összesítő összefésülve: {summary_path}")
+    if missing:
+        print(f"   ⚠️  Hiányzó shardok: {', '.join(str(i) for i in missing)}")
+    
+    return merged_summary
+
+
+def _sum_fields(parts: List[Dict], fields: Optional[Sequence[str]] = None) -> Dict:
+    """A megadott (None = minden) számláló mezők összege, a többi mező az első részből."""
+    merged = dict(parts[0])
+    for part in parts[1:]:
+        for key, value in part.items():
+            if (fields is None or key in fields) and isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def _merge_key_summaries(shard_keys: List[List[Dict]]) -> List[Dict]:
+    """Kulcsonkénti használat összesítése (a shardok ugyanazokat a kulcsokat, azonos sorrendben használják)."""
+    merged: List[Dict] = []
+    for keys in shard_keys:
+        for position, key in enumerate(keys):
+            if position >= len(merged):
+                merged.append(dict(key))
+                continue
+            current = merged[position]
+            for field in ('requests', 'characters', 'errors'):
+                current[field] += key[field]
+            current['active'] = current['active'] and key['active']
+            current['drain_reason'] = current['drain_reason'] or key['drain_reason']
+    return merged
+
+
+def _merge_file_results(parts: List[Dict]) -> Dict:
+    """Egy forgatókönyv shardonkénti eredményeinek egyesítése (soronkénti shardolás)."""
+    merged = dict(parts[0])
+    if len(parts) == 1:
+        return merged
+    
+    merged['success'] = all(p['success'] for p in parts)
+    merged['dialogues_count'] = sum(p['dialogues_count'] for p in parts)
+    merged['generated_count'] = sum(p['generated_count'] for p in parts)
+    merged['error'] = next((p['error'] for p in parts if p['error']), None)
+    merged['output_dir'] = next((p['output_dir'] for p in parts if p['output_dir']), None)
+    
+    telemetry = [p['telemetry'] for p in parts if p.get('telemetry')]
+    if telemetry:
+        merged['telemetry'] = merge_telemetry_summaries(telemetry)
+    
+    # Hanganyag: slide-onként a shardok sorainak összege
+    slides: Dict[int, Dict] = {}
+    for part in parts:
+        for slide in (part.get('audio') or {}).get('slides', []):
+            total = slides.setdefault(slide['slide_number'], {
+                'slide_number': slide['slide_number'], 'lines': 0, 'duration': 0.0})
+            total['lines'] += slide['lines']
+            total['duration'] += slide['duration']
+    if any('audio' in p for p in parts):
+        for slide in slides.values():
+            slide['duration'] = round(slide['duration'], 3)
+        merged['audio'] = {
+            'duration': round(sum(s['duration'] for s in slides.values()), 3),
+            'slides': [slides[n] for n in sorted(slides)]
+        }
+    
+    for key in ('reused', 'coalesced', 'profile'):
+        values = [p[key] for p in parts if p.get(key)]
+        if values:
+            merged[key] = _sum_fields(values)
+    if 'profile' in merged:
+        merged['profile'] = {name: round(seconds, 4) for name, seconds in merged['profile'].items()}
+    return merged
+
+
+def merge_shard_dialogues(output_dir: Path):
+    """
+    Egy forgatókönyv shardonkénti párbeszéd exportjait egyesíti sorszám szerint
+    (dialogues.json / .csv; a verify.py javítás után is ezzel frissül).
+    """
+    dialogues = []
+    for path in sorted(output_dir.glob('dialogues.shard-*-of-*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            dialogues.extend(json.load(f))
+    
+    if not dialogues:
+        return
+    
+    dialogues.sort(key=lambda d: d['line_number'])
+    
+    with open(output_dir / "dialogues.json", 'w', encoding='utf-8') as f:
+        json.dump(dialogues, f, ensure_ascii=False, indent=2)
+    
+    BatchProcessor._save_csv(dialogues, output_dir / "dialogues.csv")
@@ -0,0 +1,71 @@
+"""
+Memória benchmark: dict alapú párbeszéd sorok vs. DialogueLine (__slots__) rekordok.
+
+Futtatás:
+    python benchmarks/bench_dialogue_memory.py [sorok_száma]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dialogue_line import DialogueLine
+
+
+def build_dict_lines(count: int) -> list:
+    """A korábbi ábrázolás: parser dict + get_all_dialogues dict + generate_batch másolat."""
+    results = []
+    for i in range(count):
+        dialogue = {
+            'scene': f"Slide {i // 10 + 1}",
+            'slide_number': i // 10 + 1,
+            'character': 'Lisa',
+            'text': 'Good morning.',
+            'line_number': i + 1
+        }
+        result = dialogue.copy()
+        result['voice_id'] = 'pFZP5JQG7iQjIQuC4Bku'
+        result['file_name'] = f"{i // 10 + 1:02d}_Lisa_{i + 1:03d}.mp3"
+        result['file_path'] = None
+        result['success'] = False
+        results.append(result)
+    return results
+
+
+def build_record_lines(count: int) -> list:
+    """Az új ábrázolás: egyetlen, helyben kitöltött DialogueLine soronként."""
+    results = []
+    for i in range(count):
+        line = DialogueLine(i // 10 + 1, 'Lisa', 'Good morning.', i + 1)
+        line.voice_id = 'pFZP5JQG7iQjIQuC4Bku'
+        line.file_name = f"{i // 10 + 1:02d}_Lisa_{i + 1:03d}.mp3"
+        results.append(line)
+    return results
+
+
+def measure(builder, count: int) -> int:
+    """A builder által felépített lista által foglalt memória (byte)."""
+    tracemalloc.start()
+    data = builder(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    dict_bytes = measure(build_dict_lines, count)
+    record_bytes = measure(build_record_lines, count)
+
+    print(f"📏 {count} párbeszéd sor")
+    print(f"   dict:         {dict_bytes / 1024 / 1024:8.2f} MB  ({dict_bytes / count:6.0f} byte/sor)")
+    print(f"   DialogueLine: {record_bytes / 1024 / 1024:8.2f} MB  ({record_bytes / count:6.0f} byte/sor)")
+    print(f"   Csökkenés:    {100 * (1 - record_bytes / dict_bytes):8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
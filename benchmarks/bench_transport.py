@@ -0,0 +1,122 @@
+"""
+Transport benchmark: HTTP/1.1 keep-alive pool vs. HTTP/2 (httpx) nagy egyidejűségnél.
+
+A helyi fake TTS szerver ellen méri transportonként és egyidejűségi szintenként:
+    - áteresztőképesség (sor/s)
+    - a szerveren megnyitott TCP kapcsolatok száma
+    - a kliens Python memória csúcsa (tracemalloc, külön futásban, mert lassít)
+    - a ténylegesen egyeztetett protokoll(ok)
+
+A beépített fake szerver TLS nélkül, "prior knowledge" módon (h2c) beszél HTTP/2-t, ezért
+ellene a http2 mérés ALPN helyett rögtön HTTP/2-vel indul (Http2Transport prior_knowledge);
+a protokoll oszlop a ténylegesen kapott választ mutatja. --base-url mellett a szokásos
+(ALPN-es, HTTP/1.1-re visszaeső) transport fut.
+
+Futtatás:
+    python benchmarks/bench_transport.py
+    python benchmarks/bench_transport.py --concurrency 32 128 --lines 512 --transports http1 http2
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dialogue_line import DialogueLine
+from voice_manager import VoiceManager
+from tts_generator import TTSGenerator
+from http_transport import TRANSPORTS, Http2Transport, create_transport
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+
+
+def make_transport(name: str, workers: int, h2c: bool):
+    """A mért transport; h2c: a beépített fake szerver ellen a HTTP/2 prior knowledge-dzsel indul."""
+    if name == 'http2' and h2c:
+        return Http2Transport(workers, prior_knowledge=True)
+    return create_transport(name, workers)
+
+
+def bench_transport(name: str, workers: int, lines: int, base_url: str, server, output_dir: str,
+                    h2c: bool = True) -> dict:
+    """Egy transport + egyidejűség mérése (minden sor külön kérés, duplikátum nélkül)."""
+    voice_manager = VoiceManager()
+    voice_manager.character_voice_map = {'Lisa': voice_manager.get_voice_id('Lisa')}
+    dialogues = [DialogueLine(i // 10 + 1, 'Lisa', f"Transport benchmark line number {i}.", i + 1,
+                              voice_manager.character_voice_map['Lisa'])
+                 for i in range(lines)]
+
+    def run(transport) -> int:
+        with contextlib.redirect_stdout(io.StringIO()):
+            tts = TTSGenerator("bench-key", output_dir, base_url=base_url, max_workers=workers,
+                               transport=transport)
+            return sum(1 for line in tts.iter_generate(dialogues, voice_manager, delay=0.0) if line.success)
+
+    connections_before = server.stats.get('connections', 0)
+    transport = make_transport(name, workers, h2c)
+    start = time.perf_counter()
+    generated = run(transport)
+    elapsed = time.perf_counter() - start
+    connections = server.stats.get('connections', 0) - connections_before
+    transport.close()
+
+    # Memória: külön futás friss kapcsolatokkal
+    memory_transport = make_transport(name, workers, h2c)
+    tracemalloc.start()
+    run(memory_transport)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    memory_transport.close()
+
+    return {
+        'transport': transport.name,
+        'workers': workers,
+        'lines_per_second': round(generated / elapsed, 1) if elapsed > 0 else 0.0,
+        'failed': lines - generated,
+        'connections': connections,
+        'peak_memory_mb': round(peak / 1e6, 2),
+        'protocols': transport.summary()['protocols']
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="AutoSound transport benchmark")
+    parser.add_argument('--transports', nargs='+', choices=TRANSPORTS, default=list(TRANSPORTS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16, 64, 128],
+                        help="Egyidejű kérések szintjei (alapért.: 16 64 128)")
+    parser.add_argument('--lines', type=int, default=256, help="Kérések száma mérésenként")
+    parser.add_argument('--latency', default='fixed:0.05', help="Fake szerver késleltetés")
+    parser.add_argument('--base-url', help="Külső végpont a beépített fake szerver helyett")
+    args = parser.parse_args(argv)
+
+    transports = list(args.transports)
+    if 'http2' in transports and not all(importlib.util.find_spec(m) for m in ('httpx', 'h2')):
+        print("⚠️  A httpx[http2] nincs telepítve - a http2 mérés kimarad (pip install \"httpx[http2]\")")
+        transports.remove('http2')
+
+    print("\n🔌 Transport benchmark\n")
+    print(f"   {'transport':<10} {'workers':>7} {'sor/s':>9} {'kapcs.':>7} {'mem MB':>8}  protokoll")
+
+    config = FakeServerConfig(latency=args.latency)
+    with FakeElevenLabsServer(config) as server, tempfile.TemporaryDirectory(prefix="autosound_transport_") as work:
+        base_url = args.base_url or server.base_url
+        for workers in args.concurrency:
+            for name in transports:
+                result = bench_transport(name, workers, args.lines, base_url, server,
+                                         os.path.join(work, f"{name}_w{workers}"), h2c=not args.base_url)
+                protocols = ", ".join(f"{p}: {n}" for p, n in result['protocols'].items())
+                connections = result['connections'] if not args.base_url else '-'
+                print(f"   {result['transport']:<10} {workers:>7} {result['lines_per_second']:>9.1f} "
+                      f"{connections:>7} {result['peak_memory_mb']:>8.2f}  {protocols}"
+                      + (f"  ❌ {result['failed']} sikertelen" if result['failed'] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
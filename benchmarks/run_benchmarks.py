@@ -0,0 +1,253 @@
+"""
+End-to-end benchmark csomag regressziós küszöbökkel.
+
+Mér:
+    - parse_txt / parse_docx: ScriptParser / DocxParser áteresztőképesség (sor/s)
+    - voice_assignment: VoiceManager hozzárendelés (szereplő/s, a legjobb ismétlés - zajérzékeny mikro mérés)
+    - batch_wN: BatchProcessor végponttól végpontig (sor/s) a helyi fake TTS szerver ellen,
+      N egyidejű kéréssel
+
+Az eredmény JSON-ba kerül; --baseline megadásakor minden metrika összevetődik a
+mentett alapértékkel, és ha bármelyik a küszöbnél jobban romlott, a kilépési kód 1.
+
+Futtatás:
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from script_parser import ScriptParser
+from docx_parser import DocxParser
+from voice_manager import VoiceManager
+from batch_processor import BatchProcessor
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+from synthetic_scripts import character_names, write_txt_script, write_docx_script, write_script_tree, CHARACTER_DESCRIPTIONS
+
+
+DEFAULT_CONCURRENCY = (1, 4, 16)
+
+
+def measure(run: Callable[[], int], repeat: int, best: bool = False) -> float:
+    """
+    Lefuttatja a mérést többször, és a medián áteresztőképességet adja vissza.
+
+    Args:
+        run: Mérendő függvény; a feldolgozott egységek számát adja vissza
+        repeat: Ismétlések száma
+        best: A legjobb ismétlés a medián helyett. Néhány ms-os, tisztán CPU-kötött
+              munkánál a gép terhelése hosszabb szakaszokon át ingadozik, és ez a
+              mediánt is elviszi; a legjobb futás a zajtól mentes sebességet mutatja
+
+    Returns:
+        float: Egység / másodperc (medián, vagy best=True esetén maximum)
+    """
+    rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        units = run()
+        elapsed = time.perf_counter() - start
+        rates.append(units / elapsed if elapsed > 0 else 0.0)
+    return max(rates) if best else statistics.median(rates)
+
+
+def bench_parse(parser_cls, path: str, repeat: int) -> float:
+    """Parser áteresztőképesség (párbeszéd sor/s)."""
+    def run():
+        parser = parser_cls(path)
+        parser.parse()
+        return len(parser.get_all_dialogues())
+    return measure(run, repeat)
+
+
+def bench_voice_assignment(characters: int, repeat: int) -> float:
+    """VoiceManager hozzárendelés + lekérdezés áteresztőképesség (szereplő/s)."""
+    names = character_names(characters)
+    descriptions = [CHARACTER_DESCRIPTIONS[i % len(CHARACTER_DESCRIPTIONS)] for i in range(characters)]
+
+    def run():
+        manager = VoiceManager()
+        for name, description in zip(names, descriptions):
+            manager.assign_voice_by_description(name, description)
+        for name in names:
+            manager.get_voice_id(name)
+        return characters
+    return measure(run, repeat, best=True)
+
+
+def bench_batch(input_dir: str, output_dir: str, base_url: str, workers: int, repeat: int) -> float:
+    """BatchProcessor végponttól végpontig (generált sor/s), a kimenet elnyelve."""
+    def run():
+        processor = BatchProcessor(input_dir, output_dir, api_key="bench-key",
+                                   base_url=base_url, max_workers=workers, delay=0.0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = processor.process_all(confirm=False)
+        if not result.get('success') or result['failed']:
+            raise RuntimeError(f"Sikertelen batch futás ({workers} worker): {result.get('error')}")
+        return sum(r['generated_count'] for r in processor.iter_results())
+    return measure(run, repeat)
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict:
+    """Az összes benchmark futtatása; visszaadja az eredmény dokumentumot."""
+    metrics: Dict[str, Dict] = {}
+
+    def record(name: str, value: float, unit: str):
+        metrics[name] = {'value': round(value, 2), 'unit': unit, 'higher_is_better': True}
+        print(f"   {name:<20} {value:12.1f} {unit}")
+
+    with tempfile.TemporaryDirectory(prefix="autosound_bench_") as work:
+        print("📄 Parse")
+        txt_path = write_txt_script(os.path.join(work, "parse.txt"),
+                                    args.slides, args.lines, args.characters)
+        record('parse_txt', bench_parse(ScriptParser, txt_path, args.repeat), 'lines/s')
+
+        docx_path = write_docx_script(os.path.join(work, "parse.docx"),
+                                      args.slides, args.lines, args.characters)
+        record('parse_docx', bench_parse(DocxParser, docx_path, args.repeat), 'lines/s')
+
+        print("🎭 Hangválasztás")
+        record('voice_assignment', bench_voice_assignment(args.voice_characters, args.voice_repeat),
+               'characters/s')
+
+        print("🎵 Batch (fake TTS szerver)")
+        input_dir = os.path.join(work, "scripts")
+        write_script_tree(input_dir, args.batch_files, args.batch_slides, args.batch_lines,
+                          args.characters, formats=('txt', 'docx'))
+
+        config = FakeServerConfig(latency=args.latency)
+        with FakeElevenLabsServer(config) as server:
+            for workers in args.concurrency:
+                output_dir = os.path.join(work, f"out_w{workers}")
+                rate = bench_batch(input_dir, output_dir, server.base_url, workers, args.batch_repeat)
+                record(f'batch_w{workers}', rate, 'lines/s')
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {
+                'slides': args.slides,
+                'lines_per_slide': args.lines,
+                'characters': args.characters,
+                'voice_characters': args.voice_characters,
+                'batch_files': args.batch_files,
+                'batch_slides': args.batch_slides,
+                'batch_lines_per_slide': args.batch_lines,
+                'latency': args.latency,
+                'concurrency': list(args.concurrency),
+                'repeat': args.repeat,
+                'voice_repeat': args.voice_repeat,
+                'batch_repeat': args.batch_repeat
+            }
+        },
+        'metrics': metrics
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Összeveti az eredményeket az alapértékkel.
+
+    Args:
+        results: Aktuális eredmény dokumentum
+        baseline: Mentett alapérték dokumentum
+        threshold: Megengedett relatív romlás (pl. 0.2 = 20%)
+
+    Returns:
+        List[str]: A küszöbön túl romlott metrikák leírása (üres = rendben)
+    """
+    regressions = []
+    print(f"\n📊 Összevetés az alapértékkel (küszöb: {threshold * 100:.0f}%)")
+
+    for name, base in baseline.get('metrics', {}).items():
+        current = results['metrics'].get(name)
+        if current is None:
+            print(f"   {name:<20} ⚠️  hiányzik az aktuális futásból")
+            continue
+
+        if not base['value']:
+            continue
+        change = (current['value'] - base['value']) / base['value']
+        if not base.get('higher_is_better', True):
+            change = -change
+
+        regressed = change < -threshold
+        mark = "❌" if regressed else "✅"
+        print(f"   {name:<20} {base['value']:12.1f} -> {current['value']:12.1f}  ({change * 100:+6.1f}%) {mark}")
+        if regressed:
+            regressions.append(f"{name}: {base['value']} -> {current['value']} ({change * 100:+.1f}%)")
+
+    return regressions
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AutoSound benchmark csomag")
+    parser.add_argument('-o', '--output', default=os.path.join('benchmarks', 'results', 'latest.json'),
+                        help="Eredmény JSON (alapért.: benchmarks/results/latest.json)")
+    parser.add_argument('--baseline', metavar='PATH', help="Alapérték JSON az összevetéshez")
+    parser.add_argument('--save-baseline', metavar='PATH', help="Az eredmény mentése alapértékként is")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Megengedett relatív romlás (alapért.: 0.2 = 20%%)")
+    parser.add_argument('--slides', type=int, default=200, help="Parse benchmark: slide-ok száma")
+    parser.add_argument('--lines', type=int, default=10, help="Parse benchmark: sor / slide")
+    parser.add_argument('--characters', type=int, default=6, help="Szereplők száma a forgatókönyvekben")
+    parser.add_argument('--voice-characters', type=int, default=5000,
+                        help="Hangválasztás benchmark: szereplők száma")
+    parser.add_argument('--batch-files', type=int, default=4, help="Batch benchmark: fájlok száma")
+    parser.add_argument('--batch-slides', type=int, default=5, help="Batch benchmark: slide / fájl")
+    parser.add_argument('--batch-lines', type=int, default=6, help="Batch benchmark: sor / slide")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=list(DEFAULT_CONCURRENCY),
+                        help="Batch benchmark egyidejűségi szintjei (alapért.: 1 4 16)")
+    parser.add_argument('--latency', default='fixed:0.05',
+                        help="Fake szerver késleltetés (pl. fixed:0.05, lognormal:0.2:0.5)")
+    parser.add_argument('--repeat', type=int, default=5, help="Ismétlések a parse/hang méréseknél")
+    parser.add_argument('--voice-repeat', type=int, default=30,
+                        help="Ismétlések a hangválasztás mérésnél, a legjobb számít (alapért.: 30)")
+    parser.add_argument('--batch-repeat', type=int, default=1, help="Ismétlések a batch méréseknél")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    print("\n⏱️  AutoSound benchmark\n")
+    results = run_benchmarks(args)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Mentve: {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Regresszió ({len(regressions)} metrika):")
+            for line in regressions:
+                print(f"   • {line}")
+            return 1
+        print("\n✅ Nincs regresszió")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Szintetikus forgatókönyvek a benchmarkokhoz.
+Feladata: Tetszőleges méretű (slide × sor × szereplő) .txt és .docx forgatókönyveket
+előállítani a valódi forgatókönyvekkel azonos formátumban.
+"""
+
+import os
+import random
+from typing import List
+
+# Szereplő leírások - a VoiceManager kulcsszavas hozzárendelését is végigjárják
+CHARACTER_DESCRIPTIONS = [
+    "customer, friendly and polite",
+    "elderly lady, cheerful and helpful",
+    "young man, student, energetic",
+    "teacher, professional and calm",
+    "old man, grandfather, warm voice",
+    "child, curious little girl",
+    "waiter, British, formal",
+    "doctor, serious and confident",
+]
+
+SENTENCES = [
+    "Good morning.",
+    "What would you like?",
+    "Two apples, please.",
+    "Here you are. Anything else?",
+    "Yes, one kilo of oranges, please.",
+    "How much is it?",
+    "That's five euros, please.",
+    "Thank you. Have a nice day.",
+    "Could you tell me the way to the station, please?",
+    "Of course. Go straight on and turn left at the traffic lights.",
+]
+
+
+def character_names(count: int) -> List[str]:
+    """Egyedi, parser-kompatibilis (csak betűs) szereplőnevek."""
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    names = []
+    for i in range(count):
+        suffix = ""
+        n = i
+        while True:
+            suffix = letters[n % 26].lower() + suffix
+            n = n // 26 - 1
+            if n < 0:
+                break
+        names.append("Speaker" + suffix)
+    return names
+
+
+def build_script_text(slides: int, lines_per_slide: int, characters: int, seed: int = 0) -> str:
+    """
+    Felépít egy forgatókönyvet szövegként.
+
+    Args:
+        slides: Slide-ok száma
+        lines_per_slide: Párbeszéd sorok száma slide-onként
+        characters: Szereplők száma
+        seed: Véletlen mag (a mondatok kiválasztásához)
+
+    Returns:
+        str: A forgatókönyv szövege
+    """
+    rng = random.Random(seed)
+    names = character_names(characters)
+
+    parts = [
+        "9 Benchmark",
+        "9.1 – Synthetic Script",
+        "Level: A1",
+        "Characters:",
+    ]
+    for i, name in enumerate(names):
+        parts.append(f"• {name} – {CHARACTER_DESCRIPTIONS[i % len(CHARACTER_DESCRIPTIONS)]}")
+    parts.append("")
+
+    for slide in range(1, slides + 1):
+        parts.append(f"Slide {slide}")
+        parts.append("Scene: A generated scene.")
+        parts.append("Dialogue:")
+        for line in range(lines_per_slide):
+            speaker = names[(slide + line) % len(names)]
+            parts.append(f"{speaker}: {rng.choice(SENTENCES)}")
+        parts.append("")
+
+    return "\n".join(parts)
+
+
+def write_txt_script(path: str, slides: int, lines_per_slide: int, characters: int, seed: int = 0) -> str:
+    """Szintetikus .txt forgatókönyv mentése. Visszaadja az elérési utat."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(build_script_text(slides, lines_per_slide, characters, seed))
+    return path
+
+
+def write_docx_script(path: str, slides: int, lines_per_slide: int, characters: int, seed: int = 0) -> str:
+    """Szintetikus .docx forgatókönyv mentése (bekezdésenként egy sor)."""
+    from docx import Document
+
+    doc = Document()
+    for line in build_script_text(slides, lines_per_slide, characters, seed).split("\n"):
+        doc.add_paragraph(line)
+    doc.save(path)
+    return path
+
+
+def write_script_tree(root: str, files: int, slides: int, lines_per_slide: int,
+                      characters: int, formats=('txt',)) -> List[str]:
+    """
+    Több szintetikus forgatókönyv egy mappába (a formátumok váltakoznak).
+
+    Returns:
+        List[str]: A létrehozott fájlok
+    """
+    os.makedirs(root, exist_ok=True)
+    paths = []
+    for i in range(files):
+        ext = formats[i % len(formats)]
+        path = os.path.join(root, f"script_{i + 1:03d}.{ext}")
+        writer = write_docx_script if ext == 'docx' else write_txt_script
+        paths.append(writer(path, slides, lines_per_slide, characters, seed=i))
+    return paths
@@ -0,0 +1,69 @@
+"""
+Szöveg daraboló modul
+Feladata: A hosszú párbeszéd sorokat mondathatáron (szükség esetén tagmondat- és
+szóhatáron) legfeljebb max_chars hosszú darabokra bontani a párhuzamos szintézishez.
+"""
+
+import re
+from typing import List
+
+# Mondatvég: . ! ? …, utána legfeljebb két záró idézőjel / zárójel, majd szóköz.
+# Csak a szóközön törünk, így a záró jelek az előző mondatnál maradnak.
+_SENTENCE_END = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\'”’)\]])|(?<=[.!?…]["\'”’)\]]{2}))\s+')
+# Tagmondat határ: vessző, pontosvessző, kettőspont, gondolatjel
+_CLAUSE_END = re.compile(r'(?<=[,;:–—])\s+')
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Szöveg darabolása mondathatárokon.
+
+    A mondatok mohón kerülnek egy darabba, amíg az belefér a max_chars-ba; a
+    max_chars-nál hosszabb mondat tagmondat-, végső esetben szóhatáron törik.
+
+    Args:
+        text: A teljes szöveg
+        max_chars: Egy darab legnagyobb hossza
+
+    Returns:
+        List[str]: A darabok (rövid szövegnél egyetlen elem)
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    for sentence in _SENTENCE_END.split(text):
+        pieces.extend(_split_long(sentence.strip(), max_chars))
+
+    return _pack([p for p in pieces if p], max_chars)
+
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Túl hosszú mondat bontása tagmondatokra, majd szavakra."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    parts = []
+    for clause in _CLAUSE_END.split(sentence):
+        if len(clause) <= max_chars:
+            parts.append(clause)
+        else:
+            parts.extend(_pack(clause.split(), max_chars))
+    return _pack(parts, max_chars)
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    """Egymást követő darabok összevonása, amíg beleférnek a max_chars-ba."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        candidate = f"{current} {piece}" if current else piece
+        if current and len(candidate) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
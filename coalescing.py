@@ -0,0 +1,141 @@
+"""
+Sor összevonó modul
+Feladata: Az ugyanazon hang egymást követő rövid sorait (pl. "Yes.", "Thanks!")
+egyetlen szintézis kérésbe vonni a with-timestamps végponttal, majd a válasz
+karakter időzítése alapján a hangot soronként visszavágni. Rövid soroknál a
+kérésenkénti többletidő dominál, így a kérések száma jelentősen csökken.
+"""
+
+import base64
+import binascii
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Az összevont szövegben a sorok közötti elválasztó
+SEPARATOR = " "
+
+
+def plan_groups(items: Sequence[Tuple[str, str]],
+                short_chars: int,
+                max_chars: int = 400,
+                max_lines: int = 8,
+                skip: Optional[set] = None) -> List[List[int]]:
+    """
+    A sorok csoportosítása kérésekbe.
+
+    Egy hang rövid (legfeljebb short_chars hosszú) sorai a hang saját sorrendjében
+    egymás után csoportba kerülnek, amíg a csoport belefér a max_chars / max_lines
+    keretbe; a hang egy hosszabb sora lezárja a csoportot. Az ismétlődő
+    (hang, szöveg) párok és a skip indexek önállóak maradnak.
+
+    Args:
+        items: (voice_id, szöveg) soronként, forgatókönyv sorrendben
+        short_chars: Ennél nem hosszabb sor vonható össze
+        max_chars: Egy összevont kérés legnagyobb szöveghossza
+        max_lines: Egy összevont kérés legtöbb sora
+        skip: Nem összevonható sorok indexei (pl. cache találat)
+
+    Returns:
+        List[List[int]]: Egységek (csoport vagy egyetlen sor indexei), az első index szerint rendezve
+    """
+    skip = skip or set()
+    units: List[List[int]] = []
+    open_groups: Dict[str, List[int]] = {}
+    group_chars: Dict[str, int] = {}
+    seen = set()
+
+    def close(voice_id: str):
+        group = open_groups.pop(voice_id, None)
+        if group:
+            # Egyetlen sor nem csoport
+            units.extend([group] if len(group) > 1 else [[group[0]]])
+
+    for index, (voice_id, text) in enumerate(items):
+        text = text.strip()
+        key = (voice_id, text)
+        if key in seen or index in skip or len(text) > short_chars:
+            if len(text) > short_chars:
+                close(voice_id)
+            units.append([index])
+            seen.add(key)
+            continue
+        seen.add(key)
+
+        group = open_groups.get(voice_id)
+        if group and (len(group) >= max_lines
+                      or group_chars[voice_id] + len(SEPARATOR) + len(text) > max_chars):
+            close(voice_id)
+            group = None
+        if group is None:
+            open_groups[voice_id] = group = []
+            group_chars[voice_id] = -len(SEPARATOR)
+        group.append(index)
+        group_chars[voice_id] += len(SEPARATOR) + len(text)
+
+    for voice_id in list(open_groups):
+        close(voice_id)
+
+    units.sort(key=lambda unit: unit[0])
+    return units
+
+
+def join_texts(texts: Sequence[str]) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Sorok összefűzése egy kéréssé.
+
+    Returns:
+        Tuple[str, List[Tuple[int, int]]]: Az összevont szöveg, és soronként a [kezdet, vég) karakter tartomány
+    """
+    spans = []
+    position = 0
+    for text in texts:
+        text = text.strip()
+        spans.append((position, position + len(text)))
+        position += len(text) + len(SEPARATOR)
+    return SEPARATOR.join(text.strip() for text in texts), spans
+
+
+def decode_timestamped(body: bytes) -> Tuple[Optional[bytes], Optional[Dict], Optional[str]]:
+    """
+    A with-timestamps válasz feldolgozása.
+
+    Returns:
+        Tuple: (hang byte-ok, karakter időzítés, hiba leírása vagy None)
+    """
+    try:
+        payload = json.loads(body)
+        audio = base64.b64decode(payload['audio_base64'], validate=True)
+        alignment = payload.get('alignment') or payload.get('normalized_alignment')
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        return None, None, "érvénytelen with-timestamps válasz"
+    if not alignment or not alignment.get('characters'):
+        return None, None, "hiányzó karakter időzítés"
+    return audio, alignment, None
+
+
+def cut_times(alignment: Dict, spans: Sequence[Tuple[int, int]], text_length: int) -> Optional[List[float]]:
+    """
+    A sorok közötti vágási időpontok: két sor között a szünet közepe
+    (az előző sor utolsó és a következő első karakterének időzítése alapján).
+
+    Args:
+        alignment: {'characters', 'character_start_times_seconds', 'character_end_times_seconds'}
+        spans: join_texts() karakter tartományai
+        text_length: Az összevont szöveg hossza (az időzítésnek ezzel egyeznie kell)
+
+    Returns:
+        Optional[List[float]]: len(spans) - 1 időpont, vagy None, ha az időzítés nem illeszthető
+    """
+    starts = alignment.get('character_start_times_seconds') or []
+    ends = alignment.get('character_end_times_seconds') or []
+    if not (len(alignment['characters']) == len(starts) == len(ends) == text_length):
+        return None
+
+    times = []
+    for (_, previous_end), (next_start, _) in zip(spans, spans[1:]):
+        if previous_end <= 0 or next_start >= text_length:
+            return None
+        times.append((ends[previous_end - 1] + starts[next_start]) / 2)
+    if any(later <= earlier for earlier, later in zip(times, times[1:])):
+        return None
+    return times
@@ -0,0 +1,196 @@
+"""
+Adaptív párhuzamosság modul
+Feladata: Az egyidejű TTS kérések számát AIMD (additive-increase /
+multiplicative-decrease) szabályozással hangolni a megfigyelt késleltetés és a
+429 (rate / concurrency limit) válaszok alapján.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Az async várakozás lekérdezési időköze (a szálas feltételváltozó nem await-elhető)
+ASYNC_POLL_INTERVAL = 0.01
+
+
+class AIMDController:
+    """
+    Adaptív szemafor.
+    Sikeres kérésenként a limit 1/limit-tel nő (ablakonként kb. +increase),
+    429 vagy késleltetés-ugrás esetén decrease-szeresére csökken.
+    Egy csökkentés után a korábban indult kérések újabb csökkentést már nem váltanak ki,
+    így egy 429 sorozat nem omlasztja össze a limitet.
+    """
+
+    def __init__(self,
+                 min_limit: int = 1,
+                 max_limit: int = 16,
+                 initial: Optional[int] = None,
+                 increase: float = 1.0,
+                 decrease: float = 0.5,
+                 latency_tolerance: Optional[float] = 2.0,
+                 warmup: int = 10,
+                 verbose: bool = True):
+        """
+        Args:
+            min_limit: Minimális egyidejű kérésszám
+            max_limit: Maximális egyidejű kérésszám
+            initial: Kezdő limit (alapért.: min_limit)
+            increase: Additív növelés ablakonként
+            decrease: Multiplikatív csökkentés szorzója (0-1)
+            latency_tolerance: A karakterenkénti késleltetés gyors átlaga ennyiszer haladhatja
+                               meg a hosszú távú átlagot torlódás jelzése nélkül (None = kikapcsolva)
+            warmup: Ennyi minta után kezdődik a késleltetés figyelése
+            verbose: A limit változásainak kiírása
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(f"Érvénytelen párhuzamossági határok: {min_limit}-{max_limit}")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.warmup = warmup
+        self.verbose = verbose
+
+        self._cond = threading.Condition()
+        self._limit = float(min(max_limit, max(min_limit, initial or min_limit)))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._fast_latency = None
+        self._slow_latency = None
+        self._samples = 0
+        self._start = time.monotonic()
+        self._initial = int(self._limit)
+        self._peak = int(self._limit)
+        self._decreases = 0
+        self._trajectory: List[Dict] = [{'t': 0.0, 'limit': int(self._limit), 'reason': 'start'}]
+
+    @property
+    def limit(self) -> int:
+        """Az aktuális egyidejű kérés limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        """
+        Vár, amíg a limit enged egy újabb kérést.
+
+        Returns:
+            float: A kérés indításának időpontja (time.monotonic()) - ezt kell a release()-nek átadni
+        """
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            return time.monotonic()
+
+    async def acquire_async(self) -> float:
+        """Mint az acquire(), de az event loopot nem blokkolja (betelt limitnél lekérdezéssel vár)."""
+        while True:
+            started_at = self.try_acquire()
+            if started_at is not None:
+                return started_at
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+
+    def try_acquire(self) -> Optional[float]:
+        """Mint az acquire(), de nem vár: None, ha a limit éppen betelt."""
+        with self._cond:
+            if self._in_flight >= int(self._limit):
+                return None
+            self._in_flight += 1
+            return time.monotonic()
+
+    def cancel(self, started_at: float):
+        """Visszaad egy fel nem használt engedélyt (a limit nem változik)."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def release(self, started_at: float, status: Optional[int], chars: int = 0):
+        """
+        Lezár egy kérést, és a kimenetele alapján igazítja a limitet.
+
+        Args:
+            started_at: Az acquire() által visszaadott időpont
+            status: HTTP státusz (None = hálózati hiba / timeout)
+            chars: A kérés szövegének hossza (a késleltetés normalizálásához)
+        """
+        latency = time.monotonic() - started_at
+
+        with self._cond:
+            self._in_flight -= 1
+
+            if status == 429:
+                self._decrease(started_at, '429')
+            elif status is None:
+                self._decrease(started_at, 'timeout')
+            elif status == 200:
+                if self._latency_congested(latency / max(chars, 1)):
+                    self._decrease(started_at, 'latency')
+                else:
+                    self._set_limit(self._limit + self.increase / self._limit, 'increase')
+
+            self._cond.notify_all()
+
+    def _latency_congested(self, per_char: float) -> bool:
+        """Gyors és lassú EWMA összevetése: tartósan megugrott-e a karakterenkénti késleltetés."""
+        if self._fast_latency is None:
+            self._fast_latency = self._slow_latency = per_char
+        else:
+            self._fast_latency += 0.3 * (per_char - self._fast_latency)
+            self._slow_latency += 0.05 * (per_char - self._slow_latency)
+        self._samples += 1
+
+        if self.latency_tolerance is None or self._samples < self.warmup:
+            return False
+        return self._fast_latency > self.latency_tolerance * self._slow_latency
+
+    def _decrease(self, started_at: float, reason: str):
+        """Multiplikatív csökkentés (a legutóbbi csökkentés előtt indult kérések nem számítanak)."""
+        if started_at < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._decreases += 1
+        # A torlódás után a késleltetés átlagok újraindulnak az új szinten
+        self._fast_latency = self._slow_latency
+        self._set_limit(self._limit * self.decrease, reason)
+
+    def _set_limit(self, value: float, reason: str):
+        old = int(self._limit)
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), value))
+        new = int(self._limit)
+        if new == old:
+            return
+
+        self._peak = max(self._peak, new)
+        self._trajectory.append({
+            't': round(time.monotonic() - self._start, 3),
+            'limit': new,
+            'reason': reason
+        })
+        if self.verbose:
+            print(f"  🎚️  Párhuzamosság: {old} → {new} ({reason})")
+
+    def summary(self) -> Dict:
+        """
+        A szabályozás összesítője.
+
+        Returns:
+            Dict: Határok, kezdő / végső / csúcs limit, csökkentések száma és a teljes pálya
+        """
+        with self._cond:
+            return {
+                'min': self.min_limit,
+                'max': self.max_limit,
+                'initial': self._initial,
+                'final': int(self._limit),
+                'peak': self._peak,
+                'decreases': self._decreases,
+                'trajectory': list(self._trajectory)
+            }
@@ -0,0 +1,116 @@
+"""
+Párbeszéd sor modul
+Feladata: Egy párbeszéd sor kompakt (__slots__) rekordja, amely a parsertől
+a TTS generáláson át az exportig végigmegy a feldolgozáson.
+"""
+
+from typing import Dict, List, Optional
+
+
+class DialogueLine:
+    """
+    Egy párbeszéd sor és a generálás eredménye.
+
+    __slots__-os osztály: nincs soronkénti __dict__, így nagy korpuszoknál
+    töredék memóriát foglal a dict alapú ábrázoláshoz képest.
+    Dict-té csak a JSON/CSV határon alakítjuk (to_dict).
+    """
+
+    __slots__ = ('slide_number', 'character', 'text', 'line_number',
+                 'voice_id', 'file_name', 'file_path', 'success',
+                 'duration', 'bitrate', 'sample_rate', 'frame_count', 'size', 'sha256',
+                 'words', 'error')
+
+    def __init__(self,
+                 slide_number: int,
+                 character: str,
+                 text: str,
+                 line_number: int = 0,
+                 voice_id: Optional[str] = None,
+                 file_name: Optional[str] = None,
+                 file_path: Optional[str] = None,
+                 success: bool = False,
+                 duration: Optional[float] = None,
+                 bitrate: Optional[int] = None,
+                 sample_rate: Optional[int] = None,
+                 frame_count: Optional[int] = None,
+                 size: Optional[int] = None,
+                 sha256: Optional[str] = None,
+                 words: Optional[List[List]] = None,
+                 error: Optional[str] = None):
+        """
+        Args:
+            slide_number: A slide sorszáma
+            character: Szereplő neve
+            text: A mondandó szöveg
+            line_number: Globális sorszám a forgatókönyvben (1-től)
+            voice_id: ElevenLabs voice ID (generáláskor töltődik ki)
+            file_name: Hangfájl neve (generáláskor töltődik ki)
+            file_path: Hangfájl elérési útja (None, ha a generálás sikertelen)
+            success: Sikeres volt-e a generálás
+            duration: A hangfájl hossza másodpercben (a frame fejlécekből)
+            bitrate: Átlagos bitráta (bit/s)
+            sample_rate: Mintavételi frekvencia (Hz)
+            frame_count: MP3 frame-ek száma
+            size: A hangfájl mérete byte-ban (íráskor)
+            sha256: A hangfájl SHA-256 ellenőrzőösszege (íráskor)
+            words: Szó szintű időzítés [szó, kezdet, vég] hármasokkal (with-timestamps kérésnél)
+            error: Váratlan hiba szövege, ha a generálás kivétellel szakadt meg
+        """
+        self.slide_number = slide_number
+        self.character = character
+        self.text = text
+        self.line_number = line_number
+        self.voice_id = voice_id
+        self.file_name = file_name
+        self.file_path = file_path
+        self.success = success
+        self.duration = duration
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.frame_count = frame_count
+        self.size = size
+        self.sha256 = sha256
+        self.words = words
+        self.error = error
+
+    @property
+    def scene(self) -> str:
+        """Jelenet azonosító (pl. "Slide 3") - csak exportkor állítjuk elő."""
+        return f"Slide {self.slide_number}"
+
+    def to_dict(self) -> Dict:
+        """Dict ábrázolás a JSON/CSV exporthoz (a korábbi kulcsok + hang metaadatok)."""
+        return {
+            'scene': self.scene,
+            'slide_number': self.slide_number,
+            'character': self.character,
+            'text': self.text,
+            'line_number': self.line_number,
+            'voice_id': self.voice_id,
+            'file_name': self.file_name,
+            'file_path': self.file_path,
+            'success': self.success,
+            'duration': self.duration,
+            'bitrate': self.bitrate,
+            'sample_rate': self.sample_rate,
+            'frame_count': self.frame_count,
+            'size': self.size,
+            'sha256': self.sha256,
+            'words': self.words,
+            'error': self.error
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DialogueLine':
+        """Visszaalakítás egy exportált (dialogues.json/jsonl) rekordból."""
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DialogueLine):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (f"DialogueLine(slide_number={self.slide_number}, character={self.character!r}, "
+                f"line_number={self.line_number}, text={self.text!r})")
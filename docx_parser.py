@@ -7,6 +7,7 @@ from docx import Document
 import re
 from typing import Dict, List, Optional
 from script_parser import ScriptParser
+from profiler import NULL_PROFILER
 
 
 class DocxParser(ScriptParser):
@@ -58,29 +59,26 @@ class DocxParser(ScriptParser):
         except Exception as e:
             raise Exception(f"Hiba a .docx fájl olvasásakor: {e}")
     
-    def parse(self) -> Dict:
+    def parse(self, profiler=NULL_PROFILER, label: Optional[str] = None) -> Dict:
         """
         Feldolgozza a teljes .docx forgatókönyvet.
         
+        Args:
+            profiler: Opcionális StageProfiler a 'load' és 'parse' szakaszokhoz
+            label: Csoport címke a profilozáshoz (pl. a fájl neve)
+        
         Returns:
             Dict: Strukturált adatok (metadata, characters, scenes)
         """
-        # Szöveg kinyerése a .docx-ből
-        self._text_content = self._extract_text_from_docx()
+        # Szöveg kinyerése a .docx-ből (python-docx betöltés)
+        with profiler.stage('load', label):
+            self._text_content = self._extract_text_from_docx()
         
         if not self._text_content:
             raise Exception("A .docx fájl üres vagy nem tartalmaz szöveget!")
         
         # A szöveg feldolgozása ugyanúgy, mint a .txt-nél
-        self._extract_metadata(self._text_content)
-        self._extract_characters(self._text_content)
-        self._extract_scenes(self._text_content)
-        
-        return {
-            'metadata': self.metadata,
-            'characters': self.characters,
-            'scenes': self.scenes
-        }
+        return self.parse_text(self._text_content, profiler, label)
     
     def get_text_content(self) -> str:
         """Visszaadja a kinyert szöveget (debug célra)."""
@@ -0,0 +1,601 @@
+"""
+Helyi ElevenLabs utánzat (fake szerver)
+Feladata: API kulcs és kvóta nélkül, offline futtathatóvá tenni a teljes pipeline-t
+(TTSGenerator, BatchProcessor, GUI), és terhelés / hibakezelés teszteléséhez
+késleltetést, 429-et (Retry-After), 5xx sorozatokat és csonka válaszokat injektálni.
+HTTP/1.1 mellett HTTP/2-t is beszél TLS nélkül, "prior knowledge" (h2c) módon, ha a h2 csomag
+telepítve van (pl. httpx.Client(http2=True, http1=False)).
+
+Használat:
+    python fake_elevenlabs.py --port 8765 --latency lognormal:0.8:0.5 --rate-429 0.05
+    ELEVENLABS_BASE_URL=http://127.0.0.1:8765/v1 python batch_main.py my_scripts -y
+"""
+
+import io
+import sys
+import base64
+import json
+import math
+import random
+import hashlib
+import argparse
+import threading
+import time
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from voice_manager import VoiceManager
+from mp3_utils import silent_mp3_frames
+
+
+# Becsült beszédtempó a fake hang hosszához (karakter / másodperc, 1.0 sebességnél)
+CHARS_PER_SECOND = 15.0
+
+# A HTTP/2 kapcsolat nyitó sora; h2c (prior knowledge) kliens ezzel kezd HTTP/1.1 kérés helyett
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """A kliens által bontott kapcsolatokat (keep-alive lezárás, terheléses teszt) nem naplózza."""
+
+    daemon_threads = True
+    # Sok egyidejű kliensnél az alapértelmezett 5-ös backlog SYN eldobást (1s+ késést) okoz
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeServerConfig:
+    """A fake szerver viselkedése (késleltetés és hibainjektálás)."""
+
+    def __init__(self,
+                 latency: str = "fixed:0.05",
+                 latency_per_char: float = 0.0,
+                 rate_429: float = 0.0,
+                 retry_after: float = 1.0,
+                 concurrency_limit: int = 0,
+                 error_burst_every: int = 0,
+                 error_burst_length: int = 0,
+                 error_status: int = 503,
+                 truncate_rate: float = 0.0,
+                 truncate_declared: bool = True,
+                 stall_rate: float = 0.0,
+                 stall_seconds: float = 30.0,
+                 valid_keys: Optional[set] = None,
+                 key_quota_chars: int = 0,
+                 seed: int = 0):
+        """
+        Args:
+            latency: Késleltetés eloszlás: "fixed:S", "uniform:MIN:MAX" vagy "lognormal:MEDIAN:SIGMA"
+            latency_per_char: Karakterenkénti többlet késleltetés (s)
+            rate_429: 429 válaszok valószínűsége (0-1)
+            retry_after: A 429 válaszok Retry-After értéke (s)
+            concurrency_limit: Egyidejű kérések felső határa (0 = nincs); felette 429
+            error_burst_every: Minden N-edik kéréstől 5xx sorozat indul (0 = nincs)
+            error_burst_length: Egy 5xx sorozat hossza (kérés)
+            error_status: A sorozat HTTP státusza
+            truncate_rate: Csonka válasz valószínűsége (0-1)
+            truncate_declared: True = a teljes Content-Length-et jelzi (a kliens észleli),
+                               False = a csonka hosszt jelzi (csendes csonkítás)
+            stall_rate: "Beragadó" kérések valószínűsége (0-1) - a hedging teszteléséhez
+            stall_seconds: A beragadó kérések többlet késleltetése (s)
+            valid_keys: Elfogadott API kulcsok (None = bármely nem üres kulcs)
+            key_quota_chars: Kulcsonkénti karakter keret (0 = nincs); felette 401 quota_exceeded
+            seed: A véletlen injektálások magja (determinisztikus futásokhoz)
+        """
+        self.latency = latency
+        self.latency_per_char = latency_per_char
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.concurrency_limit = concurrency_limit
+        self.error_burst_every = error_burst_every
+        self.error_burst_length = error_burst_length
+        self.error_status = error_status
+        self.truncate_rate = truncate_rate
+        self.truncate_declared = truncate_declared
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.valid_keys = valid_keys
+        self.key_quota_chars = key_quota_chars
+        self.seed = seed
+
+        self._parse_latency()
+
+    def _parse_latency(self):
+        parts = self.latency.split(':')
+        kind, params = parts[0], [float(p) for p in parts[1:]]
+        expected = {'fixed': 1, 'uniform': 2, 'lognormal': 2}
+
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"Érvénytelen késleltetés megadás: {self.latency!r}")
+        self._latency_kind, self._latency_params = kind, params
+
+    def sample_latency(self, rng: random.Random, chars: int) -> float:
+        """Egy kérés késleltetése (s) a beállított eloszlásból."""
+        kind, params = self._latency_kind, self._latency_params
+        if kind == 'fixed':
+            base = params[0]
+        elif kind == 'uniform':
+            base = rng.uniform(params[0], params[1])
+        else:
+            base = rng.lognormvariate(math.log(params[0]), params[1])
+        if self.stall_rate and rng.random() < self.stall_rate:
+            base += self.stall_seconds
+        return max(0.0, base + self.latency_per_char * chars)
+
+
+class FakeElevenLabsServer:
+    """
+    Szálas HTTP szerver, amely az ElevenLabs API releváns végpontjait utánozza:
+    POST /v1/text-to-speech/{voice_id}[/with-timestamps], GET /v1/voices és GET /v1/user/subscription.
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config: Viselkedés beállítások (alapért.: gyors, hibamentes)
+            host: Figyelő cím
+            port: Port (0 = szabad port választása)
+        """
+        self.config = config or FakeServerConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._request_count = 0
+        self._key_usage: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {'requests': 0, 'max_in_flight': 0}
+
+        handler = type('FakeHandler', (_FakeHandler,), {'server_ref': self})
+        self._httpd = _QuietHTTPServer((host, port), handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Az API alap URL-je (TTSGenerator base_url / ELEVENLABS_BASE_URL)."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'FakeElevenLabsServer':
+        """Háttérszálon elindítja a szervert."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Leállítja a szervert."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        """Előtérben futtatja a szervert (CLI)."""
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _admit(self) -> Tuple[int, Optional[int]]:
+        """
+        Beenged egy szintézis kérést, és eldönti az injektált hibát.
+
+        Returns:
+            Tuple[int, Optional[int]]: (kérés sorszáma, hibastátusz vagy None)
+        """
+        with self._lock:
+            self._request_count += 1
+            number = self._request_count
+            self._in_flight += 1
+            self.stats['requests'] += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+
+            config = self.config
+            if config.concurrency_limit and self._in_flight > config.concurrency_limit:
+                return number, 429
+            if config.error_burst_every and (number - 1) % config.error_burst_every < config.error_burst_length:
+                return number, config.error_status
+            if config.rate_429 and self._rng.random() < config.rate_429:
+                return number, 429
+            return number, None
+
+    def _charge(self, key: str, chars: int) -> bool:
+        """Kulcsonkénti karakter keret terhelése. Hamis, ha a keret elfogyott."""
+        quota = self.config.key_quota_chars
+        with self._lock:
+            used = self._key_usage.get(key, 0)
+            if quota and used + chars > quota:
+                return False
+            self._key_usage[key] = used + chars
+            return True
+
+    def subscription(self, key: str) -> Dict:
+        """A kulcs "előfizetése" (a keret a key_quota_chars, ennek hiányában 100 000)."""
+        with self._lock:
+            used = self._key_usage.get(key, 0)
+        return {
+            'tier': 'fake',
+            'character_count': used,
+            'character_limit': self.config.key_quota_chars or 100000,
+            'next_character_count_reset_unix': int(time.time()) + 30 * 24 * 3600
+        }
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _sample(self, chars: int) -> Tuple[float, bool]:
+        """Késleltetés és csonkítás döntés (a közös RNG-ből, zárral)."""
+        with self._lock:
+            latency = self.config.sample_latency(self._rng, chars)
+            truncate = bool(self.config.truncate_rate) and self._rng.random() < self.config.truncate_rate
+        return latency, truncate
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    """HTTP kérés kezelő (a server_ref osztályattribútum a FakeElevenLabsServer)."""
+
+    protocol_version = "HTTP/1.1"
+    # A fejléc és a törzs külön írásánál Nagle + késleltetett ACK ~40ms-ot adna
+    # minden újrahasznált (keep-alive) kapcsolaton; a valódi API szerverek is kikapcsolják
+    disable_nagle_algorithm = True
+    server_ref: FakeElevenLabsServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Új TCP kapcsolat (keep-alive / HTTP/1.1 pool méret összevetéshez)
+        self.server_ref._count('connections')
+
+    def handle(self):
+        # h2c (prior knowledge): a kapcsolat a HTTP/2 nyitó sorral kezdődik
+        if self.rfile.peek(len(H2_PREFACE)).startswith(H2_PREFACE[:14]):
+            try:
+                connection = _H2Connection(self)
+            except ImportError:
+                # h2 nélkül nincs HTTP/2: a kapcsolat válasz nélkül bomlik
+                return
+            connection.serve()
+        else:
+            super().handle()
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server_ref._count(f"status_{status}")
+
+    def _authorized(self) -> bool:
+        key = self.headers.get('xi-api-key')
+        valid_keys = self.server_ref.config.valid_keys
+        if not key or (valid_keys is not None and key not in valid_keys):
+            self._send_json(401, {'detail': {'status': 'invalid_api_key', 'message': 'Invalid API key'}})
+            return False
+        return True
+
+    def do_GET(self):
+        path = urlparse(self.path).path.rstrip('/')
+        if path not in ('/v1/voices', '/v1/user/subscription'):
+            self._send_json(404, {'detail': 'Not found'})
+            return
+        if not self._authorized():
+            return
+
+        if path == '/v1/user/subscription':
+            self._send_json(200, self.server_ref.subscription(self.headers.get('xi-api-key')))
+            return
+
+        voices = [{'voice_id': voice_id, 'name': profile, 'category': 'premade'}
+                  for profile, voice_id in VoiceManager.VOICE_PROFILES.items()]
+        self._send_json(200, {'voices': voices})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length) if length else b""
+        path = urlparse(self.path).path.rstrip('/')
+        parts = path.split('/')
+
+        timestamps = len(parts) == 5 and parts[4] == 'with-timestamps'
+        if len(parts) not in (4, 5) or parts[1:3] != ['v1', 'text-to-speech'] or (len(parts) == 5 and not timestamps):
+            self._send_json(404, {'detail': 'Not found'})
+            return
+        if not self._authorized():
+            return
+
+        try:
+            payload = json.loads(raw or b"{}")
+            text = payload['text']
+        except (ValueError, KeyError):
+            self._send_json(422, {'detail': 'Invalid request body'})
+            return
+
+        server = self.server_ref
+        if not server._charge(self.headers.get('xi-api-key'), len(text)):
+            self._send_json(401, {'detail': {'status': 'quota_exceeded',
+                                              'message': 'This request exceeds your quota.'}})
+            server._count('status_401')
+            return
+
+        _, error_status = server._admit()
+        try:
+            latency, truncate = server._sample(len(text))
+
+            if error_status == 429:
+                self._send_json(429, {'detail': {'status': 'too_many_concurrent_requests',
+                                                  'message': 'Too many requests'}},
+                                {'Retry-After': f"{server.config.retry_after:g}"})
+                return
+
+            time.sleep(latency)
+
+            if error_status is not None:
+                self._send_json(error_status, {'detail': 'Injected server error'})
+                return
+
+            output_format = parse_qs(urlparse(self.path).query).get('output_format', ['mp3_44100_128'])[0]
+            self._send_audio(payload, parts[3], text, truncate, output_format, timestamps)
+        finally:
+            server._release()
+
+    def _send_audio(self, payload: Dict, voice_id: str, text: str, truncate: bool,
+                    output_format: str = 'mp3_44100_128', timestamps: bool = False):
+        speed = (payload.get('voice_settings') or {}).get('speed') or 1.0
+        seed = hashlib.sha1(f"{voice_id}\x00{payload.get('model_id')}\x00{speed}\x00{output_format}\x00{text}"
+                            .encode('utf-8')).hexdigest()
+        duration = max(0.3, len(text) / CHARS_PER_SECOND / speed)
+        content_type = 'audio/mpeg'
+
+        # output_format: mp3_<frekvencia>_<kbps> (MPEG-1 frekvenciák) vagy pcm_<frekvencia> (16 bit mono csend)
+        codec, _, params = output_format.partition('_')
+        try:
+            if codec == 'pcm':
+                audio = bytes(int(duration * int(params)) * 2)
+                content_type = 'audio/pcm'
+            else:
+                rate, kbps = (int(v) for v in params.split('_'))
+                audio = silent_mp3_frames(duration, seed.encode('ascii'), rate, kbps * 1000)
+        except ValueError:
+            self._send_json(422, {'detail': f'Unsupported output_format: {output_format}'})
+            return
+
+        if timestamps:
+            # with-timestamps: JSON (base64 hang + egyenletes karakter időzítés)
+            audio = json.dumps({
+                'audio_base64': base64.b64encode(audio).decode('ascii'),
+                'alignment': _uniform_alignment(text, duration),
+                'normalized_alignment': _uniform_alignment(text, duration)
+            }).encode('utf-8')
+            content_type = 'application/json'
+
+        body = audio[:len(audio) // 2] if truncate else audio
+        declared = len(audio) if (truncate and self.server_ref.config.truncate_declared) else len(body)
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(declared))
+        if truncate:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+        self.server_ref._count('truncated' if truncate else 'status_200')
+
+
+class _H2Exchange(_FakeHandler):
+    """Egy HTTP/2 stream a _FakeHandler kéréskezelőinek: a válasz pufferbe gyűlik."""
+
+    def __init__(self, server_ref: FakeElevenLabsServer, headers: Dict[str, str], body: bytes):
+        self.server_ref = server_ref
+        self.command = headers.get(':method', 'GET')
+        self.path = headers.get(':path', '/')
+        self.headers = Message()
+        for key, value in headers.items():
+            if not key.startswith(':') and key != 'content-length':
+                self.headers[key] = value
+        self.headers['Content-Length'] = str(len(body))
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+        self.status = 500
+        self.response_headers = []
+        self.close_connection = False
+
+    def send_response(self, code, message=None):
+        self.status = code
+
+    def send_header(self, keyword, value):
+        self.response_headers.append((keyword.lower(), str(value)))
+
+    def end_headers(self):
+        pass
+
+
+class _H2Connection:
+    """
+    Egy h2c kapcsolat kiszolgálása: a streamek külön szálon futnak (a késleltetés nem
+    blokkolja a többit), a keretek küldése a kapcsolat zárja alatt, folyamvezérléssel.
+    """
+
+    def __init__(self, handler: _FakeHandler):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        self._events = h2.events
+        self._errors = h2.exceptions
+        self.handler = handler
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False,
+                                                                         header_encoding='utf-8'))
+        self.cond = threading.Condition()
+        self.streams: Dict[int, Tuple[Dict[str, str], bytearray]] = {}
+        self.closed = False
+
+    def serve(self):
+        """Az olvasó ciklus (a kezelő szálán) a kapcsolat bontásáig."""
+        events = self._events
+        with self.cond:
+            self.conn.initiate_connection()
+            self._flush()
+        while not self.closed:
+            try:
+                data = self.handler.rfile.read1(65536)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            with self.cond:
+                try:
+                    received = self.conn.receive_data(data)
+                except self._errors.ProtocolError:
+                    self._flush()
+                    break
+                for event in received:
+                    if isinstance(event, events.RequestReceived):
+                        self.streams[event.stream_id] = (dict(event.headers), bytearray())
+                    elif isinstance(event, events.DataReceived):
+                        self.streams[event.stream_id][1].extend(event.data)
+                        self.conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, events.StreamEnded):
+                        headers, body = self.streams.pop(event.stream_id)
+                        threading.Thread(target=self._respond, args=(event.stream_id, headers, bytes(body)),
+                                         daemon=True).start()
+                    elif isinstance(event, events.StreamReset):
+                        self.streams.pop(event.stream_id, None)
+                    elif isinstance(event, events.ConnectionTerminated):
+                        self.closed = True
+                self._flush()
+                # WindowUpdated / SETTINGS: a küldésre váró streamek újra próbálkoznak
+                self.cond.notify_all()
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def _flush(self):
+        data = self.conn.data_to_send()
+        if data and not self.closed:
+            try:
+                self.handler.wfile.write(data)
+            except OSError:
+                self.closed = True
+
+    def _respond(self, stream_id: int, headers: Dict[str, str], body: bytes):
+        """Egy stream: a HTTP/1.1 kezelő futtatása, majd a válasz HTTP/2 keretekben."""
+        self.handler.server_ref._count('http2_streams')
+        exchange = _H2Exchange(self.handler.server_ref, headers, body)
+        if exchange.command == 'POST':
+            exchange.do_POST()
+        else:
+            exchange.do_GET()
+        # Csonka válasz: a megadott hossz helyett stream reset (HTTP/2-n nincs kapcsolat bontás)
+        truncate = exchange.close_connection
+        response_headers = [(':status', str(exchange.status))] + [
+            (key, value) for key, value in exchange.response_headers
+            if key != 'connection' and not (truncate and key == 'content-length')]
+        data = exchange.wfile.getvalue()
+
+        try:
+            with self.cond:
+                if self.closed:
+                    return
+                self.conn.send_headers(stream_id, response_headers, end_stream=not data)
+                self._flush()
+            offset = 0
+            while offset < len(data):
+                with self.cond:
+                    while not self.closed and self.conn.local_flow_control_window(stream_id) <= 0:
+                        self.cond.wait()
+                    if self.closed:
+                        return
+                    size = min(self.conn.local_flow_control_window(stream_id),
+                               self.conn.max_outbound_frame_size, len(data) - offset)
+                    self.conn.send_data(stream_id, data[offset:offset + size])
+                    offset += size
+                    if offset == len(data):
+                        if truncate:
+                            self.conn.reset_stream(stream_id)
+                        else:
+                            self.conn.end_stream(stream_id)
+                    self._flush()
+        except self._errors.StreamClosedError:
+            # A kliens közben bontotta a streamet (pl. hedge vesztes példánya)
+            pass
+
+
+def _uniform_alignment(text: str, duration: float) -> Dict:
+    """Karakter időzítés: a karakterek egyenletesen osztoznak a hang hosszán."""
+    step = duration / max(1, len(text))
+    return {
+        'characters': list(text),
+        'character_start_times_seconds': [round(i * step, 3) for i in range(len(text))],
+        'character_end_times_seconds': [round((i + 1) * step, 3) for i in range(len(text))]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Helyi ElevenLabs utánzat (offline futtatáshoz és terheléses teszthez)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0.05',
+                        help='fixed:S | uniform:MIN:MAX | lognormal:MEDIAN:SIGMA (alapért.: fixed:0.05)')
+    parser.add_argument('--latency-per-char', type=float, default=0.0)
+    parser.add_argument('--rate-429', type=float, default=0.0, help='429 valószínűség (0-1)')
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--concurrency-limit', type=int, default=0)
+    parser.add_argument('--error-burst-every', type=int, default=0)
+    parser.add_argument('--error-burst-length', type=int, default=0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--truncate-rate', type=float, default=0.0)
+    parser.add_argument('--silent-truncation', action='store_true',
+                        help='Csonka válasznál a csonka hosszt jelzi (a kliens nem észleli)')
+    parser.add_argument('--stall-rate', type=float, default=0.0, help='Beragadó kérések valószínűsége (0-1)')
+    parser.add_argument('--stall-seconds', type=float, default=30.0)
+    parser.add_argument('--valid-keys', help='Elfogadott API kulcsok, vesszővel elválasztva (alapért.: bármely)')
+    parser.add_argument('--key-quota-chars', type=int, default=0, help='Kulcsonkénti karakter keret (0 = nincs)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        latency=args.latency,
+        latency_per_char=args.latency_per_char,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        concurrency_limit=args.concurrency_limit,
+        error_burst_every=args.error_burst_every,
+        error_burst_length=args.error_burst_length,
+        error_status=args.error_status,
+        truncate_rate=args.truncate_rate,
+        truncate_declared=not args.silent_truncation,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        valid_keys=set(args.valid_keys.split(',')) if args.valid_keys else None,
+        key_quota_chars=args.key_quota_chars,
+        seed=args.seed
+    )
+    server = FakeElevenLabsServer(config, args.host, args.port)
+
+    print(f"🧪 Fake ElevenLabs szerver: {server.base_url}")
+    print(f"   Használat: ELEVENLABS_BASE_URL={server.base_url} python batch_main.py ...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Leállítva")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ from docx_parser import DocxParser
 from voice_manager import VoiceManager
 from tts_generator import TTSGenerator
 from batch_processor import BatchProcessor
+from script_discovery import iter_script_files
+from key_pool import load_api_keys, parse_key_spec, build_key_pool
+from output_formats import OUTPUT_PROFILES
 
 
 class AutoSoundGUI(ctk.CTk):
@@ -33,7 +36,10 @@ class AutoSoundGUI(ctk.CTk):
         
         # API kulcs betöltése
         load_dotenv()
-        self.api_key = os.getenv('ELEVENLABS_API_KEY')
+        self.api_keys = load_api_keys()
+        self.api_key = parse_key_spec(self.api_keys[0])[0] if self.api_keys else None
+        # Több kulcsnál közös pool (a kulcsonkénti használat a futások között is számít)
+        self.key_pool = build_key_pool(self.api_keys)
         
         # Változók
         self.mode = ctk.StringVar(value="single")  # "single" vagy "batch"
@@ -41,6 +47,7 @@ class AutoSoundGUI(ctk.CTk):
         self.input_folder_path = ctk.StringVar()
         self.output_dir_path = ctk.StringVar(value="output")
         self.speed_value = ctk.DoubleVar(value=0.7)
+        self.output_profile = ctk.StringVar(value=os.getenv('ELEVENLABS_OUTPUT_FORMAT') or "standard")
         self.is_processing = False
         
         self.setup_ui()
@@ -208,6 +215,23 @@ class AutoSoundGUI(ctk.CTk):
         )
         speed_slider.pack(fill="x", pady=(5, 0))
         
+        # Kimeneti formátum
+        format_frame = ctk.CTkFrame(settings_section, fg_color="transparent")
+        format_frame.pack(fill="x", pady=5)
+        
+        ctk.CTkLabel(
+            format_frame,
+            text="💾 Kimeneti formátum:",
+            font=ctk.CTkFont(size=14)
+        ).pack(side="left")
+        
+        ctk.CTkOptionMenu(
+            format_frame,
+            values=list(OUTPUT_PROFILES),
+            variable=self.output_profile,
+            width=140
+        ).pack(side="right")
+        
         # Info labels
         info_frame = ctk.CTkFrame(settings_section, fg_color="#1a1a1a", corner_radius=10)
         info_frame.pack(fill="x", pady=(10, 0), padx=10)
@@ -315,7 +339,7 @@ class AutoSoundGUI(ctk.CTk):
         if folder:
             self.input_folder_path.set(folder)
             # Fájlok számolása
-            files = list(Path(folder).glob("*.txt")) + list(Path(folder).glob("*.docx"))
+            files = list(iter_script_files(folder))
             self.log_message(f"📂 Mappa kiválasztva: {folder}", "info")
             self.log_message(f"   📄 Talált fájlok: {len(files)} db", "info")
     
@@ -412,7 +436,7 @@ class AutoSoundGUI(ctk.CTk):
             else:
                 self.log_message("⚠️  Nincs Characters szekció - név alapú hangválasztás", "warning")
                 dialogues = parser.get_all_dialogues()
-                unique_characters = set(d['character'] for d in dialogues)
+                unique_characters = set(d.character for d in dialogues)
                 for character in unique_characters:
                     voice_manager.assign_voice_by_description(character, "")
             
@@ -427,58 +451,21 @@ class AutoSoundGUI(ctk.CTk):
             self.log_message(f"\n💬 Összes párbeszéd: {total}", "info")
             self.log_message(f"🎚️ Sebesség: {self.speed_value.get():.1f}x\n", "info")
             
-            # TTS Generator
-            tts = TTSGenerator(self.api_key, output_dir)
-            
-            # SEBESSÉG BEÁLLÍTÁSA (módosítjuk a generate_speech-et dinamikusan)
-            original_generate = tts.generate_speech
-            
-            def custom_generate(text, voice_id, filename, model="eleven_v3"):
-                # Itt módosítjuk a sebességet
-                import requests
-                url = f"{tts.base_url}/text-to-speech/{voice_id}"
-                headers = {
-                    "Accept": "audio/mpeg",
-                    "Content-Type": "application/json",
-                    "xi-api-key": tts.api_key
-                }
-                data = {
-                    "text": text,
-                    "model_id": model,
-                    "voice_settings": {
-                        "stability": 1.0,
-                        "similarity_boost": 0.25,
-                        "style": 0.0,
-                        "use_speaker_boost": True,
-                        "speed": self.speed_value.get()  # GUI-ból vesszük
-                    }
-                }
-                
-                try:
-                    response = requests.post(url, json=data, headers=headers, timeout=30)
-                    if response.status_code == 200:
-                        filepath = os.path.join(tts.output_dir, filename)
-                        with open(filepath, 'wb') as f:
-                            f.write(response.content)
-                        return filepath
-                    else:
-                        return None
-                except Exception:
-                    return None
-            
-            tts.generate_speech = custom_generate
+            # TTS Generator (a sebesség a GUI csúszkájából)
+            tts = TTSGenerator(self.api_key, output_dir, speed=self.speed_value.get(),
+                               key_pool=self.key_pool, output_format=self.output_profile.get())
             
             # Generálás
             self.log_message("🎤 Hangfájlok generálása...\n", "info")
             
             success_count = 0
             for i, dialogue in enumerate(dialogues, 1):
-                char = dialogue['character']
-                text = dialogue['text']
-                slide_num = dialogue['slide_number']  # Közvetlenül integer formátumban
+                char = dialogue.character
+                text = dialogue.text
+                slide_num = dialogue.slide_number
                 
                 voice_id = voice_manager.get_voice_id(char)
-                filename = f"{slide_num:02d}_{char}_{i:03d}.mp3"
+                filename = f"{slide_num:02d}_{char}_{i:03d}.{tts.output_format.extension}"
                 
                 self.log_message(f"  [{i}/{total}] {filename}...", "info")
                 
@@ -516,17 +503,11 @@ class AutoSoundGUI(ctk.CTk):
             self.log_message("🎬 BATCH FELDOLGOZÁS INDÍTÁSA", "info")
             self.log_message("="*60, "info")
             
-            # Fájlok listázása
-            files = sorted(list(input_folder.glob("*.txt")) + list(input_folder.glob("*.docx")))
-            
-            if not files:
-                self.log_message("❌ Nincs .txt vagy .docx fájl a mappában!", "error")
-                messagebox.showerror("Hiba", "Nincs feldolgozható fájl a kiválasztott mappában!")
-                return
+            # Fájlok lusta keresése (almappákkal együtt) - a feldolgozás azonnal indulhat
+            files = iter_script_files(input_folder)
             
             self.log_message(f"📂 Input mappa: {input_folder}", "info")
             self.log_message(f"📁 Output mappa: {output_base}", "info")
-            self.log_message(f"📄 Talált fájlok: {len(files)}", "info")
             self.log_message("", "info")
             
             # BatchProcessor inicializálása
@@ -535,9 +516,11 @@ class AutoSoundGUI(ctk.CTk):
             # Feldolgozás fájlonként
             success_count = 0
             total_dialogues = 0
+            file_count = 0
             
             for i, file_path in enumerate(files, 1):
-                self.log_message(f"[{i}/{len(files)}]", "info")
+                file_count = i
+                self.log_message(f"[{i}]", "info")
                 self.log_message("="*60, "info")
                 self.log_message(f"📄 Feldolgozás: {file_path.name}", "info")
                 self.log_message("="*60, "info")
@@ -563,13 +546,13 @@ class AutoSoundGUI(ctk.CTk):
                             voice_manager.assign_voice_by_description(character, description)
                     else:
                         dialogues_temp = parser.get_all_dialogues()
-                        unique_characters = set(d['character'] for d in dialogues_temp)
+                        unique_characters = set(d.character for d in dialogues_temp)
                         for character in unique_characters:
                             voice_manager.assign_voice_by_description(character, "")
                     
-                    # Output mappa
-                    output_dir = os.path.join(output_base, file_path.stem)
-                    os.makedirs(output_dir, exist_ok=True)
+                    # Output mappa (az input almappa-szerkezetét tükrözi)
+                    rel_parent = file_path.parent.relative_to(input_folder)
+                    output_dir = str(batch_processor.create_output_directory(file_path.stem, str(rel_parent)))
                     
                     self.log_message(f"📁 Output mappa: {output_dir}", "info")
                     
@@ -578,53 +561,27 @@ class AutoSoundGUI(ctk.CTk):
                     self.log_message(f"💬 Párbeszédek: {len(dialogues)}", "info")
                     self.log_message("", "info")
                     
-                    # TTS Generator  
-                    tts = TTSGenerator(self.api_key, output_dir)
+                    # TTS Generator (a sebesség a GUI csúszkájából)
+                    tts = TTSGenerator(self.api_key, output_dir, speed=self.speed_value.get(),
+                                       key_pool=self.key_pool, output_format=self.output_profile.get())
                     
                     # Generálás
                     self.log_message(f"🎬 Összesen {len(dialogues)} párbeszéd generálása...\n", "info")
                     
                     file_success = 0
                     for j, dialogue in enumerate(dialogues, 1):
-                        char = dialogue['character']
-                        text = dialogue['text']
-                        slide_num = dialogue['slide_number']  # Közvetlenül integer formátumban
+                        char = dialogue.character
+                        text = dialogue.text
+                        slide_num = dialogue.slide_number
                         
                         voice_id = voice_manager.get_voice_id(char)
-                        filename = f"{slide_num:02d}_{char}_{j:03d}.mp3"
+                        filename = f"{slide_num:02d}_{char}_{j:03d}.{tts.output_format.extension}"
                         
-                        # Sebesség figyelembevételével
-                        import requests
-                        url = f"{tts.base_url}/text-to-speech/{voice_id}"
-                        headers = {
-                            "Accept": "audio/mpeg",
-                            "Content-Type": "application/json",
-                            "xi-api-key": tts.api_key
-                        }
-                        data = {
-                            "text": text,
-                            "model_id": "eleven_v3",
-                            "voice_settings": {
-                                "stability": 1.0,
-                                "similarity_boost": 0.25,
-                                "style": 0.0,
-                                "use_speaker_boost": True,
-                                "speed": self.speed_value.get()
-                            }
-                        }
-                        
-                        try:
-                            response = requests.post(url, json=data, headers=headers, timeout=30)
-                            if response.status_code == 200:
-                                filepath = os.path.join(output_dir, filename)
-                                with open(filepath, 'wb') as f:
-                                    f.write(response.content)
-                                file_success += 1
-                                self.log_message(f"  ✅ {filename}", "success")
-                            else:
-                                self.log_message(f"  ❌ {filename} - Hiba: {response.status_code}", "error")
-                        except Exception as e:
-                            self.log_message(f"  ❌ {filename} - {str(e)}", "error")
+                        if tts.generate_speech(text, voice_id, filename):
+                            file_success += 1
+                            self.log_message(f"  ✅ {filename}", "success")
+                        else:
+                            self.log_message(f"  ❌ {filename} - Hiba", "error")
                     
                     self.log_message(f"\n✅ Sikeres: {file_success}/{len(dialogues)}\n", "success")
                     
@@ -637,18 +594,23 @@ class AutoSoundGUI(ctk.CTk):
                 
                 self.log_message("", "info")
             
+            if file_count == 0:
+                self.log_message("❌ Nincs .txt vagy .docx fájl a mappában!", "error")
+                messagebox.showerror("Hiba", "Nincs feldolgozható fájl a kiválasztott mappában!")
+                return
+            
             # Összesítés
             self.log_message("="*60, "info")
             self.log_message("✅ BATCH FELDOLGOZÁS BEFEJEZVE!", "success")
             self.log_message("="*60, "info")
-            self.log_message(f"📄 Összes fájl: {len(files)}", "info")
+            self.log_message(f"📄 Összes fájl: {file_count}", "info")
             self.log_message(f"✅ Sikeres: {success_count}", "success")
-            self.log_message(f"❌ Sikertelen: {len(files) - success_count}", "error" if success_count < len(files) else "info")
+            self.log_message(f"❌ Sikertelen: {file_count - success_count}", "error" if success_count < file_count else "info")
             self.log_message(f"💬 Összes párbeszéd: {total_dialogues}", "info")
             self.log_message(f"📁 Output: {output_base}", "info")
             self.log_message("="*60, "info")
             
-            messagebox.showinfo("Kész!", f"Batch feldolgozás befejezve!\n\n{success_count}/{len(files)} fájl sikeres\n{total_dialogues} hangfájl generálva")
+            messagebox.showinfo("Kész!", f"Batch feldolgozás befejezve!\n\n{success_count}/{file_count} fájl sikeres\n{total_dialogues} hangfájl generálva")
             
         except Exception as e:
             self.log_message(f"\n❌ HIBA: {str(e)}", "error")
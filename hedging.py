@@ -0,0 +1,105 @@
+"""
+Hedging modul
+Feladata: Eldönteni, mikor induljon egy lassú szintézis kérés mellé egy második,
+azonos kérés (hedge), és a többletkérések keretét betartatni.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from telemetry import percentile
+
+
+class HedgePolicy:
+    """
+    Hedge döntések a megfigyelt késleltetés alapján.
+    Ha egy kérés a sikeres kérések késleltetésének `pct`-edik percentilisénél tovább tart,
+    indulhat mellé egy másodpéldány - amíg a hedge kérések aránya a keret alatt marad.
+    """
+
+    def __init__(self,
+                 pct: float = 95.0,
+                 budget: float = 0.1,
+                 min_samples: int = 20,
+                 min_delay: float = 0.2,
+                 window: int = 500):
+        """
+        Args:
+            pct: A hedge küszöb percentilise (pl. 95 = p95 után indul a másodpéldány)
+            budget: A hedge kérések megengedett aránya az elsődleges kérésekhez képest (0-1)
+            min_samples: Ennyi mért kérés előtt nincs hedging (még nincs megbízható percentilis)
+            min_delay: A küszöb alsó határa (s)
+            window: A percentilishez figyelembe vett utolsó kérések száma
+        """
+        if not 0 < pct < 100:
+            raise ValueError(f"Érvénytelen hedge percentilis: {pct}")
+
+        self.pct = pct
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._threshold = None
+        self._dirty = 0
+        self._requests = 0
+        self._hedges = 0
+        self._wins = 0
+        self._denied = 0
+
+    def observe(self, latency: float):
+        """Rögzíti egy sikeres próbálkozás késleltetését."""
+        with self._lock:
+            self._latencies.append(latency)
+            self._dirty += 1
+
+    def delay(self) -> Optional[float]:
+        """
+        Elsődleges kérés indításakor: mennyi idő után induljon hedge.
+
+        Returns:
+            Optional[float]: Küszöb másodpercben, vagy None, ha még nincs elég minta
+        """
+        with self._lock:
+            self._requests += 1
+            if len(self._latencies) < self.min_samples:
+                return None
+            # A rendezés drága - csak minden 10. új minta után számoljuk újra
+            if self._threshold is None or self._dirty >= 10:
+                self._threshold = max(self.min_delay, percentile(sorted(self._latencies), self.pct))
+                self._dirty = 0
+            return self._threshold
+
+    def try_spend(self) -> bool:
+        """Lefoglal egy hedge kérést a keretből. Hamis, ha a keret elfogyott."""
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._requests:
+                self._denied += 1
+                return False
+            self._hedges += 1
+            return True
+
+    def record_win(self):
+        """A hedge kérés végzett előbb."""
+        with self._lock:
+            self._wins += 1
+
+    def summary(self) -> Dict:
+        """
+        Hedge statisztika.
+
+        Returns:
+            Dict: Elsődleges kérések, hedge kérések, nyertes hedge-ek, keret miatt elmaradt hedge-ek
+        """
+        with self._lock:
+            return {
+                'percentile': self.pct,
+                'budget': self.budget,
+                'threshold_seconds': None if self._threshold is None else round(self._threshold, 4),
+                'requests': self._requests,
+                'hedges': self._hedges,
+                'hedge_wins': self._wins,
+                'budget_denied': self._denied
+            }
@@ -0,0 +1,334 @@
+"""
+HTTP transport modul
+Feladata: A szintézis kérések HTTP rétege, futásidőben választhatóan:
+    - http1: requests Session közös keep-alive kapcsolat poollal (alapértelmezés)
+    - http2: httpx kliens HTTP/2-vel, ahol sok egyidejű kérés néhány kapcsolaton
+             multiplexelődik (opcionális függőség: pip install "httpx[http2]")
+
+Ha a HTTP/2 függőségek hiányoznak, vagy a szerver nem támogatja a HTTP/2-t
+(ALPN egyeztetés), a forgalom HTTP/1.1-en megy tovább.
+
+Beágyazott használatnál a hívó saját requests.Session / httpx.Client példánya
+is átadható (transport_for_session); ezt a transport nem zárja le.
+
+Az asyncio alapú szintézishez (TTSGenerator.aiter_generate) az AsyncHttpTransport
+httpx.AsyncClient-et használ: a kérések nem foglalnak szálat, így sok ezer sor
+lehet egyszerre folyamatban (a httpx ehhez kötelező, a h2 csak a HTTP/2-höz kell).
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+TRANSPORTS = ('http1', 'http2')
+DEFAULT_TRANSPORT = 'http1'
+
+
+class TransportError(Exception):
+    """Hálózati hiba vagy timeout (a hívó újrapróbálhatja)."""
+
+
+class TransportResponse:
+    """Egy (streamelt) válasz: a fejlécek már megjöttek, a törzs a read()-del olvasható."""
+
+    __slots__ = ('status_code', 'headers', 'http_version', '_read', '_close')
+
+    def __init__(self, status_code: int, headers, http_version: str,
+                 read: Callable[[], bytes], close: Callable[[], None]):
+        self.status_code = status_code
+        self.headers = headers
+        self.http_version = http_version
+        self._read = read
+        self._close = close
+
+    def read(self) -> bytes:
+        """
+        A teljes törzs.
+
+        Raises:
+            TransportError: Ha a kapcsolat a törzs olvasása közben megszakad
+        """
+        try:
+            return self._read()
+        finally:
+            self._close()
+
+    @property
+    def text(self) -> str:
+        return self.read().decode('utf-8', errors='replace')
+
+    def close(self):
+        """A válasz eldobása (pl. hedge vesztes példánya)."""
+        self._close()
+
+
+class AsyncTransportResponse:
+    """Az AsyncHttpTransport válasza: mint a TransportResponse, de a törzs olvasása await-elhető."""
+
+    __slots__ = ('status_code', 'headers', 'http_version', '_response', '_errors')
+
+    def __init__(self, response, errors):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.http_version = response.http_version
+        self._response = response
+        self._errors = errors
+
+    async def read(self) -> bytes:
+        """
+        A teljes törzs.
+
+        Raises:
+            TransportError: Ha a kapcsolat a törzs olvasása közben megszakad
+        """
+        try:
+            return await self._response.aread()
+        except self._errors as e:
+            raise TransportError(str(e)) from e
+        finally:
+            await self._response.aclose()
+
+    async def text(self) -> str:
+        return (await self.read()).decode('utf-8', errors='replace')
+
+    async def close(self):
+        await self._response.aclose()
+
+
+class _Transport:
+    """Közös rész: a kapott válaszok protokollonkénti számlálása."""
+
+    name = DEFAULT_TRANSPORT
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.protocols: Dict[str, int] = {}
+
+    def _observe(self, http_version: str):
+        with self._lock:
+            self.protocols[http_version] = self.protocols.get(http_version, 0) + 1
+
+    def summary(self) -> Dict:
+        """A választott transport és a ténylegesen használt protokollok (válasz / protokoll)."""
+        with self._lock:
+            return {'transport': self.name, 'protocols': dict(self.protocols)}
+
+
+class Http1Transport(_Transport):
+    """HTTP/1.1 egy közös requests Session-nel (egyidejű kérésenként egy keep-alive kapcsolat)."""
+
+    name = 'http1'
+
+    def __init__(self, max_connections: int = 10, session: Optional[requests.Session] = None):
+        """
+        Args:
+            max_connections: A poolban tartott keep-alive kapcsolatok száma (~ egyidejű kérések)
+            session: A hívó saját Session-je (a beállításai, pl. proxy, adapterek megmaradnak,
+                     és a close() nem zárja le)
+        """
+        super().__init__()
+        self._owned = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, max_connections))
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def post(self, url: str, json: Dict, headers: Dict, timeout: float) -> TransportResponse:
+        """
+        Streamelt POST kérés.
+
+        Raises:
+            TransportError: Hálózati hiba vagy timeout esetén
+        """
+        try:
+            response = self.session.post(url, json=json, headers=headers, timeout=timeout, stream=True)
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        self._observe('HTTP/1.1')
+
+        def read() -> bytes:
+            try:
+                return response.content
+            except requests.exceptions.RequestException as e:
+                raise TransportError(str(e)) from e
+
+        return TransportResponse(response.status_code, response.headers, 'HTTP/1.1', read, response.close)
+
+    def close(self):
+        if self._owned:
+            self.session.close()
+
+
+class Http2Transport(_Transport):
+    """HTTP/2 httpx klienssel: az egyidejű kérések streamként osztoznak néhány kapcsolaton."""
+
+    name = 'http2'
+
+    def __init__(self, max_connections: int = 10, client=None, prior_knowledge: bool = False):
+        """
+        Args:
+            max_connections: Kapcsolatok felső határa (HTTP/2-n általában egy is elég;
+                             HTTP/1.1-re visszaesve ennyi egyidejű kérés)
+            client: A hívó saját httpx.Client-je (a close() nem zárja le)
+            prior_knowledge: TLS nélküli (http://) végponton is rögtön HTTP/2 (h2c), HTTP/1.1
+                             visszaesés nélkül; csak olyan szerverhez, amely ezt támogatja
+                             (pl. fake_elevenlabs.py)
+
+        Raises:
+            ImportError: Ha a httpx vagy a h2 csomag nincs telepítve
+        """
+        super().__init__()
+        import httpx
+
+        self._httpx = httpx
+        self._owned = client is None
+        if client is None:
+            limits = httpx.Limits(max_connections=max(1, max_connections),
+                                  max_keepalive_connections=max(1, max_connections))
+            # http2=True a h2 csomagot is igényli (hiányában ImportError)
+            client = httpx.Client(http2=True, http1=not prior_knowledge, limits=limits)
+        self.client = client
+
+    def post(self, url: str, json: Dict, headers: Dict, timeout: float) -> TransportResponse:
+        """
+        Streamelt POST kérés.
+
+        Raises:
+            TransportError: Hálózati hiba vagy timeout esetén
+        """
+        httpx = self._httpx
+        try:
+            request = self.client.build_request('POST', url, json=json, headers=headers, timeout=timeout)
+            response = self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        self._observe(response.http_version)
+
+        def read() -> bytes:
+            try:
+                return response.read()
+            except httpx.HTTPError as e:
+                raise TransportError(str(e)) from e
+
+        return TransportResponse(response.status_code, response.headers, response.http_version,
+                                 read, response.close)
+
+    def close(self):
+        if self._owned:
+            self.client.close()
+
+
+class AsyncHttpTransport(_Transport):
+    """Nem blokkoló transport httpx.AsyncClient-tel (HTTP/1.1, vagy h2 esetén HTTP/2)."""
+
+    name = 'async'
+
+    def __init__(self, max_connections: int = 100, client=None, http2: bool = False):
+        """
+        Args:
+            max_connections: Kapcsolatok felső határa (HTTP/1.1-en ~ egyidejű kérések)
+            client: A hívó saját httpx.AsyncClient-je (az aclose() nem zárja le)
+            http2: HTTP/2 multiplexelés (a h2 csomagot is igényli)
+
+        Raises:
+            ImportError: Ha a httpx (vagy http2=True mellett a h2) csomag nincs telepítve
+        """
+        super().__init__()
+        import httpx
+
+        self._httpx = httpx
+        self._owned = client is None
+        if client is None:
+            limits = httpx.Limits(max_connections=max(1, max_connections),
+                                  max_keepalive_connections=max(1, max_connections))
+            client = httpx.AsyncClient(http2=http2, limits=limits)
+        self.client = client
+
+    async def post(self, url: str, json: Dict, headers: Dict, timeout: float) -> AsyncTransportResponse:
+        """
+        Streamelt POST kérés (a fejlécek után tér vissza, a törzs a read()-del jön).
+
+        Raises:
+            TransportError: Hálózati hiba vagy timeout esetén
+        """
+        httpx = self._httpx
+        try:
+            request = self.client.build_request('POST', url, json=json, headers=headers, timeout=timeout)
+            response = await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        self._observe(response.http_version)
+        return AsyncTransportResponse(response, httpx.HTTPError)
+
+    async def aclose(self):
+        if self._owned:
+            await self.client.aclose()
+
+
+def create_async_transport(name: Optional[str] = None, max_connections: int = 100, verbose: bool = True):
+    """
+    Async transport a sync transport nevéhez igazítva ('http2' -> HTTP/2, ha a h2 telepítve van).
+
+    Raises:
+        ImportError: Ha a httpx nincs telepítve (pip install httpx)
+    """
+    try:
+        import httpx  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Az async szintézishez a httpx csomag kell (pip install httpx)") from e
+
+    if name == 'http2':
+        try:
+            return AsyncHttpTransport(max_connections, http2=True)
+        except ImportError:
+            if verbose:
+                print("⚠️  HTTP/2-höz a httpx[http2] csomag kell (pip install \"httpx[http2]\") - HTTP/1.1 marad")
+    return AsyncHttpTransport(max_connections)
+
+
+def create_transport(name: Optional[str] = None, max_connections: int = 10, verbose: bool = True):
+    """
+    Transport létrehozása név alapján.
+
+    Args:
+        name: 'http1' vagy 'http2' (None = http1)
+        max_connections: Kapcsolat pool mérete
+        verbose: A HTTP/2 -> HTTP/1.1 visszaesés kiírása
+
+    Returns:
+        Http1Transport vagy Http2Transport (http2 függőségek hiányában Http1Transport)
+
+    Raises:
+        ValueError: Ismeretlen transport név esetén
+    """
+    name = name or DEFAULT_TRANSPORT
+    if name not in TRANSPORTS:
+        raise ValueError(f"Ismeretlen transport: {name} ({', '.join(TRANSPORTS)})")
+
+    if name == 'http2':
+        try:
+            return Http2Transport(max_connections)
+        except ImportError:
+            if verbose:
+                print("⚠️  HTTP/2-höz a httpx[http2] csomag kell (pip install \"httpx[http2]\") - HTTP/1.1 marad")
+    return Http1Transport(max_connections)
+
+
+def transport_for_session(session):
+    """
+    Transport a hívó meglévő HTTP kliensére: requests.Session -> Http1Transport,
+    httpx.Client -> Http2Transport (a kliens saját beállításaival, pl. http2=True).
+
+    Raises:
+        TypeError: Ha a kliens típusa nem támogatott
+    """
+    if isinstance(session, requests.Session):
+        return Http1Transport(session=session)
+    if type(session).__module__.split('.')[0] == 'httpx':
+        return Http2Transport(client=session)
+    raise TypeError(f"Nem támogatott HTTP kliens: {type(session).__name__} (requests.Session vagy httpx.Client)")
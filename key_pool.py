@@ -0,0 +1,245 @@
+"""
+API kulcs pool modul
+Feladata: Több ElevenLabs API kulcs között szétosztani a kéréseket kulcsonként
+külön rate limiterrel és egyidejű kérés korláttal, kulcsonként követni a
+karakterhasználatot, és a kimerült / érvénytelen kulcsokat kivonni a forgásból.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from concurrency import ASYNC_POLL_INTERVAL
+from rate_limiter import RateLimiter
+
+
+class NoKeysAvailable(Exception):
+    """Minden API kulcs ki lett vonva a forgásból."""
+
+
+def parse_key_spec(spec: str):
+    """
+    Egy kulcs megadás feldolgozása: "KULCS" vagy "KULCS:KARAKTER_KERET".
+
+    Returns:
+        Tuple[str, Optional[int]]: (kulcs, karakter keret vagy None)
+    """
+    key, _, quota = spec.strip().partition(':')
+    return key, int(quota) if quota else None
+
+
+def load_api_keys() -> List[str]:
+    """
+    API kulcsok a környezetből: ELEVENLABS_API_KEYS (vesszővel elválasztva,
+    opcionális ":karakter_keret" utótaggal), ennek hiányában ELEVENLABS_API_KEY.
+
+    Returns:
+        List[str]: Kulcs megadások (üres lista, ha nincs beállítva)
+    """
+    keys = [k.strip() for k in os.getenv('ELEVENLABS_API_KEYS', '').split(',') if k.strip()]
+    if not keys and os.getenv('ELEVENLABS_API_KEY'):
+        keys = [os.getenv('ELEVENLABS_API_KEY')]
+    return keys
+
+
+def build_key_pool(keys: Sequence[str],
+                   min_interval: float = 0.5,
+                   max_in_flight: Optional[int] = None) -> Optional['KeyPool']:
+    """
+    Kulcs pool több kulcshoz (vagy karakter kerettel megadott kulcshoz).
+    Egyetlen sima kulcsnál None - ilyenkor a TTSGenerator a megszokott módon, egy kulccsal fut.
+    """
+    if len(keys) > 1 or any(parse_key_spec(spec)[1] is not None for spec in keys):
+        return KeyPool(keys, min_interval, max_in_flight)
+    return None
+
+
+def mask_key(key: str) -> str:
+    """Naplózható kulcs azonosító (csak az utolsó 4 karakter)."""
+    return f"…{key[-4:]}" if len(key) > 4 else "…"
+
+
+class ApiKey:
+    """Egy kulcs állapota a poolban."""
+
+    __slots__ = ('key', 'name', 'quota', 'limiter', 'in_flight', 'requests',
+                 'characters', 'errors', 'drained', 'drain_reason')
+
+    def __init__(self, key: str, min_interval: float, quota: Optional[int] = None):
+        self.key = key
+        self.name = mask_key(key)
+        self.quota = quota                  # Karakter keret (None = ismeretlen / korlátlan)
+        self.limiter = RateLimiter(min_interval)
+        self.in_flight = 0
+        self.requests = 0
+        self.characters = 0                 # Sikeresen szintetizált karakterek
+        self.errors = 0
+        self.drained = False
+        self.drain_reason = None
+
+
+class KeyPool:
+    """
+    Szálbiztos kulcs pool.
+    Minden kéréshez a legkorábban szabad időréssel rendelkező, nem telített kulcsot adja.
+    """
+
+    def __init__(self,
+                 keys: Sequence[str],
+                 min_interval: float = 0.5,
+                 max_in_flight: Optional[int] = None,
+                 verbose: bool = True):
+        """
+        Args:
+            keys: Kulcs megadások ("KULCS" vagy "KULCS:KARAKTER_KERET")
+            min_interval: Kulcsonként minimális időköz két kérés indítása között (s)
+            max_in_flight: Kulcsonként egyidejű kérések felső határa (None = nincs)
+            verbose: A kivont kulcsok kiírása
+        """
+        if not keys:
+            raise ValueError("Legalább egy API kulcs szükséges")
+
+        self._keys = []
+        for spec in keys:
+            key, quota = parse_key_spec(spec)
+            self._keys.append(ApiKey(key, min_interval, quota))
+        self.max_in_flight = max_in_flight
+        self.verbose = verbose
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def active_count(self) -> int:
+        """A forgásban lévő kulcsok száma."""
+        with self._cond:
+            return sum(1 for k in self._keys if not k.drained)
+
+    def acquire(self, chars: int = 0) -> ApiKey:
+        """
+        Kiválaszt egy kulcsot a következő kéréshez, és kivárja a kulcs rate limitjét.
+        Karakter kerettel megadott kulcsot csak akkor ad, ha a kérés még belefér.
+
+        Args:
+            chars: A kérés szövegének hossza
+
+        Returns:
+            ApiKey: A használandó kulcs (a kérés után release()-zel vissza kell adni)
+
+        Raises:
+            NoKeysAvailable: Ha minden kulcs ki lett vonva, vagy egyikbe sem fér bele a kérés
+        """
+        with self._cond:
+            while True:
+                selected = self._select(chars)
+                if selected is not None:
+                    break
+                self._cond.wait()
+
+        # Az időrés már a kiválasztáskor lefoglalódott; itt csak kivárjuk
+        key, wait = selected
+        if wait > 0:
+            time.sleep(wait)
+        return key
+
+    async def acquire_async(self, chars: int = 0) -> ApiKey:
+        """
+        Mint az acquire(), de az event loopot nem blokkolja (telített kulcsoknál lekérdezéssel vár).
+
+        Raises:
+            NoKeysAvailable: Ha minden kulcs ki lett vonva, vagy egyikbe sem fér bele a kérés
+        """
+        while True:
+            with self._cond:
+                selected = self._select(chars)
+            if selected is not None:
+                break
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+
+        key, wait = selected
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return key
+
+    def _select(self, chars: int) -> Optional[Tuple[ApiKey, float]]:
+        """
+        A legkorábban szabad kulcs és időrésének lefoglalása (a zárat a hívó tartja).
+        Az időrés a kiválasztással egy kritikus szakaszban foglalódik, így két egyidejű
+        kérés nem választhatja ugyanazt a "legkorábbi" rést.
+
+        Returns:
+            Optional[Tuple[ApiKey, float]]: (kulcs, várakozás az időrésig), None, ha mind telített
+        """
+        active = [k for k in self._keys if not k.drained]
+        if not active:
+            raise NoKeysAvailable("Nincs használható API kulcs (mind kimerült vagy érvénytelen)")
+        active = [k for k in active if k.quota is None or k.characters + chars <= k.quota]
+        if not active:
+            raise NoKeysAvailable(f"Egyik API kulcs karakter keretébe sem fér bele a kérés ({chars} karakter)")
+
+        free = [k for k in active if self.max_in_flight is None or k.in_flight < self.max_in_flight]
+        if not free:
+            return None
+        key = min(free, key=lambda k: (k.limiter.next_slot, k.in_flight))
+        key.in_flight += 1
+        key.requests += 1
+        return key, key.limiter.reserve()
+
+    def release(self, key: ApiKey, status: Optional[int], chars: int, error_text: Optional[str] = None):
+        """
+        Visszaad egy kulcsot a kérés kimenetelével.
+
+        Args:
+            key: Az acquire() által adott kulcs
+            status: HTTP státusz (None = hálózati hiba / timeout)
+            chars: A kérés szövegének hossza
+            error_text: Hiba válasz szövege (a kvóta hiba felismeréséhez)
+        """
+        with self._cond:
+            key.in_flight -= 1
+
+            if status == 200:
+                key.characters += chars
+                if key.quota is not None and key.characters >= key.quota:
+                    self._drain(key, 'quota')
+            elif status == 401:
+                key.errors += 1
+                self._drain(key, 'quota' if error_text and 'quota' in error_text else 'unauthorized')
+            elif status is not None and status >= 400:
+                key.errors += 1
+
+            self._cond.notify_all()
+
+    def _drain(self, key: ApiKey, reason: str):
+        """Kivonja a kulcsot a forgásból."""
+        if key.drained:
+            return
+        key.drained = True
+        key.drain_reason = reason
+        if self.verbose:
+            remaining = sum(1 for k in self._keys if not k.drained)
+            print(f"  🔑 API kulcs kivonva: {key.name} ({reason}), {remaining} maradt")
+
+    def summary(self) -> List[Dict]:
+        """
+        Kulcsonkénti használat.
+
+        Returns:
+            List[Dict]: Kulcsonként (maszkolt név) kérések, karakterek, hibák, állapot
+        """
+        with self._cond:
+            return [
+                {
+                    'key': k.name,
+                    'requests': k.requests,
+                    'characters': k.characters,
+                    'quota': k.quota,
+                    'errors': k.errors,
+                    'active': not k.drained,
+                    'drain_reason': k.drain_reason
+                }
+                for k in self._keys
+            ]
@@ -5,37 +5,23 @@ Fő program fájl
 
 import os
 import json
-import csv
 from dotenv import load_dotenv
 from script_parser import ScriptParser
 from voice_manager import VoiceManager
 from tts_generator import TTSGenerator
+from key_pool import load_api_keys, parse_key_spec, build_key_pool
+from results_log import ResultsLog, export_json, export_csv
 
 
-def save_json(data: list, output_path: str):
-    """Menti a strukturált adatokat JSON formátumban."""
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def save_json(log_path: str, output_path: str):
+    """Menti a strukturált adatokat JSON formátumban (a soronkénti naplóból)."""
+    export_json(log_path, output_path)
     print(f"📄 JSON mentve: {output_path}")
 
 
-def save_csv(data: list, output_path: str):
-    """Menti a strukturált adatokat CSV formátumban."""
-    if not data:
-        return
-    
-    # CSV mezők
-    fieldnames = ['scene', 'slide_number', 'character', 'text', 'voice_id', 'file_name', 'success']
-    
-    with open(output_path, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for row in data:
-            # Csak a szükséges mezők
-            csv_row = {key: row.get(key, '') for key in fieldnames}
-            writer.writerow(csv_row)
-    
+def save_csv(log_path: str, output_path: str):
+    """Menti a strukturált adatokat CSV formátumban (a soronkénti naplóból)."""
+    export_csv(log_path, output_path)
     print(f"📊 CSV mentve: {output_path}")
 
 
@@ -78,9 +64,9 @@ def main():
     
     # 1. Környezeti változók betöltése (.env fájl)
     load_dotenv()
-    api_key = os.getenv('ELEVENLABS_API_KEY')
+    api_keys = load_api_keys()
     
-    if not api_key:
+    if not api_keys:
         print("❌ Hiba: ELEVENLABS_API_KEY nincs beállítva!")
         print("   1. Másold le a .env.example fájlt .env néven")
         print("   2. Írd be az API kulcsodat a .env fájlba")
@@ -119,7 +105,7 @@ def main():
     else:
         print("⚠️  Nincs Characters szekció - nevek alapján történik a hangválasztás")
         dialogues = parser.get_all_dialogues()
-        unique_characters = set(d['character'] for d in dialogues)
+        unique_characters = set(d.character for d in dialogues)
         for character in unique_characters:
             # Üres leírással hívjuk meg -> név alapú felismerés
             voice_manager.assign_voice_by_description(character, "")
@@ -144,33 +130,49 @@ def main():
     
     # 7. TTS generálás
     output_dir = "output"
-    tts_generator = TTSGenerator(api_key, output_dir)
-    
-    results = tts_generator.generate_batch(dialogues, voice_manager, delay=0.5)
+    api_key = parse_key_spec(api_keys[0])[0]
+    tts_generator = TTSGenerator(api_key, output_dir, key_pool=build_key_pool(api_keys),
+                                 output_format=os.getenv('ELEVENLABS_OUTPUT_FORMAT'),
+                                 transport=os.getenv('ELEVENLABS_TRANSPORT'))
+    
+    # Minden eredmény azonnal a naplóba kerül (összeomlás esetén is megmarad)
+    log_path = os.path.join(output_dir, "dialogues.jsonl")
+    success_count = 0
+    total_duration = 0.0
+    
+    print(f"\n🎬 Összesen {len(dialogues)} párbeszéd generálása indítása...\n")
+    with ResultsLog(log_path) as results_log:
+        for result in tts_generator.iter_generate(dialogues, voice_manager, delay=0.5):
+            results_log.append(result.to_dict())
+            if result.success:
+                success_count += 1
+                total_duration += result.duration or 0.0
     
     # 8. Eredmények mentése
     print("\n💾 Eredmények mentése...")
     
     # JSON export
     json_path = os.path.join(output_dir, "dialogues.json")
-    save_json(results, json_path)
+    save_json(log_path, json_path)
     
     # CSV export
     csv_path = os.path.join(output_dir, "dialogues.csv")
-    save_csv(results, csv_path)
+    save_csv(log_path, csv_path)
     
     # Voice mappings mentése
     mappings_path = os.path.join(output_dir, "voice_mappings.json")
     with open(mappings_path, 'w', encoding='utf-8') as f:
         json.dump(voice_manager.get_all_mappings(), f, ensure_ascii=False, indent=2)
     print(f"🔊 Voice mappings mentve: {mappings_path}")
+    tts_generator.save_settings()
     
     # 9. Végső összefoglaló
     print("\n" + "="*60)
     print("✅ KÉSZ!")
     print("="*60)
     print(f"📁 Output mappa: {os.path.abspath(output_dir)}")
-    print(f"🎵 Generált hangfájlok: {sum(1 for r in results if r['success'])}/{len(results)}")
+    print(f"🎵 Generált hangfájlok: {success_count}/{len(dialogues)}")
+    print(f"🕒 Hanganyag hossza: {total_duration:.1f}s")
     print(f"📄 JSON export: {json_path}")
     print(f"📊 CSV export: {csv_path}")
     print("="*60 + "\n")
@@ -0,0 +1,368 @@
+"""
+MP3 segédmodul
+Feladata: MPEG audio frame fejlécek értelmezése dekódolás nélkül, MP3 fájlok
+frame szintű összefűzése és időpontok szerinti szétvágása (újrakódolás nélkül, a
+felesleges ID3 / Xing fejlécek elhagyásával), és csendes frame-ek előállítása.
+"""
+
+import bisect
+import math
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+# MPEG-1 Layer III paraméterek (az ElevenLabs alapértelmezett mp3_44100_128 formátuma)
+MP3_SAMPLE_RATE = 44100
+MP3_BITRATE = 128000
+MP3_SAMPLES_PER_FRAME = 1152
+
+# Bitráta táblák (kbps) Layer III-hoz, a fejléc 4 bites indexe szerint
+_BITRATES_V1_L3 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+_BITRATES_V2_L3 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0)
+
+# Mintavételi frekvenciák verziónként (a fejléc 2 bites indexe szerint)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),   # MPEG-1
+    2: (22050, 24000, 16000),   # MPEG-2
+    0: (11025, 12000, 8000),    # MPEG-2.5
+}
+
+
+class FrameHeader:
+    """Egy MPEG-1/2/2.5 Layer III frame fejléce."""
+
+    __slots__ = ('version', 'bitrate', 'sample_rate', 'padding', 'channels', 'size', 'samples', 'protected')
+
+    def __init__(self, version: int, bitrate: int, sample_rate: int, padding: int, channels: int,
+                 protected: bool = False):
+        self.version = version          # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+        self.bitrate = bitrate          # bit/s
+        self.sample_rate = sample_rate
+        self.padding = padding
+        self.channels = channels
+        self.protected = protected      # CRC-16 követi a fejlécet
+        if version == 3:
+            self.samples = 1152
+            self.size = 144 * bitrate // sample_rate + padding
+        else:
+            self.samples = 576
+            self.size = 72 * bitrate // sample_rate + padding
+
+    @property
+    def duration(self) -> float:
+        """A frame hossza másodpercben."""
+        return self.samples / self.sample_rate
+
+    @property
+    def side_info_size(self) -> int:
+        """A side info mérete (a Xing / Info fejléc ez után kezdődik)."""
+        if self.version == 3:
+            return 17 if self.channels == 1 else 32
+        return 9 if self.channels == 1 else 17
+
+
+def parse_frame_header(data, offset: int = 0) -> Optional[FrameHeader]:
+    """
+    Frame fejléc értelmezése az adott pozíción.
+
+    Returns:
+        Optional[FrameHeader]: A fejléc, vagy None, ha itt nincs érvényes Layer III frame
+    """
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+
+    # 11 bites szinkron
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+
+    # Csak Layer III (01), érvényes verzió, bitráta és frekvencia
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    table = _BITRATES_V1_L3 if version == 3 else _BITRATES_V2_L3
+    channels = 1 if (b3 >> 6) == 3 else 2
+    return FrameHeader(version, table[bitrate_index] * 1000, _SAMPLE_RATES[version][rate_index],
+                       (b2 >> 1) & 0x01, channels, protected=not (b1 & 0x01))
+
+
+def id3v2_size(data) -> int:
+    """Az elején lévő ID3v2 címke teljes mérete (0, ha nincs)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def is_info_frame(data, offset: int, header: FrameHeader) -> bool:
+    """Xing / Info / VBRI metaadat frame-e (nem hang, összefűzéskor el kell hagyni)."""
+    tag_offset = offset + 4 + header.side_info_size
+    if data[tag_offset:tag_offset + 4] in (b"Xing", b"Info"):
+        return True
+    return data[offset + 36:offset + 40] == b"VBRI"
+
+
+def iter_frames(data) -> Iterator[Tuple[int, FrameHeader]]:
+    """
+    Végigmegy a hang frame-eken (ID3v2 / ID3v1 címkék és Xing / Info frame nélkül).
+    Szemét byte-ok esetén a következő érvényes frame-re szinkronizál.
+
+    Yields:
+        Tuple[int, FrameHeader]: (a frame kezdő pozíciója, fejléc)
+    """
+    offset = id3v2_size(data)
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    first = True
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header.size > end:
+            # Újraszinkronizálás a következő lehetséges frame kezdetre
+            next_sync = data.find(b"\xFF", offset + 1, end)
+            if next_sync < 0:
+                break
+            offset = next_sync
+            continue
+
+        if not (first and is_info_frame(data, offset, header)):
+            yield offset, header
+        first = False
+        offset += header.size
+
+
+def audio_frames(data) -> bytes:
+    """Csak a hang frame-ek byte-jai (címkék és Xing / Info frame nélkül)."""
+    return b"".join(bytes(data[offset:offset + header.size]) for offset, header in iter_frames(data))
+
+
+def audio_info(data) -> Dict:
+    """
+    Hossz és formátum a frame fejlécekből (dekódolás és külső eszköz nélkül).
+
+    Returns:
+        Dict: {'duration': s, 'bitrate': átlagos bit/s, 'sample_rate': Hz, 'frame_count': db}
+              (érvénytelen / üres adatnál a hossz 0, a többi None)
+    """
+    frame_count = 0
+    duration = 0.0
+    bits = 0.0
+    sample_rate = None
+    for _, header in iter_frames(data):
+        frame_count += 1
+        duration += header.duration
+        bits += header.bitrate * header.duration
+        sample_rate = sample_rate or header.sample_rate
+
+    return {
+        'duration': round(duration, 3),
+        # VBR esetén időben súlyozott átlag, CBR esetén a névleges bitráta
+        'bitrate': round(bits / duration) if duration else None,
+        'sample_rate': sample_rate,
+        'frame_count': frame_count or None
+    }
+
+
+def validate_mp3(data) -> Optional[str]:
+    """
+    Szigorú ellenőrzés: a címkéken kívül a fájl hézag és szemét nélkül, teljes
+    frame-ekből áll-e (a csonka letöltés az utolsó frame közepén szakad meg).
+
+    Returns:
+        Optional[str]: A hiba leírása, vagy None, ha a fájl ép
+    """
+    if not data:
+        return "üres fájl"
+    offset = id3v2_size(data)
+    end = len(data)
+    if offset > end:
+        return "csonka ID3 címke"
+    if end - offset >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    frames = 0
+    while offset < end:
+        header = parse_frame_header(data, offset)
+        if header is None:
+            return f"érvénytelen frame fejléc ({offset}. byte)"
+        if offset + header.size > end:
+            return f"csonka utolsó frame ({end - offset}/{header.size} byte)"
+        frames += 1
+        offset += header.size
+
+    return None if frames else "nincs MP3 frame"
+
+
+def is_silent_frame(data, offset: int, header: FrameHeader) -> bool:
+    """
+    Csendes-e a frame: a side info szerint egyik granule / csatorna sem tartalmaz
+    kódolt adatot (part2_3_length = 0 mindenhol) - dekódolás nélkül.
+    """
+    start = offset + 4 + (2 if header.protected else 0)
+    size = header.side_info_size
+    side = int.from_bytes(bytes(data[start:start + size]), 'big')
+    total_bits = size * 8
+
+    if header.version == 3:
+        # main_data_begin (9) + private bitek (mono 5 / sztereó 3) + scfsi (csatornánként 4)
+        position = 9 + (5 if header.channels == 1 else 3) + 4 * header.channels
+        granules, granule_bits = 2, 59
+    else:
+        # main_data_begin (8) + private bitek (mono 1 / sztereó 2)
+        position = 8 + (1 if header.channels == 1 else 2)
+        granules, granule_bits = 1, 63
+
+    for _ in range(granules * header.channels):
+        if (side >> (total_bits - position - 12)) & 0xFFF:
+            return False
+        position += granule_bits
+    return True
+
+
+def silent_ratio(data) -> float:
+    """A csendes frame-ek aránya (0-1; üres fájlnál 1)."""
+    total = silent = 0
+    for offset, header in iter_frames(data):
+        total += 1
+        silent += is_silent_frame(data, offset, header)
+    return silent / total if total else 1.0
+
+
+def join_mp3(parts: Iterable[bytes]) -> bytes:
+    """
+    MP3 részek összefűzése frame szinten, újrakódolás nélkül.
+    Az első rész ID3v2 címkéje megmarad, a többi címke és minden Xing / Info frame elmarad
+    (ezek a részek hosszát írnák le, nem az egészét).
+
+    Args:
+        parts: Azonos formátumú MP3 byte sorozatok, lejátszási sorrendben
+
+    Returns:
+        bytes: Az összefűzött MP3
+    """
+    output = bytearray()
+    for i, part in enumerate(parts):
+        if i == 0:
+            output += part[:id3v2_size(part)]
+        output += audio_frames(part)
+    return bytes(output)
+
+
+def split_mp3(data, cut_times: Sequence[float]) -> Optional[List[bytes]]:
+    """
+    MP3 szétvágása frame határokon, újrakódolás nélkül.
+    Minden vágás a megadott időponthoz legközelebbi frame határra esik. A bit
+    tartály miatt egy rész első frame-je hiányos lehet (a dekóder csendet ad) -
+    ezért a vágási pontok a sorok közötti szünetek közepére essenek.
+
+    Args:
+        data: A teljes MP3
+        cut_times: Növekvő vágási időpontok (s)
+
+    Returns:
+        Optional[List[bytes]]: len(cut_times) + 1 rész, vagy None, ha valamelyik rész üres lenne
+    """
+    frames = list(iter_frames(data))
+    if not frames:
+        return None
+
+    # Frame határok időpontjai (a frame hosszak összegzésével)
+    starts = []
+    elapsed = 0.0
+    for _, header in frames:
+        starts.append(elapsed)
+        elapsed += header.duration
+
+    bounds = [0]
+    for cut in cut_times:
+        index = bisect.bisect_left(starts, cut)
+        if index == len(starts) or (index > 0 and cut - starts[index - 1] < starts[index] - cut):
+            index -= 1
+        if index <= bounds[-1]:
+            return None
+        bounds.append(index)
+    bounds.append(len(frames))
+    if bounds[-1] <= bounds[-2]:
+        return None
+
+    parts = []
+    for first, last in zip(bounds, bounds[1:]):
+        begin = frames[first][0]
+        end = frames[last - 1][0] + frames[last - 1][1].size
+        parts.append(bytes(data[begin:end]))
+    return parts
+
+
+def silent_frames(duration: float,
+                  sample_rate: int = MP3_SAMPLE_RATE,
+                  bitrate: int = MP3_BITRATE) -> bytes:
+    """
+    Csendes MPEG-1 Layer III mono frame-ek (nulla side info = nincs hang adat).
+
+    Args:
+        duration: A csend hossza másodpercben (felfelé kerekítve egész frame-re)
+        sample_rate: Mintavételi frekvencia (44100, 48000 vagy 32000)
+        bitrate: Bitráta bit/s-ban (az MPEG-1 Layer III tábla egy értéke)
+
+    Returns:
+        bytes: A frame-ek
+    """
+    rate_index = _SAMPLE_RATES[3].index(sample_rate)
+    bitrate_index = _BITRATES_V1_L3.index(bitrate // 1000)
+    frame_count = max(1, math.ceil(duration * sample_rate / MP3_SAMPLES_PER_FRAME))
+    frames = bytearray()
+
+    # Padding bit váltogatása, hogy az átlagos bitráta pontosan a megadott legyen
+    numerator = 144 * bitrate
+    remainder = 0
+    for _ in range(frame_count):
+        remainder += numerator % sample_rate
+        padding = 0
+        if remainder >= sample_rate:
+            remainder -= sample_rate
+            padding = 1
+
+        size = numerator // sample_rate + padding
+        # FF FB: sync + MPEG-1 + Layer III + nincs CRC; 0xC4: mono, original
+        header = bytes((0xFF, 0xFB, bitrate_index << 4 | rate_index << 2 | padding << 1, 0xC4))
+        frames += header + bytes(size - len(header))
+
+    return bytes(frames)
+
+
+def silent_mp3_frames(duration: float,
+                      seed: bytes = b"",
+                      sample_rate: int = MP3_SAMPLE_RATE,
+                      bitrate: int = MP3_BITRATE) -> bytes:
+    """
+    Determinisztikus, érvényes MP3 byte-ok (csendes MPEG-1 Layer III mono frame-ek).
+
+    Args:
+        duration: A hang hossza másodpercben
+        seed: Az ID3 címkébe írt azonosító (azonos bemenet -> azonos byte-ok)
+        sample_rate: Mintavételi frekvencia
+        bitrate: Bitráta bit/s-ban
+
+    Returns:
+        bytes: ID3v2 címke + MP3 frame-ek
+    """
+    return _id3_tag(seed) + silent_frames(duration, sample_rate, bitrate)
+
+
+def _id3_tag(seed: bytes) -> bytes:
+    """Minimális ID3v2.3 címke egy TXXX kerettel (a kérés ujjlenyomatával)."""
+    if not seed:
+        return b""
+
+    payload = b"\x00" + b"autosound-fake\x00" + seed
+    frame = b"TXXX" + len(payload).to_bytes(4, 'big') + b"\x00\x00" + payload
+    size = len(frame)
+    # Syncsafe méret (7 bites byte-ok)
+    syncsafe = bytes(((size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F))
+    return b"ID3\x03\x00\x00" + syncsafe + frame
@@ -0,0 +1,191 @@
+"""
+Kimeneti formátum modul
+Feladata: A névvel ellátott kimeneti profilok (előnézet, normál, végleges, PCM)
+leképezése az ElevenLabs output_format paraméterére, valamint a formátumhoz tartozó
+kiterjesztés, Accept fejléc, összefűzés és hang metaadat kezelése.
+"""
+
+import struct
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from mp3_utils import audio_info, join_mp3, silent_ratio, split_mp3, validate_mp3
+
+
+# Névvel ellátott profilok -> ElevenLabs output_format
+OUTPUT_PROFILES = {
+    'preview': 'mp3_44100_64',     # Előnézet: fele akkora fájl
+    'standard': 'mp3_44100_128',   # Az API alapértelmezése
+    'final': 'mp3_44100_192',      # Végleges anyag
+    'pcm': 'pcm_24000',            # 16 bites mono PCM további feldolgozáshoz (WAV-ként mentve)
+}
+
+DEFAULT_OUTPUT_FORMAT = OUTPUT_PROFILES['standard']
+
+
+class OutputFormat:
+    """Egy ElevenLabs kimeneti formátum (pl. "mp3_44100_128", "pcm_24000")."""
+
+    __slots__ = ('name', 'codec', 'sample_rate', 'bitrate')
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: ElevenLabs output_format érték
+
+        Raises:
+            ValueError: Nem támogatott formátum esetén
+        """
+        parts = name.split('_')
+        try:
+            codec = parts[0]
+            sample_rate = int(parts[1])
+            bitrate = int(parts[2]) * 1000 if codec == 'mp3' else sample_rate * 16
+        except (IndexError, ValueError):
+            raise ValueError(f"Érvénytelen kimeneti formátum: {name}")
+        if codec not in ('mp3', 'pcm') or (codec == 'mp3' and len(parts) != 3):
+            raise ValueError(f"Nem támogatott kimeneti formátum: {name} (mp3_* vagy pcm_*)")
+
+        self.name = name
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate
+
+    @property
+    def is_default(self) -> bool:
+        """Az API alapértelmezett formátuma-e (a korábbi cache kulcsok ehhez tartoznak)."""
+        return self.name == DEFAULT_OUTPUT_FORMAT
+
+    @property
+    def extension(self) -> str:
+        """A mentett fájl kiterjesztése (a PCM WAV fejlécet kap)."""
+        return 'mp3' if self.codec == 'mp3' else 'wav'
+
+    @property
+    def accept(self) -> str:
+        """A kérés Accept fejléce."""
+        return 'audio/mpeg' if self.codec == 'mp3' else 'audio/pcm'
+
+    def join(self, parts: Iterable[bytes]) -> bytes:
+        """Darabolt sor részeinek összefűzése (MP3: frame szinten, PCM: egyszerű fűzés)."""
+        if self.codec == 'mp3':
+            return join_mp3(parts)
+        return b"".join(parts)
+
+    def split(self, audio: bytes, cut_times: Sequence[float]) -> Optional[List[bytes]]:
+        """
+        Az API-tól kapott (még nem véglegesített) hang szétvágása a megadott időpontokban
+        (MP3: frame határon, PCM: minta határon).
+
+        Returns:
+            Optional[List[bytes]]: len(cut_times) + 1 rész, vagy None, ha valamelyik üres lenne
+        """
+        if self.codec == 'mp3':
+            return split_mp3(audio, cut_times)
+        bounds = [0] + [min(len(audio), round(t * self.sample_rate) * 2) for t in cut_times] + [len(audio)]
+        if any(end <= begin for begin, end in zip(bounds, bounds[1:])):
+            return None
+        return [audio[begin:end] for begin, end in zip(bounds, bounds[1:])]
+
+    def duration(self, audio: bytes) -> float:
+        """Az API-tól kapott (még nem véglegesített) hang hossza másodpercben."""
+        if self.codec == 'mp3':
+            return audio_info(audio)['duration']
+        return len(audio) / 2 / self.sample_rate
+
+    def finalize(self, audio: bytes) -> bytes:
+        """A mentendő byte-ok (a nyers PCM WAV fejlécet kap)."""
+        if self.codec == 'pcm':
+            return pcm_to_wav(audio, self.sample_rate)
+        return audio
+
+    def info(self, data) -> Dict:
+        """Hossz és formátum a mentett byte-okból (mint mp3_utils.audio_info)."""
+        if self.codec == 'mp3':
+            return audio_info(data)
+        return wav_info(data)
+
+    def validate(self, audio: bytes) -> Optional[str]:
+        """
+        Az API-tól kapott (még nem véglegesített) byte-ok ellenőrzése.
+
+        Returns:
+            Optional[str]: A hiba leírása (pl. csonka letöltés), vagy None
+        """
+        if self.codec == 'mp3':
+            return validate_mp3(audio)
+        if not audio:
+            return "üres válasz"
+        return "csonka PCM minta" if len(audio) % 2 else None
+
+    def __repr__(self) -> str:
+        return f"OutputFormat({self.name!r})"
+
+
+def resolve_output_format(spec: Optional[str]) -> OutputFormat:
+    """
+    Profil név vagy nyers ElevenLabs formátum feloldása.
+
+    Args:
+        spec: "preview" / "standard" / "final" / "pcm", vagy pl. "mp3_44100_96";
+              None = az API alapértelmezése
+
+    Raises:
+        ValueError: Ismeretlen profil / formátum esetén
+    """
+    if not spec:
+        return OutputFormat(DEFAULT_OUTPUT_FORMAT)
+    return OutputFormat(OUTPUT_PROFILES.get(spec, spec))
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Nyers little-endian PCM WAV fájllá alakítása (44 byte-os RIFF fejléc)."""
+    byte_rate = sample_rate * channels * sample_width
+    header = struct.pack('<4sI4s4sIHHIIHH4sI',
+                         b'RIFF', 36 + len(pcm), b'WAVE',
+                         b'fmt ', 16, 1, channels, sample_rate, byte_rate,
+                         channels * sample_width, sample_width * 8,
+                         b'data', len(pcm))
+    return header + pcm
+
+
+def validate_file_data(data, extension: str) -> Optional[str]:
+    """
+    Egy mentett hangfájl ellenőrzése a kiterjesztése alapján.
+
+    Returns:
+        Optional[str]: A hiba leírása, vagy None, ha a fájl ép
+    """
+    if extension == 'wav':
+        if len(data) < 44 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+            return "érvénytelen WAV fejléc"
+        declared = struct.unpack('<I', data[40:44])[0]
+        if declared != len(data) - 44:
+            return f"csonka WAV adat ({len(data) - 44}/{declared} byte)"
+        return None if declared else "üres fájl"
+    return validate_mp3(data)
+
+
+def file_silent_ratio(data, extension: str) -> float:
+    """A csend aránya egy mentett fájlban (MP3: üres frame-ek, WAV: csak a csupa nulla adat számít csendnek)."""
+    if extension == 'wav':
+        return 0.0 if any(data[44:]) else 1.0
+    return silent_ratio(data)
+
+
+def wav_info(data) -> Dict:
+    """
+    Egy (pcm_to_wav által írt) WAV fájl hossza és formátuma.
+
+    Returns:
+        Dict: audio_info()-val azonos kulcsok (frame_count = minták száma)
+    """
+    if len(data) < 44 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return {'duration': 0.0, 'bitrate': None, 'sample_rate': None, 'frame_count': None}
+    channels, sample_rate, byte_rate, block_align = struct.unpack('<HIIH', data[22:34])
+    samples = (len(data) - 44) // block_align if block_align else 0
+    return {
+        'duration': round(samples / sample_rate, 3) if sample_rate else 0.0,
+        'bitrate': byte_rate * 8,
+        'sample_rate': sample_rate,
+        'frame_count': samples or None
+    }
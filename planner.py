@@ -0,0 +1,223 @@
+"""
+Előzetes tervező modul (dry-run)
+Feladata: Hang generálása nélkül kiszámolni, mennyi kérést és karaktert fog egy
+batch futás felhasználni (hangonként), mennyi ideig fog tartani, és belefér-e
+a fiók(ok) hátralévő karakter keretébe.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence
+
+import requests
+
+from voice_manager import VoiceManager
+from scheduling import CostModel
+from tts_generator import DEFAULT_BASE_URL, build_voice_settings
+from audio_cache import synthesis_key
+from coalescing import plan_groups
+from key_pool import parse_key_spec, mask_key
+
+
+def estimate_file_seconds(costs: List[float], workers: int, interval: float) -> float:
+    """
+    Egy forgatókönyv becsült generálási ideje.
+
+    Args:
+        costs: Kérésenkénti becsült idő (s)
+        workers: Egyidejű kérések száma
+        interval: Minimális időköz két kérés indítása között (s)
+
+    Returns:
+        float: Becsült idő (s)
+    """
+    if not costs:
+        return 0.0
+    if workers <= 1:
+        # Sorban: kérés + késleltetés a sorok között
+        return sum(costs) + interval * (len(costs) - 1)
+    # Párhuzamosan: a munka / worker, a rate limit és a leghosszabb kérés közül a legnagyobb
+    return max(sum(costs) / workers, interval * (len(costs) - 1) + costs[-1], max(costs))
+
+
+def plan_batch(processor,
+               custom_mappings: Optional[Dict] = None,
+               model: str = "eleven_v3",
+               cost_model: Optional[CostModel] = None) -> Dict:
+    """
+    Végigelemzi a batch összes forgatókönyvét (generálás nélkül).
+
+    A processor beállításait használja: fájl szűrők, shard, sebesség, cache,
+    párhuzamosság, késleltetés, kulcs pool és a rövid sorok összevonása.
+
+    Args:
+        processor: BatchProcessor instance
+        custom_mappings: Egyedi hang párosítások (opcionális)
+        model: ElevenLabs model
+        cost_model: Költségbecslő (alapért.: a processor tanult becslője)
+
+    Returns:
+        Dict: Kérések, számlázott karakterek hangonként, duplikátumok, cache találatok,
+              becsült idő, fájlonkénti bontás
+    """
+    cost_model = cost_model or processor.cost_model
+    voice_settings = build_voice_settings(processor.speed)
+    output_format = None if processor.output_format.is_default else processor.output_format.name
+    voice_names = {voice_id: profile for profile, voice_id in VoiceManager.VOICE_PROFILES.items()}
+
+    # Párhuzamosság és effektív rate limit (kulcs poolnál a kulcsok száma osztja)
+    workers = processor.concurrency.max_limit if processor.concurrency is not None else processor.max_workers
+    keys = processor.key_pool.active_count if processor.key_pool is not None else 1
+    interval = processor.delay / keys
+
+    voice_manager = VoiceManager(custom_mappings)
+    seen = set()
+    by_voice: Dict[str, Dict] = {}
+    files = []
+    totals = {'lines': 0, 'requests': 0, 'characters': 0, 'duplicates': 0, 'cached': 0, 'cached_characters': 0,
+              'coalesced_lines': 0}
+    estimated_seconds = 0.0
+
+    for file_path in processor.iter_script_files():
+        label = processor._shard_key(file_path)
+        entry = {'file': label, 'lines': 0, 'requests': 0, 'characters': 0, 'error': None}
+        files.append(entry)
+
+        try:
+            parser = processor.open_parser(file_path)
+            parser_data = parser.parse()
+            processor.assign_voices(parser, parser_data, voice_manager, custom_mappings)
+            dialogues = [d for d in parser.get_all_dialogues() if processor.owns_line(file_path, d.line_number)]
+        except Exception as e:
+            entry['error'] = str(e)
+            continue
+
+        items = []
+        for dialogue in dialogues:
+            voice_id = voice_manager.get_voice_id(dialogue.character)
+            chars = len(dialogue.text)
+            key = synthesis_key(dialogue.text, voice_id, model, voice_settings, output_format)
+            entry['lines'] += 1
+
+            if key in seen:
+                totals['duplicates'] += 1
+                continue
+            seen.add(key)
+
+            if processor.cache is not None and processor.cache.contains(key):
+                totals['cached'] += 1
+                totals['cached_characters'] += chars
+                continue
+
+            voice = by_voice.setdefault(voice_id, {
+                'voice': voice_names.get(voice_id, voice_id),
+                'characters_in_script': set(),
+                'requests': 0,
+                'characters': 0
+            })
+            voice['characters_in_script'].add(dialogue.character)
+            voice['characters'] += chars
+            entry['characters'] += chars
+            items.append((voice_id, dialogue.text))
+
+        # Kérés egységek: soronként egy, összevonásnál a rövid sorok csoportja egy kérés
+        if processor.coalesce_chars:
+            units = plan_groups(items, processor.coalesce_chars,
+                                processor.coalesce_max_chars, processor.coalesce_max_lines)
+        else:
+            units = [[i] for i in range(len(items))]
+
+        costs = []
+        for unit in units:
+            voice_id = items[unit[0]][0]
+            by_voice[voice_id]['requests'] += 1
+            if len(unit) > 1:
+                totals['coalesced_lines'] += len(unit)
+            costs.append(cost_model.estimate(voice_id, sum(len(items[i][1]) for i in unit)))
+        entry['requests'] = len(units)
+
+        # A feldolgozás LJF sorrendje szerint a költségek csökkenő sorrendben
+        costs.sort(reverse=True)
+        entry['estimated_seconds'] = round(estimate_file_seconds(costs, workers, interval), 2)
+        estimated_seconds += entry['estimated_seconds']
+
+        totals['lines'] += entry['lines']
+        totals['requests'] += entry['requests']
+        totals['characters'] += entry['characters']
+        voice_manager.character_voice_map.clear()
+
+    for voice in by_voice.values():
+        voice['characters_in_script'] = sorted(voice['characters_in_script'])
+
+    return {
+        'files': len(files),
+        'failed_files': sum(1 for f in files if f['error']),
+        **totals,
+        'by_voice': dict(sorted(by_voice.items(), key=lambda item: -item[1]['characters'])),
+        'estimated_seconds': round(estimated_seconds, 2),
+        'output_format': processor.output_format.name,
+        'assumptions': {
+            'workers': workers,
+            'min_interval_seconds': round(interval, 4),
+            'keys': keys,
+            'seconds_per_character': round(cost_model.default, 4)
+        },
+        'file_plans': files
+    }
+
+
+def fetch_subscription(api_key: str, base_url: Optional[str] = None, timeout: float = 10.0) -> Dict:
+    """
+    A fiók előfizetési adatai (GET /v1/user/subscription).
+
+    Returns:
+        Dict: character_count, character_limit, next_character_count_reset_unix, tier, ...
+
+    Raises:
+        requests.exceptions.RequestException: Hálózati vagy HTTP hiba esetén
+    """
+    base_url = (base_url or os.getenv('ELEVENLABS_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+    response = requests.get(f"{base_url}/user/subscription", headers={"xi-api-key": api_key}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def check_quota(plan: Dict, api_keys: Sequence[str], base_url: Optional[str] = None) -> Dict:
+    """
+    Összeveti a terv karakterigényét a kulcsok hátralévő keretével.
+
+    Args:
+        plan: plan_batch() eredménye
+        api_keys: Kulcs megadások ("KULCS" vagy "KULCS:KARAKTER_KERET")
+        base_url: API alap URL
+
+    Returns:
+        Dict: {'required', 'remaining', 'sufficient', 'keys': [...]}
+    """
+    keys = []
+    remaining = 0
+
+    for spec in api_keys:
+        key, local_quota = parse_key_spec(spec)
+        info = {'key': mask_key(key), 'remaining': None, 'error': None}
+        try:
+            subscription = fetch_subscription(key, base_url)
+            info['character_count'] = subscription.get('character_count')
+            info['character_limit'] = subscription.get('character_limit')
+            info['remaining'] = max(0, info['character_limit'] - info['character_count'])
+            info['tier'] = subscription.get('tier')
+        except (requests.exceptions.RequestException, ValueError, TypeError) as e:
+            info['error'] = str(e)
+
+        # A helyi karakter keret (KULCS:N) is korlátoz
+        if local_quota is not None:
+            info['remaining'] = local_quota if info['remaining'] is None else min(info['remaining'], local_quota)
+
+        remaining += info['remaining'] or 0
+        keys.append(info)
+
+    return {
+        'required': plan['characters'],
+        'remaining': remaining,
+        'sufficient': remaining >= plan['characters'],
+        'keys': keys
+    }
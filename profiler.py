@@ -0,0 +1,212 @@
+"""
+Profilozó modul
+Feladata: A feldolgozás szakaszait (betöltés, elemzés, hangválasztás, szintézis, export)
+időzíteni, opcionálisan szakaszonként cProfile-lal mérni és .pstats fájlokba menteni.
+A cProfile szálanként mér: a worker szálakban futó munkát a profiled() burkolja,
+a szálankénti profilok mentéskor szakaszonként egy .pstats fájlba egyesülnek.
+"""
+
+import os
+import time
+import pstats
+import cProfile
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# A feldolgozás szakaszai, a futás sorrendjében
+STAGES = ('load', 'parse', 'voice_assignment', 'synthesis', 'export')
+
+
+class StageProfiler:
+    """
+    Szakasz profilozó.
+    Kikapcsolt állapotban a stage() üres kontextus, így a hívási helyeken
+    nem kell feltételes kód.
+    """
+
+    def __init__(self, enabled: bool = True, use_cprofile: bool = False):
+        """
+        Args:
+            enabled: Mérjen-e egyáltalán
+            use_cprofile: Szakaszonként cProfile futtatása is (lassítja a futást)
+        """
+        self.enabled = enabled
+        self.use_cprofile = enabled and use_cprofile
+        self._lock = threading.Lock()
+        self._totals: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._by_label: Dict[str, Dict[str, float]] = {}
+        # (szakasz, szál) -> profil; a pool szálai egységről egységre ugyanazt folytatják
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str, label: Optional[str] = None):
+        """
+        Időzített szakasz.
+
+        Args:
+            name: Szakasz neve (pl. "parse")
+            label: Opcionális csoport (pl. a forgatókönyv neve) a fájlonkénti bontáshoz
+        """
+        if not self.enabled:
+            yield
+            return
+
+        profile = self._start_profile(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stop_profile(profile)
+            self.record(name, elapsed, label)
+
+    def profiled(self, name: str, fn: Callable) -> Callable:
+        """
+        Worker szálon futó függvény burkolása a szakasz cProfile-jával (időmérés nélkül:
+        a szakasz idejét a hívó méri). cProfile nélkül a függvényt változatlanul adja vissza.
+
+        Args:
+            name: Szakasz neve (pl. "synthesis")
+            fn: A worker szálban futtatandó függvény
+        """
+        if not self.use_cprofile:
+            return fn
+
+        def run(*args, **kwargs):
+            profile = self._start_profile(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._stop_profile(profile)
+        return run
+
+    def record(self, name: str, seconds: float, label: Optional[str] = None):
+        """
+        Egy szakasz kívülről mért ideje (pl. a közös worker poolban futó szintézisé,
+        ahol a szakasz nem egy kontextusban telik).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+            self._calls[name] = self._calls.get(name, 0) + 1
+            if label is not None:
+                stages = self._by_label.setdefault(label, {})
+                stages[name] = stages.get(name, 0.0) + seconds
+
+    def _start_profile(self, name: str) -> Optional[cProfile.Profile]:
+        """Elindítja a szakasz cProfile-ját a hívó szálon (szálanként egyszerre csak egy lehet aktív)."""
+        if not self.use_cprofile or getattr(self._local, 'active', False):
+            return None
+
+        key = (name, threading.get_ident())
+        with self._lock:
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: a profilozás interpreter szintű, egy már aktív profiler ezt a szálat is méri
+            return None
+        self._local.active = True
+        return profile
+
+    def _stop_profile(self, profile: Optional[cProfile.Profile]):
+        if profile is not None:
+            profile.disable()
+            self._local.active = False
+
+    def label_summary(self, label: str) -> Dict[str, float]:
+        """Egy csoport (forgatókönyv) szakaszonkénti ideje másodpercben."""
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self._by_label.get(label, {}).items()}
+
+    def summary(self) -> Dict:
+        """
+        Szakaszonkénti időbontás.
+
+        Returns:
+            Dict: {'total_seconds', 'stages': {név: {'seconds', 'calls', 'share'}}}
+        """
+        with self._lock:
+            total = sum(self._totals.values())
+            ordered = sorted(self._totals, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES))
+            return {
+                'total_seconds': round(total, 4),
+                'stages': {
+                    name: {
+                        'seconds': round(self._totals[name], 4),
+                        'calls': self._calls[name],
+                        'share': round(self._totals[name] / total, 4) if total else 0.0
+                    }
+                    for name in ordered
+                }
+            }
+
+    def dump_stats(self, output_dir: str, suffix: str = "") -> list:
+        """
+        Szakaszonként .pstats fájlba menti a cProfile eredményeket (a szálankénti profilok egyesítve).
+
+        Args:
+            output_dir: Cél mappa
+            suffix: Opcionális fájlnév utótag (pl. shard azonosító)
+
+        Returns:
+            list: A mentett fájlok elérési útjai
+        """
+        with self._lock:
+            profiles = list(self._profiles.items())
+
+        merged: Dict[str, pstats.Stats] = {}
+        for (name, _), profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if name in merged:
+                merged[name].add(profile)
+            else:
+                merged[name] = pstats.Stats(profile)
+        if not merged:
+            return []
+
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        for name, stats in merged.items():
+            path = os.path.join(output_dir, f"{name}{'.' + suffix if suffix else ''}.pstats")
+            stats.dump_stats(path)
+            paths.append(path)
+        return paths
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """Több (pl. shardonkénti) szakasz összesítő egyesítése (az idők összeadódnak)."""
+    seconds: Dict[str, float] = {}
+    calls: Dict[str, int] = {}
+
+    for summary in summaries:
+        for name, stage in (summary or {}).get('stages', {}).items():
+            seconds[name] = seconds.get(name, 0.0) + stage['seconds']
+            calls[name] = calls.get(name, 0) + stage['calls']
+
+    total = sum(seconds.values())
+    ordered = sorted(seconds, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES))
+    return {
+        'total_seconds': round(total, 4),
+        'stages': {
+            name: {
+                'seconds': round(seconds[name], 4),
+                'calls': calls[name],
+                'share': round(seconds[name] / total, 4) if total else 0.0
+            }
+            for name in ordered
+        }
+    }
+
+
+# Közös, kikapcsolt profilozó az alapértelmezett paraméterekhez
+NULL_PROFILER = StageProfiler(enabled=False)
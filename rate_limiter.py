@@ -0,0 +1,64 @@
+"""
+Rate limiter modul
+Feladata: Több szál között megosztva betartatni a minimális időközt
+az API kérések indítása között.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Szálbiztos, időrés-foglalásos rate limiter.
+    Minden acquire() a következő szabad időrést foglalja le, majd
+    (a zár elengedése után) kivárja azt, így a szálak nem blokkolják egymást.
+    """
+
+    def __init__(self, min_interval: float = 0.0):
+        """
+        Args:
+            min_interval: Minimális időköz két kérés indítása között (másodperc)
+        """
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    @property
+    def next_slot(self) -> float:
+        """A következő szabad időrés (time.monotonic() skálán)."""
+        with self._lock:
+            return self._next_slot
+
+    def reserve(self) -> float:
+        """
+        Lefoglalja a következő időrést várakozás nélkül.
+
+        Returns:
+            float: Ennyi másodpercet kell várni a kérés indításáig
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+            return slot - now
+
+    def acquire(self) -> float:
+        """
+        Kivárja a következő szabad időrést.
+
+        Returns:
+            float: A várakozással töltött idő (másodperc)
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Mint az acquire(), de az event loopot nem blokkolja (szálakkal közösen is használható)."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,157 @@
+"""
+Eredmény napló modul
+Feladata: A generálási eredményeket soronként (JSONL) menteni, ahogy elkészülnek,
+és a végén ebből előállítani a JSON/CSV exportokat - a memóriában semmit sem gyűjtve.
+"""
+
+import os
+import csv
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+
+# A dialogues.csv oszlopai (main.py és batch_processor.py közös formátuma)
+CSV_FIELDNAMES = ['scene', 'slide_number', 'character', 'text', 'voice_id', 'file_name', 'success',
+                  'duration', 'bitrate', 'sample_rate', 'frame_count']
+
+
+class ResultsLog:
+    """
+    Hozzáfűzéses JSONL napló.
+    Minden rekord azonnal kiíródik (flush), az fsync kötegelve történik,
+    így egy összeomlás után is teljes lista marad a már legenerált fájlokról.
+    """
+
+    def __init__(self,
+                 path: str,
+                 fsync_every: int = 20,
+                 fsync_interval: float = 1.0,
+                 truncate: bool = True):
+        """
+        Megnyitja a naplót.
+
+        Args:
+            path: A .jsonl fájl elérési útja
+            fsync_every: Ennyi rekordonként fsync
+            fsync_interval: Legfeljebb ennyi másodpercenként fsync
+            truncate: Új futásnál üres naplóval indul (False = hozzáfűzés)
+        """
+        self.path = str(path)
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.count = 0
+
+        self._file = open(self.path, 'w' if truncate else 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record: Dict):
+        """Hozzáfűz egy rekordot a naplóhoz."""
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self.count += 1
+        self._unsynced += 1
+
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        """Lemezre kényszeríti a még nem szinkronizált rekordokat."""
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Szinkronizál és lezárja a naplót."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_results(path: str) -> Iterator[Dict]:
+    """
+    Soronként visszaolvassa a naplót.
+    Egy összeomlás miatt félbeszakadt utolsó sort kihagyja.
+
+    Args:
+        path: A .jsonl fájl elérési útja
+
+    Yields:
+        Dict: A naplózott rekordok sorrendben
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def write_json_array(records: Iterable[Dict], f: TextIO, indent: int = 2, level: int = 0):
+    """
+    JSON tömböt ír rekordonként, a teljes lista felépítése nélkül.
+    A kimenet megegyezik a json.dump(list, indent=indent) formájával.
+    """
+    outer = ' ' * (indent * level)
+    inner = ' ' * (indent * (level + 1))
+    first = True
+
+    for record in records:
+        text = json.dumps(record, ensure_ascii=False, indent=indent)
+        text = text.replace('\n', '\n' + inner)
+        f.write(('[\n' if first else ',\n') + inner + text)
+        first = False
+
+    f.write('[]' if first else '\n' + outer + ']')
+
+
+def export_json(log_path: str, json_path: str):
+    """A naplóból előállítja a dialogues.json fájlt (streamelve)."""
+    with open(json_path, 'w', encoding='utf-8') as f:
+        write_json_array(iter_results(log_path), f)
+
+
+def export_csv(log_path: str, csv_path: str, fieldnames: Optional[List[str]] = None):
+    """A naplóból előállítja a dialogues.csv fájlt (streamelve)."""
+    fieldnames = fieldnames or CSV_FIELDNAMES
+
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+
+        for row in iter_results(log_path):
+            writer.writerow({key: row.get(key, '') for key in fieldnames})
+
+
+def write_json_with_results(head: Dict, results: Iterable[Dict], json_path: str, key: str = 'results'):
+    """
+    Egy összesítő objektumot ír, amelynek `key` mezője streamelt rekord tömb.
+
+    Args:
+        head: Az összesítő többi (kis méretű) mezője
+        results: A rekordok iterátora
+        json_path: Cél fájl
+        key: A tömb mező neve
+    """
+    head_text = json.dumps(head, ensure_ascii=False, indent=2)
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        if head:
+            f.write(head_text[:-2] + ',\n')
+        else:
+            f.write('{\n')
+        f.write(f'  {json.dumps(key)}: ')
+        write_json_array(results, f, indent=2, level=1)
+        f.write('\n}')
@@ -0,0 +1,72 @@
+"""
+Ütemezés modul
+Feladata: A szintézis kérések becsült költségét (szöveghossz és a hang eddig mért
+sebessége alapján) kiszámolni, és a leghosszabb munkákat előre venni (LJF),
+hogy párhuzamos generálásnál egy későn induló hosszú sor ne nyújtsa meg a futást.
+"""
+
+import threading
+from typing import Dict, List, Sequence
+
+# Ütemezési módok: 'fifo' = forgatókönyv sorrend, 'ljf' = leghosszabb munka először
+SCHEDULES = ('fifo', 'ljf')
+
+
+class CostModel:
+    """
+    Hangonkénti költségbecslő.
+    A kérés ideje ~ (karakterek + fix többlet) * másodperc/karakter, ahol a
+    másodperc/karakter hangonként, exponenciális mozgóátlaggal tanul.
+    """
+
+    def __init__(self,
+                 seconds_per_char: float = 0.05,
+                 overhead_chars: int = 20,
+                 alpha: float = 0.2):
+        """
+        Args:
+            seconds_per_char: Kezdeti becslés, amíg egy hangra nincs mérés
+            overhead_chars: A kérésenkénti fix többlet karakterben kifejezve
+            alpha: A mozgóátlag súlya (0-1, nagyobb = gyorsabban követ)
+        """
+        self.default = seconds_per_char
+        self.overhead_chars = overhead_chars
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._by_voice: Dict[str, float] = {}
+
+    def observe(self, voice_id: str, chars: int, seconds: float):
+        """Rögzít egy sikeres kérést."""
+        rate = seconds / (chars + self.overhead_chars)
+        with self._lock:
+            current = self._by_voice.get(voice_id)
+            self._by_voice[voice_id] = rate if current is None else current + self.alpha * (rate - current)
+            # Ismeretlen hangokhoz az összes hang átlaga
+            self.default = sum(self._by_voice.values()) / len(self._by_voice)
+
+    def estimate(self, voice_id: str, chars: int) -> float:
+        """Becsült kérésidő (s)."""
+        with self._lock:
+            rate = self._by_voice.get(voice_id, self.default)
+        return rate * (chars + self.overhead_chars)
+
+    def summary(self) -> Dict[str, float]:
+        """Hangonkénti becsült sebesség (karakter/s)."""
+        with self._lock:
+            return {voice: round(1.0 / rate, 2) for voice, rate in self._by_voice.items() if rate > 0}
+
+
+def submission_order(costs: Sequence[float], schedule: str = 'ljf') -> List[int]:
+    """
+    A kérések indítási sorrendje.
+
+    Args:
+        costs: Soronkénti becsült költség (a forgatókönyv sorrendjében)
+        schedule: 'fifo' vagy 'ljf'
+
+    Returns:
+        List[int]: Indexek az indítás sorrendjében (azonos költségnél a forgatókönyv sorrendje)
+    """
+    if schedule == 'fifo':
+        return list(range(len(costs)))
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
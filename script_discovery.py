@@ -0,0 +1,100 @@
+"""
+Forgatókönyv kereső modul
+Feladata: Mappafákat lustán (os.scandir) bejárni és a feldolgozandó
+forgatókönyv fájlokat azonnal továbbadni, ahogy megtalálja őket.
+"""
+
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Set, Tuple
+
+
+# Alapértelmezetten feldolgozott fájltípusok
+DEFAULT_INCLUDE = ('*.txt', '*.docx')
+
+# Ideiglenes / zárolási fájlok, amelyeket soha nem dolgozunk fel
+# (Word: ~$lesson.docx, LibreOffice: .~lock.lesson.docx#, rejtett és .tmp fájlok)
+TEMP_FILE_PATTERNS = ('~$*', '.~lock.*', '.*', '*.tmp', '*~')
+
+
+def _matches(rel_path: str, name: str, patterns: Sequence[str]) -> bool:
+    """
+    Igaz, ha a bejegyzés illeszkedik valamelyik glob mintára.
+    A '/'-t tartalmazó minták a relatív útvonalra, a többi a névre illeszkedik.
+    """
+    for pattern in patterns:
+        target = rel_path if '/' in pattern else name
+        if fnmatch(target, pattern):
+            return True
+    return False
+
+
+def is_temp_file(name: str) -> bool:
+    """Igaz, ha a fájl ideiglenes vagy zárolási fájl (pl. ~$lesson.docx)."""
+    return any(fnmatch(name, pattern) for pattern in TEMP_FILE_PATTERNS)
+
+
+def iter_script_files(root: str,
+                      include: Optional[Sequence[str]] = None,
+                      exclude: Optional[Sequence[str]] = None,
+                      max_depth: Optional[int] = None) -> Iterator[Path]:
+    """
+    Lustán bejárja a mappafát és visszaadja a forgatókönyv fájlokat.
+
+    Mappánként név szerint rendez, így a sorrend determinisztikus, de nem kell
+    a teljes fát előre felépíteni - az első fájl azonnal feldolgozható.
+    A mappa symlinkeket követi, de minden mappát csak egyszer jár be
+    (egy ősre mutató symlink nem okoz végtelen rekurziót).
+
+    Args:
+        root: A bejárandó gyökér mappa
+        include: Glob minták a feldolgozandó fájlokra (alapért.: *.txt, *.docx)
+        exclude: Glob minták a kihagyandó fájlokra/mappákra (pl. "archive", "drafts/*")
+        max_depth: Maximális mélység (0 = csak a gyökér mappa, None = korlátlan)
+
+    Yields:
+        Path: A talált forgatókönyv fájlok
+    """
+    include = tuple(include or DEFAULT_INCLUDE)
+    exclude = tuple(exclude or ())
+    root = Path(root)
+
+    yield from _walk(root, '', include, exclude, max_depth, 0, set())
+
+
+def _walk(directory: Path,
+          rel_dir: str,
+          include: Sequence[str],
+          exclude: Sequence[str],
+          max_depth: Optional[int],
+          depth: int,
+          visited: Set[Tuple[int, int]]) -> Iterator[Path]:
+    """Egy mappa bejárása (rekurzívan, mélységi sorrendben; visited: a bejárt mappák (st_dev, st_ino) párjai)."""
+    try:
+        stat = directory.stat()
+        identity = (stat.st_dev, stat.st_ino)
+        if identity in visited:
+            return
+        visited.add(identity)
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+
+        if is_temp_file(entry.name) or _matches(rel_path, entry.name, exclude):
+            continue
+
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            continue
+
+        if is_dir:
+            if max_depth is None or depth < max_depth:
+                yield from _walk(Path(entry.path), rel_path, include, exclude, max_depth, depth + 1, visited)
+        elif _matches(rel_path, entry.name, include):
+            yield Path(entry.path)
@@ -7,6 +7,9 @@ szereplőket és párbeszédeket.
 import re
 from typing import List, Dict, Optional
 
+from dialogue_line import DialogueLine
+from profiler import NULL_PROFILER
+
 
 class ScriptParser:
     """
@@ -26,24 +29,44 @@ class ScriptParser:
         self.metadata = {}    # Script metaadatok (cím, szint, stb.)
         self.scenes = []      # Jelenet lista
         
-    def parse(self) -> Dict:
+    def parse(self, profiler=NULL_PROFILER, label: Optional[str] = None) -> Dict:
         """
         Feldolgozza a teljes forgatókönyvet és visszaadja a strukturált adatot.
         
+        Args:
+            profiler: Opcionális StageProfiler a 'load' és 'parse' szakaszokhoz
+            label: Csoport címke a profilozáshoz (pl. a fájl neve)
+        
         Returns:
             Dict: Strukturált adatok (metadata, characters, scenes)
         """
-        with open(self.script_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with profiler.stage('load', label):
+            with open(self.script_path, 'r', encoding='utf-8') as f:
+                content = f.read()
         
-        # Metaadatok kinyerése (első sorok)
-        self._extract_metadata(content)
+        return self.parse_text(content, profiler, label)
+    
+    def parse_text(self, content: str, profiler=NULL_PROFILER, label: Optional[str] = None) -> Dict:
+        """
+        Feldolgoz egy már beolvasott forgatókönyv szöveget (fájl nélkül, pl. beágyazott használatnál).
         
-        # Szereplők kinyerése
-        self._extract_characters(content)
+        Args:
+            content: A forgatókönyv teljes szövege
+            profiler: Opcionális StageProfiler a 'parse' szakaszhoz
+            label: Csoport címke a profilozáshoz
         
-        # Jelenetek és párbeszédek kinyerése
-        self._extract_scenes(content)
+        Returns:
+            Dict: Strukturált adatok (metadata, characters, scenes)
+        """
+        with profiler.stage('parse', label):
+            # Metaadatok kinyerése (első sorok)
+            self._extract_metadata(content)
+            
+            # Szereplők kinyerése
+            self._extract_characters(content)
+            
+            # Jelenetek és párbeszédek kinyerése
+            self._extract_scenes(content)
         
         return {
             'metadata': self.metadata,
@@ -119,6 +142,7 @@ class ScriptParser:
         # Slide-ok keresése (Slide 1, Slide 2, stb.)
         slide_pattern = r'Slide\s+(\d+)\s*\n'
         slides = list(re.finditer(slide_pattern, content))
+        global_line_num = 1
         
         for i, slide_match in enumerate(slides):
             slide_num = slide_match.group(1)
@@ -133,7 +157,12 @@ class ScriptParser:
             slide_content = content[start_pos:end_pos]
             
             # Párbeszédek kinyerése ebből a slide-ból
-            dialogues = self._extract_dialogues(slide_content)
+            dialogues = self._extract_dialogues(slide_content, int(slide_num))
+            
+            # Globális sorszámozás (a fájlnevekhez)
+            for dialogue in dialogues:
+                dialogue.line_number = global_line_num
+                global_line_num += 1
             
             if dialogues:
                 self.scenes.append({
@@ -141,15 +170,16 @@ class ScriptParser:
                     'dialogues': dialogues
                 })
     
-    def _extract_dialogues(self, slide_content: str) -> List[Dict]:
+    def _extract_dialogues(self, slide_content: str, slide_number: int = 0) -> List[DialogueLine]:
         """
         Kinyeri a párbeszédeket egy slide szövegéből.
         
         Args:
             slide_content: Egy slide szövege
+            slide_number: A slide sorszáma
             
         Returns:
-            List[Dict]: Párbeszéd lista (character, text)
+            List[DialogueLine]: Párbeszéd lista (a sorszámot a hívó tölti ki)
         """
         dialogues = []
         
@@ -178,34 +208,16 @@ class ScriptParser:
                 if character.lower() in EXCLUDED_KEYWORDS:
                     continue
                 
-                dialogues.append({
-                    'character': character,
-                    'text': text
-                })
+                dialogues.append(DialogueLine(slide_number, character, text))
         
         return dialogues
     
-    def get_all_dialogues(self) -> List[Dict]:
+    def get_all_dialogues(self) -> List[DialogueLine]:
         """
         Visszaadja az összes párbeszédet sorszámozva és jelenet információval.
+        A rekordok ugyanazok, amelyeket a parser létrehozott (nincs másolás).
         
         Returns:
-            List[Dict]: Teljes párbeszéd lista strukturálva
+            List[DialogueLine]: Teljes párbeszéd lista strukturálva
         """
-        all_dialogues = []
-        global_line_num = 1
-        
-        for scene in self.scenes:
-            slide_num = scene['slide_number']
-            
-            for dialogue in scene['dialogues']:
-                all_dialogues.append({
-                    'scene': f"Slide {slide_num}",
-                    'slide_number': slide_num,
-                    'character': dialogue['character'],
-                    'text': dialogue['text'],
-                    'line_number': global_line_num
-                })
-                global_line_num += 1
-        
-        return all_dialogues
+        return [dialogue for scene in self.scenes for dialogue in scene['dialogues']]
@@ -0,0 +1,690 @@
+"""
+Szolgáltatás mód
+Feladata: Helyi HTTP API forgatókönyvek beküldéséhez, a feladatok állapotának
+lekérdezéséhez és a kimenetek letöltéséhez.
+
+Minden beküldött feladat egy közös worker poolon fut, közös rate limiterrel,
+hang cache-sel, HTTP kapcsolat poollal (és opcionálisan közös AIMD szabályozóval).
+A worker-ek a beküldők között körbeforgó (round-robin) sorrendben választják a
+következő kérést, így az egyidejű felhasználók igazságosan osztoznak egy fiók
+áteresztőképességén, ahelyett hogy saját ciklusaikkal egymást 429-be futtatnák.
+
+Végpontok:
+    POST   /jobs                       forgatókönyv beküldése (JSON: text vagy docx_base64)
+    GET    /jobs                       feladatok listája
+    GET    /jobs/{id}                  állapot (?lines=1: soronkénti eredmények is)
+    DELETE /jobs/{id}                  megszakítás (a még el nem indult sorok kimaradnak)
+    GET    /jobs/{id}/files            a kimeneti fájlok listája
+    GET    /jobs/{id}/files/{út}       egy kimeneti fájl
+    GET    /jobs/{id}/archive          a teljes kimenet zip-ben
+    GET    /status                     a közös pool állapota (sorok, rate limit, cache, telemetria)
+
+Futtatás:
+    python service.py --port 8770 --workers 8 --delay 0.2 --cache-dir audio_cache
+    curl -X POST localhost:8770/jobs -H "X-AutoSound-User: anna" \\
+         -d '{"name": "lesson_12", "text": "..."}'
+"""
+
+import argparse
+import base64
+import binascii
+import io
+import json
+import os
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from dotenv import load_dotenv
+
+from audio_cache import AudioCache
+from audio_export import export_combined_audio
+from batch_processor import BatchProcessor
+from concurrency import AIMDController
+from docx_parser import DocxParser
+from http_transport import TRANSPORTS, create_transport
+from key_pool import build_key_pool, load_api_keys, parse_key_spec
+from rate_limiter import RateLimiter
+from results_log import ResultsLog, export_csv, export_json
+from script_parser import ScriptParser
+from subtitles import write_subtitles
+from telemetry import TelemetryCollector
+from tts_generator import TTSGenerator
+from voice_manager import VoiceManager
+
+
+JOB_STATES = ('queued', 'running', 'done', 'cancelled')
+
+# A beküldött forgatókönyv legnagyobb mérete (byte)
+MAX_SUBMISSION_BYTES = 20 * 1024 * 1024
+
+
+class FairQueue:
+    """
+    Beküldőnkénti sorok körbeforgó kiszolgálással: minden get() a soron következő
+    beküldő legrégebbi elemét adja, így egy nagy beküldés nem éheztet ki egy
+    később érkező kisebbet. Egy beküldőn belül a sorrend FIFO.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owners: 'OrderedDict[str, deque]' = OrderedDict()
+        self._closed = False
+
+    def put(self, owner: str, items: Iterable):
+        """Elemek a beküldő sorának végére (új beküldő a kör végére kerül)."""
+        with self._cond:
+            queue = self._owners.get(owner)
+            if queue is None:
+                queue = self._owners[owner] = deque()
+            queue.extend(items)
+            if not queue:
+                del self._owners[owner]
+            self._cond.notify_all()
+
+    def get(self):
+        """
+        A következő elem (blokkol, amíg nincs).
+
+        Returns:
+            A következő elem, vagy None, ha a sor lezárult
+        """
+        with self._cond:
+            while not self._owners and not self._closed:
+                self._cond.wait()
+            if not self._owners:
+                return None
+            owner, queue = self._owners.popitem(last=False)
+            item = queue.popleft()
+            if queue:
+                # A beküldő a kör végére kerül
+                self._owners[owner] = queue
+            return item
+
+    def remove(self, predicate: Callable) -> int:
+        """A feltételnek megfelelő, még ki nem adott elemek törlése. Visszaadja a számukat."""
+        removed = 0
+        with self._cond:
+            for owner in list(self._owners):
+                queue = self._owners[owner]
+                kept = deque(item for item in queue if not predicate(item))
+                removed += len(queue) - len(kept)
+                if kept:
+                    self._owners[owner] = kept
+                else:
+                    del self._owners[owner]
+        return removed
+
+    def pending(self) -> Dict[str, int]:
+        """Beküldőnként a várakozó elemek száma."""
+        with self._cond:
+            return {owner: len(queue) for owner, queue in self._owners.items()}
+
+    def close(self):
+        """A várakozó get() hívások None-nal térnek vissza (a maradék elemek eldobódnak)."""
+        with self._cond:
+            self._closed = True
+            self._owners.clear()
+            self._cond.notify_all()
+
+
+class Job:
+    """Egy beküldött forgatókönyv és a feldolgozás állapota."""
+
+    __slots__ = ('id', 'name', 'owner', 'state', 'directory', 'dialogues', 'voice_manager',
+                 'generator', 'export_audio', 'subtitles', 'units_left', 'in_flight',
+                 'lines_done', 'lines_failed', 'created_at', 'started_at', 'finished_at',
+                 'finishing', 'outputs', 'error', 'lock')
+
+    def __init__(self, job_id: str, name: str, owner: str, directory: Path):
+        self.id = job_id
+        self.name = name
+        self.owner = owner
+        self.state = 'queued'
+        self.directory = directory
+        self.dialogues = []
+        self.voice_manager = None
+        self.generator: Optional[TTSGenerator] = None
+        self.export_audio = False
+        self.subtitles = False
+        self.units_left = 0
+        self.in_flight = 0
+        self.lines_done = 0
+        self.lines_failed = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # A lezárást (_finish) pontosan egy hívó végzi: a worker vagy a cancel()
+        self.finishing = False
+        self.outputs: Dict = {}
+        self.error = None
+        self.lock = threading.Lock()
+
+    def status(self, lines: bool = False) -> Dict:
+        """Az állapot JSON alakja (lines=True: soronkénti eredmények is)."""
+        with self.lock:
+            status = {
+                'id': self.id,
+                'name': self.name,
+                'owner': self.owner,
+                'state': self.state,
+                'lines': len(self.dialogues),
+                'done': self.lines_done,
+                'failed': self.lines_failed,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'outputs': dict(self.outputs),
+                'error': self.error
+            }
+        if lines:
+            status['results'] = [dialogue.to_dict() for dialogue in self.dialogues]
+        return status
+
+
+class JobService:
+    """
+    A feladatok és a közös erőforrások: worker pool, rate limiter, cache,
+    kapcsolat pool és telemetria. HTTP nélkül, programból is használható.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str],
+                 root: str = "service_output",
+                 workers: int = 4,
+                 delay: float = 0.5,
+                 key_pool=None,
+                 cache_dir: Optional[str] = None,
+                 adaptive: bool = False,
+                 base_url: Optional[str] = None,
+                 speed: float = 0.7,
+                 output_format: Optional[str] = None,
+                 transport: Optional[str] = None,
+                 chunk_chars: Optional[int] = None,
+                 coalesce_chars: Optional[int] = None,
+                 line_gap: float = 0.3,
+                 slide_gap: float = 1.0):
+        """
+        Args:
+            api_key: ElevenLabs API kulcs (key_pool mellett nem kell)
+            root: A feladatok kimeneti mappája (feladatonként egy almappa)
+            workers: A közös pool egyidejű kérései (az összes feladatra együtt)
+            delay: Minimális időköz két kérés indítása között (az összes feladatra együtt)
+            key_pool: Opcionális több kulcsos pool (ilyenkor a kulcsonkénti limiter dönt)
+            cache_dir: Közös hang cache mappa
+            adaptive: Közös AIMD szabályozó (1..workers egyidejű kérés a 429-ek alapján)
+            base_url: API alap URL
+            speed: Beszéd sebessége
+            output_format: Kimeneti profil vagy ElevenLabs output_format
+            transport: 'http1' vagy 'http2'
+            chunk_chars: Hosszú sorok darabolása
+            coalesce_chars: Rövid sorok összevonása
+            line_gap: Csend két sor között az összefűzött sávban (s)
+            slide_gap: Csend két slide között az összefűzött sávban (s)
+        """
+        self.api_key = api_key
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.key_pool = key_pool
+        self.rate_limiter = RateLimiter(delay) if key_pool is None else None
+        self.cache = AudioCache(cache_dir) if cache_dir else None
+        self.concurrency = AIMDController(1, self.workers, verbose=False) if adaptive else None
+        self.telemetry = TelemetryCollector()
+        self.transport = create_transport(transport, self.workers)
+        self.base_url = base_url
+        self.speed = speed
+        self.output_format = output_format
+        self.chunk_chars = chunk_chars
+        self.coalesce_chars = coalesce_chars
+        self.line_gap = line_gap
+        self.slide_gap = slide_gap
+
+        self.queue = FairQueue()
+        self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._work, name=f"service-worker-{i + 1}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self,
+               text: Optional[str] = None,
+               name: str = "script",
+               owner: str = "anonymous",
+               docx: Optional[bytes] = None,
+               voice_mappings: Optional[Dict[str, str]] = None,
+               export_audio: bool = False,
+               subtitles: bool = False) -> Job:
+        """
+        Egy forgatókönyv beküldése. A feldolgozás (parse, hang hozzárendelés) azonnal,
+        a generálás a közös poolon történik.
+
+        Args:
+            text: A forgatókönyv szövege (.txt formátum)
+            name: A forgatókönyv neve
+            owner: A beküldő (a körbeforgó ütemezés egysége)
+            docx: .docx fájl tartalma (text helyett)
+            voice_mappings: Egyedi szereplő -> hangprofil párosítások
+            export_audio: Összefűzött sávok (combined/) a végén
+            subtitles: Szó időzítés és SRT / WebVTT felirat
+
+        Returns:
+            Job: A sorba állított feladat
+
+        Raises:
+            ValueError: Ha a forgatókönyv üres vagy nincs benne párbeszéd
+        """
+        job_id = uuid.uuid4().hex[:12]
+        directory = self.root / job_id / BatchProcessor._safe_dir_name(name or "script")
+        directory.mkdir(parents=True, exist_ok=True)
+        job = Job(job_id, name, owner, directory)
+
+        if docx is not None:
+            docx_path = directory.parent / "source.docx"
+            docx_path.write_bytes(docx)
+            parser = DocxParser(str(docx_path))
+            parser_data = parser.parse()
+        elif text:
+            parser = ScriptParser(name)
+            parser_data = parser.parse_text(text)
+        else:
+            raise ValueError("Üres forgatókönyv (text vagy docx_base64 szükséges)")
+
+        job.dialogues = parser.get_all_dialogues()
+        if not job.dialogues:
+            raise ValueError("Nincs párbeszéd a forgatókönyvben")
+
+        job.voice_manager = VoiceManager()
+        BatchProcessor.assign_voices(parser, parser_data, job.voice_manager, voice_mappings)
+        job.export_audio = export_audio
+        job.subtitles = subtitles
+        job.generator = TTSGenerator(self.api_key, str(directory),
+                                     speed=self.speed,
+                                     telemetry=self.telemetry,
+                                     telemetry_label=job_id,
+                                     base_url=self.base_url,
+                                     concurrency=self.concurrency,
+                                     key_pool=self.key_pool,
+                                     cache=self.cache,
+                                     chunk_chars=self.chunk_chars,
+                                     coalesce_chars=self.coalesce_chars,
+                                     output_format=self.output_format,
+                                     transport=self.transport,
+                                     word_timing=subtitles,
+                                     verbose=False)
+
+        units = job.generator.plan_units(job.dialogues, job.voice_manager)
+        job.units_left = len(units)
+        with self._jobs_lock:
+            self.jobs[job_id] = job
+        enqueued_at = time.monotonic()
+        self.queue.put(owner, ((job, unit, enqueued_at) for unit in units))
+        print(f"📥 Feladat: {job_id} ({name}, {owner}) - {len(job.dialogues)} sor, {len(units)} kérés")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict]:
+        with self._jobs_lock:
+            jobs = list(self.jobs.values())
+        return [job.status() for job in jobs]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Megszakítás: a még el nem indult kérések kimaradnak, a futók befejeződnek.
+
+        Returns:
+            Optional[Job]: A feladat, vagy None, ha nincs ilyen
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        removed = self.queue.remove(lambda item: item[0] is job)
+        with job.lock:
+            if job.state in ('done', 'cancelled') or job.finishing:
+                return job
+            job.units_left -= removed
+            job.state = 'cancelled'
+            finished = job.in_flight == 0
+            job.finishing = finished
+        if finished:
+            self._finish(job)
+        return job
+
+    def _work(self):
+        """Worker: a közös sorból a következő beküldő következő kérés egysége."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            job, unit, enqueued_at = item
+            with job.lock:
+                if job.state == 'cancelled':
+                    continue
+                job.in_flight += 1
+                if job.state == 'queued':
+                    job.state = 'running'
+                    job.started_at = time.time()
+
+            dialogues = [job.dialogues[i] for i in unit]
+            try:
+                job.generator.generate_unit(dialogues, job.voice_manager, enqueued_at, self.rate_limiter)
+            except Exception as e:
+                print(f"❌ Feladat {job.id}: {e}")
+
+            with job.lock:
+                job.in_flight -= 1
+                job.units_left -= 1
+                for dialogue in dialogues:
+                    if dialogue.success:
+                        job.lines_done += 1
+                    else:
+                        job.lines_failed += 1
+                finished = (not job.finishing and job.in_flight == 0
+                            and (job.units_left == 0 or job.state == 'cancelled'))
+                if finished:
+                    job.finishing = True
+            if finished:
+                self._finish(job)
+
+    def _finish(self, job: Job):
+        """Napló, JSON / CSV export és a kért sávok / feliratok a feladat végén."""
+        outputs = {}
+        error = None
+        with job.lock:
+            # Megszakított, egyetlen kész sor nélküli feladatnál nincs mit összefűzni
+            produced = not (job.state == 'cancelled' and job.lines_done == 0)
+        try:
+            log_path = job.directory / "dialogues.jsonl"
+            with ResultsLog(str(log_path)) as results_log:
+                for dialogue in job.dialogues:
+                    if dialogue.file_name is not None:
+                        results_log.append(dialogue.to_dict())
+            export_json(str(log_path), str(job.directory / "dialogues.json"))
+            export_csv(str(log_path), str(job.directory / "dialogues.csv"))
+            with open(job.directory / "voice_mappings.json", 'w', encoding='utf-8') as f:
+                json.dump(job.voice_manager.get_all_mappings(), f, ensure_ascii=False, indent=2)
+            job.generator.save_settings()
+            outputs['dialogues'] = "dialogues.json"
+
+            index_path = None
+            if produced and job.export_audio and job.generator.output_format.codec == 'mp3':
+                combined = export_combined_audio(str(log_path), str(job.directory), job.directory.name,
+                                                 self.line_gap, self.slide_gap)
+                outputs['combined'] = os.path.relpath(combined['script_file'], job.directory)
+                index_path = combined['index_file']
+            if produced and job.subtitles:
+                subtitles = write_subtitles(str(log_path), str(job.directory), job.directory.name,
+                                            self.line_gap, self.slide_gap, index_path)
+                outputs['subtitles'] = {fmt: os.path.relpath(path, job.directory)
+                                        for fmt, path in subtitles['files'].items()}
+        except Exception as e:
+            error = str(e)
+
+        with job.lock:
+            job.outputs = outputs
+            job.error = error
+            if job.state != 'cancelled':
+                job.state = 'done'
+            job.finished_at = time.time()
+        print(f"{'✅' if error is None else '❌'} Feladat: {job.id} ({job.state}) - "
+              f"{job.lines_done} kész, {job.lines_failed} sikertelen")
+
+    def status(self) -> Dict:
+        """A közös pool állapota."""
+        jobs = self.list_jobs()
+        status = {
+            'workers': self.workers,
+            'jobs': {state: sum(1 for job in jobs if job['state'] == state) for state in JOB_STATES},
+            'pending': self.queue.pending(),
+            'rate_limit_interval': self.rate_limiter.min_interval if self.rate_limiter else None,
+            'transport': self.transport.summary(),
+            'telemetry': self.telemetry.summary()
+        }
+        if self.cache is not None:
+            status['cache'] = self.cache.summary()
+        if self.concurrency is not None:
+            status['concurrency'] = self.concurrency.summary()
+        if self.key_pool is not None:
+            status['keys'] = self.key_pool.summary()
+        return status
+
+    def close(self):
+        """A worker-ek leállítása (a futó kérések befejeződnek) és a kapcsolatok lezárása."""
+        self.queue.close()
+        for thread in self._threads:
+            thread.join()
+        self.transport.close()
+
+
+class ServiceServer:
+    """A JobService HTTP felülete (szálas HTTP szerver)."""
+
+    def __init__(self, service: JobService, host: str = "127.0.0.1", port: int = 8770):
+        """
+        Args:
+            service: A feladatokat kezelő JobService
+            host: Figyelő cím
+            port: Port (0 = szabad port választása)
+        """
+        self.service = service
+        handler = type('ServiceHandler', (_ServiceHandler,), {'service': service})
+        self._httpd = ThreadingHTTPServer((host, port), handler)
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ServiceServer':
+        """Háttérszálon elindítja a szervert."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Leállítja a szervert (a JobService-t nem)."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        """Előtérben futtatja a szervert (CLI)."""
+        self._httpd.serve_forever()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """HTTP kérés kezelő (a service osztályattribútum a JobService)."""
+
+    protocol_version = "HTTP/1.1"
+    service: JobService = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8')
+        self._send(status, body, 'application/json; charset=utf-8')
+
+    def _route(self):
+        """(útvonal részek, query) - pl. ['jobs', 'abc123', 'files', ...]."""
+        url = urlparse(self.path)
+        return [part for part in url.path.split('/') if part], parse_qs(url.query)
+
+    def _job(self, job_id: str) -> Optional[Job]:
+        job = self.service.get(job_id)
+        if job is None:
+            self._send_json(404, {'error': f"Nincs ilyen feladat: {job_id}"})
+        return job
+
+    def do_POST(self):
+        parts, _ = self._route()
+        if parts != ['jobs']:
+            self._send_json(404, {'error': 'Not found'})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        if length > MAX_SUBMISSION_BYTES:
+            self._send_json(413, {'error': f"Túl nagy beküldés (max {MAX_SUBMISSION_BYTES} byte)"})
+            return
+        raw = self.rfile.read(length) if length else b""
+        try:
+            payload = json.loads(raw or b"{}")
+            docx = base64.b64decode(payload['docx_base64'], validate=True) if payload.get('docx_base64') else None
+            owner = payload.get('owner') or self.headers.get('X-AutoSound-User') or self.client_address[0]
+            job = self.service.submit(text=payload.get('text'),
+                                      name=payload.get('name') or 'script',
+                                      owner=owner,
+                                      docx=docx,
+                                      voice_mappings=payload.get('voices'),
+                                      export_audio=bool(payload.get('export_audio')),
+                                      subtitles=bool(payload.get('subtitles')))
+        except (ValueError, TypeError, AttributeError, binascii.Error) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': str(e)})
+            return
+
+        status = job.status()
+        status['links'] = {'self': f"/jobs/{job.id}", 'files': f"/jobs/{job.id}/files",
+                           'archive': f"/jobs/{job.id}/archive"}
+        self._send_json(202, status)
+
+    def do_GET(self):
+        parts, query = self._route()
+        if parts == ['status']:
+            self._send_json(200, self.service.status())
+        elif parts == ['jobs']:
+            self._send_json(200, {'jobs': self.service.list_jobs()})
+        elif len(parts) >= 2 and parts[0] == 'jobs':
+            job = self._job(parts[1])
+            if job is None:
+                return
+            if len(parts) == 2:
+                self._send_json(200, job.status(lines=query.get('lines', ['0'])[0] not in ('0', '')))
+            elif parts[2:] == ['files']:
+                self._send_json(200, {'files': [path.relative_to(job.directory).as_posix()
+                                                for path in sorted(job.directory.rglob('*')) if path.is_file()]})
+            elif parts[2] == 'files' and len(parts) > 3:
+                self._send_file(job, "/".join(parts[3:]))
+            elif parts[2:] == ['archive']:
+                self._send_archive(job)
+            else:
+                self._send_json(404, {'error': 'Not found'})
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._send_json(404, {'error': 'Not found'})
+            return
+        job = self.service.cancel(parts[1])
+        if job is None:
+            self._send_json(404, {'error': f"Nincs ilyen feladat: {parts[1]}"})
+            return
+        self._send_json(200, job.status())
+
+    def _send_file(self, job: Job, relative: str):
+        """Egy kimeneti fájl (csak a feladat mappáján belül)."""
+        root = job.directory.resolve()
+        path = (root / relative).resolve()
+        if root not in path.parents or not path.is_file():
+            self._send_json(404, {'error': f"Nincs ilyen fájl: {relative}"})
+            return
+        content_types = {'.mp3': 'audio/mpeg', '.wav': 'audio/wav', '.json': 'application/json',
+                         '.jsonl': 'application/x-ndjson', '.csv': 'text/csv; charset=utf-8',
+                         '.srt': 'application/x-subrip', '.vtt': 'text/vtt; charset=utf-8'}
+        self._send(200, path.read_bytes(), content_types.get(path.suffix.lower(), 'application/octet-stream'))
+
+    def _send_archive(self, job: Job):
+        """A feladat teljes kimenete zip-ben (a hangok tömörítés nélkül)."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for path in sorted(job.directory.rglob('*')):
+                if path.is_file():
+                    compression = zipfile.ZIP_STORED if path.suffix in ('.mp3', '.wav') else zipfile.ZIP_DEFLATED
+                    archive.write(path, path.relative_to(job.directory).as_posix(), compress_type=compression)
+        self._send(200, buffer.getvalue(), 'application/zip',
+                   {'Content-Disposition': f'attachment; filename="{job.directory.name}.zip"'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoSound szolgáltatás mód (helyi HTTP API, közös worker pool)")
+    parser.add_argument('--host', default='127.0.0.1', help="Figyelő cím (alapért.: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8770, help="Port (alapért.: 8770)")
+    parser.add_argument('-o', '--output', default='service_output', metavar='DIR',
+                        help="A feladatok kimeneti mappája (alapért.: service_output)")
+    parser.add_argument('--workers', type=int, default=4, metavar='N',
+                        help="A közös pool egyidejű kérései, az összes felhasználóra együtt (alapért.: 4)")
+    parser.add_argument('--delay', type=float, default=0.5, metavar='SEC',
+                        help="Minimális időköz két kérés indítása között, együtt (alapért.: 0.5)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help="Közös AIMD szabályozás: 429 esetén az egyidejű kérések száma csökken")
+    parser.add_argument('--cache-dir', metavar='DIR', help="Közös hang cache mappa")
+    parser.add_argument('--chunk-chars', type=int, metavar='N', help="Hosszú sorok darabolása")
+    parser.add_argument('--coalesce-chars', type=int, metavar='N', help="Rövid sorok összevonása")
+    parser.add_argument('--output-format', metavar='PROFIL', help="Kimeneti profil vagy ElevenLabs formátum")
+    parser.add_argument('--transport', choices=TRANSPORTS, help="HTTP transport (alapért.: http1)")
+    parser.add_argument('--base-url', help="API alap URL (pl. a helyi fake szerver)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    api_keys = load_api_keys()
+    if not api_keys:
+        print("❌ Hiba: ELEVENLABS_API_KEY nincs beállítva!")
+        return 1
+
+    service = JobService(parse_key_spec(api_keys[0])[0],
+                         root=args.output,
+                         workers=args.workers,
+                         delay=args.delay,
+                         key_pool=build_key_pool(api_keys, args.delay, args.workers),
+                         cache_dir=args.cache_dir,
+                         adaptive=args.adaptive,
+                         base_url=args.base_url,
+                         output_format=args.output_format or os.getenv('ELEVENLABS_OUTPUT_FORMAT'),
+                         transport=args.transport or os.getenv('ELEVENLABS_TRANSPORT'),
+                         chunk_chars=args.chunk_chars,
+                         coalesce_chars=args.coalesce_chars)
+    server = ServiceServer(service, args.host, args.port)
+
+    print(f"🛰️  AutoSound szolgáltatás: {server.url} ({service.workers} worker, "
+          f"{args.delay}s időköz, kimenet: {service.root})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠️  Leállítva")
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""
+Felirat modul
+Feladata: A szintézis közben kapott karakter időzítésből (with-timestamps végpont)
+szó szintű időzítést készíteni, és ebből forgatókönyvenként SRT / WebVTT feliratot
+írni az összefűzött sáv idővonalán. Így nincs szükség utólagos forced alignment
+futtatásra a legenerált hangokon.
+
+Ha egy sorhoz nincs szó időzítés (pl. régi cache bejegyzés), a sor egyetlen
+feliratként jelenik meg a teljes hosszában.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from audio_export import COMBINED_DIR_NAME
+from results_log import iter_results
+
+
+SUBTITLE_FORMATS = ('srt', 'vtt')
+
+# Egy felirat legfeljebb ennyi karakter (két 42 karakteres sor)
+DEFAULT_CUE_CHARS = 84
+
+
+def word_timings(alignment: Dict,
+                 span: Optional[Tuple[int, int]] = None,
+                 offset: float = 0.0) -> Optional[List[List]]:
+    """
+    Szó szintű időzítés a karakter időzítésből.
+
+    Args:
+        alignment: {'characters', 'character_start_times_seconds', 'character_end_times_seconds'}
+        span: Csak ez a [kezdet, vég) karakter tartomány (összevont kérés egy sora)
+        offset: Ennyi másodperc levonása (a sor hangjának kezdete a válaszban)
+
+    Returns:
+        Optional[List[List]]: [szó, kezdet, vég] hármasok másodpercben, vagy None,
+        ha az időzítés hiányos
+    """
+    characters = alignment.get('characters') or []
+    starts = alignment.get('character_start_times_seconds') or []
+    ends = alignment.get('character_end_times_seconds') or []
+    if not characters or not (len(characters) == len(starts) == len(ends)):
+        return None
+
+    first, last = span or (0, len(characters))
+    words = []
+    current: List[str] = []
+    start = end = 0.0
+
+    def flush():
+        if current:
+            words.append(["".join(current), round(max(0.0, start - offset), 3),
+                          round(max(0.0, end - offset), 3)])
+            current.clear()
+
+    for i in range(first, min(last, len(characters))):
+        if characters[i].isspace():
+            flush()
+            continue
+        if not current:
+            start = starts[i]
+        current.append(characters[i])
+        end = ends[i]
+    flush()
+    return words
+
+
+def shift_words(words: Sequence[Sequence], offset: float) -> List[List]:
+    """Szó időzítések eltolása (pl. darabolt sor későbbi darabja)."""
+    return [[word, round(start + offset, 3), round(end + offset, 3)] for word, start, end in words]
+
+
+def line_offsets(records: Iterable[Dict], line_gap: float, slide_gap: float) -> Dict[int, float]:
+    """
+    A sorok kezdete az összefűzött sávban, az AudioExporter szüneteivel számolva
+    (ha a sáv nem készül el, vagy a timing.json nem elérhető).
+
+    Returns:
+        Dict[int, float]: line_number -> kezdet (s)
+    """
+    offsets = {}
+    position = 0.0
+    slide_number = None
+    for record in records:
+        if not record.get('success') or not record.get('duration'):
+            continue
+        if offsets:
+            position += slide_gap if record.get('slide_number') != slide_number else line_gap
+        slide_number = record.get('slide_number')
+        offsets[record['line_number']] = position
+        position += record['duration']
+    return offsets
+
+
+def load_offsets(index_path: str) -> Dict[int, float]:
+    """A sorok kezdete az összefűzött sáv időzítési indexéből (combined/timing.json)."""
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return {line['line_number']: line['script_start'] for line in index.get('lines', [])}
+
+
+def build_cues(records: Iterable[Dict], offsets: Dict[int, float],
+               max_chars: int = DEFAULT_CUE_CHARS) -> List[Dict]:
+    """
+    Feliratok a sorokból: szó időzítésnél mondat- vagy max_chars határon több
+    feliratra bontva, a beszéd tényleges kezdetétől a végéig.
+
+    Args:
+        records: A soronkénti eredmények (dialogues.jsonl rekordjai)
+        offsets: line_number -> a sor kezdete a sávban (s)
+        max_chars: Egy felirat legnagyobb hossza
+
+    Returns:
+        List[Dict]: {'start', 'end', 'character', 'text', 'words'} feliratok időrendben
+    """
+    cues = []
+    for record in records:
+        base = offsets.get(record.get('line_number'))
+        if base is None or not record.get('success'):
+            continue
+
+        words = record.get('words')
+        if not words:
+            cues.append({'start': base, 'end': base + (record.get('duration') or 0.0),
+                         'character': record.get('character'), 'text': record.get('text', '').strip(),
+                         'words': []})
+            continue
+
+        group: List = []
+        for word in words:
+            length = sum(len(w[0]) + 1 for w in group) + len(word[0])
+            if group and length > max_chars:
+                cues.append(_word_cue(record, group, base))
+                group = []
+            group.append(word)
+            # Mondat végén új felirat, ha az eddigi már elég hosszú
+            if word[0][-1] in '.!?' and length > max_chars // 2:
+                cues.append(_word_cue(record, group, base))
+                group = []
+        if group:
+            cues.append(_word_cue(record, group, base))
+
+    cues.sort(key=lambda cue: cue['start'])
+    return cues
+
+
+def _word_cue(record: Dict, words: List, base: float) -> Dict:
+    return {
+        'start': base + words[0][1],
+        'end': base + max(words[-1][2], words[0][1] + 0.001),
+        'character': record.get('character'),
+        'text': " ".join(word[0] for word in words),
+        'words': [[word[0], base + word[1]] for word in words]
+    }
+
+
+def _timestamp(seconds: float, separator: str) -> str:
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def format_srt(cues: Sequence[Dict]) -> str:
+    """SRT felirat (a szereplő neve a szöveg előtt)."""
+    blocks = []
+    for number, cue in enumerate(cues, start=1):
+        text = f"{cue['character']}: {cue['text']}" if cue['character'] else cue['text']
+        blocks.append(f"{number}\n{_timestamp(cue['start'], ',')} --> {_timestamp(cue['end'], ',')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def _vtt_escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def format_vtt(cues: Sequence[Dict]) -> str:
+    """WebVTT felirat: szereplő <v> címkével, szavanként időbélyeggel (karaoke kiemeléshez)."""
+    blocks = ["WEBVTT\n"]
+    for cue in cues:
+        if cue['words']:
+            # Az első szó a felirat kezdetén indul, a többi előtt időbélyeg
+            text = " ".join([_vtt_escape(cue['words'][0][0])] +
+                            [f"<{_timestamp(start, '.')}>{_vtt_escape(word)}" for word, start in cue['words'][1:]])
+        else:
+            text = _vtt_escape(cue['text'])
+        if cue['character']:
+            text = f"<v {_vtt_escape(cue['character'])}>{text}"
+        blocks.append(f"{_timestamp(cue['start'], '.')} --> {_timestamp(cue['end'], '.')}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def write_subtitles(log_path: str,
+                    output_dir: str,
+                    script_name: str,
+                    line_gap: float = 0.3,
+                    slide_gap: float = 1.0,
+                    index_path: Optional[str] = None,
+                    formats: Sequence[str] = SUBTITLE_FORMATS) -> Dict:
+    """
+    A forgatókönyv feliratainak írása a soronkénti naplóból (dialogues.jsonl).
+
+    A feliratok az output_dir/combined/<script_name>.srt / .vtt fájlokba kerülnek,
+    az összefűzött sáv mellé (a lejátszók az azonos nevű feliratot automatikusan betöltik).
+
+    Args:
+        log_path: A dialogues.jsonl elérési útja
+        output_dir: A forgatókönyv output mappája
+        script_name: A fájlnév (kiterjesztés nélkül)
+        line_gap: Csend két sor között (s), ha nincs időzítési index
+        slide_gap: Csend két slide között (s), ha nincs időzítési index
+        index_path: Az összefűzött sáv timing.json indexe (pontos, frame szintű kezdetek)
+        formats: 'srt' és/vagy 'vtt'
+
+    Returns:
+        Dict: A megírt fájlok, a feliratok és a szó időzítés nélküli sorok száma
+    """
+    if index_path and os.path.exists(index_path):
+        offsets = load_offsets(index_path)
+    else:
+        offsets = line_offsets(iter_results(log_path), line_gap, slide_gap)
+
+    cues = build_cues(iter_results(log_path), offsets)
+    target_dir = Path(output_dir) / COMBINED_DIR_NAME
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    for fmt in formats:
+        path = target_dir / f"{script_name}.{fmt}"
+        content = format_srt(cues) if fmt == 'srt' else format_vtt(cues)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        files[fmt] = str(path)
+
+    return {
+        'files': files,
+        'cues': len(cues),
+        'untimed_lines': sum(1 for cue in cues if not cue['words'])
+    }
@@ -0,0 +1,370 @@
+"""
+Telemetria modul
+Feladata: A TTS kérések időzítését (várakozás, első byte, teljes idő), HTTP státuszát,
+méretét és próbálkozásainak számát gyűjteni, és fájlonként / összesítve kiértékelni
+(késleltetés hisztogram, percentilisek, áteresztőképesség, Prometheus export).
+"""
+
+import bisect
+import random
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+# Késleltetés hisztogram felső határai (másodperc) - Prometheus "le" bucketek
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Címkénként ennyi késleltetés minta marad meg a percentilisekhez (felette mintavétel)
+RESERVOIR_SIZE = 2048
+
+
+class RequestMetrics:
+    """Egy szintézis kérés mérési adatai (minden újrapróbálkozással együtt)."""
+
+    __slots__ = ('label', 'file_name', 'voice_id', 'chars', 'queue_wait', 'ttfb',
+                 'total', 'status', 'bytes', 'attempts', 'success', 'started_at', 'finished_at',
+                 'hedges', 'hedge_won', 'chunks', 'lines')
+
+    def __init__(self, label: str, file_name: str, voice_id: str, chars: int):
+        self.label = label
+        self.file_name = file_name
+        self.voice_id = voice_id
+        self.chars = chars
+        self.queue_wait = 0.0     # Ütemezéstől a kérés indításáig (s)
+        self.ttfb = None          # Utolsó próbálkozás: kérés indítása -> válasz fejléc (s)
+        self.total = 0.0          # Kérés indításától az utolsó byte-ig, újrapróbálkozásokkal (s)
+        self.status = None        # Utolsó HTTP státusz (None = hálózati hiba / timeout)
+        self.bytes = 0
+        self.attempts = 0
+        self.success = False
+        self.started_at = 0.0     # time.monotonic()
+        self.finished_at = 0.0
+        self.hedges = 0           # Indított hedge (másodpéldány) kérések
+        self.hedge_won = False    # A hedge válasza nyert
+        self.chunks = 1           # Darabolt sornál a darabok száma (az összesített mérésben)
+        self.lines = 1            # Összevont kérésnél az egy kérésben generált sorok száma
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Lineáris interpolációs percentilis egy rendezett listából."""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def histogram(values: Iterable[float], buckets=LATENCY_BUCKETS) -> Dict[str, int]:
+    """Kumulatív hisztogram (Prometheus szemantika: le = kisebb vagy egyenlő)."""
+    values = list(values)
+    counts = {str(bound): sum(1 for v in values if v <= bound) for bound in buckets}
+    counts['+Inf'] = len(values)
+    return counts
+
+
+def _histogram_percentile(counts: Dict[str, int], pct: float) -> Optional[float]:
+    """Percentilis becslése kumulatív hisztogramból (a bucket felső határa)."""
+    total = counts.get('+Inf', 0)
+    if not total:
+        return None
+
+    target = total * pct / 100.0
+    for bound in LATENCY_BUCKETS:
+        if counts.get(str(bound), 0) >= target:
+            return bound
+    return float('inf')
+
+
+def _round(value: Optional[float], digits: int = 4) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+class _Reservoir:
+    """Korlátos méretű, egyenletes minta (Vitter R algoritmus) a percentilisekhez."""
+
+    __slots__ = ('size', 'seen', 'values', '_rng')
+
+    def __init__(self, size: int = RESERVOIR_SIZE):
+        self.size = size
+        self.seen = 0
+        self.values: List[float] = []
+        # Rögzített mag: azonos futásból azonos becslés
+        self._rng = random.Random(0)
+
+    def add(self, value: float):
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+            return
+        index = self._rng.randrange(self.seen)
+        if index < self.size:
+            self.values[index] = value
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Pontos, amíg a minta nem telt meg; utána a mintából becsült."""
+        return percentile(sorted(self.values), pct)
+
+
+class _Aggregate:
+    """Egy címke futó összesítése: számlálók, hisztogram, összegek és korlátos minták."""
+
+    __slots__ = ('requests', 'succeeded', 'lines', 'attempts', 'retries', 'hedges', 'hedge_wins',
+                 'statuses', 'bytes', 'bytes_all', 'characters', 'latency_sum', 'latency_max',
+                 'buckets', 'ttfb_sum', 'first_start', 'last_finish', 'latencies', 'ttfbs', 'waits')
+
+    def __init__(self):
+        self.requests = 0
+        self.succeeded = 0
+        self.lines = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.statuses: Dict[str, int] = {}
+        self.bytes = 0           # Sikeres kérések byte-jai
+        self.bytes_all = 0       # Minden kérés byte-jai (Prometheus bytes_total)
+        self.characters = 0
+        self.latency_sum = 0.0
+        self.latency_max: Optional[float] = None
+        # Bucketenkénti (nem kumulatív) darabszám, az utolsó elem a +Inf
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.ttfb_sum = 0.0
+        self.first_start: Optional[float] = None
+        self.last_finish: Optional[float] = None
+        self.latencies = _Reservoir()
+        self.ttfbs = _Reservoir()
+        self.waits = _Reservoir()
+
+    def add(self, m: RequestMetrics):
+        self.requests += 1
+        self.attempts += m.attempts
+        self.retries += max(0, m.attempts - 1)
+        self.hedges += m.hedges
+        self.hedge_wins += 1 if m.hedge_won else 0
+        key = str(m.status) if m.status is not None else 'error'
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        self.bytes_all += m.bytes
+        if m.success:
+            self.succeeded += 1
+            self.lines += m.lines
+            self.bytes += m.bytes
+            self.characters += m.chars
+
+        self.latency_sum += m.total
+        self.latency_max = m.total if self.latency_max is None else max(self.latency_max, m.total)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, m.total)] += 1
+        self.latencies.add(m.total)
+        if m.ttfb is not None:
+            self.ttfb_sum += m.ttfb
+            self.ttfbs.add(m.ttfb)
+        self.waits.add(m.queue_wait)
+
+        self.first_start = m.started_at if self.first_start is None else min(self.first_start, m.started_at)
+        self.last_finish = m.finished_at if self.last_finish is None else max(self.last_finish, m.finished_at)
+
+    def histogram(self) -> Dict[str, int]:
+        """Kumulatív hisztogram (Prometheus szemantika: le = kisebb vagy egyenlő)."""
+        counts = {}
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            running += count
+            counts[str(bound)] = running
+        counts['+Inf'] = self.requests
+        return counts
+
+    def summary(self) -> Dict:
+        wall = 0.0
+        if self.requests:
+            wall = self.last_finish - self.first_start
+        latencies = self.latencies
+
+        return {
+            'requests': self.requests,
+            'succeeded': self.succeeded,
+            'failed': self.requests - self.succeeded,
+            'lines': self.lines,
+            'attempts': self.attempts,
+            'retries': self.retries,
+            'hedges': self.hedges,
+            'hedge_wins': self.hedge_wins,
+            'statuses': dict(self.statuses),
+            'bytes': self.bytes,
+            'characters': self.characters,
+            'latency_seconds': {
+                'p50': _round(latencies.percentile(50)),
+                'p95': _round(latencies.percentile(95)),
+                'p99': _round(latencies.percentile(99)),
+                'max': _round(self.latency_max),
+                'sum': _round(self.latency_sum),
+                'histogram': self.histogram()
+            },
+            'ttfb_seconds': {
+                'p50': _round(self.ttfbs.percentile(50)),
+                'p95': _round(self.ttfbs.percentile(95))
+            },
+            'queue_wait_seconds': {
+                'p50': _round(self.waits.percentile(50)),
+                'p95': _round(self.waits.percentile(95))
+            },
+            'throughput': {
+                'wall_seconds': _round(wall),
+                'lines_per_second': _round(self.lines / wall if wall > 0 else None),
+                'characters_per_second': _round(self.characters / wall if wall > 0 else None),
+                'bytes_per_second': _round(self.bytes / wall if wall > 0 else None)
+            },
+            'makespan': {
+                'seconds': _round(wall),
+                'request_seconds_sum': _round(self.latency_sum),
+                # > 1: ennyi kérés futott átlagosan egyszerre
+                'overlap': _round(self.latency_sum / wall if wall > 0 else None)
+            }
+        }
+
+
+class TelemetryCollector:
+    """
+    Szálbiztos gyűjtő a kérések mérési adataihoz.
+    A kéréseket címke (pl. forgatókönyv) szerint, futó összesítésként tartja: a memória
+    a kérések számától független (a percentilisek RESERVOIR_SIZE kérés felett mintából becsültek).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[str, _Aggregate] = {}
+        self._all = _Aggregate()
+
+    def record(self, metrics: RequestMetrics):
+        """Rögzít egy befejezett kérést."""
+        with self._lock:
+            aggregate = self._labels.get(metrics.label)
+            if aggregate is None:
+                aggregate = self._labels[metrics.label] = _Aggregate()
+            aggregate.add(metrics)
+            self._all.add(metrics)
+
+    def labels(self) -> List[str]:
+        with self._lock:
+            return list(self._labels)
+
+    def summary(self, label: Optional[str] = None) -> Dict:
+        """
+        Összesített statisztika egy címkére (vagy az összes kérésre).
+
+        Returns:
+            Dict: Darabszámok, újrapróbálkozások, státuszok, késleltetés
+                  percentilisek és hisztogram, áteresztőképesség
+        """
+        with self._lock:
+            aggregate = self._all if label is None else self._labels.get(label)
+            return (aggregate or _Aggregate()).summary()
+
+    def write_prometheus(self, path: str, prefix: str = 'autosound_tts'):
+        """
+        Kiírja a metrikákat Prometheus text formátumban (node_exporter textfile collectorhoz).
+
+        Args:
+            path: Cél fájl (pl. metrics.prom)
+            prefix: Metrika név előtag
+        """
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Szintézis kérés teljes ideje (újrapróbálkozásokkal).",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            groups = list(self._labels.items())
+
+            for label, aggregate in groups:
+                file_label = _escape_label(label)
+                for bound, count in aggregate.histogram().items():
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{file="{file_label}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{file="{file_label}"}} {aggregate.latency_sum:.6f}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{file="{file_label}"}} {aggregate.requests}')
+
+            counters = [
+                ('requests_total', 'Szintézis kérések száma HTTP státusz szerint.'),
+                ('attempts_total', 'HTTP próbálkozások száma (újrapróbálkozásokkal).'),
+                ('hedges_total', 'Indított hedge (másodpéldány) kérések.'),
+                ('bytes_total', 'Letöltött hang byte-ok.'),
+                ('characters_total', 'Sikeresen szintetizált karakterek.'),
+                ('ttfb_seconds_sum', 'Első byte-ig eltelt idő összege.'),
+            ]
+            for name, help_text in counters:
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} {'counter' if name.endswith('_total') else 'gauge'}")
+
+                for label, aggregate in groups:
+                    file_label = _escape_label(label)
+                    if name == 'requests_total':
+                        for status, count in sorted(aggregate.statuses.items()):
+                            lines.append(f'{prefix}_{name}{{file="{file_label}",status="{status}"}} {count}')
+                        continue
+
+                    if name == 'attempts_total':
+                        value = aggregate.attempts
+                    elif name == 'hedges_total':
+                        value = aggregate.hedges
+                    elif name == 'bytes_total':
+                        value = aggregate.bytes_all
+                    elif name == 'characters_total':
+                        value = aggregate.characters
+                    else:
+                        value = round(aggregate.ttfb_sum, 6)
+                    lines.append(f'{prefix}_{name}{{file="{file_label}"}} {value}')
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def _escape_label(value: str) -> str:
+    """Prometheus címke érték escape-elése."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def merge_summaries(summaries: List[Dict]) -> Dict:
+    """
+    Több (pl. shardonkénti) telemetria összesítő egyesítése.
+    A darabszámok és hisztogramok összeadódnak, a percentiliseket
+    az egyesített hisztogramból becsüljük (bucket felső határ).
+    """
+    summaries = [s for s in summaries if s and s.get('requests')]
+    merged_hist: Dict[str, int] = {}
+    statuses: Dict[str, int] = {}
+
+    for s in summaries:
+        for bound, count in s['latency_seconds']['histogram'].items():
+            merged_hist[bound] = merged_hist.get(bound, 0) + count
+        for status, count in s['statuses'].items():
+            statuses[status] = statuses.get(status, 0) + count
+
+    def total(key):
+        return sum(s[key] for s in summaries)
+
+    return {
+        'requests': total('requests'),
+        'succeeded': total('succeeded'),
+        'failed': total('failed'),
+        'lines': sum(s.get('lines', s['succeeded']) for s in summaries),
+        'attempts': total('attempts'),
+        'retries': total('retries'),
+        'hedges': sum(s.get('hedges', 0) for s in summaries),
+        'hedge_wins': sum(s.get('hedge_wins', 0) for s in summaries),
+        'statuses': statuses,
+        'bytes': total('bytes'),
+        'characters': total('characters'),
+        'latency_seconds': {
+            'p50': _histogram_percentile(merged_hist, 50),
+            'p95': _histogram_percentile(merged_hist, 95),
+            'p99': _histogram_percentile(merged_hist, 99),
+            'max': max((s['latency_seconds']['max'] or 0 for s in summaries), default=None),
+            'sum': _round(sum(s['latency_seconds']['sum'] or 0 for s in summaries)),
+            'histogram': merged_hist,
+            'estimated_from_histogram': True
+        }
+    }
@@ -0,0 +1,103 @@
+"""
+Async generálás megszakítása: a hívó task megszakítása vagy az aiter_generate()
+idő előtti lezárása a futó kéréseket is leállítja, nem marad függő task, a szabályozó
+engedélyei visszajárnak, félbemaradt sor nem kerül a cache-be, és a generátor utána
+is használható (fake ElevenLabs szerverrel).
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+pytest.importorskip('httpx')
+
+from audio_cache import AudioCache
+from concurrency import AIMDController
+from dialogue_line import DialogueLine
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+from tts_generator import TTSGenerator
+from voice_manager import VoiceManager
+
+
+TEXTS = ['Good morning.', 'How can I help?', 'One kilo of apples.', 'Two euros, please.',
+         'Here you are.', 'Have a nice day!']
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeElevenLabsServer(FakeServerConfig(latency='fixed:0.3')) as fake:
+        yield fake
+
+
+@pytest.fixture
+def tts(server, tmp_path):
+    return TTSGenerator('test-key', str(tmp_path / 'out'), base_url=server.base_url,
+                        concurrency=AIMDController(1, 3, initial=3, verbose=False),
+                        cache=AudioCache(str(tmp_path / 'cache')), verbose=False)
+
+
+def _dialogues():
+    return [DialogueLine(1, 'Anna' if i % 2 else 'Bob', text, i + 1) for i, text in enumerate(TEXTS)]
+
+
+def _other_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+def _audio_files(tts):
+    return sorted(name for name in os.listdir(tts.output_dir) if name.endswith('.mp3'))
+
+
+def test_cancel_running_batch(server, tts):
+    dialogues = _dialogues()
+    voice_manager = VoiceManager()
+    requests = server.stats['requests']
+
+    async def run():
+        task = asyncio.ensure_future(tts.generate_batch_async(dialogues, voice_manager, delay=0.0))
+        # Megszakítás, amint az első három kérés a szerverre ért (válasz csak 0.3s múlva)
+        while server.stats['requests'] < requests + 3:
+            await asyncio.sleep(0.005)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert _other_tasks() == []
+        assert tts.concurrency.in_flight == 0
+        assert tts.cache.summary()['stores'] == 0
+        assert _audio_files(tts) == []
+        assert not any(dialogue.success for dialogue in dialogues)
+
+        # A félbemaradt sorok dedup bejegyzései lezárultak: az újrafuttatás nem akad el
+        results = await asyncio.wait_for(tts.generate_batch_async(dialogues, voice_manager, delay=0.0), 10)
+        await tts.aclose()
+        return results
+
+    results = asyncio.run(run())
+    assert all(line.success for line in results)
+    assert tts.cache.summary()['stores'] == len(TEXTS)
+    assert len(_audio_files(tts)) == len(TEXTS)
+
+
+def test_early_close_of_iterator(tts):
+    dialogues = _dialogues()
+
+    async def run():
+        lines = tts.aiter_generate(dialogues, VoiceManager(), delay=0.0, max_concurrency=2)
+        first = await lines.__anext__()
+        await lines.aclose()
+
+        assert _other_tasks() == []
+        assert tts.concurrency.in_flight == 0
+        await tts.aclose()
+        return first
+
+    first = asyncio.run(run())
+    assert first.line_number == 1 and first.success
+    # Az első kettő együtt futott; a helyükre indult kérések a lezáráskor megszakadtak
+    assert not any(dialogue.success for dialogue in dialogues[2:])
+    assert len(_audio_files(tts)) < len(TEXTS)
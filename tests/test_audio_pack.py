@@ -0,0 +1,143 @@
+"""
+audio_pack: írás / visszaolvasás (index, alias, folytatás), megszakadt (lezáratlan
+vagy csonka) csomag visszaolvasása a rekordok végigolvasásával, biztonságos
+kicsomagolás és lezárás élő nézetek mellett.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from audio_pack import AudioPackReader, AudioPackWriter, read_audio, split_location
+
+
+AUDIO = {
+    '01_Anna_001.mp3': b'\xff\xfb' + bytes(range(200)),
+    'sub/02_Bob_002.mp3': b'\xff\xfb' + b'x' * 1000,
+    '02_Anna_003.mp3': b'',
+}
+
+
+def _write(path, audio=AUDIO, close=True):
+    writer = AudioPackWriter(str(path))
+    locations = {name: writer.add(name, data) for name, data in audio.items()}
+    if close:
+        writer.close()
+    return writer, locations
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'audio.pack'
+    _, locations = _write(path)
+
+    with AudioPackReader(str(path)) as reader:
+        assert not reader.recovered
+        assert reader.names() == list(AUDIO)
+        for name, data in AUDIO.items():
+            assert reader.read(name) == data
+            assert bytes(reader.get(name)) == data
+
+    location = locations['sub/02_Bob_002.mp3']
+    assert split_location(location) == (str(path), 'sub/02_Bob_002.mp3')
+    assert read_audio(location) == AUDIO['sub/02_Bob_002.mp3']
+
+
+def test_alias_and_append(tmp_path):
+    path = tmp_path / 'audio.pack'
+    writer, _ = _write(path, close=False)
+    writer.alias('03_Bob_004.mp3', '01_Anna_001.mp3')
+    size_before = writer.size
+    writer.close()
+
+    with AudioPackWriter(str(path), append=True) as writer:
+        writer.add('04_Anna_005.mp3', b'new')
+        # Az alias nem írja újra a hangot
+        assert size_before < writer.size
+
+    with AudioPackReader(str(path)) as reader:
+        assert reader.read('03_Bob_004.mp3') == AUDIO['01_Anna_001.mp3']
+        assert reader.read('04_Anna_005.mp3') == b'new'
+        assert len(reader) == len(AUDIO) + 2
+
+
+def test_unclosed_pack_is_recovered(tmp_path):
+    path = tmp_path / 'audio.pack'
+    writer, _ = _write(path, close=False)
+    writer.alias('03_Bob_004.mp3', '01_Anna_001.mp3')
+    writer._file.close()
+
+    with AudioPackReader(str(path)) as reader:
+        assert reader.recovered
+        assert set(reader.names()) == set(AUDIO) | {'03_Bob_004.mp3'}
+        assert reader.read('sub/02_Bob_002.mp3') == AUDIO['sub/02_Bob_002.mp3']
+
+
+def test_truncated_last_record_is_dropped(tmp_path):
+    path = tmp_path / 'audio.pack'
+    writer, _ = _write(path, close=False)
+    writer._file.close()
+    # Az utolsó nem üres rekord közepén szakad meg az írás
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 30)
+
+    with AudioPackReader(str(path)) as reader:
+        assert reader.recovered
+        assert reader.names() == ['01_Anna_001.mp3']
+        end = reader.data_end
+
+    # Folytatáskor az ép rész után ír tovább
+    with AudioPackWriter(str(path), append=True) as writer:
+        assert writer.size == end
+        writer.add('sub/02_Bob_002.mp3', AUDIO['sub/02_Bob_002.mp3'])
+    with AudioPackReader(str(path)) as reader:
+        assert not reader.recovered
+        assert reader.read('sub/02_Bob_002.mp3') == AUDIO['sub/02_Bob_002.mp3']
+
+
+def test_not_a_pack(tmp_path):
+    empty = tmp_path / 'empty.pack'
+    empty.write_bytes(b'')
+    other = tmp_path / 'other.pack'
+    other.write_bytes(b'ID3' + bytes(100))
+    for path in (empty, other):
+        with pytest.raises(ValueError):
+            AudioPackReader(str(path))
+
+
+def test_extract(tmp_path):
+    path = tmp_path / 'audio.pack'
+    _write(path)
+
+    with AudioPackReader(str(path)) as reader:
+        assert reader.extract(str(tmp_path / 'out')) == len(AUDIO)
+    for name, data in AUDIO.items():
+        assert (tmp_path / 'out' / name).read_bytes() == data
+
+
+@pytest.mark.parametrize('name', ['../evil.mp3', 'sub/../../evil.mp3', '/tmp/evil.mp3', '.'])
+def test_extract_rejects_names_outside_target(tmp_path, name):
+    path = tmp_path / 'audio.pack'
+    _write(path, dict(AUDIO, **{name: b'evil'}))
+
+    with AudioPackReader(str(path)) as reader:
+        with pytest.raises(ValueError):
+            reader.extract(str(tmp_path / 'out'))
+    # Semmi sem íródik ki, a célmappán kívül sem
+    assert not (tmp_path / 'out').exists()
+    assert not (tmp_path / 'evil.mp3').exists()
+
+
+def test_close_with_live_views(tmp_path):
+    path = tmp_path / 'audio.pack'
+    _write(path)
+
+    reader = AudioPackReader(str(path))
+    view = reader.get('sub/02_Bob_002.mp3')
+    reader.close()
+    # A nézet a lezárás után is olvasható, a leképezés az elengedésével szűnik meg
+    assert bytes(view) == AUDIO['sub/02_Bob_002.mp3']
+    view.release()
+    reader.close()
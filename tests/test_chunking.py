@@ -0,0 +1,47 @@
+"""
+chunking.split_text: a darabok együtt pontosan a bemenetet adják vissza
+(szóköz normalizálás után), és egyik sem hosszabb max_chars-nál.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from chunking import split_text
+
+
+TEXTS = [
+    'She said "Stop right there." Then he left the room quietly. (It was late.) Everyone slept.',
+    "He asked: \"Why?\") Nobody knew. 'Fine.' Then – after a long pause – he went home.",
+    "Wait… Really?! “Yes,” she said. ‘Okay.’ [Laughs.] Good night.",
+    "One, two; three: four — five, six, seven, eight, nine, ten, eleven, twelve, thirteen.",
+    "Averyveryveryverylongwordwithoutanyspaces and then some words.   Extra   spaces.\nNew line.",
+]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+@pytest.mark.parametrize('text', TEXTS)
+@pytest.mark.parametrize('max_chars', [12, 20, 30, 60, 1000])
+def test_round_trip(text, max_chars):
+    chunks = split_text(text, max_chars)
+    assert _normalize(" ".join(chunks)) == _normalize(text)
+    assert all(chunk == chunk.strip() and chunk for chunk in chunks)
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_chunks_fit(text):
+    for chunk in split_text(text, 30):
+        # Szóközt nem tartalmazó, túl hosszú szó egyben marad
+        assert len(chunk) <= 30 or " " not in chunk
+
+
+def test_closing_quotes_stay_with_sentence():
+    chunks = split_text(TEXTS[0], 30)
+    assert chunks == ['She said "Stop right there."', 'Then he left the room quietly.',
+                      '(It was late.) Everyone slept.']
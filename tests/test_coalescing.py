@@ -0,0 +1,121 @@
+"""
+coalescing: a rövid sorok csoportosítása (hangonként, sorrendben, a kereteken belül),
+az összevont szöveg tartományai és a karakter időzítés alapú vágási pontok;
+végül egy összevont futás a fake szerverrel (kevesebb kérés, soronként ép hang).
+"""
+
+import os
+import sys
+import json
+import base64
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from coalescing import SEPARATOR, cut_times, decode_timestamped, join_texts, plan_groups
+from dialogue_line import DialogueLine
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+from output_formats import validate_file_data
+from tts_generator import TTSGenerator
+from voice_manager import VoiceManager
+
+
+def _alignment(text, step=0.1):
+    return {
+        'characters': list(text),
+        'character_start_times_seconds': [i * step for i in range(len(text))],
+        'character_end_times_seconds': [(i + 1) * step for i in range(len(text))]
+    }
+
+
+def test_groups_follow_voice_order():
+    items = [('a', 'Yes.'), ('b', 'No.'), ('a', 'Thanks!'), ('b', 'Okay.'), ('a', 'Bye.')]
+    assert plan_groups(items, short_chars=10) == [[0, 2, 4], [1, 3]]
+
+
+def test_long_line_closes_group():
+    items = [('a', 'Yes.'), ('a', 'Thanks!'), ('a', 'This line is far too long to coalesce.'), ('a', 'Bye.'),
+             ('a', 'Sure.')]
+    assert plan_groups(items, short_chars=10) == [[0, 1], [2], [3, 4]]
+
+
+def test_limits_and_single_lines():
+    items = [('a', 'One.'), ('a', 'Two.'), ('a', 'Three.'), ('a', 'Four.'), ('a', 'Five.')]
+    # Legfeljebb 2 sor csoportonként; a maradék egy sor nem csoport
+    assert plan_groups(items, short_chars=10, max_lines=2) == [[0, 1], [2, 3], [4]]
+    # "One. Two." = 9 karakter fér bele, a harmadik már nem
+    assert plan_groups(items[:3], short_chars=10, max_chars=9) == [[0, 1], [2]]
+
+
+def test_duplicates_and_skip_stay_alone():
+    items = [('a', 'Yes.'), ('a', 'Yes.'), ('a', 'No.'), ('a', 'Maybe.'), ('b', 'Yes.')]
+    assert plan_groups(items, short_chars=10, skip={2}) == [[0, 3], [1], [2], [4]]
+
+
+@pytest.mark.parametrize('items', [
+    [('a', 'Yes.'), ('b', 'No, thank you very much.'), ('a', 'Hi.'), ('a', 'Yes.'), ('c', 'Ok.')],
+    [('v%d' % (i % 3), 'Line %d.' % (i % 5)) for i in range(40)],
+])
+def test_every_line_planned_once(items):
+    units = plan_groups(items, short_chars=12, max_chars=30, max_lines=4)
+    assert sorted(i for unit in units for i in unit) == list(range(len(items)))
+    for unit in units:
+        assert len({items[i][0] for i in unit}) == 1
+        assert unit == sorted(unit) and len(unit) <= 4
+        if len(unit) > 1:
+            assert len(join_texts([items[i][1] for i in unit])[0]) <= 30
+
+
+def test_join_texts_spans():
+    texts = [' Yes. ', 'No.', 'Thanks!']
+    text, spans = join_texts(texts)
+    assert text == SEPARATOR.join(['Yes.', 'No.', 'Thanks!'])
+    assert [text[start:end] for start, end in spans] == ['Yes.', 'No.', 'Thanks!']
+
+
+def test_cut_times_midpoint_of_pause():
+    text, spans = join_texts(['Yes.', 'No.'])
+    # "Yes." vége 0.4s, "No." kezdete 0.5s (a szóköz 0.4-0.5)
+    assert cut_times(_alignment(text), spans, len(text)) == pytest.approx([0.45])
+
+
+def test_cut_times_rejects_mismatched_alignment():
+    text, spans = join_texts(['Yes.', 'No.', 'Bye.'])
+    assert cut_times(_alignment(text[:-1]), spans, len(text)) is None
+
+    alignment = _alignment(text)
+    # Nem növekvő vágási pontok: az időzítés nem illeszthető
+    alignment['character_start_times_seconds'][spans[2][0]] = 0.0
+    alignment['character_end_times_seconds'][spans[1][1] - 1] = 0.0
+    assert cut_times(alignment, spans, len(text)) is None
+
+
+def test_decode_timestamped():
+    body = json.dumps({'audio_base64': base64.b64encode(b'abc').decode(), 'alignment': _alignment('Hi')})
+    audio, alignment, problem = decode_timestamped(body.encode())
+    assert (audio, alignment['characters'], problem) == (b'abc', ['H', 'i'], None)
+
+    for body in (b'not json', b'{"audio_base64": "***"}', json.dumps({'audio_base64': 'YWJj'}).encode()):
+        audio, alignment, problem = decode_timestamped(body)
+        assert audio is None and alignment is None and problem
+
+
+def test_coalesced_generation(tmp_path):
+    texts = ['Yes.', 'Thanks!', 'Of course, here is the long answer you asked for.', 'Bye.', 'See you.']
+    dialogues = [DialogueLine(1, 'Anna', text, number) for number, text in enumerate(texts, 1)]
+
+    with FakeElevenLabsServer(FakeServerConfig(latency='fixed:0.0')) as server:
+        tts = TTSGenerator('test-key', str(tmp_path), base_url=server.base_url,
+                           coalesce_chars=12, verbose=False)
+        results = list(tts.iter_generate(dialogues, VoiceManager(), delay=0.0))
+        requests = server.stats['requests']
+
+    # [1, 2] és [4, 5] egy-egy kérés, a hosszú sor külön
+    assert requests == 3
+    assert (tts.coalesced_requests, tts.coalesced_lines) == (2, 4)
+    assert [line.line_number for line in results] == [1, 2, 3, 4, 5]
+    for line in results:
+        assert line.success and line.duration > 0
+        with open(line.file_path, 'rb') as f:
+            assert validate_file_data(f.read(), 'mp3') is None
@@ -0,0 +1,115 @@
+"""
+JobService: a megszakítás és az utolsó kérés egység befejeződése versenyében
+a feladat lezárása (_finish) pontosan egyszer fut le (fake ElevenLabs szerverrel).
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+from service import JobService
+from tts_generator import TTSGenerator
+
+
+SCRIPT = """1 Teszt
+1.1 – Service
+Level: A1
+Characters:
+• Anna – customer
+• Bob – shop assistant
+
+Slide 1
+Scene: A shop.
+Dialogue:
+Anna: Good morning.
+Bob: Good morning! How can I help?
+Anna: One kilo of apples, please.
+Bob: That's two euros, please.
+"""
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeElevenLabsServer(FakeServerConfig(latency='uniform:0.0:0.01')) as fake:
+        yield fake
+
+
+@pytest.fixture
+def service(server, tmp_path):
+    service = JobService('test-key', root=str(tmp_path), workers=2, delay=0.0, base_url=server.base_url)
+    finishes = Counter()
+    finish = service._finish
+
+    def counting_finish(job):
+        finishes[job.id] += 1
+        finish(job)
+
+    service._finish = counting_finish
+    service.finishes = finishes
+    yield service
+    service.close()
+
+
+def _wait_finished(job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while job.status()['finished_at'] is None:
+        assert time.monotonic() < deadline, "a feladat nem zárult le"
+        time.sleep(0.005)
+    # Egy esetleges második lezárásnak is legyen ideje lefutni
+    time.sleep(0.05)
+
+
+def test_job_finishes_once(service):
+    job = service.submit(SCRIPT, name='plain')
+    _wait_finished(job)
+
+    assert job.state == 'done' and job.lines_done == 4
+    assert service.finishes[job.id] == 1
+    assert service.cancel(job.id).state == 'done'
+    assert service.finishes[job.id] == 1
+
+
+def test_cancel_while_last_unit_runs(service, monkeypatch):
+    started = threading.Event()
+    proceed = threading.Event()
+    generate_unit = TTSGenerator.generate_unit
+
+    def blocking_unit(self, *args, **kwargs):
+        started.set()
+        proceed.wait(5)
+        return generate_unit(self, *args, **kwargs)
+
+    monkeypatch.setattr(TTSGenerator, 'generate_unit', blocking_unit)
+    job = service.submit(SCRIPT, name='blocked')
+    assert started.wait(5)
+
+    # A futó egységek miatt a cancel() még nem zárhat le; az utolsó befejeződő worker igen
+    service.cancel(job.id)
+    assert service.finishes[job.id] == 0
+    proceed.set()
+    _wait_finished(job)
+
+    assert job.state == 'cancelled'
+    assert service.finishes[job.id] == 1
+    assert job.in_flight == 0
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_cancel_race(service, seed):
+    rng = random.Random(seed)
+    job = service.submit(SCRIPT, name=f'race{seed}')
+    time.sleep(rng.uniform(0.0, 0.03))
+    service.cancel(job.id)
+    _wait_finished(job)
+
+    assert service.finishes[job.id] == 1
+    assert job.state in ('done', 'cancelled')
+    assert job.lines_done + job.lines_failed <= 4
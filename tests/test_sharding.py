@@ -0,0 +1,119 @@
+"""
+Shardolás: a shard hozzárendelés stabil és teljes partíció (minden fájl / sor pontosan
+egy shardhoz tartozik), a shardonkénti futások összefésülése pedig minden sort
+pontosan egyszer, sorszám szerint ad vissza (fake ElevenLabs szerverrel).
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from batch_processor import BatchProcessor, merge_shard_summaries, parse_shard_spec, stable_shard
+from fake_elevenlabs import FakeElevenLabsServer, FakeServerConfig
+
+
+SCRIPT = """1 Teszt
+1.{number} – Sharding
+Level: A1
+Characters:
+• Anna – customer
+• Bob – shop assistant
+
+Slide 1
+Scene: A shop.
+Dialogue:
+Anna: Good morning, script {number}.
+Bob: Good morning! How can I help?
+Anna: One kilo of apples, please.
+
+Slide 2
+Scene: The counter.
+Dialogue:
+Bob: That's two euros, please.
+Anna: Here you are.
+Bob: Thank you, have a nice day!
+"""
+
+
+@pytest.fixture(scope='module')
+def server():
+    with FakeElevenLabsServer(FakeServerConfig(latency='fixed:0.0')) as fake:
+        yield fake
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    directory = tmp_path / 'in'
+    directory.mkdir()
+    for number in range(1, 4):
+        (directory / f'script_{number:03d}.txt').write_text(SCRIPT.format(number=number), encoding='utf-8')
+    return directory
+
+
+def _processor(input_dir, output_dir, base_url, index, count, shard_by):
+    return BatchProcessor(str(input_dir), str(output_dir), api_key='test-key', shard_index=index,
+                          shard_count=count, shard_by=shard_by, base_url=base_url, max_workers=2, delay=0.0)
+
+
+def test_parse_shard_spec():
+    assert parse_shard_spec('1/4') == (0, 4)
+    assert parse_shard_spec(' 4 / 4 ') == (3, 4)
+    for spec in ('0/4', '5/4', '1/0', '2', 'a/b', ''):
+        with pytest.raises(ValueError):
+            parse_shard_spec(spec)
+
+
+def test_stable_shard_is_fixed():
+    # SHA-1 alapú: gépenként és futásonként ugyanaz (a beépített hash() nem az); ha ez
+    # megváltozik, a már elindított shardolt futások más felosztást kapnának
+    assert [stable_shard(f'scripts/{i:03d}.docx', 4) for i in range(8)] == [2, 0, 0, 0, 3, 1, 3, 0]
+    assert stable_shard('01_At_the_Market.docx#12', 16) == 15
+    assert stable_shard('a/b.txt', 1) == 0
+    assert all(0 <= stable_shard(f'key{i}', 7) < 7 for i in range(200))
+
+
+@pytest.mark.parametrize('shard_by', ['file', 'line'])
+@pytest.mark.parametrize('count', [1, 2, 3, 5])
+def test_shards_partition_the_work(tmp_path, shard_by, count):
+    files = [Path(tmp_path, 'in', f'sub{i % 3}', f'script_{i:03d}.txt') for i in range(40)]
+    processors = [_processor(tmp_path / 'in', tmp_path / 'out', None, index, count, shard_by)
+                  for index in range(count)]
+
+    for file_path in files:
+        for line_number in range(1, 6):
+            owners = [p for p in processors
+                      if p.owns_file(file_path) and p.owns_line(file_path, line_number)]
+            assert len(owners) == 1
+
+
+def test_line_shards_merge(server, input_dir, tmp_path):
+    output_dir = tmp_path / 'out'
+    for index in range(2):
+        result = _processor(input_dir, output_dir, server.base_url, index, 2, 'line').process_all(confirm=False)
+        assert result['success'] and result['failed'] == 0
+
+    merged = merge_shard_summaries(str(output_dir))
+
+    assert merged['shards'] == {'count': 2, 'by': 'line', 'merged': [1, 2], 'missing': []}
+    assert merged['total_files'] == 3 and merged['processed_files'] == 3
+    for result in merged['results']:
+        assert result['dialogues_count'] == result['generated_count'] == 6
+        with open(Path(result['output_dir']) / 'dialogues.json', encoding='utf-8') as f:
+            dialogues = json.load(f)
+        # Minden sor pontosan egyszer, sorszám szerint
+        assert [d['line_number'] for d in dialogues] == list(range(1, 7))
+        assert all(d['success'] for d in dialogues)
+
+
+def test_merge_reports_missing_shard(server, input_dir, tmp_path):
+    output_dir = tmp_path / 'out'
+    _processor(input_dir, output_dir, server.base_url, 0, 3, 'file').process_all(confirm=False)
+
+    merged = merge_shard_summaries(str(output_dir))
+
+    assert merged['shards']['missing'] == [2, 3]
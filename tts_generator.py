@@ -4,10 +4,98 @@ Feladata: ElevenLabs API-val hangfájlokat generálni.
 """
 
 import os
+import asyncio
+import hashlib
+import json
+import queue
+import shutil
 import requests
-from typing import Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 import time
 
+from dialogue_line import DialogueLine
+from telemetry import TelemetryCollector, RequestMetrics
+from rate_limiter import RateLimiter
+from concurrency import AIMDController, ASYNC_POLL_INTERVAL
+from hedging import HedgePolicy
+from scheduling import CostModel, submission_order
+from key_pool import KeyPool, NoKeysAvailable
+from audio_cache import AudioCache, synthesis_key
+from chunking import split_text
+from coalescing import cut_times, decode_timestamped, join_texts, plan_groups
+from output_formats import OutputFormat, resolve_output_format, validate_file_data
+from audio_pack import AudioPackWriter, split_location
+from subtitles import shift_words, word_timings
+from http_transport import TransportError, create_async_transport, create_transport
+from profiler import NULL_PROFILER, StageProfiler
+
+# Párhuzamos generálásnál a soronkénti kiírások ne keveredjenek
+_print_lock = threading.Lock()
+
+
+# Az ElevenLabs API alap URL-je (ELEVENLABS_BASE_URL-lel vagy base_url-lel felülírható,
+# pl. a helyi fake_elevenlabs.py szerverre)
+DEFAULT_BASE_URL = "https://api.elevenlabs.io/v1"
+
+# Újrapróbálható HTTP státuszok (rate limit és átmeneti szerverhibák)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Az output mappába mentett szintézis beállítások (verify.py --repair ezekkel generál újra)
+SETTINGS_FILE_NAME = "synthesis_settings.json"
+
+
+def build_voice_settings(speed: float) -> Dict:
+    """A kérés hang beállításai (a cache kulcsnak is része)."""
+    # TTS beállítások - MAXIMÁLIS PONTOSSÁG OKTATÁSHOZ 🎓
+    return {
+        "stability": 1.0,            # MAXIMUM = 100% szó szerinti, NULLA improvizáció (0-1)
+        "similarity_boost": 0.25,    # MINIMUM = Teljesen robotikus, pontos szövegkövetés (0-1)
+        "style": 0.0,                # 0 = NULLA stílus, csak a szöveg (0-1)
+        "use_speaker_boost": True,   # Beszélő hangerő optimalizálás
+        "speed": speed               # Beszéd sebessége (0.25-4.0, alapért: 0.7)
+    }
+
+
+def load_settings(directory: str) -> Dict:
+    """Egy output mappa mentett szintézis beállításai (üres dict, ha nincs vagy olvashatatlan)."""
+    try:
+        with open(os.path.join(directory, SETTINGS_FILE_NAME), encoding='utf-8') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return settings if isinstance(settings, dict) else {}
+
+
+class _DedupEntry:
+    """Egy futáson belüli (folyamatban lévő vagy kész) kérés."""
+    
+    __slots__ = ('done', 'path', 'info')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.path = None          # A sikeresen legenerált fájl
+        self.info = None          # A fájl hossza / formátuma (audio_info)
+
+
+class _Attempt:
+    """Egy HTTP próbálkozás kimenete."""
+    
+    __slots__ = ('status', 'audio', 'retry_after', 'error_text', 'ttfb', 'elapsed', 'rotate', 'invalid',
+                 'alignment')
+    
+    def __init__(self):
+        self.status = None        # HTTP státusz (None = hálózati hiba / timeout)
+        self.audio = None         # Sikeres válasz byte-jai
+        self.retry_after = None   # Retry-After fejléc
+        self.error_text = None    # Nem újrapróbálható hiba válasz szövege
+        self.ttfb = None
+        self.elapsed = 0.0
+        self.rotate = False       # Kulcs poolnál: a kulcs kiesett, másik kulccsal azonnal újra
+        self.invalid = None       # 200-as, de sérült (pl. csonka) válasz leírása - újrapróbálható
+        self.alignment = None     # with-timestamps kérésnél a karakter időzítés
+
 
 class TTSGenerator:
     """
@@ -15,26 +103,164 @@ class TTSGenerator:
     MP3 fájlokat generál a párbeszédekből.
     """
     
-    def __init__(self, api_key: str, output_dir: str = "output"):
+    def __init__(self,
+                 api_key: str,
+                 output_dir: str = "output",
+                 speed: float = 0.7,
+                 max_retries: int = 2,
+                 retry_backoff: float = 1.0,
+                 telemetry: Optional[TelemetryCollector] = None,
+                 telemetry_label: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 max_workers: int = 1,
+                 concurrency: Optional[AIMDController] = None,
+                 hedge: Optional[HedgePolicy] = None,
+                 schedule: str = 'fifo',
+                 cost_model: Optional[CostModel] = None,
+                 key_pool: Optional[KeyPool] = None,
+                 cache: Optional[AudioCache] = None,
+                 chunk_chars: Optional[int] = None,
+                 chunk_workers: int = 4,
+                 output_format: Optional[str] = None,
+                 pack: Optional[AudioPackWriter] = None,
+                 pack_prefix: str = "",
+                 transport=None,
+                 coalesce_chars: Optional[int] = None,
+                 coalesce_max_chars: int = 400,
+                 coalesce_max_lines: int = 8,
+                 word_timing: bool = False,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 async_transport=None,
+                 profiler: StageProfiler = NULL_PROFILER,
+                 verbose: bool = True):
         """
         Inicializálja a TTS generátort.
         
         Args:
             api_key: ElevenLabs API kulcs
             output_dir: Kimenet mappa neve
+            speed: Beszéd sebessége (0.25-4.0)
+            max_retries: Újrapróbálkozások száma 429 / 5xx / timeout esetén
+            retry_backoff: Alap várakozás újrapróbálkozás előtt (exponenciálisan nő,
+                           a Retry-After fejléc felülírja)
+            telemetry: Opcionális gyűjtő a kérések mérési adataihoz
+            telemetry_label: Csoportosító címke a telemetriában (alapért.: output_dir)
+            base_url: API alap URL (alapért.: ELEVENLABS_BASE_URL vagy az éles API)
+            max_workers: Egyidejű szintézis kérések száma (1 = sorban, egymás után)
+            concurrency: Opcionális AIMD szabályozó; ilyenkor az egyidejű kérések számát
+                         ez hangolja (legfeljebb concurrency.max_limit)
+            hedge: Opcionális hedge szabály a lassú kérések megduplázásához
+            schedule: Párhuzamos módban a kérések indítási sorrendje: 'fifo' (forgatókönyv
+                      sorrend) vagy 'ljf' (a leghosszabb becsült munka először)
+            cost_model: Költségbecslő az 'ljf' ütemezéshez (a mért kérésekből tanul)
+            key_pool: Opcionális több kulcsos pool; ilyenkor a kérések kulcsonkénti
+                      rate limittel a pool kulcsai között oszlanak el (az api_key nem kell)
+            cache: Opcionális tartalom alapú hang cache (találatnál nincs API hívás)
+            chunk_chars: Ennél hosszabb sorok mondathatáron darabolva, párhuzamosan
+                         generálódnak, majd frame szinten összefűződnek (None = nincs darabolás)
+            chunk_workers: Egy sor darabjaiból egyszerre futó kérések száma
+            output_format: Kimeneti profil ("preview", "standard", "final", "pcm") vagy
+                           ElevenLabs output_format (pl. "mp3_44100_96"); None = alapértelmezés
+            pack: Opcionális hang csomag; ilyenkor a hangok külön fájlok helyett ide kerülnek,
+                  az elérési út "<csomag>#<név>" alakú
+            pack_prefix: A csomagbeli nevek előtagja (közös batch csomagnál a forgatókönyv mappája)
+            transport: HTTP transport: 'http1' / 'http2', vagy egy közös create_transport()
+                       példány (None = HTTP/1.1 keep-alive pool)
+            coalesce_chars: Ha meg van adva, az ugyanazon hang egymást követő, legfeljebb ennyi
+                            karakteres sorai egy with-timestamps kérésbe vonódnak, és a hang a
+                            karakter időzítés alapján soronként visszavágva mentődik
+            coalesce_max_chars: Egy összevont kérés legnagyobb szöveghossza
+            coalesce_max_lines: Egy összevont kérés legtöbb sora
+            word_timing: Minden kérés a with-timestamps végponttal megy, és a sorok szó szintű
+                         időzítése (DialogueLine.words) a feliratokhoz elmentődik
+            rate_limiter: Opcionális közös RateLimiter (pl. több generátor egy folyamatban);
+                          ilyenkor ez tartja a kérések közötti időközt a delay helyett
+            async_transport: Az async szintézis (aiter_generate(), generate_speech_async())
+                             AsyncHttpTransport-ja (None = első használatkor jön létre a
+                             transport protokolljával, httpx szükséges)
+            profiler: cProfile módban a worker szálak munkája is a 'synthesis' szakaszba kerül
+            verbose: Soronkénti kiírások (False = semmit nem ír a kimenetre, beágyazott használathoz)
         """
         self.api_key = api_key
         self.output_dir = output_dir
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = (base_url or os.getenv('ELEVENLABS_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.speed = speed
+        self.output_format: OutputFormat = resolve_output_format(output_format)
+        self.pack = pack
+        self.pack_prefix = pack_prefix
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.telemetry = telemetry
+        self.telemetry_label = telemetry_label or output_dir
+        self.max_workers = max(1, max_workers)
+        self.concurrency = concurrency
+        self.hedge = hedge
+        self.schedule = schedule
+        self.cost_model = cost_model or CostModel()
+        self.key_pool = key_pool
+        self.cache = cache
+        self.chunk_chars = chunk_chars
+        self.chunk_workers = max(1, chunk_workers)
+        self.coalesce_chars = coalesce_chars
+        self.coalesce_max_chars = coalesce_max_chars
+        self.coalesce_max_lines = max(2, coalesce_max_lines)
+        self.coalesced_requests = 0
+        self.coalesced_lines = 0
+        self.word_timing = word_timing
+        self.rate_limiter = rate_limiter
+        self.profiler = profiler
+        self.verbose = verbose
+        # Futáson belüli duplikátumok: azonos kérés csak egyszer megy ki
+        self._dedup_lock = threading.Lock()
+        self._dedup: Dict[str, '_DedupEntry'] = {}
+        self.cache_hits = 0
+        self.dedup_hits = 0
+        if concurrency is not None:
+            self.max_workers = max(self.max_workers, concurrency.max_limit)
+        # Kapcsolat pool (batch futásnál a BatchProcessor közös példánya, fájlok között megmarad)
+        if transport is None or isinstance(transport, str):
+            max_connections = self.max_workers * (self.chunk_workers if chunk_chars else 1)
+            transport = create_transport(transport, max_connections, verbose)
+        self.transport = transport
+        # Async kapcsolat pool (a csak általunk létrehozottat zárja le az aclose())
+        self.async_transport = async_transport
+        self._owns_async_transport = False
         
         # Output mappa létrehozása
         os.makedirs(self.output_dir, exist_ok=True)
     
+    def save_settings(self, path: Optional[str] = None) -> str:
+        """
+        A hangot befolyásoló beállítások mentése, hogy egy későbbi javítás
+        (verify.py --repair) ugyanígy generálja újra a hibás sorokat.
+        
+        Args:
+            path: Cél fájl (alapért.: <output_dir>/synthesis_settings.json)
+            
+        Returns:
+            str: A mentett fájl elérési útja
+        """
+        path = path or os.path.join(self.output_dir, SETTINGS_FILE_NAME)
+        settings = {
+            'speed': self.speed,
+            'output_format': self.output_format.name,
+            'chunk_chars': self.chunk_chars,
+            'chunk_workers': self.chunk_workers,
+            'coalesce_chars': self.coalesce_chars,
+            'coalesce_max_chars': self.coalesce_max_chars,
+            'coalesce_max_lines': self.coalesce_max_lines,
+            'word_timing': self.word_timing
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
+        return path
+    
     def generate_speech(self, 
                        text: str, 
                        voice_id: str, 
                        filename: str,
-                       model: str = "eleven_v3") -> Optional[str]:
+                       model: str = "eleven_v3",
+                       enqueued_at: Optional[float] = None) -> Optional[str]:
         """
         Generál egy hangfájlt az ElevenLabs API-val.
         
@@ -43,106 +269,1176 @@ class TTSGenerator:
             voice_id: ElevenLabs voice ID
             filename: A mentendő fájl neve (pl. "01_Lisa_001.mp3")
             model: ElevenLabs model (alapért: eleven_v3 - legújabb)
+            enqueued_at: Mikor került a sor ütemezésre (time.monotonic(), a várakozási időhöz)
             
         Returns:
-            Optional[str]: A mentett fájl teljes elérési útja, vagy None hiba esetén
+            Optional[str]: A mentett fájl teljes elérési útja (csomagnál "<csomag>#<név>"),
+            vagy None hiba esetén
         """
-        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        return self._generate_file(text, voice_id, filename, model, enqueued_at)[0]
+    
+    def _generate_file(self,
+                       text: str,
+                       voice_id: str,
+                       filename: str,
+                       model: str = "eleven_v3",
+                       enqueued_at: Optional[float] = None):
+        """
+        generate_speech() a hang metaadataival együtt (a frame fejlécekből, íráskor számolva).
+        
+        Returns:
+            Tuple[Optional[str], Optional[Dict]]: (elérési út, audio_info()), sikertelen kérésnél
+            (None, None), váratlan kivételnél (None, {'error': ...})
+        """
+        key = self.synthesis_key(text, voice_id, model)
+        entry, owner = None, False
+        
+        try:
+            # Ugyanez a kérés ebben a futásban már ment / megy: megvárjuk és lemásoljuk
+            entry, owner = self._claim(key)
+            while not owner:
+                entry.done.wait()
+                if entry.path is not None:
+                    return self._copy_duplicate(entry, filename)
+                # A korábbi azonos kérés sikertelen volt - újrapróbáljuk
+                entry, owner = self._claim(key)
+            
+            cached = self._load_cached(key, filename)
+            if cached is not None:
+                entry.path, entry.info = cached
+                return cached
+            
+            audio, words, metrics = self._synthesize(text, voice_id, filename, model, enqueued_at)
+            
+            if audio is None:
+                self._log_result(filename, metrics)
+                return None, None
+            
+            entry.path, entry.info = self._save(key, filename, audio, words)
+            self._log_result(filename, metrics, entry.info['size'])
+            return entry.path, entry.info
+        except Exception as e:
+            # Váratlan hiba (lemez, csomag, dekódolás): a sor sikertelen, a futás megy tovább.
+            # A hálózati és kulcs hibákat az _attempt() már kezeli (újrapróbálkozás / rotáció).
+            return self._failed_file(filename, e)
+        finally:
+            if owner:
+                entry.done.set()
+    
+    def _failed_file(self, filename: str, error: Exception):
+        """Kivétellel megszakadt sor: naplózás és a hiba visszaadása a sor eredményéhez."""
+        self._log(f"  🎤 Generálás: {filename}... ❌ Kivétel: {error}")
+        return None, {'error': str(error)}
+    
+    def _copy_duplicate(self, entry: '_DedupEntry', filename: str):
+        """Egy futáson belül már legenerált azonos hang másolata a sor nevén."""
+        filepath = self._store_copy(filename, entry.path)
+        with self._dedup_lock:
+            self.dedup_hits += 1
+        self._log(f"  🎤 Generálás: {filename}... ♻️  Duplikátum ({os.path.basename(entry.path)})")
+        return filepath, entry.info
+    
+    def _load_cached(self, key: str, filename: str):
+        """
+        Cache találat mentése a sor nevén.
+        
+        Returns:
+            Optional[Tuple[str, Dict]]: (elérési út, metaadatok), vagy None, ha nincs ép bejegyzés
+        """
+        cached_path = self.cache.get(key) if self.cache is not None else None
+        if cached_path is None:
+            return None
+        
+        with open(cached_path, 'rb') as f:
+            cached = f.read()
+        problem = validate_file_data(cached, self.output_format.extension)
+        if problem is not None:
+            # Sérült cache bejegyzés: újragenerálás (a put felülírja)
+            self._log(f"  ⚠️  Sérült cache bejegyzés ({filename}): {problem}")
+            return None
+        
+        filepath = self._store(filename, cached)
+        with self._dedup_lock:
+            self.cache_hits += 1
+        self._log(f"  🎤 Generálás: {filename}... ♻️  Cache")
+        info = self._file_info(cached)
+        if self.word_timing:
+            info['words'] = self.cache.get_words(key)
+        return filepath, info
+    
+    def _save(self, key: str, filename: str, audio: bytes, words: Optional[List]):
+        """
+        A legenerált hang mentése (PCM esetén WAV fejléccel) és cache-be írása.
+        
+        Returns:
+            Tuple[str, Dict]: (elérési út, metaadatok)
+        """
+        audio = self.output_format.finalize(audio)
+        filepath = self._store(filename, audio)
+        if self.cache is not None:
+            self.cache.put(key, audio, words)
+        info = self._file_info(audio)
+        if self.word_timing:
+            info['words'] = words
+        return filepath, info
+    
+    def _log_result(self, filename: str, metrics: RequestMetrics, size: Optional[int] = None):
+        """A sor kérésének kimenetele (size=None: sikertelen)."""
+        if size is None:
+            if metrics.status is None:
+                self._log(f"  🎤 Generálás: {filename}... ❌ Hálózati hiba / timeout ({metrics.attempts} próbálkozás)")
+            else:
+                self._log(f"  🎤 Generálás: {filename}... ❌ Hiba: {metrics.status} ({metrics.attempts} próbálkozás)")
+            return
+        
+        retry_note = f", {metrics.attempts}. próbálkozás" if metrics.attempts > metrics.chunks else ""
+        chunk_note = f", {metrics.chunks} darab" if metrics.chunks > 1 else ""
+        self._log(f"  🎤 Generálás: {filename}... ✅ Kész ({size} bytes, {metrics.total:.2f}s{chunk_note}{retry_note})")
+    
+    def _store(self, filename: str, audio: bytes) -> str:
+        """Hang mentése fájlba, vagy csomag módban a csomagba. Visszaadja a helyét."""
+        if self.pack is not None:
+            return self.pack.add(self.pack_prefix + filename, audio)
+        filepath = os.path.join(self.output_dir, filename)
+        with open(filepath, 'wb') as f:
+            f.write(audio)
+        return filepath
+    
+    def _store_copy(self, filename: str, source: str) -> str:
+        """Egy már mentett hang másolata új néven (csomagban alias, byte-ok nélkül)."""
+        if self.pack is not None:
+            pack_path, name = split_location(source)
+            if name is not None and pack_path == self.pack.path:
+                return self.pack.alias(self.pack_prefix + filename, name)
+            return self.pack.add(self.pack_prefix + filename, self.pack.read_location(source))
+        filepath = os.path.join(self.output_dir, filename)
+        shutil.copyfile(source, filepath)
+        return filepath
+    
+    def _file_info(self, audio: bytes) -> Dict:
+        """A mentett fájl metaadatai: hossz / formátum, méret és SHA-256 (az utólagos ellenőrzéshez)."""
+        info = self.output_format.info(audio)
+        info['size'] = len(audio)
+        info['sha256'] = hashlib.sha256(audio).hexdigest()
+        return info
+    
+    def _synthesize(self,
+                    text: str,
+                    voice_id: str,
+                    filename: str,
+                    model: str = "eleven_v3",
+                    enqueued_at: Optional[float] = None):
+        """
+        Egy sor hangja: rövid szövegnél egy kérés, hosszúnál mondathatáron darabolt,
+        párhuzamos kérések, amelyek MP3 frame szinten (újrakódolás nélkül) fűződnek össze.
+        
+        Returns:
+            Tuple[Optional[bytes], Optional[List], RequestMetrics]: A hang byte-jai, a szó
+            időzítés (word_timing módban) és a (darabolásnál összesített) mérési adatok
+        """
+        chunks = split_text(text, self.chunk_chars) if self.chunk_chars else [text]
+        if len(chunks) == 1:
+            result, metrics = self._request_audio(text, voice_id, filename, model, enqueued_at,
+                                                  timestamps=self.word_timing)
+            return self._with_words(result) + (metrics,)
+        
+        metrics = RequestMetrics(self.telemetry_label, filename, voice_id, len(text))
+        metrics.started_at = time.monotonic()
+        metrics.chunks = len(chunks)
+        
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.chunk_workers),
+                                thread_name_prefix="tts-chunk") as executor:
+            request = self.profiler.profiled('synthesis', self._request_audio)
+            futures = [executor.submit(request, chunk, voice_id, f"{filename}#{i + 1}",
+                                       model, enqueued_at, context, self.word_timing)
+                       for i, (chunk, context) in enumerate(self._chunk_contexts(chunks))]
+            results = [self._with_words(result) + (chunk_metrics,)
+                       for result, chunk_metrics in (future.result() for future in futures)]
+        
+        return self._join_chunks(metrics, results)
+    
+    @staticmethod
+    def _chunk_contexts(chunks: List[str]):
+        """(darab, kontextus) párok: a szomszédos szöveg a hanglejtés folytonosságához."""
+        for i, chunk in enumerate(chunks):
+            yield chunk, {
+                "previous_text": " ".join(chunks[:i])[-300:] or None,
+                "next_text": " ".join(chunks[i + 1:])[:300] or None
+            }
+    
+    def _join_chunks(self, metrics: RequestMetrics, results: List):
+        """
+        A darabok (hang, szó időzítés, mérés) hármasainak összefűzése egy sorrá.
+        
+        Returns:
+            Tuple[Optional[bytes], Optional[List], RequestMetrics]: mint a _synthesize()
+        """
+        metrics.finished_at = time.monotonic()
+        metrics.total = metrics.finished_at - metrics.started_at
+        metrics.attempts = sum(m.attempts for _, _, m in results)
+        failed = [m for audio, _, m in results if audio is None]
+        metrics.status = failed[0].status if failed else 200
+        metrics.success = not failed
+        
+        if failed:
+            return None, None, metrics
+        
+        # A darabok szó időzítése a darab kezdetével eltolva
+        words = None
+        if self.word_timing and all(chunk_words is not None for _, chunk_words, _ in results):
+            words = []
+            position = 0.0
+            for chunk_audio, chunk_words, _ in results:
+                words.extend(shift_words(chunk_words, position))
+                position += self.output_format.duration(chunk_audio)
+        
+        audio = self.output_format.join(audio for audio, _, _ in results)
+        metrics.bytes = len(audio)
+        return audio, words, metrics
+    
+    def _with_words(self, result):
+        """A _request_audio() eredménye (hang, szó időzítés) párként; időzítés nélkül (hang, None)."""
+        if result is None:
+            return None, None
+        if not self.word_timing:
+            return result, None
+        audio, alignment = result
+        return audio, word_timings(alignment)
+    
+    def synthesis_key(self, text: str, voice_id: str, model: str = "eleven_v3") -> str:
+        """A kérés tartalom alapú kulcsa (cache és duplikátum szűrés)."""
+        output_format = None if self.output_format.is_default else self.output_format.name
+        return synthesis_key(text, voice_id, model, build_voice_settings(self.speed), output_format)
+    
+    def _claim(self, key: str):
+        """
+        Lefoglalja a kulcsot ebben a futásban.
+        
+        Returns:
+            Tuple[_DedupEntry, bool]: A bejegyzés, és hogy mi generáljuk-e (True),
+            vagy egy korábbi / folyamatban lévő azonos kérés eredményét kell megvárni (False).
+            Ha a korábbi próbálkozás sikertelen volt, újra mi generálunk.
+        """
+        with self._dedup_lock:
+            entry = self._dedup.get(key)
+            if entry is not None and (not entry.done.is_set() or entry.path is not None):
+                return entry, False
+            entry = _DedupEntry()
+            self._dedup[key] = entry
+            return entry, True
+    
+    def _log(self, message: str):
+        """Egy teljes sor kiírása (párhuzamos generálásnál sem keveredik)."""
+        if not self.verbose:
+            return
+        with _print_lock:
+            print(message)
+    
+    def _build_request(self, text: str, voice_id: str, model: str, timestamps: bool = False):
+        """Összeállítja a szintézis kérés URL-jét, fejléceit és törzsét (timestamps: with-timestamps végpont)."""
+        endpoint = "/with-timestamps" if timestamps else ""
+        url = f"{self.base_url}/text-to-speech/{voice_id}{endpoint}?output_format={self.output_format.name}"
         
         headers = {
-            "Accept": "audio/mpeg",
+            "Accept": "application/json" if timestamps else self.output_format.accept,
             "Content-Type": "application/json",
             "xi-api-key": self.api_key
         }
         
-        # TTS beállítások - MAXIMÁLIS PONTOSSÁG OKTATÁSHOZ 🎓
         data = {
             "text": text,
             "model_id": model,
-            "voice_settings": {
-                "stability": 1.0,            # MAXIMUM = 100% szó szerinti, NULLA improvizáció (0-1)
-                "similarity_boost": 0.25,    # MINIMUM = Teljesen robotikus, pontos szövegkövetés (0-1)
-                "style": 0.0,                # 0 = NULLA stílus, csak a szöveg (0-1)
-                "use_speaker_boost": True,   # Beszélő hangerő optimalizálás
-                "speed": 0.7                 # Beszéd sebessége (0.25-4.0, alapért: 1.0)
-            }
+            "voice_settings": build_voice_settings(self.speed)
         }
         
+        return url, headers, data
+    
+    def _request_audio(self,
+                       text: str,
+                       voice_id: str,
+                       filename: str,
+                       model: str = "eleven_v3",
+                       enqueued_at: Optional[float] = None,
+                       context: Optional[Dict] = None,
+                       timestamps: bool = False):
+        """
+        Lekéri a hangot az API-tól újrapróbálkozásokkal, és méri a kérést.
+        
+        Args:
+            context: Opcionális további mezők a kérés törzsébe (pl. previous_text / next_text)
+            timestamps: with-timestamps végpont (a hang mellé karakter időzítés is jön)
+        
+        Returns:
+            Tuple[Optional[bytes], RequestMetrics]: A hang byte-jai (None hiba esetén)
+            és a kérés mérési adatai; timestamps=True esetén a hang helyén (byte-ok, időzítés)
+        """
+        url, headers, data = self._build_request(text, voice_id, model, timestamps)
+        if context:
+            data.update({key: value for key, value in context.items() if value})
+        
+        metrics = self._start_metrics(text, voice_id, filename, enqueued_at)
+        audio = None
+        rotations = 0
+        
+        while True:
+            metrics.attempts += 1
+            
+            if self.hedge is not None:
+                attempt = self._hedged_attempt(url, headers, data, len(text), metrics, timestamps)
+            else:
+                attempt = self._attempt(url, headers, data, len(text), self._acquire_slot(),
+                                        timestamps=timestamps)
+            
+            metrics.status = attempt.status
+            metrics.ttfb = attempt.ttfb if attempt.ttfb is not None else metrics.ttfb
+            
+            if attempt.audio is not None:
+                audio = (attempt.audio, attempt.alignment) if timestamps else attempt.audio
+                metrics.bytes = len(attempt.audio)
+                break
+            
+            # Kivont kulcs: azonnal újra egy másik kulccsal (nem számít újrapróbálkozásnak)
+            if attempt.rotate:
+                rotations += 1
+                continue
+            
+            if attempt.invalid is not None:
+                self._log(f"     ⚠️  Sérült válasz ({filename}): {attempt.invalid}")
+            
+            if attempt.error_text is not None:
+                self._log(f"     Válasz ({filename}): {attempt.error_text}")
+                break
+            
+            if metrics.attempts - rotations > self.max_retries:
+                break
+            
+            time.sleep(self._retry_delay(metrics.attempts, attempt.retry_after))
+        
+        self._finish_metrics(metrics, audio, voice_id, len(text))
+        return audio, metrics
+    
+    def _start_metrics(self, text: str, voice_id: str, filename: str,
+                       enqueued_at: Optional[float] = None) -> RequestMetrics:
+        """Egy sor (vagy darab) kérésének mérése: indulás és várakozási idő."""
+        metrics = RequestMetrics(self.telemetry_label, filename, voice_id, len(text))
+        metrics.started_at = time.monotonic()
+        if enqueued_at is not None:
+            metrics.queue_wait = max(0.0, metrics.started_at - enqueued_at)
+        return metrics
+    
+    def _finish_metrics(self, metrics: RequestMetrics, audio, voice_id: str, chars: int):
+        """A mérés lezárása, a költségmodell tanítása és a telemetria rögzítése."""
+        metrics.finished_at = time.monotonic()
+        metrics.total = metrics.finished_at - metrics.started_at
+        metrics.success = audio is not None
+        
+        if metrics.success:
+            self.cost_model.observe(voice_id, chars, metrics.total)
+        
+        if self.telemetry is not None:
+            self.telemetry.record(metrics)
+    
+    def _acquire_slot(self) -> Optional[float]:
+        """Adaptív módban a szabályozó engedélyére várunk (próbálkozásonként)."""
+        return self.concurrency.acquire() if self.concurrency is not None else None
+    
+    def _attempt(self, url: str, headers: dict, data: dict, chars: int,
+                 slot: Optional[float] = None,
+                 cancelled: Optional[threading.Event] = None,
+                 timestamps: bool = False) -> '_Attempt':
+        """
+        Egyetlen HTTP próbálkozás.
+        
+        Args:
+            slot: A szabályozótól kapott engedély (a próbálkozás végén visszaadjuk)
+            cancelled: Hedge esetén: ha a másik példány már nyert, a választ eldobjuk
+            timestamps: A válasz JSON (base64 hang + karakter időzítés)
+        """
+        attempt = _Attempt()
+        attempt_start = time.monotonic()
+        key = None
         try:
-            print(f"  🎤 Generálás: {filename}...", end=" ")
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            if self.key_pool is not None:
+                key = self.key_pool.acquire(chars)
+                headers = dict(headers, **{"xi-api-key": key.key})
             
-            if response.status_code == 200:
-                # MP3 mentése
-                filepath = os.path.join(self.output_dir, filename)
-                with open(filepath, 'wb') as f:
-                    f.write(response.content)
-                
-                print(f"✅ Kész ({len(response.content)} bytes)")
-                return filepath
+            response = self.transport.post(url, json=data, headers=headers, timeout=30)
+            attempt.ttfb = time.monotonic() - attempt_start
+            attempt.status = response.status_code
+            
+            if cancelled is not None and cancelled.is_set():
+                response.close()
+            elif response.status_code == 200:
+                self._accept_body(attempt, response.read(), timestamps)
             else:
-                print(f"❌ Hiba: {response.status_code}")
-                print(f"     Válasz: {response.text}")
-                return None
+                attempt.retry_after = response.headers.get('Retry-After')
+                if response.status_code not in RETRYABLE_STATUSES:
+                    attempt.error_text = response.text
+                else:
+                    response.close()
+                    
+        except TransportError:
+            attempt.status = None
+            attempt.audio = None
+        except NoKeysAvailable as e:
+            attempt.error_text = str(e)
+        finally:
+            self._end_attempt(attempt, slot, key, chars)
+        
+        attempt.elapsed = time.monotonic() - attempt_start
+        if attempt.audio is not None and self.hedge is not None:
+            self.hedge.observe(attempt.elapsed)
+        return attempt
+    
+    def _accept_body(self, attempt: '_Attempt', body: bytes, timestamps: bool):
+        """A 200-as válasz törzsének ellenőrzése (with-timestamps esetén dekódolása)."""
+        audio = body
+        if timestamps:
+            audio, attempt.alignment, attempt.invalid = decode_timestamped(body)
+        # Csonka / sérült törzs nem kerülhet a lemezre és a cache-be
+        if attempt.invalid is None:
+            attempt.invalid = self.output_format.validate(audio)
+        if attempt.invalid is None:
+            attempt.audio = audio
+    
+    def _end_attempt(self, attempt: '_Attempt', slot: Optional[float], key, chars: int):
+        """A szabályozó engedélyének és a kulcsnak a visszaadása a próbálkozás kimenetelével."""
+        if slot is not None:
+            self.concurrency.release(slot, attempt.status, chars)
+        if key is not None:
+            self.key_pool.release(key, attempt.status, chars, attempt.error_text)
+            if attempt.status == 401 and self.key_pool.active_count:
+                attempt.rotate = True
+                attempt.error_text = None
+    
+    def _hedged_attempt(self, url: str, headers: dict, data: dict, chars: int,
+                        metrics: RequestMetrics, timestamps: bool = False) -> '_Attempt':
+        """
+        Próbálkozás hedginggel: ha az elsődleges kérés a küszöbön belül nem végez,
+        (a keret terhére) indul egy azonos másodpéldány, és az elsőként sikeres válasz nyer.
+        A vesztes kérés eredménye eldobódik (a kapcsolatát a válasz fejléc után lezárjuk).
+        """
+        hedge_after = self.hedge.delay()
+        if hedge_after is None:
+            return self._attempt(url, headers, data, chars, self._acquire_slot(), timestamps=timestamps)
+        
+        results = queue.Queue()
+        cancelled = threading.Event()
+        
+        def run(is_hedge: bool, slot: Optional[float]):
+            results.put((is_hedge, self._attempt(url, headers, data, chars, slot, cancelled, timestamps)))
+        
+        threading.Thread(target=run, args=(False, self._acquire_slot()), daemon=True).start()
+        running = 1
+        
+        try:
+            is_hedge, attempt = results.get(timeout=hedge_after)
+            running -= 1
+        except queue.Empty:
+            is_hedge = attempt = None
+            if self._start_hedge(run):
+                running += 1
+                metrics.hedges += 1
+        
+        while attempt is None or (attempt.audio is None and running):
+            is_hedge, attempt = results.get()
+            running -= 1
+        
+        cancelled.set()
+        if is_hedge and attempt.audio is not None:
+            metrics.hedge_won = True
+            self.hedge.record_win()
+        return attempt
+    
+    def _start_hedge(self, run) -> bool:
+        """Elindítja a hedge példányt, ha a keret és az adaptív limit is engedi."""
+        slot = None
+        if self.concurrency is not None:
+            slot = self.concurrency.try_acquire()
+            if slot is None:
+                return False
+        if not self.hedge.try_spend():
+            if slot is not None:
+                self.concurrency.cancel(slot)
+            return False
+        
+        threading.Thread(target=run, args=(True, slot), daemon=True).start()
+        return True
+    
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Várakozás az újrapróbálkozás előtt (Retry-After fejléc vagy exponenciális backoff)."""
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.retry_backoff * (2 ** (attempt - 1))
+    
+    def iter_generate(self, dialogues: List[DialogueLine], voice_manager, delay: float = 0.5,
+                      ordered: bool = True) -> Iterator[DialogueLine]:
+        """
+        Generálja a párbeszédeket, és mindegyik eredményét azonnal, a forgatókönyv
+        sorrendjében visszaadja (nem gyűjti össze őket).
+        
+        max_workers > 1 esetén a kérések párhuzamosan futnak; ilyenkor a delay
+        a kérések *indítása* közötti minimális időköz (közös rate limiter).
+        
+        Args:
+            dialogues: Párbeszéd sorok listája
+            voice_manager: VoiceManager instance a voice ID-khoz
+            delay: Késleltetés az API hívások között (másodpercben)
+            ordered: False esetén párhuzamos módban a sorok elkészülési sorrendben jönnek
+                     (nem várnak a forgatókönyvben előttük álló, még futó sorokra)
+            
+        Yields:
+            DialogueLine: A sor, kitöltött voice_id, file_name, file_path, success mezőkkel
+        """
+        units = self.plan_units(dialogues, voice_manager)
+        
+        if self.max_workers > 1:
+            yield from self._iter_generate_concurrent(dialogues, voice_manager, delay, units, ordered)
+            return
+        
+        # Egy összevont csoport a legkorábbi soránál generálódik, a többi sora addigra kész
+        unit_starts = {unit[0]: unit for unit in units}
+        remaining = len(units)
+        for index, dialogue in enumerate(dialogues):
+            unit = unit_starts.get(index)
+            if unit is not None:
+                self.generate_unit([dialogues[i] for i in unit], voice_manager, time.monotonic(),
+                                    self.rate_limiter)
+                remaining -= 1
                 
-        except requests.exceptions.Timeout:
-            print(f"❌ Timeout hiba")
-            return None
-        except Exception as e:
-            print(f"❌ Kivétel: {e}")
-            return None
+                # Késleltetés az API rate limit miatt (kulcs poolnál a kulcsonkénti limiter végzi)
+                if remaining and self.key_pool is None and self.rate_limiter is None:
+                    time.sleep(delay)
+            yield dialogue
     
-    def generate_batch(self, dialogues: list, voice_manager, delay: float = 0.5) -> list:
+    def _iter_generate_concurrent(self, dialogues: List[DialogueLine], voice_manager, delay: float,
+                                  units: List[List[int]], ordered: bool = True) -> Iterator[DialogueLine]:
+        """
+        Párhuzamos generálás korlátos ablakkal: legfeljebb 2 * max_workers kérés van
+        egyszerre ütemezve. 'ljf' ütemezésnél a becsült költség szerint csökkenő sorrendben
+        indulnak a kérések; az eredmények a forgatókönyv sorrendjében (ordered=False
+        esetén elkészülési sorrendben) jönnek vissza.
+        """
+        limiter = self.rate_limiter
+        if limiter is None and self.key_pool is None:
+            limiter = RateLimiter(delay)
+        order = self._submission_order(dialogues, voice_manager, units)
+        window = self.max_workers * 2
+        pending = {}
+        done = {}
+        submitted = 0
+        next_index = 0
+        
+        generate_unit = self.profiler.profiled('synthesis', self.generate_unit)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tts") as executor:
+            def refill():
+                nonlocal submitted
+                while len(pending) < window and submitted < len(order):
+                    unit = units[order[submitted]]
+                    future = executor.submit(generate_unit, [dialogues[i] for i in unit],
+                                             voice_manager, time.monotonic(), limiter)
+                    pending[future] = unit
+                    submitted += 1
+            
+            try:
+                refill()
+                while next_index < len(dialogues):
+                    if next_index in done:
+                        yield done.pop(next_index)
+                        next_index += 1
+                        continue
+                    
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        unit = pending.pop(future)
+                        future.result()
+                        if ordered:
+                            done.update((index, dialogues[index]) for index in unit)
+                            continue
+                        # Elkészülési sorrend: a kész sorok azonnal mennek (next_index = kiadott sorok)
+                        for index in unit:
+                            yield dialogues[index]
+                        next_index += len(unit)
+                    refill()
+            finally:
+                # Ha a hívó idő előtt abbahagyja, a még el nem indult kéréseket eldobjuk
+                for future in pending:
+                    future.cancel()
+    
+    def _submission_order(self, dialogues: List[DialogueLine], voice_manager,
+                          units: List[List[int]]) -> List[int]:
+        """A kérés egységek indítási sorrendje a beállított ütemezés szerint."""
+        if self.schedule == 'fifo':
+            return list(range(len(units)))
+        return submission_order(self.unit_costs(dialogues, voice_manager, units), self.schedule)
+    
+    def unit_costs(self, dialogues: List[DialogueLine], voice_manager, units: List[List[int]]) -> List[float]:
+        """A kérés egységek becsült ideje (s), a költségmodell szerint; külső ütemezőnek is."""
+        costs = []
+        for unit in units:
+            voice_id = voice_manager.get_voice_id(dialogues[unit[0]].character)
+            costs.append(self.cost_model.estimate(voice_id, sum(len(dialogues[i].text) for i in unit)))
+        return costs
+    
+    def plan_units(self, dialogues: List[DialogueLine], voice_manager) -> List[List[int]]:
+        """Kérés egységek (indexlisták): soronként egy, összevonásnál az egy kérésbe vont rövid sorok csoportja."""
+        if not self.coalesce_chars:
+            return [[i] for i in range(len(dialogues))]
+        
+        items = [(voice_manager.get_voice_id(d.character), d.text) for d in dialogues]
+        # A cache-ben már meglévő sorokért nem kell kérés
+        skip = set()
+        if self.cache is not None:
+            skip = {i for i, (voice_id, text) in enumerate(items)
+                    if self.cache.contains(self.synthesis_key(text, voice_id, "eleven_v3"))}
+        return plan_groups(items, self.coalesce_chars, self.coalesce_max_chars, self.coalesce_max_lines, skip)
+    
+    def generate_unit(self,
+                      dialogues: List[DialogueLine],
+                      voice_manager,
+                      enqueued_at: float,
+                      limiter: Optional[RateLimiter] = None):
+        """
+        Egy kérés egység: egyetlen sor, vagy összevont rövid sorok csoportja (plan_units()).
+        A sorok eredménye helyben töltődik ki; külső ütemezőből (pl. service.py) is hívható.
+        """
+        if len(dialogues) == 1:
+            self._generate_line(dialogues[0], voice_manager, enqueued_at, limiter)
+        else:
+            self._generate_group(dialogues, voice_manager, enqueued_at, limiter)
+    
+    def _file_name(self, dialogue: DialogueLine) -> str:
+        """A sor hangfájljának neve (pl. "01_Lisa_001.mp3")."""
+        return f"{dialogue.slide_number:02d}_{dialogue.character}_{dialogue.line_number:03d}.{self.output_format.extension}"
+    
+    def _generate_line(self,
+                       dialogue: DialogueLine,
+                       voice_manager,
+                       enqueued_at: float,
+                       limiter: Optional[RateLimiter] = None) -> DialogueLine:
+        """Egy párbeszéd sor generálása és az eredmény helyben kitöltése."""
+        # Fájlnév generálás
+        filename = self._file_name(dialogue)
+        
+        # Voice ID lekérése
+        voice_id = voice_manager.get_voice_id(dialogue.character)
+        
+        if limiter is not None:
+            limiter.acquire()
+        
+        # Hangfájl generálása
+        filepath, info = self._generate_file(
+            text=dialogue.text,
+            voice_id=voice_id,
+            filename=filename,
+            enqueued_at=enqueued_at
+        )
+        
+        self._fill_result(dialogue, voice_id, filename, filepath, info)
+        return dialogue
+    
+    @staticmethod
+    def _fill_result(dialogue: DialogueLine, voice_id: str, filename: str,
+                     filepath: Optional[str], info: Optional[Dict]):
+        """Eredmény kitöltése helyben (nincs soronkénti másolás)."""
+        dialogue.voice_id = voice_id
+        dialogue.file_name = filename
+        dialogue.file_path = filepath
+        dialogue.success = filepath is not None
+        dialogue.error = info.get('error') if info is not None else None
+        if filepath is not None and info is not None:
+            dialogue.duration = info['duration']
+            dialogue.bitrate = info['bitrate']
+            dialogue.sample_rate = info['sample_rate']
+            dialogue.frame_count = info['frame_count']
+            dialogue.size = info['size']
+            dialogue.sha256 = info['sha256']
+            dialogue.words = info.get('words')
+    
+    def _generate_group(self,
+                        dialogues: List[DialogueLine],
+                        voice_manager,
+                        enqueued_at: float,
+                        limiter: Optional[RateLimiter] = None):
+        """
+        Ugyanazon hang rövid sorai egyetlen with-timestamps kéréssel. A sorok fájljai,
+        cache bejegyzései és metaadatai ugyanazok, mint soronkénti generálásnál.
+        Ha a kérés vagy a vágás nem sikerül, a sorok egyenként generálódnak.
+        """
+        model = "eleven_v3"
+        voice_id = voice_manager.get_voice_id(dialogues[0].character)
+        owned, rest = self._claim_group(dialogues, voice_id, model)
+        
+        stored = False
+        try:
+            if len(owned) > 1 and self.coalesce_chars:
+                if limiter is not None:
+                    limiter.acquire()
+                stored = self._synthesize_group(owned, voice_id, model, enqueued_at)
+        finally:
+            # A sikertelen bejegyzéseket a soronkénti generálás újra lefoglalja
+            for _, _, entry in owned:
+                entry.done.set()
+        
+        if not stored:
+            rest = sorted(rest + [dialogue for dialogue, _, _ in owned], key=lambda d: d.line_number)
+        for dialogue in rest:
+            self._generate_line(dialogue, voice_manager, enqueued_at, limiter)
+    
+    def _claim_group(self, dialogues: List[DialogueLine], voice_id: str, model: str):
+        """
+        Az összevonható sorok lefoglalása: csak a még senki által nem generált,
+        cache-ben sem lévő sorok kerülnek a kérésbe.
+        
+        Returns:
+            Tuple[List, List[DialogueLine]]: (sor, cache kulcs, dedup bejegyzés) hármasok
+            és a soronként generálandó többi sor
+        """
+        owned = []
+        rest = []
+        for dialogue in dialogues:
+            key = self.synthesis_key(dialogue.text, voice_id, model)
+            entry, owner = self._claim(key)
+            if owner and (self.cache is None or self.cache.get(key) is None):
+                owned.append((dialogue, key, entry))
+                continue
+            if owner:
+                entry.done.set()
+            rest.append(dialogue)
+        return owned, rest
+    
+    def _synthesize_group(self, owned: List, voice_id: str, model: str, enqueued_at: float) -> bool:
+        """
+        Az összevont kérés, majd a hang soronkénti visszavágása a karakter időzítés alapján.
+        
+        Args:
+            owned: (sor, cache kulcs, dedup bejegyzés) hármasok
+        
+        Returns:
+            bool: Minden sor elkészült-e (False esetén a hívó soronként generál)
+        """
+        text, spans = join_texts([dialogue.text for dialogue, _, _ in owned])
+        label = f"{self._file_name(owned[0][0])}+{len(owned) - 1}"
+        result, metrics = self._request_audio(text, voice_id, label, model, enqueued_at, timestamps=True)
+        return self._store_group(owned, voice_id, label, text, spans, result, metrics)
+    
+    def _store_group(self, owned: List, voice_id: str, label: str, text: str, spans: List,
+                     result, metrics: RequestMetrics) -> bool:
+        """Az összevont válasz visszavágása, a sorok mentése és cache-be írása."""
+        metrics.lines = len(owned)
+        if result is None:
+            if metrics.status in (404, 405):
+                # A végpont nem érhető el: a futás hátralevő részében nincs összevonás
+                self.coalesce_chars = None
+            self._log(f"  🧩 Összevont kérés ({label}): ❌ Hiba: {metrics.status} - soronként újra")
+            return False
+        
+        audio, alignment = result
+        times = cut_times(alignment, spans, len(text))
+        parts = self.output_format.split(audio, times) if times is not None else None
+        if parts is None:
+            self._log(f"  🧩 Összevont kérés ({label}): ⚠️  Az időzítés nem illeszthető - soronként újra")
+            return False
+        
+        with self._dedup_lock:
+            self.coalesced_requests += 1
+            self.coalesced_lines += len(owned)
+        
+        filenames = [self._file_name(dialogue) for dialogue, _, _ in owned]
+        position = 0.0
+        for (dialogue, key, entry), filename, part, span in zip(owned, filenames, parts, spans):
+            # A sor szavai a saját része kezdetéhez mérve
+            words = word_timings(alignment, span, position) if self.word_timing else None
+            position += self.output_format.duration(part)
+            part = self.output_format.finalize(part)
+            filepath = self._store(filename, part)
+            if self.cache is not None:
+                self.cache.put(key, part, words)
+            entry.info = self._file_info(part)
+            if self.word_timing:
+                entry.info['words'] = words
+            entry.path = filepath
+            self._fill_result(dialogue, voice_id, filename, filepath, entry.info)
+            self._log(f"  🎤 Generálás: {filename}... ✅ Kész ({len(part)} bytes, "
+                      f"összevonva {len(owned)} sorral, {metrics.total:.2f}s)")
+        return True
+    
+    def generate_batch(self, dialogues: List[DialogueLine], voice_manager, delay: float = 0.5) -> List[DialogueLine]:
         """
         Több párbeszédet generál egymás után.
         
         Args:
-            dialogues: Párbeszéd lista (dict-ek listája)
+            dialogues: Párbeszéd sorok listája
             voice_manager: VoiceManager instance a voice ID-khoz
             delay: Késleltetés az API hívások között (másodpercben)
             
         Returns:
-            list: Generált fájlok adatai (bővített dialogues lista)
+            List[DialogueLine]: A sorok, kitöltött generálási eredménnyel
         """
-        results = []
+        self._log(f"\n🎬 Összesen {len(dialogues)} párbeszéd generálása indítása...\n")
+        
+        results = list(self.iter_generate(dialogues, voice_manager, delay))
         
-        print(f"\n🎬 Összesen {len(dialogues)} párbeszéd generálása indítása...\n")
+        # Statisztika
+        success_count = sum(1 for r in results if r.success)
+        self._log(f"\n✅ Sikeres: {success_count}/{len(dialogues)}")
         
-        for i, dialogue in enumerate(dialogues, 1):
-            # Fájlnév generálás
-            slide_num = f"{dialogue['slide_number']:02d}"
-            character = dialogue['character']
-            line_num = f"{dialogue['line_number']:03d}"
-            filename = f"{slide_num}_{character}_{line_num}.mp3"
+        return results
+    
+    async def generate_speech_async(self,
+                                    text: str,
+                                    voice_id: str,
+                                    filename: str,
+                                    model: str = "eleven_v3",
+                                    enqueued_at: Optional[float] = None) -> Optional[str]:
+        """
+        A generate_speech() asyncio változata: nem blokkoló HTTP (httpx.AsyncClient), a fájl
+        írás és a cache olvasás soronként egyetlen háttérszálas lépésben. A cache, a duplikátum
+        szűrés, a kulcs pool, az AIMD szabályozó és az újrapróbálkozás ugyanúgy működik.
+        
+        Returns:
+            Optional[str]: A mentett fájl elérési útja, vagy None hiba esetén
+        
+        Raises:
+            ImportError: Ha a httpx nincs telepítve
+        """
+        self._ensure_async_transport(self.max_workers)
+        return (await self._generate_file_async(text, voice_id, filename, model, enqueued_at))[0]
+    
+    async def generate_batch_async(self, dialogues: List[DialogueLine], voice_manager, delay: float = 0.5,
+                                   max_concurrency: Optional[int] = None) -> List[DialogueLine]:
+        """
+        A generate_batch() asyncio változata (aiter_generate()).
+        
+        Args:
+            dialogues: Párbeszéd sorok listája
+            voice_manager: VoiceManager instance a voice ID-khoz
+            delay: Minimális időköz a kérések indítása között (másodpercben)
+            max_concurrency: Egyszerre futó kérések száma (alapért.: max_workers)
+            
+        Returns:
+            List[DialogueLine]: A sorok, kitöltött generálási eredménnyel
+        """
+        self._log(f"\n🎬 Összesen {len(dialogues)} párbeszéd generálása indítása...\n")
+        
+        results = [dialogue async for dialogue in
+                   self.aiter_generate(dialogues, voice_manager, delay, max_concurrency=max_concurrency)]
+        
+        success_count = sum(1 for r in results if r.success)
+        self._log(f"\n✅ Sikeres: {success_count}/{len(dialogues)}")
+        
+        return results
+    
+    async def aiter_generate(self, dialogues: List[DialogueLine], voice_manager, delay: float = 0.5,
+                             ordered: bool = True,
+                             max_concurrency: Optional[int] = None) -> AsyncIterator[DialogueLine]:
+        """
+        Az iter_generate() asyncio változata. A folyamatban lévő kérések nem foglalnak
+        szálat, így max_concurrency akár több ezer is lehet; a kérések indítását a
+        rate limiter (delay), a kulcs pool és az AIMD szabályozó ugyanúgy korlátozza.
+        
+        A hívó task megszakítása (vagy a generátor idő előtti lezárása) a még futó
+        kéréseket is megszakítja; a félbemaradt sorok nem kerülnek a cache-be.
+        
+        Args:
+            dialogues: Párbeszéd sorok listája
+            voice_manager: VoiceManager instance a voice ID-khoz
+            delay: Minimális időköz a kérések indítása között (másodpercben)
+            ordered: False esetén a sorok elkészülési sorrendben jönnek
+            max_concurrency: Egyszerre futó kérés egységek száma (alapért.: max_workers)
+            
+        Yields:
+            DialogueLine: A sor, kitöltött voice_id, file_name, file_path, success mezőkkel
+        
+        Raises:
+            ImportError: Ha a httpx nincs telepítve
+        """
+        limit = max(1, max_concurrency or self.max_workers)
+        self._ensure_async_transport(limit)
+        units = self.plan_units(dialogues, voice_manager)
+        limiter = self.rate_limiter
+        if limiter is None and self.key_pool is None:
+            limiter = RateLimiter(delay)
+        order = self._submission_order(dialogues, voice_manager, units)
+        pending = {}
+        done = {}
+        submitted = 0
+        next_index = 0
+        
+        def refill():
+            nonlocal submitted
+            while len(pending) < limit and submitted < len(order):
+                unit = units[order[submitted]]
+                task = asyncio.ensure_future(self.generate_unit_async([dialogues[i] for i in unit], voice_manager,
+                                                                      time.monotonic(), limiter))
+                pending[task] = unit
+                submitted += 1
+        
+        try:
+            refill()
+            while next_index < len(dialogues):
+                if next_index in done:
+                    yield done.pop(next_index)
+                    next_index += 1
+                    continue
+                
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    unit = pending.pop(task)
+                    task.result()
+                    if ordered:
+                        done.update((index, dialogues[index]) for index in unit)
+                        continue
+                    for index in unit:
+                        yield dialogues[index]
+                    next_index += len(unit)
+                refill()
+        finally:
+            # Idő előtti kilépés / megszakítás: a futó kérések is leállnak
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    async def generate_unit_async(self,
+                                  dialogues: List[DialogueLine],
+                                  voice_manager,
+                                  enqueued_at: float,
+                                  limiter: Optional[RateLimiter] = None):
+        """A generate_unit() asyncio változata (külső async ütemezőből is hívható)."""
+        if len(dialogues) == 1:
+            await self._generate_line_async(dialogues[0], voice_manager, enqueued_at, limiter)
+        else:
+            await self._generate_group_async(dialogues, voice_manager, enqueued_at, limiter)
+    
+    async def aclose(self):
+        """A saját async kapcsolat pool lezárása (az átadott async_transport a hívóé marad)."""
+        if self._owns_async_transport and self.async_transport is not None:
+            await self.async_transport.aclose()
+            self.async_transport = None
+            self._owns_async_transport = False
+    
+    def _ensure_async_transport(self, concurrency: int):
+        """Az async kapcsolat pool létrehozása első használatkor, a sync transport protokolljával."""
+        if self.async_transport is None:
+            max_connections = concurrency * (self.chunk_workers if self.chunk_chars else 1)
+            self.async_transport = create_async_transport(self.transport.name, max_connections, self.verbose)
+            self._owns_async_transport = True
+        return self.async_transport
+    
+    async def _generate_line_async(self,
+                                   dialogue: DialogueLine,
+                                   voice_manager,
+                                   enqueued_at: float,
+                                   limiter: Optional[RateLimiter] = None) -> DialogueLine:
+        """A _generate_line() asyncio változata."""
+        filename = self._file_name(dialogue)
+        voice_id = voice_manager.get_voice_id(dialogue.character)
+        
+        if limiter is not None:
+            await limiter.acquire_async()
+        
+        filepath, info = await self._generate_file_async(dialogue.text, voice_id, filename,
+                                                         enqueued_at=enqueued_at)
+        self._fill_result(dialogue, voice_id, filename, filepath, info)
+        return dialogue
+    
+    async def _generate_file_async(self,
+                                   text: str,
+                                   voice_id: str,
+                                   filename: str,
+                                   model: str = "eleven_v3",
+                                   enqueued_at: Optional[float] = None):
+        """A _generate_file() asyncio változata: a lemez műveletek (cache, mentés, hash) szálon futnak."""
+        key = self.synthesis_key(text, voice_id, model)
+        entry, owner = None, False
+        
+        try:
+            entry, owner = self._claim(key)
+            while not owner:
+                # A dedup bejegyzés szálak között is közös - lekérdezéssel várunk rá
+                while not entry.done.is_set():
+                    await asyncio.sleep(ASYNC_POLL_INTERVAL)
+                if entry.path is not None:
+                    return await asyncio.to_thread(self._copy_duplicate, entry, filename)
+                entry, owner = self._claim(key)
             
-            # Voice ID lekérése
-            voice_id = voice_manager.get_voice_id(character)
+            if self.cache is not None:
+                cached = await asyncio.to_thread(self._load_cached, key, filename)
+                if cached is not None:
+                    entry.path, entry.info = cached
+                    return cached
             
-            # Hangfájl generálása
-            filepath = self.generate_speech(
-                text=dialogue['text'],
-                voice_id=voice_id,
-                filename=filename
-            )
+            audio, words, metrics = await self._synthesize_async(text, voice_id, filename, model, enqueued_at)
+            
+            if audio is None:
+                self._log_result(filename, metrics)
+                return None, None
+            
+            entry.path, entry.info = await asyncio.to_thread(self._save, key, filename, audio, words)
+            self._log_result(filename, metrics, entry.info['size'])
+            return entry.path, entry.info
+        except Exception as e:
+            return self._failed_file(filename, e)
+        finally:
+            if owner:
+                entry.done.set()
+    
+    async def _synthesize_async(self,
+                                text: str,
+                                voice_id: str,
+                                filename: str,
+                                model: str = "eleven_v3",
+                                enqueued_at: Optional[float] = None):
+        """A _synthesize() asyncio változata (a darabok legfeljebb chunk_workers kéréssel egyszerre)."""
+        chunks = split_text(text, self.chunk_chars) if self.chunk_chars else [text]
+        if len(chunks) == 1:
+            result, metrics = await self._request_audio_async(text, voice_id, filename, model, enqueued_at,
+                                                              timestamps=self.word_timing)
+            return self._with_words(result) + (metrics,)
+        
+        metrics = RequestMetrics(self.telemetry_label, filename, voice_id, len(text))
+        metrics.started_at = time.monotonic()
+        metrics.chunks = len(chunks)
+        semaphore = asyncio.Semaphore(self.chunk_workers)
+        
+        async def request(i: int, chunk: str, context: Dict):
+            async with semaphore:
+                return await self._request_audio_async(chunk, voice_id, f"{filename}#{i + 1}", model,
+                                                       enqueued_at, context, self.word_timing)
+        
+        responses = await asyncio.gather(*(request(i, chunk, context)
+                                           for i, (chunk, context) in enumerate(self._chunk_contexts(chunks))))
+        results = [self._with_words(result) + (chunk_metrics,) for result, chunk_metrics in responses]
+        return self._join_chunks(metrics, results)
+    
+    async def _request_audio_async(self,
+                                   text: str,
+                                   voice_id: str,
+                                   filename: str,
+                                   model: str = "eleven_v3",
+                                   enqueued_at: Optional[float] = None,
+                                   context: Optional[Dict] = None,
+                                   timestamps: bool = False):
+        """
+        A _request_audio() asyncio változata (ugyanazok az újrapróbálkozási szabályok;
+        hedge nélkül - a sok olcsó egyidejű kérés itt a szórást is kiegyenlíti).
+        """
+        url, headers, data = self._build_request(text, voice_id, model, timestamps)
+        if context:
+            data.update({key: value for key, value in context.items() if value})
+        
+        metrics = self._start_metrics(text, voice_id, filename, enqueued_at)
+        audio = None
+        rotations = 0
+        
+        while True:
+            metrics.attempts += 1
+            attempt = await self._attempt_async(url, headers, data, len(text), timestamps)
             
-            # Eredmény hozzáadása
-            result = dialogue.copy()
-            result['voice_id'] = voice_id
-            result['file_name'] = filename
-            result['file_path'] = filepath
-            result['success'] = filepath is not None
+            metrics.status = attempt.status
+            metrics.ttfb = attempt.ttfb if attempt.ttfb is not None else metrics.ttfb
             
-            results.append(result)
+            if attempt.audio is not None:
+                audio = (attempt.audio, attempt.alignment) if timestamps else attempt.audio
+                metrics.bytes = len(attempt.audio)
+                break
             
-            # Késleltetés az API rate limit miatt
-            if i < len(dialogues):
-                time.sleep(delay)
+            # Kivont kulcs: azonnal újra egy másik kulccsal (nem számít újrapróbálkozásnak)
+            if attempt.rotate:
+                rotations += 1
+                continue
+            
+            if attempt.invalid is not None:
+                self._log(f"     ⚠️  Sérült válasz ({filename}): {attempt.invalid}")
+            
+            if attempt.error_text is not None:
+                self._log(f"     Válasz ({filename}): {attempt.error_text}")
+                break
+            
+            if metrics.attempts - rotations > self.max_retries:
+                break
+            
+            await asyncio.sleep(self._retry_delay(metrics.attempts, attempt.retry_after))
         
-        # Statisztika
-        success_count = sum(1 for r in results if r['success'])
-        print(f"\n✅ Sikeres: {success_count}/{len(dialogues)}")
+        self._finish_metrics(metrics, audio, voice_id, len(text))
+        return audio, metrics
+    
+    async def _attempt_async(self, url: str, headers: dict, data: dict, chars: int,
+                             timestamps: bool = False) -> '_Attempt':
+        """Egyetlen nem blokkoló HTTP próbálkozás (mint az _attempt(), hedge nélkül)."""
+        attempt = _Attempt()
+        slot = await self.concurrency.acquire_async() if self.concurrency is not None else None
+        attempt_start = time.monotonic()
+        key = None
+        try:
+            if self.key_pool is not None:
+                key = await self.key_pool.acquire_async(chars)
+                headers = dict(headers, **{"xi-api-key": key.key})
+            
+            response = await self.async_transport.post(url, json=data, headers=headers, timeout=30)
+            attempt.ttfb = time.monotonic() - attempt_start
+            attempt.status = response.status_code
+            
+            if response.status_code == 200:
+                self._accept_body(attempt, await response.read(), timestamps)
+            else:
+                attempt.retry_after = response.headers.get('Retry-After')
+                if response.status_code not in RETRYABLE_STATUSES:
+                    attempt.error_text = await response.text()
+                else:
+                    await response.close()
+                    
+        except TransportError:
+            attempt.status = None
+            attempt.audio = None
+        except NoKeysAvailable as e:
+            attempt.error_text = str(e)
+        except asyncio.CancelledError:
+            # Megszakításnál az engedély a limit módosítása nélkül jár vissza
+            if slot is not None:
+                self.concurrency.cancel(slot)
+                slot = None
+            raise
+        finally:
+            self._end_attempt(attempt, slot, key, chars)
         
-        return results
+        attempt.elapsed = time.monotonic() - attempt_start
+        return attempt
+    
+    async def _generate_group_async(self,
+                                    dialogues: List[DialogueLine],
+                                    voice_manager,
+                                    enqueued_at: float,
+                                    limiter: Optional[RateLimiter] = None):
+        """A _generate_group() asyncio változata."""
+        model = "eleven_v3"
+        voice_id = voice_manager.get_voice_id(dialogues[0].character)
+        owned, rest = self._claim_group(dialogues, voice_id, model)
+        
+        stored = False
+        try:
+            if len(owned) > 1 and self.coalesce_chars:
+                if limiter is not None:
+                    await limiter.acquire_async()
+                text, spans = join_texts([dialogue.text for dialogue, _, _ in owned])
+                label = f"{self._file_name(owned[0][0])}+{len(owned) - 1}"
+                result, metrics = await self._request_audio_async(text, voice_id, label, model, enqueued_at,
+                                                                  timestamps=True)
+                stored = await asyncio.to_thread(self._store_group, owned, voice_id, label, text, spans,
+                                                 result, metrics)
+        finally:
+            for _, _, entry in owned:
+                entry.done.set()
+        
+        if not stored:
+            rest = sorted(rest + [dialogue for dialogue, _, _ in owned], key=lambda d: d.line_number)
+        for dialogue in rest:
+            await self._generate_line_async(dialogue, voice_manager, enqueued_at, limiter)
     
     def get_available_voices(self) -> Optional[dict]:
         """
@@ -0,0 +1,498 @@
+"""
+Ellenőrző modul
+Feladata: Egy output mappa (akár a teljes batch_output fa) legenerált hangfájljainak
+gyors, párhuzamos ellenőrzése a soronkénti naplók (dialogues*.jsonl) alapján
+(önálló fájlok és hang csomagok egyaránt): frame fejlécek bejárása, rögzített méret és SHA-256, gyanúsan rövid vagy csendes hang.
+Javító módban csak a hibás sorok generálódnak újra, a naplók és exportok (összefűzött sáv,
+feliratok, egyesített shard export) frissülnek.
+
+Használat:
+    python verify.py batch_output
+    python verify.py batch_output --repair
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from audio_pack import AudioPackReader, AudioPackWriter, split_location
+from audio_export import export_combined_audio
+from subtitles import write_subtitles
+from batch_processor import merge_shard_dialogues
+from dialogue_line import DialogueLine
+from voice_manager import VoiceManager
+from tts_generator import TTSGenerator, load_settings
+from key_pool import load_api_keys, parse_key_spec, build_key_pool
+from mp3_utils import audio_info
+from output_formats import file_silent_ratio, validate_file_data, wav_info
+from results_log import iter_results, export_csv, export_json
+
+
+# Ennél több karakter / másodperc gyanúsan rövid hang (normál beszéd ~15)
+DEFAULT_MAX_CHARS_PER_SECOND = 30.0
+# Ennél rövidebb szövegnél nem vizsgáljuk a hosszt (pl. "Yes.")
+MIN_CHECK_CHARS = 20
+# Ekkora csendes frame arány felett a hang csendesnek számít
+SILENT_RATIO = 0.98
+
+
+def find_result_logs(root: str) -> List[Path]:
+    """A soronkénti naplók (dialogues.jsonl, shardolt futásnál dialogues.<shard>.jsonl) a fában."""
+    return sorted(Path(root).rglob('dialogues*.jsonl'))
+
+
+def locate_pack(pack_path: str, base_dir: Path) -> Optional[Path]:
+    """
+    Egy naplózott hang csomag megkeresése.
+    Ha a fát áthelyezték, a napló mappájában, majd a szülő mappákban keressük
+    (forgatókönyvenkénti csomag a napló mellett, közös batch csomag a fa gyökerében).
+    """
+    path = Path(pack_path)
+    if path.is_file():
+        return path
+    for directory in (base_dir, *base_dir.parents):
+        candidate = directory / path.name
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+class PackReaders:
+    """Megnyitott csomag olvasók, csomagonként egy (a párhuzamos ellenőrzés szálai osztoznak rajtuk)."""
+
+    __slots__ = ('_readers', '_lock')
+
+    def __init__(self):
+        self._readers: Dict[Path, Optional[AudioPackReader]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pack_path: str, base_dir: Path) -> Optional[AudioPackReader]:
+        """A csomag olvasója, vagy None, ha a csomag nem található / sérült."""
+        path = locate_pack(pack_path, base_dir)
+        if path is None:
+            return None
+        with self._lock:
+            if path not in self._readers:
+                try:
+                    self._readers[path] = AudioPackReader(str(path))
+                except ValueError:
+                    self._readers[path] = None
+            return self._readers[path]
+
+    def close(self):
+        with self._lock:
+            for reader in self._readers.values():
+                if reader is not None:
+                    reader.close()
+            self._readers.clear()
+
+
+def check_line(record: Dict,
+               base_dir: Path,
+               max_chars_per_second: float = DEFAULT_MAX_CHARS_PER_SECOND,
+               check_silence: bool = True,
+               packs: Optional[PackReaders] = None) -> List[str]:
+    """
+    Egy sor hangfájljának ellenőrzése.
+
+    Args:
+        record: A sor naplózott rekordja
+        base_dir: A napló mappája (ha a fát áthelyezték, itt keressük a fájlt)
+        max_chars_per_second: E fölött a hang gyanúsan rövid
+        check_silence: Vizsgálja-e a csendet
+        packs: Csomag olvasók csomagbeli hangokhoz (None = soronként új olvasó)
+
+    Returns:
+        List[str]: A talált hibák ("kód" vagy "kód: részletek"); üres lista = ép
+    """
+    if not record.get('success') or not record.get('file_name'):
+        return ['not_generated']
+
+    pack_path, name = split_location(record.get('file_path') or '')
+    if name is not None:
+        own_packs = packs is None
+        packs = packs or PackReaders()
+        try:
+            reader = packs.get(pack_path, base_dir)
+            if reader is None or name not in reader:
+                return ['missing']
+            # Méret eltérésnél nem kell beolvasni a hangot
+            size = reader.entries[name][1]
+            if record.get('size') is not None and size != record['size']:
+                return [f"size_mismatch: {size}/{record['size']} byte"]
+            data = reader.read(name)
+        finally:
+            if own_packs:
+                packs.close()
+        extension = Path(name).suffix.lstrip('.').lower()
+    else:
+        path = Path(pack_path)
+        if not path.is_file():
+            path = base_dir / record['file_name']
+        if not path.is_file():
+            return ['missing']
+
+        # Méret eltérésnél nem kell beolvasni a fájlt
+        size = path.stat().st_size
+        if record.get('size') is not None and size != record['size']:
+            return [f"size_mismatch: {size}/{record['size']} byte"]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        extension = path.suffix.lstrip('.').lower()
+
+    problems = []
+    if record.get('sha256') and hashlib.sha256(data).hexdigest() != record['sha256']:
+        problems.append('checksum_mismatch')
+
+    problem = validate_file_data(data, extension)
+    if problem is not None:
+        problems.append(f"corrupt: {problem}")
+        return problems
+
+    chars = len(record.get('text') or '')
+    duration = (wav_info(data) if extension == 'wav' else audio_info(data))['duration']
+    if chars >= MIN_CHECK_CHARS and duration * max_chars_per_second < chars:
+        problems.append(f"too_short: {duration:.2f}s / {chars} karakter")
+
+    if check_silence and file_silent_ratio(data, extension) >= SILENT_RATIO:
+        problems.append('silent')
+
+    return problems
+
+
+def verify_tree(root: str,
+                workers: int = 8,
+                max_chars_per_second: float = DEFAULT_MAX_CHARS_PER_SECOND,
+                check_silence: bool = True) -> Dict:
+    """
+    Az output fa összes naplózott sorának ellenőrzése párhuzamosan.
+
+    Returns:
+        Dict: {'root', 'logs', 'lines', 'ok', 'by_problem', 'broken': [...], 'seconds'}
+    """
+    started = time.monotonic()
+    logs = find_result_logs(root)
+    jobs = [(log, record) for log in logs for record in iter_results(str(log))]
+    packs = PackReaders()
+
+    def run(job):
+        log, record = job
+        return check_line(record, log.parent, max_chars_per_second, check_silence, packs)
+
+    broken = []
+    by_problem: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="verify") as executor:
+        try:
+            results = list(executor.map(run, jobs))
+        finally:
+            packs.close()
+        for (log, record), problems in zip(jobs, results):
+            if not problems:
+                continue
+            for problem in problems:
+                code = problem.split(':', 1)[0]
+                by_problem[code] = by_problem.get(code, 0) + 1
+            broken.append({
+                'log': str(log),
+                'line_number': record.get('line_number'),
+                'file_name': record.get('file_name'),
+                'problems': problems
+            })
+
+    return {
+        'root': str(root),
+        'logs': len(logs),
+        'lines': len(jobs),
+        'ok': len(jobs) - len(broken),
+        'by_problem': by_problem,
+        'broken': broken,
+        'seconds': round(time.monotonic() - started, 3)
+    }
+
+
+def find_export_settings(log_dir: Path) -> Optional[Dict]:
+    """
+    Egy forgatókönyv összefűzött sáv / felirat exportjának beállításai a batch összesítőből
+    (batch_summary*.json a forgatókönyv mappájának szülőjében).
+
+    Returns:
+        Dict: {'name', 'export_audio', 'subtitles', 'line_gap', 'slide_gap'}, vagy None, ha
+              a forgatókönyv nem szerepel olyan összesítőben, amely a csend hosszakat is rögzíti
+    """
+    for path in sorted(log_dir.parent.glob('batch_summary*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if summary.get('line_gap') is None or summary.get('slide_gap') is None:
+            continue
+        for result in summary.get('results', []):
+            # Név szerint: az áthelyezett fában is megtalálható
+            if result.get('output_dir') and Path(result['output_dir']).name == log_dir.name:
+                return {
+                    'name': result['name'],
+                    'export_audio': 'combined' in result,
+                    'subtitles': 'subtitles' in result,
+                    'line_gap': summary['line_gap'],
+                    'slide_gap': summary['slide_gap']
+                }
+    return None
+
+
+def rebuild_exports(log_path: Path) -> Dict:
+    """
+    Egy javított napló származtatott exportjainak újraépítése: az egyesített shard export
+    (dialogues.json / .csv), az összefűzött sávok (combined/*.mp3, timing.json) és a feliratok.
+    Ami a batch összesítő nélkül nem építhető újra, elavultként jelentjük.
+
+    Returns:
+        Dict: {'rebuilt': [...], 'stale': [...]} (elérési utak)
+    """
+    output_dir = log_path.parent
+    result = {'rebuilt': [], 'stale': []}
+
+    # Soronkénti shardolás: a --merge-shards által egyesített export
+    if log_path.name != 'dialogues.jsonl' and (output_dir / 'dialogues.json').exists():
+        merge_shard_dialogues(output_dir)
+        result['rebuilt'] += [str(output_dir / 'dialogues.json'), str(output_dir / 'dialogues.csv')]
+
+    combined_dir = output_dir / 'combined'
+    if not combined_dir.is_dir():
+        return result
+
+    settings = find_export_settings(output_dir)
+    if settings is None:
+        result['stale'] += [str(path) for path in sorted(combined_dir.iterdir())]
+        return result
+
+    index_path = None
+    if settings['export_audio']:
+        combined = export_combined_audio(str(log_path), str(output_dir), settings['name'],
+                                         settings['line_gap'], settings['slide_gap'])
+        index_path = combined['index_file']
+        result['rebuilt'] += [combined['script_file'], combined['index_file']]
+        result['rebuilt'] += [slide['file'] for slide in combined['slides']]
+    if settings['subtitles']:
+        subtitles = write_subtitles(str(log_path), str(output_dir), settings['name'],
+                                    settings['line_gap'], settings['slide_gap'], index_path)
+        result['rebuilt'] += list(subtitles['files'].values())
+    return result
+
+
+def infer_output_format(records: Sequence[Dict]) -> Optional[str]:
+    """Az eredeti kimeneti formátum a rögzített metaadatokból (pl. mp3_44100_64, pcm_24000)."""
+    for record in records:
+        if not (record.get('file_name') and record.get('sample_rate') and record.get('bitrate')):
+            continue
+        if record['file_name'].endswith('.wav'):
+            return f"pcm_{record['sample_rate']}"
+        return f"mp3_{record['sample_rate']}_{record['bitrate'] // 1000}"
+    return None
+
+
+def repair(report: Dict,
+           api_key: str,
+           key_pool=None,
+           speed: Optional[float] = None,
+           output_format: Optional[str] = None,
+           base_url: Optional[str] = None,
+           max_workers: int = 4,
+           delay: float = 0.5) -> Dict:
+    """
+    Csak a hibás sorok újragenerálása, naplónként; utána a napló, a JSON/CSV export, az összefűzött
+    sávok és a feliratok frissülnek (ami nem építhető újra, a 'stale' listába kerül).
+    Csomagba mentett hangoknál az új hang a csomag végére kerül (a régi rekord elárvul).
+    A sebesség, a formátum, a darabolás / összevonás és a szó időzítés a futás mentett
+    beállításaiból (synthesis_settings.json) jön; szó időzítés akkor is, ha a napló sorai tartalmazzák.
+
+    Args:
+        report: verify_tree() eredménye
+        api_key: ElevenLabs API kulcs
+        key_pool: Opcionális több kulcsos pool
+        speed: Beszéd sebessége (None = a futás mentett beállítása, különben 0.7)
+        output_format: Kimeneti formátum (None = a mentett beállítás, vagy a naplóból kikövetkeztetve)
+        base_url: API alap URL
+        max_workers: Egyidejű kérések
+        delay: Minimális időköz a kérések között (s)
+
+    Returns:
+        Dict: {'lines', 'repaired', 'failed': [...], 'rebuilt': [...], 'stale': [...]}
+    """
+    by_log: Dict[str, set] = {}
+    for item in report['broken']:
+        by_log.setdefault(item['log'], set()).add(item['line_number'])
+
+    result = {'lines': sum(len(lines) for lines in by_log.values()), 'repaired': 0, 'failed': [],
+              'rebuilt': [], 'stale': []}
+
+    for log, line_numbers in by_log.items():
+        log_path = Path(log)
+        records = list(iter_results(log))
+        print(f"\n🔧 {log_path.parent}: {len(line_numbers)} sor újragenerálása")
+
+        # Friss sorok (a régi eredmény mezők nélkül), a naplózott hanggal
+        dialogues = [DialogueLine(r['slide_number'], r['character'], r['text'], r['line_number'], r.get('voice_id'))
+                     for r in records if r.get('line_number') in line_numbers]
+        voice_manager = VoiceManager()
+        voice_manager.character_voice_map = {d.character: d.voice_id for d in dialogues if d.voice_id}
+
+        # Az eredeti futás beállításai, hogy a javított sor ugyanúgy szóljon
+        settings = load_settings(str(log_path.parent))
+        word_timing = bool(settings.get('word_timing')) or any(r.get('words') for r in records)
+
+        pack, pack_prefix = _open_repair_pack(records, log_path.parent)
+        tts = TTSGenerator(api_key, str(log_path.parent),
+                           speed=speed if speed is not None else settings.get('speed', 0.7),
+                           base_url=base_url,
+                           max_workers=max_workers,
+                           key_pool=key_pool,
+                           chunk_chars=settings.get('chunk_chars'),
+                           chunk_workers=settings.get('chunk_workers', 4),
+                           coalesce_chars=settings.get('coalesce_chars'),
+                           coalesce_max_chars=settings.get('coalesce_max_chars', 400),
+                           coalesce_max_lines=settings.get('coalesce_max_lines', 8),
+                           word_timing=word_timing,
+                           output_format=(output_format or settings.get('output_format')
+                                          or infer_output_format(records)),
+                           pack=pack,
+                           pack_prefix=pack_prefix)
+
+        updated = {}
+        try:
+            for line in tts.iter_generate(dialogues, voice_manager, delay=delay):
+                updated[line.line_number] = line.to_dict()
+                if line.success:
+                    result['repaired'] += 1
+                else:
+                    result['failed'].append({'log': log, 'line_number': line.line_number})
+        finally:
+            if pack is not None:
+                pack.close()
+
+        # Napló csere (atomikusan), majd exportok újra
+        tmp_path = log_path.with_name(log_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                record = updated.get(record.get('line_number'), record)
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, log_path)
+
+        export_json(str(log_path), str(log_path.with_suffix('.json')))
+        export_csv(str(log_path), str(log_path.with_suffix('.csv')))
+
+        exports = rebuild_exports(log_path)
+        result['rebuilt'] += exports['rebuilt']
+        result['stale'] += exports['stale']
+        if exports['stale']:
+            print(f"⚠️  Elavult exportok (batch összesítő nélkül nem építhetők újra): {len(exports['stale'])} fájl")
+
+    return result
+
+
+def _open_repair_pack(records: Sequence[Dict], base_dir: Path):
+    """
+    Ha a napló hangjai csomagban vannak, a csomag folytatása a javításhoz.
+
+    Returns:
+        Tuple: (AudioPackWriter vagy None, a csomagbeli nevek mappa előtagja)
+    """
+    for record in records:
+        pack_path, name = split_location(record.get('file_path') or '')
+        if name is None:
+            continue
+        path = locate_pack(pack_path, base_dir) or Path(pack_path)
+        prefix = name.rpartition('/')[0]
+        return AudioPackWriter(str(path), append=True), prefix + '/' if prefix else ''
+    return None, ''
+
+
+def print_report(report: Dict, limit: int = 20):
+    """Az ellenőrzés eredményének kiírása."""
+    print(f"\n🔍 Ellenőrzés: {report['root']}")
+    print(f"   📄 Naplók: {report['logs']}, sorok: {report['lines']} ({report['seconds']:.2f}s)")
+    print(f"   ✅ Ép: {report['ok']}")
+    if not report['broken']:
+        return
+
+    print(f"   ❌ Hibás: {len(report['broken'])}")
+    for code, count in sorted(report['by_problem'].items(), key=lambda item: -item[1]):
+        print(f"      • {code}: {count}")
+    for item in report['broken'][:limit]:
+        print(f"      {Path(item['log']).parent.name}/{item['file_name']}: {', '.join(item['problems'])}")
+    if len(report['broken']) > limit:
+        print(f"      ... és még {len(report['broken']) - limit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AutoSound - legenerált hangfájlok ellenőrzése és javítása")
+    parser.add_argument('root', help="Output mappa (pl. batch_output vagy output)")
+    parser.add_argument('--workers', type=int, default=8, help="Párhuzamos ellenőrzés szálai (alapért.: 8)")
+    parser.add_argument('--max-chars-per-second', type=float, default=DEFAULT_MAX_CHARS_PER_SECOND,
+                        metavar='N', help="E fölött a hang gyanúsan rövid (alapért.: 30)")
+    parser.add_argument('--allow-silent', action='store_true', help="A csendes hang nem hiba")
+    parser.add_argument('--repair', action='store_true', help="A hibás sorok újragenerálása")
+    parser.add_argument('--speed', type=float,
+                        help="Beszéd sebessége javításkor (alapért.: a futás mentett beállítása, különben 0.7)")
+    parser.add_argument('--output-format', metavar='PROFIL',
+                        help="Kimeneti formátum javításkor (alapért.: a futás mentett beállítása vagy a naplóból "
+                             "kikövetkeztetve)")
+    parser.add_argument('--synth-workers', type=int, default=4, metavar='N',
+                        help="Egyidejű kérések javításkor (alapért.: 4)")
+    parser.add_argument('--delay', type=float, default=0.5, metavar='SEC')
+    parser.add_argument('--base-url', help="API alap URL (alapért.: ELEVENLABS_BASE_URL vagy az éles API)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"❌ Hiba: A mappa nem található: {args.root}")
+        sys.exit(2)
+
+    report = verify_tree(args.root, args.workers, args.max_chars_per_second, not args.allow_silent)
+    print_report(report)
+
+    if args.repair and report['broken']:
+        load_dotenv()
+        api_keys = load_api_keys()
+        if not api_keys:
+            print("❌ Hiba: ELEVENLABS_API_KEY (vagy ELEVENLABS_API_KEYS) nincs beállítva!")
+            sys.exit(2)
+
+        report['repair'] = repair(report, parse_key_spec(api_keys[0])[0],
+                                  key_pool=build_key_pool(api_keys),
+                                  speed=args.speed,
+                                  output_format=args.output_format,
+                                  base_url=args.base_url,
+                                  max_workers=args.synth_workers,
+                                  delay=args.delay)
+        print(f"\n🔧 Javítva: {report['repair']['repaired']}/{report['repair']['lines']}")
+        if report['repair']['rebuilt']:
+            print(f"   🎞️  Újraépített exportok: {len(report['repair']['rebuilt'])} fájl")
+        for path in report['repair']['stale']:
+            print(f"   ⚠️  Elavult: {path}")
+
+        # Ellenőrzés újra a javítás után
+        report['after_repair'] = verify_tree(args.root, args.workers, args.max_chars_per_second,
+                                             not args.allow_silent)
+        print_report(report['after_repair'])
+
+    report_path = os.path.join(args.root, "verify_report.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📋 Jelentés: {report_path}\n")
+
+    final = report.get('after_repair', report)
+    sys.exit(1 if final['broken'] else 0)
+
+
+if __name__ == "__main__":
+    main()